@@ -12,17 +12,23 @@
 #******************************************************************************
 # CCSDS Stack - Assembler that assembles TM frames from TM packets            *
 # Must be overloaded to handle the frame callback.                            *
-# Restriction: Supports only one virtual channel                              *
+# Serves one virtual channel, see CCSDS.MULTIPLEXER for several channels.     *
 #******************************************************************************
+import array
 from UTIL.SYS import Error, LOG, LOG_INFO, LOG_WARNING, LOG_ERROR
 import CCSDS.DU, CCSDS.FRAME, CCSDS.PACKET
-import UTIL.DU, UTIL.SYS
+import UTIL.CRC, UTIL.DU, UTIL.SYS
 
 #############
 # constants #
 #############
 # default value from the CCSDS standard
 TRANSFER_FRAME_SECONDARY_HEADER_SIZE = 4
+# byte positions in the primary header for the frame template
+MASTER_CHANNEL_FRAME_COUNT_BYTE_POS = 2
+VIRTUAL_CHANNEL_FRAME_COUNT_BYTE_POS = 3
+FIRST_HEADER_POINTER_BYTE_POS = 4
+FIRST_HEADER_POINTER_HIGH_BITS_MASK = 0x07
 
 ###########
 # classes #
@@ -81,18 +87,58 @@ class CLCWdefaults(object):
 class Assembler(object):
   """Converter from TM packets to TM frames"""
   # ---------------------------------------------------------------------------
-  def __init__(self):
-    """default constructor"""
+  def __init__(self, useFrameTemplate=False):
+    """
+    default constructor,
+    useFrameTemplate: frames are copied from a preallocated template
+    instead of being created attribute by attribute, this requires
+    that initFrameTemplate() is called when frameDefaults are changed
+    """
     if UTIL.SYS.s_configuration.TM_TRANSFER_FRAME_HAS_N_PKTS == "1":
       self.multiPacketMode = True
     else:
       self.multiPacketMode = False
     self.pendingFrame = None
+    self.pendingFrameCrc = None
     self.masterChannelFrameCount = 0
     self.virtualChannelFrameCount = 0
     self.frameDefaults = TMframeDefaults()
+    self.frameTemplate = None
+    self.frameHeaderSize = 0
+    self.idlePacketHeaders = {}
+    if useFrameTemplate:
+      self.initFrameTemplate()
     self.initCLCW(CLCWdefaults())
   # ---------------------------------------------------------------------------
+  def initFrameTemplate(self):
+    """
+    creates the frame template from frameDefaults: a zero filled frame with
+    precomputed headers, where only the frame counters and the first header
+    pointer are patched for each frame
+    """
+    # the frame headers are created by the attribute based frame creation
+    self.frameTemplate = None
+    masterChannelFrameCount = self.masterChannelFrameCount
+    virtualChannelFrameCount = self.virtualChannelFrameCount
+    self.createPendingFrame()
+    self.masterChannelFrameCount = masterChannelFrameCount
+    self.virtualChannelFrameCount = virtualChannelFrameCount
+    frameHeader = self.pendingFrame.getBuffer()
+    self.pendingFrame = None
+    self.frameHeaderSize = len(frameHeader)
+    self.frameTemplate = frameHeader + \
+      array.array("B", bytes(self.frameDefaults.transferFrameSize - self.frameHeaderSize))
+    self.idlePacketHeaders = {}
+  # ---------------------------------------------------------------------------
+  def getIdlePacketHeader(self, idlePacketSize):
+    """returns the cached header of an idle packet with idlePacketSize"""
+    idlePacketHeader = self.idlePacketHeaders.get(idlePacketSize)
+    if idlePacketHeader == None:
+      idlePacket = CCSDS.PACKET.createIdlePacket(idlePacketSize)
+      idlePacketHeader = idlePacket.getBuffer()[:CCSDS.PACKET.PRIMARY_HEADER_BYTE_SIZE]
+      self.idlePacketHeaders[idlePacketSize] = idlePacketHeader
+    return idlePacketHeader
+  # ---------------------------------------------------------------------------
   def initCLCW(self, clcwDefaults):
     """initialise CLCW"""
     self.clcw = CCSDS.FRAME.CLCW()
@@ -122,6 +168,7 @@ class Assembler(object):
   def reset(self):
     """resets pending frame"""
     self.pendingFrame = None
+    self.pendingFrameCrc = None
   # ---------------------------------------------------------------------------
   def isFramePending(self):
     """checks if there is a pending frame (waiting for next packet)"""
@@ -137,7 +184,7 @@ class Assembler(object):
       if self.pendingFrameFreeSpace() < binPacketLen:
         LOG_ERROR("packet too big for insert into frame")
         return
-      self.pendingFrame.append(binPacket)
+      self.appendToPendingFrame(binPacket)
       self.flushTMframe()
       return
     # multi packet mode
@@ -148,14 +195,14 @@ class Assembler(object):
     freeSpace = self.pendingFrameFreeSpace()
     if freeSpace >= binPacketLen:
       # the complete TM packet can be added TM packet directly
-      self.pendingFrame.append(binPacket)
+      self.appendToPendingFrame(binPacket)
       if freeSpace == binPacketLen:
         self.flushTMframe()
       return
     # the TM packet must be split into fragments:
     # add the first fragment and flush the frame
     firstFragment = binPacket[:freeSpace]
-    self.pendingFrame.append(firstFragment)
+    self.appendToPendingFrame(firstFragment)
     self.flushTMframe()
     # create frames with the remaining fragments
     remainingFragments = binPacket[freeSpace:]
@@ -163,26 +210,28 @@ class Assembler(object):
     while len(remainingFragments) >= emptyFrameFreeSpace:
       # the next fragment fully fits into the next frame
       nextFragment = remainingFragments[:emptyFrameFreeSpace]
-      self.createPendingFrame()
-      self.pendingFrame.append(nextFragment)
-      self.pendingFrame.firstHeaderPointer = CCSDS.FRAME.NO_FIRST_PACKET_PATTERN
+      self.createPendingFrame(CCSDS.FRAME.NO_FIRST_PACKET_PATTERN)
+      self.appendToPendingFrame(nextFragment)
       self.flushTMframe()
       remainingFragments = remainingFragments[emptyFrameFreeSpace:]
     # handle last fragment (if there is one) that partially fills a frame
     lastFragment = remainingFragments
     lastFragmentLen = len(lastFragment)
     if lastFragmentLen > 0:
-      self.createPendingFrame()
-      self.pendingFrame.append(lastFragment)
-      self.pendingFrame.firstHeaderPointer = lastFragmentLen
+      self.createPendingFrame(lastFragmentLen)
+      self.appendToPendingFrame(lastFragment)
       # the frame of the last fragment is not automatically flushed,
       # because it can be filled with further TM packet(s)
   # ---------------------------------------------------------------------------
-  def createPendingFrame(self):
+  def createPendingFrame(self, firstHeaderPointer=None):
     """
     creates the TM frames only with the headers -->
-    packet or packet fragments are appended later
+    packet or packet fragments are appended later,
+    firstHeaderPointer overrides the value from frameDefaults
     """
+    if self.frameTemplate != None:
+      self.createPendingFrameFromTemplate(firstHeaderPointer)
+      return
     enableSecondaryHeader = (self.frameDefaults.secondaryHeaderFlag == 1)
     tmFrame = CCSDS.FRAME.TMframe(enableSecondaryHeader=enableSecondaryHeader)
     tmFrame.versionNumber = self.frameDefaults.versionNumber
@@ -204,7 +253,51 @@ class Assembler(object):
       tmFrame.secondaryHeaderVersionNr = self.frameDefaults.secondaryHeaderVersionNr
       tmFrame.secondaryHeaderSize = self.frameDefaults.secondaryHeaderSize
       tmFrame.virtualChannelFCountHigh = self.frameDefaults.virtualChannelFCountHigh
+    if firstHeaderPointer != None:
+      tmFrame.firstHeaderPointer = firstHeaderPointer
+    self.pendingFrame = tmFrame
+    self.pendingFrameCrc = None
+  # ---------------------------------------------------------------------------
+  def createPendingFrameFromTemplate(self, firstHeaderPointer):
+    """creates the pending frame as copy of the frame template"""
+    frameBuffer = self.frameTemplate[:]
+    frameBuffer[MASTER_CHANNEL_FRAME_COUNT_BYTE_POS] = self.masterChannelFrameCount
+    self.masterChannelFrameCount += 1
+    self.masterChannelFrameCount %= 256
+    frameBuffer[VIRTUAL_CHANNEL_FRAME_COUNT_BYTE_POS] = self.virtualChannelFrameCount
+    self.virtualChannelFrameCount += 1
+    self.virtualChannelFrameCount %= 256
+    if firstHeaderPointer != None:
+      bytePos = FIRST_HEADER_POINTER_BYTE_POS
+      frameBuffer[bytePos] = (frameBuffer[bytePos] & ~FIRST_HEADER_POINTER_HIGH_BITS_MASK) | \
+                             (firstHeaderPointer >> 8)
+      frameBuffer[bytePos + 1] = firstHeaderPointer & 0xFF
+    tmFrame = CCSDS.FRAME.TMframe(frameBuffer,
+      enableSecondaryHeader=(self.frameDefaults.secondaryHeaderFlag == 1))
+    # the used part of the frame grows with the appended data
+    tmFrame.setLen(self.frameHeaderSize)
     self.pendingFrame = tmFrame
+    self.pendingFrameCrc = None
+  # ---------------------------------------------------------------------------
+  def appendToPendingFrame(self, binData):
+    """
+    appends data to the pending frame and updates the frame CRC on the fly,
+    the frame header must not be changed after the first data are appended
+    """
+    if self.pendingFrameCrc == None:
+      self.pendingFrameCrc = UTIL.CRC.calculate(self.pendingFrame.getBuffer())
+    self.pendingFrameCrc = UTIL.CRC.update(self.pendingFrameCrc, binData)
+    if self.frameTemplate != None:
+      self.writeToPendingFrame(binData)
+    else:
+      self.pendingFrame.append(binData)
+  # ---------------------------------------------------------------------------
+  def writeToPendingFrame(self, binData):
+    """writes data in place behind the used part of a template frame"""
+    bytePos = len(self.pendingFrame)
+    # setLen enlarges the buffer only for a spillover idle packet
+    self.pendingFrame.setLen(bytePos + len(binData))
+    memoryview(self.pendingFrame.buffer)[bytePos:bytePos + len(binData)] = binData
   # ---------------------------------------------------------------------------
   def emptyFrameFreeSpace(self):
     """free space of an empty frame, considers a CRC"""
@@ -226,6 +319,9 @@ class Assembler(object):
     """finalize a telemetry frame with an idle packet"""
     if self.pendingFrame == None:
       return
+    if self.frameTemplate != None:
+      self.flushTemplateFrame()
+      return
     # append idle packet
     idlePacketSize = self.pendingFrameFreeSpace()
     if idlePacketSize > 0:
@@ -233,27 +329,57 @@ class Assembler(object):
       # note: this might cause a spillover if the idle packet
       idlePacketSize = max(idlePacketSize, CCSDS.PACKET.PACKET_MIN_BYTE_SIZE)
       tmIdlePacket = CCSDS.PACKET.createIdlePacket(idlePacketSize)
-      self.pendingFrame.append(tmIdlePacket.getBuffer())
+      self.appendToPendingFrame(tmIdlePacket.getBuffer())
     # append CLCW
-    self.pendingFrame.append(self.clcw.getBuffer())
-    # append CRC
+    self.appendToPendingFrame(self.clcw.getBuffer())
+    # append CRC, which is already calculated
     if CCSDS.FRAME.CRC_CHECK:
       self.pendingFrame.append("\0" * CCSDS.DU.CRC_BYTE_SIZE)
-      self.pendingFrame.setChecksum()
+      crcPos = len(self.pendingFrame) - CCSDS.DU.CRC_BYTE_SIZE
+      self.pendingFrame.setUnsigned(crcPos, CCSDS.DU.CRC_BYTE_SIZE, self.pendingFrameCrc)
     # frame complete
     self.notifyTMframeCallback(self.pendingFrame)
     self.pendingFrame = None
+    self.pendingFrameCrc = None
   # ---------------------------------------------------------------------------
   def flushTMframeOrIdleFrame(self):
     """finalize a telemetry frame with an idle packet or create an idle frame"""
     if self.pendingFrame != None:
       self.flushTMframe()
       return
-    self.createPendingFrame()
-    self.pendingFrame.firstHeaderPointer = CCSDS.FRAME.IDLE_FRAME_PATTERN
+    self.createPendingFrame(CCSDS.FRAME.IDLE_FRAME_PATTERN)
     self.flushTMframe()
   # ---------------------------------------------------------------------------
+  def flushTemplateFrame(self):
+    """flushTMframe for a frame that is created from the frame template"""
+    # the data field behind the used part is still zero filled,
+    # therefore only the header of the idle packet must be written
+    idlePacketSize = self.pendingFrameFreeSpace()
+    if idlePacketSize > 0:
+      # note: this might cause a spillover like in flushTMframe
+      idlePacketSize = max(idlePacketSize, CCSDS.PACKET.PACKET_MIN_BYTE_SIZE)
+      if self.pendingFrameCrc == None:
+        self.pendingFrameCrc = UTIL.CRC.calculate(self.pendingFrame.getBuffer())
+      bytePos = len(self.pendingFrame)
+      self.pendingFrame.setLen(bytePos + idlePacketSize)
+      frameBuffer = self.pendingFrame.buffer
+      frameBuffer[bytePos:bytePos + CCSDS.PACKET.PRIMARY_HEADER_BYTE_SIZE] = \
+        self.getIdlePacketHeader(idlePacketSize)
+      self.pendingFrameCrc = UTIL.CRC.update(self.pendingFrameCrc,
+        memoryview(frameBuffer)[bytePos:bytePos + idlePacketSize])
+    # write CLCW
+    self.appendToPendingFrame(self.clcw.getBuffer())
+    # write CRC, which is already calculated
+    if CCSDS.FRAME.CRC_CHECK:
+      crcPos = len(self.pendingFrame)
+      self.pendingFrame.setLen(crcPos + CCSDS.DU.CRC_BYTE_SIZE)
+      self.pendingFrame.setUnsigned(crcPos, CCSDS.DU.CRC_BYTE_SIZE, self.pendingFrameCrc)
+    # frame complete
+    self.notifyTMframeCallback(self.pendingFrame)
+    self.pendingFrame = None
+    self.pendingFrameCrc = None
+  # ---------------------------------------------------------------------------
   def notifyTMframeCallback(self, tmFrameDu):
     """notifies when the next TM frame is assembled"""
     # shall be overloaded in derived class, default implementaion logs frame
-    LOG("Assembler.notifyTMframeCallback" + UTIL.DU.array2str(tmFrameDu.getBuffer()))
+    LOG(lambda: "Assembler.notifyTMframeCallback" + UTIL.DU.array2str(tmFrameDu.getBuffer()))
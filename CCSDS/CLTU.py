@@ -31,6 +31,8 @@ CLTU_TRAILER_SEQUENCE_SIZE = len(CLTU_TRAILER_SEQUENCE)
 # derived constants
 BCH_NETTO_SIZE = UTIL.BCH.CODE_BLOCK_SIZE - 1
 BCH_MAX_NETTO_INDEX = BCH_NETTO_SIZE - 1
+CLTU_START_BYTES = bytes(CLTU_START_SEQUENCE)
+CLTU_TRAILER_BYTES = bytes(CLTU_TRAILER_SEQUENCE)
 
 #############
 # functions #
@@ -38,54 +40,23 @@ BCH_MAX_NETTO_INDEX = BCH_NETTO_SIZE - 1
 # -----------------------------------------------------------------------------
 def encodeCltu(frame):
   """Converts a TC Frame into a CLTU"""
-  # iterate over the frame bytes, which are copied
-  # into the CLTU body together with BCH code bytes
-  frameIdx = 0
+  # the frame bytes are filled up to complete code blocks and
+  # are copied into the CLTU body together with the BCH code bytes,
+  # all code blocks are processed at once
   frameSize = len(frame)
   nrCltuCodeBlocks = (frameSize + BCH_MAX_NETTO_INDEX) // BCH_NETTO_SIZE
-  cltuBodySize = nrCltuCodeBlocks * UTIL.BCH.CODE_BLOCK_SIZE
-  cltuBody = array.array("B", [0] * cltuBodySize)
-  cltuBodyIdx = 0
-  codeBlkIdx = 0
-  while frameIdx < frameSize:
-    # handle start of a code block
-    if codeBlkIdx == 0:
-      sreg = UTIL.BCH.encodeStart()
-    # take the next byte from the frame for the CLTU and the BCH encoding
-    nextByte = frame[frameIdx]
-    cltuBody[cltuBodyIdx] = nextByte
-    sreg = UTIL.BCH.encodeStep(sreg, nextByte)
-    frameIdx += 1
-    cltuBodyIdx += 1
-    codeBlkIdx += 1
-    # handle end of a code block
-    if codeBlkIdx >= BCH_NETTO_SIZE:
-      code = UTIL.BCH.encodeStop(sreg)
-      cltuBody[cltuBodyIdx] = code
-      cltuBodyIdx += 1
-      codeBlkIdx = 0
-  # fill up remaining bytes in the cltuBody (incl. BCH code byte)
-  while cltuBodyIdx < cltuBodySize:
-    nextByte = CLTU_FILL_BYTE
-    cltuBody[cltuBodyIdx] = nextByte
-    sreg = UTIL.BCH.encodeStep(sreg, nextByte)
-    cltuBodyIdx += 1
-    codeBlkIdx += 1
-    # handle end of the code block
-    if codeBlkIdx >= BCH_NETTO_SIZE:
-      code = UTIL.BCH.encodeStop(sreg)
-      cltuBody[cltuBodyIdx] = code
-      cltuBodyIdx += 1
+  nettoSize = nrCltuCodeBlocks * BCH_NETTO_SIZE
+  netto = bytes(frame) + bytes([CLTU_FILL_BYTE]) * (nettoSize - frameSize)
+  cltuBody = bytearray(nrCltuCodeBlocks * UTIL.BCH.CODE_BLOCK_SIZE)
+  for i in range(BCH_NETTO_SIZE):
+    cltuBody[i::UTIL.BCH.CODE_BLOCK_SIZE] = netto[i::BCH_NETTO_SIZE]
+  cltuBody[BCH_NETTO_SIZE::UTIL.BCH.CODE_BLOCK_SIZE] = \
+    UTIL.BCH.encodeBlocks(netto)
   # CLTU body is completely processed
-  return (array.array("B", CLTU_START_SEQUENCE) +
-          cltuBody +
-          array.array("B", CLTU_TRAILER_SEQUENCE))
+  return array.array("B", CLTU_START_BYTES + cltuBody + CLTU_TRAILER_BYTES)
 # -----------------------------------------------------------------------------
-def decodeCltu(cltu):
-  """Converts a CLTU into a TC Frame"""
-  # Note: the returned frame might contain additional fill bytes,
-  #       these bytes must be removed at the frame layer
-  # calculate the frame size from the CLTU size
+def getCltuBody(cltu):
+  """returns the CLTU body (bytes) or None if the CLTU frame is invalid"""
   cltuSize = len(cltu)
   cltuBodySize = cltuSize - CLTU_START_SEQUENCE_SIZE - CLTU_TRAILER_SEQUENCE_SIZE
   # check general CLTU properties
@@ -93,37 +64,68 @@ def decodeCltu(cltu):
     return None
   if cltuBodySize % UTIL.BCH.CODE_BLOCK_SIZE != 0:
     return None
-  if cltu[:CLTU_START_SEQUENCE_SIZE] != array.array("B", CLTU_START_SEQUENCE):
+  cltu = bytes(cltu)
+  if cltu[:CLTU_START_SEQUENCE_SIZE] != CLTU_START_BYTES:
     return None
-  if cltu[-CLTU_TRAILER_SEQUENCE_SIZE:] != array.array("B", CLTU_TRAILER_SEQUENCE):
+  if cltu[-CLTU_TRAILER_SEQUENCE_SIZE:] != CLTU_TRAILER_BYTES:
     return None
-  # iterate over the CLTU body bytes, which are copied
-  # into the frame, BCH code is checked during the iteration
-  nrCltuCodeBlocks = cltuBodySize // UTIL.BCH.CODE_BLOCK_SIZE
-  frameSize = nrCltuCodeBlocks * BCH_NETTO_SIZE
-  frame = array.array("B", [0] * frameSize)
-  frameIdx = 0
-  cltuIdx = CLTU_START_SEQUENCE_SIZE
+  return cltu[CLTU_START_SEQUENCE_SIZE:-CLTU_TRAILER_SEQUENCE_SIZE]
+# -----------------------------------------------------------------------------
+def decodeCltuBodies(cltuBodies):
+  """
+  Converts CLTU bodies into the netto data of the code blocks,
+  the BCH codes of all bodies are checked in one step,
+  returns a list with netto data (bytearray) or None for each body
+  """
+  codeBlockSize = UTIL.BCH.CODE_BLOCK_SIZE
+  allBodies = b"".join(cltuBodies)
+  netto = bytearray((len(allBodies) // codeBlockSize) * BCH_NETTO_SIZE)
+  for i in range(BCH_NETTO_SIZE):
+    netto[i::BCH_NETTO_SIZE] = allBodies[i::codeBlockSize]
+  expectedCodes = UTIL.BCH.encodeBlocks(netto)
+  receivedCodes = allBodies[BCH_NETTO_SIZE::codeBlockSize]
+  # split the result into the related frames
+  frames = []
   codeBlkIdx = 0
-  while frameIdx < frameSize:
-    # handle start of a code block
-    if codeBlkIdx == 0:
-      sreg = UTIL.BCH.encodeStart()
-    # take the next byte from the CLTU for the frame and the BCH decoding
-    nextByte = cltu[cltuIdx]
-    frame[frameIdx] = nextByte
-    sreg = UTIL.BCH.encodeStep(sreg, nextByte)
-    frameIdx += 1
-    cltuIdx += 1
-    codeBlkIdx += 1
-    # handle end of a code block
-    if codeBlkIdx >= BCH_NETTO_SIZE:
-      code = UTIL.BCH.encodeStop(sreg)
-      if cltu[cltuIdx] != code:
-        return None
-      cltuIdx += 1
-      codeBlkIdx = 0
-  return frame
+  for cltuBody in cltuBodies:
+    nrCltuCodeBlocks = len(cltuBody) // codeBlockSize
+    nextCodeBlkIdx = codeBlkIdx + nrCltuCodeBlocks
+    if receivedCodes[codeBlkIdx:nextCodeBlkIdx] == \
+       expectedCodes[codeBlkIdx:nextCodeBlkIdx]:
+      frames.append(netto[codeBlkIdx * BCH_NETTO_SIZE:
+                          nextCodeBlkIdx * BCH_NETTO_SIZE])
+    else:
+      frames.append(None)
+    codeBlkIdx = nextCodeBlkIdx
+  return frames
+# -----------------------------------------------------------------------------
+def decodeCltu(cltu):
+  """Converts a CLTU into a TC Frame"""
+  # Note: the returned frame might contain additional fill bytes,
+  #       these bytes must be removed at the frame layer
+  return decodeCltus([cltu])[0]
+# -----------------------------------------------------------------------------
+def decodeCltus(cltus):
+  """
+  Converts a list of CLTUs into TC Frames,
+  returns a list with a frame or None (invalid CLTU) for each CLTU
+  """
+  # Note: the returned frames might contain additional fill bytes,
+  #       these bytes must be removed at the frame layer
+  cltuBodies = [getCltuBody(cltu) for cltu in cltus]
+  validCltuBodies = [cltuBody for cltuBody in cltuBodies if cltuBody != None]
+  decodedFrames = iter(decodeCltuBodies(validCltuBodies))
+  # merge the decoded frames with the invalid CLTUs
+  frames = []
+  for cltuBody in cltuBodies:
+    frame = None
+    if cltuBody != None:
+      frame = next(decodedFrames)
+    if frame == None:
+      frames.append(None)
+    else:
+      frames.append(array.array("B", frame))
+  return frames
 # -----------------------------------------------------------------------------
 def checkCltu(cltu):
   """Checks the consistency of a CLTU"""
@@ -136,31 +138,12 @@ def checkCltu(cltu):
     return False, "cltuBodySize too short"
   if cltuBodySize % UTIL.BCH.CODE_BLOCK_SIZE != 0:
     return False, "wrong cltuBodySize"
-  for i in range(0, CLTU_START_SEQUENCE_SIZE):
-    if cltu[i] != CLTU_START_SEQUENCE[i]:
-      return False, "wrong cltu start sequence"
-  for i in range(-CLTU_TRAILER_SEQUENCE_SIZE, 0):
-    if cltu[i] != CLTU_TRAILER_SEQUENCE[i]:
-      return False, "wrong cltu trailer sequence"
-  # iterate over the CLTU body bytes and check the BCH code
-  nrCltuCodeBlocks = cltuBodySize // UTIL.BCH.CODE_BLOCK_SIZE
-  frameSize = nrCltuCodeBlocks * BCH_NETTO_SIZE
-  cltuIdx = CLTU_START_SEQUENCE_SIZE
-  codeBlkIdx = 0
-  while cltuIdx < cltuTrailerStartIdx:
-    # handle start of a code block
-    if codeBlkIdx == 0:
-      sreg = UTIL.BCH.encodeStart()
-    # take the next byte from the CLTU for the frame and the BCH decoding
-    nextByte = cltu[cltuIdx]
-    sreg = UTIL.BCH.encodeStep(sreg, nextByte)
-    cltuIdx += 1
-    codeBlkIdx += 1
-    # handle end of a code block
-    if codeBlkIdx >= BCH_NETTO_SIZE:
-      code = UTIL.BCH.encodeStop(sreg)
-      if cltu[cltuIdx] != code:
-        return False, "wrong BCH check byte"
-      cltuIdx += 1
-      codeBlkIdx = 0
+  cltu = bytes(cltu)
+  if cltu[:CLTU_START_SEQUENCE_SIZE] != CLTU_START_BYTES:
+    return False, "wrong cltu start sequence"
+  if cltu[cltuTrailerStartIdx:] != CLTU_TRAILER_BYTES:
+    return False, "wrong cltu trailer sequence"
+  # check the BCH codes of all code blocks
+  if decodeCltuBodies([cltu[CLTU_START_SEQUENCE_SIZE:cltuTrailerStartIdx]])[0] == None:
+    return False, "wrong BCH check byte"
   return True, "cltu OK"
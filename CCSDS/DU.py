@@ -21,7 +21,7 @@ import UTIL.CRC
 #############
 # constants #
 #############
-CRC_BYTE_SIZE = 2
+CRC_BYTE_SIZE = UTIL.CRC.CRC_BYTE_SIZE
 
 ###########
 # classes #
@@ -35,17 +35,23 @@ class DataUnit(BinaryUnit):
   # ---------------------------------------------------------------------------
   def getTime(self, bytePos, timeFormat):
     """extracts a time"""
-    byteSize = CCSDS.TIME.byteArraySize(timeFormat)
-    timeData = self.getBytes(bytePos, byteSize)
-    timeDU = CCSDS.TIME.createCCSDS(timeData, timeFormat)
-    return CCSDS.TIME.convertFromCCSDS(timeDU, timeFormat)
+    self.checkTimeField(bytePos, timeFormat)
+    return CCSDS.TIME.decodeTime(self.buffer, bytePos, timeFormat)
   # ---------------------------------------------------------------------------
   def setTime(self, bytePos, timeFormat, value):
     """set a time"""
-    timeDU = CCSDS.TIME.convertToCCSDS(value, timeFormat)
-    byteSize = len(timeDU)
-    timeData = timeDU.getBuffer()
-    self.setBytes(bytePos, byteSize, timeData)
+    self.checkTimeField(bytePos, timeFormat)
+    CCSDS.TIME.encodeTime(self.buffer, bytePos, timeFormat, value)
+  # ---------------------------------------------------------------------------
+  def checkTimeField(self, bytePos, timeFormat):
+    """consistency checks for the time field, see getBytes/setBytes"""
+    byteSize = CCSDS.TIME.byteArraySize(timeFormat)
+    if byteSize == None:
+      raise ValueError("invalid timeFormat")
+    if bytePos < 0:
+      raise IndexError("invalid bytePos")
+    if bytePos + byteSize > self.usedBufferSize:
+      raise IndexError("bytePos/byteLength out of buffer")
   # ---------------------------------------------------------------------------
   def setChecksum(self):
     """
@@ -53,7 +59,8 @@ class DataUnit(BinaryUnit):
     buffer must be correctly initialised
     """
     crcPos = self.usedBufferSize - 2
-    crc = UTIL.CRC.calculate(self.buffer[0:crcPos])
+    with memoryview(self.buffer) as bufferView:
+      crc = UTIL.CRC.calculate(bufferView[0:crcPos])
     self.setUnsigned(crcPos, 2, crc)
   # ---------------------------------------------------------------------------
   def checkChecksum(self):
@@ -62,5 +69,6 @@ class DataUnit(BinaryUnit):
     buffer must be correctly initialised
     """
     crcPos = self.usedBufferSize - 2
-    crc = UTIL.CRC.calculate(self.buffer[0:crcPos])
+    with memoryview(self.buffer) as bufferView:
+      crc = UTIL.CRC.calculate(bufferView[0:crcPos])
     return self.getUnsigned(crcPos, 2) == crc
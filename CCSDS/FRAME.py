@@ -111,11 +111,11 @@ class TMframe(CCSDS.DU.DataUnit):
     else:
       self.secondaryHeaderFlag = 1
   # ---------------------------------------------------------------------------
-  def getPackets(self):
-    """return packets and packet fragments in a tuple"""
-    # - leading fragment: binary array
-    # - packets: list of binary arrays
-    # - trailing fragment: binary array
+  def getPacketPositions(self):
+    """return the positions of packets and packet fragments in a tuple"""
+    # - leading fragment: (startPos, endPos) or None
+    # - packets: list of (startPos, endPos)
+    # - trailing fragment: (startPos, endPos) or None
     # calculate data field start position
     dataFieldStartBytePos = TM_FRAME_PRIMARY_HEADER_BYTE_SIZE
     if self.secondaryHeaderFlag == 1:
@@ -137,39 +137,70 @@ class TMframe(CCSDS.DU.DataUnit):
       return (leadingFragment, packets, trailingFragment)
     elif firstHeaderPointer == NO_FIRST_PACKET_PATTERN:
       # the fragment fills the whole data field
-      fragmentSize = dataFieldStopBytePos - dataFieldStartBytePos
-      leadingFragment = self.getBytes(dataFieldStartBytePos, fragmentSize)
+      self.checkByteRange(dataFieldStartBytePos, dataFieldStopBytePos)
+      leadingFragment = (dataFieldStartBytePos, dataFieldStopBytePos)
       return (leadingFragment, packets, trailingFragment)
     # there is at least one packet start
     fragmentSize = firstHeaderPointer
+    packetsFieldStartBytePos = dataFieldStartBytePos + fragmentSize
     if fragmentSize > 0:
-      leadingFragment = self.getBytes(dataFieldStartBytePos, fragmentSize)
+      self.checkByteRange(dataFieldStartBytePos, packetsFieldStartBytePos)
+      leadingFragment = (dataFieldStartBytePos, packetsFieldStartBytePos)
     # extract the complete packets and the trailing fragment
-    packetsFieldStartBytePos = dataFieldStartBytePos + fragmentSize
-    packetsFieldSize = dataFieldStopBytePos - packetsFieldStartBytePos
-    packetsField = self.getBytes(packetsFieldStartBytePos, packetsFieldSize)
-    nextPacketBytePos = 0
-    while nextPacketBytePos < packetsFieldSize:
+    self.checkByteRange(packetsFieldStartBytePos, dataFieldStopBytePos)
+    nextPacketBytePos = packetsFieldStartBytePos
+    while nextPacketBytePos < dataFieldStopBytePos:
       # check for the next packet if there is at least size for a CCSDS header
-      remainingPacketSize = packetsFieldSize - nextPacketBytePos
+      remainingPacketSize = dataFieldStopBytePos - nextPacketBytePos
       if remainingPacketSize < CCSDS.PACKET.PRIMARY_HEADER_BYTE_SIZE:
         # an incomplete CCSDS header is a trailing fragment
-        trailingFragmentEndPos = nextPacketBytePos + remainingPacketSize
-        trailingFragment = packetsField[nextPacketBytePos:trailingFragmentEndPos]
+        trailingFragment = (nextPacketBytePos, dataFieldStopBytePos)
         break
       # check if the next packet complete
-      packetSize = CCSDS.PACKET.getPacketSize(packetsField, nextPacketBytePos)
+      packetSize = CCSDS.PACKET.getPacketSize(self.buffer, nextPacketBytePos)
       if packetSize > remainingPacketSize:
         # an incomplete packet is a trailing fragment
-        trailingFragmentEndPos = nextPacketBytePos + remainingPacketSize
-        trailingFragment = packetsField[nextPacketBytePos:trailingFragmentEndPos]
+        trailingFragment = (nextPacketBytePos, dataFieldStopBytePos)
         break
       nextPacketEndPos = nextPacketBytePos + packetSize
-      nextPacket = packetsField[nextPacketBytePos:nextPacketEndPos]
-      packets.append(nextPacket)
+      packets.append((nextPacketBytePos, nextPacketEndPos))
       nextPacketBytePos = nextPacketEndPos
     # packet extraction finished
     return (leadingFragment, packets, trailingFragment)
+  # ---------------------------------------------------------------------------
+  def checkByteRange(self, startPos, endPos):
+    """checks a non-empty byte range like getBytes"""
+    if startPos < 0:
+      raise IndexError("invalid bytePos")
+    if endPos <= startPos:
+      raise IndexError("invalid byteLength")
+    if endPos > self.usedBufferSize:
+      raise IndexError("bytePos/byteLength out of buffer")
+  # ---------------------------------------------------------------------------
+  def getPackets(self):
+    """return packets and packet fragments in a tuple"""
+    # - leading fragment: binary array
+    # - packets: list of binary arrays
+    # - trailing fragment: binary array
+    return self.slicePackets(self.buffer)
+  # ---------------------------------------------------------------------------
+  def getPacketViews(self):
+    """
+    return packets and packet fragments in a tuple like getPackets(),
+    but as memoryviews into the frame buffer instead of copies
+    """
+    # note: the frame buffer cannot be resized while views are in use
+    return self.slicePackets(memoryview(self.buffer))
+  # ---------------------------------------------------------------------------
+  def slicePackets(self, buffer):
+    """helper for getPackets() and getPacketViews()"""
+    leadingFragment, packets, trailingFragment = self.getPacketPositions()
+    if leadingFragment != None:
+      leadingFragment = buffer[leadingFragment[0]:leadingFragment[1]]
+    packets = [buffer[startPos:endPos] for startPos, endPos in packets]
+    if trailingFragment != None:
+      trailingFragment = buffer[trailingFragment[0]:trailingFragment[1]]
+    return (leadingFragment, packets, trailingFragment)
 
 # =============================================================================
 class CLCW(BinaryUnit):
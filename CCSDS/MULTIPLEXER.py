@@ -0,0 +1,287 @@
+#******************************************************************************
+# (C) 2019, Stefan Korner, Austria                                            *
+#                                                                             *
+# The Space Python Library is free software; you can redistribute it and/or   *
+# modify it under under the terms of the MIT License as published by the      *
+# Massachusetts Institute of Technology.                                      *
+#                                                                             *
+# The Space Python Library is distributed in the hope that it will be useful, *
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              *
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the MIT License    *
+# for more details.                                                           *
+#******************************************************************************
+# CCSDS Stack - Master channel multiplexer for TM frames of virtual channels  *
+# Each virtual channel has its own Assembler, TM packets are routed by APID.  *
+# The frames are queued per virtual channel and emitted on the master channel *
+# in the order of a scheduler. Must be overloaded to handle the frame         *
+# callback.                                                                   *
+#******************************************************************************
+import collections
+from UTIL.SYS import Error, LOG, LOG_INFO, LOG_WARNING, LOG_ERROR
+import CCSDS.ASSEMBLER, CCSDS.FRAME, CCSDS.PACKET
+import UTIL.DU
+
+#############
+# constants #
+#############
+# scheduling of the virtual channels on the master channel
+PRIORITY_SCHEDULING = "PRIORITY"
+ROUND_ROBIN_SCHEDULING = "ROUND_ROBIN"
+BITRATE_SCHEDULING = "BITRATE"
+# fill policy for a pending (partially filled) frame of a virtual channel
+# - FILL_WITH_IDLE_PACKET: the frame is completed with an idle packet when
+#                          the virtual channel is scheduled without full frames
+# - FILL_NEVER: the frame is emitted only when it is full
+FILL_WITH_IDLE_PACKET = "IDLE_PACKET"
+FILL_NEVER = "NEVER"
+# the VCID of TM transfer frames has 3 bits
+MAX_VIRTUAL_CHANNEL_ID = 7
+# virtual channel for idle frames (recommended by CCSDS)
+IDLE_VIRTUAL_CHANNEL_ID = 7
+
+###########
+# classes #
+###########
+# =============================================================================
+class VirtualChannelAssembler(CCSDS.ASSEMBLER.Assembler):
+  """Assembler of one virtual channel, the frames are queued"""
+  # ---------------------------------------------------------------------------
+  def __init__(self, virtualChannelId, weight, priority, fillPolicy):
+    """
+    weight: relative frame rate (ROUND_ROBIN) or bitrate (BITRATE),
+    priority: higher values are emitted first (PRIORITY)
+    """
+    CCSDS.ASSEMBLER.Assembler.__init__(self)
+    self.frameDefaults.virtualChannelId = virtualChannelId
+    self.initFrameTemplate()
+    self.virtualChannelId = virtualChannelId
+    self.weight = weight
+    self.priority = priority
+    self.fillPolicy = fillPolicy
+    self.frameQueue = collections.deque()
+    self.emittedFrameCount = 0
+    # scheduler specific state
+    self.credit = 0
+    self.finishTime = 0.0
+  # ---------------------------------------------------------------------------
+  def reset(self):
+    """resets pending and queued frames"""
+    CCSDS.ASSEMBLER.Assembler.reset(self)
+    self.frameQueue.clear()
+  # ---------------------------------------------------------------------------
+  def isFrameReady(self):
+    """checks if there is a full frame for the master channel"""
+    return len(self.frameQueue) > 0
+  # ---------------------------------------------------------------------------
+  def isFrameFillable(self):
+    """checks if a pending frame can be completed with an idle packet"""
+    return (self.pendingFrame != None and
+            self.fillPolicy == FILL_WITH_IDLE_PACKET)
+  # ---------------------------------------------------------------------------
+  def notifyTMframeCallback(self, tmFrameDu):
+    """queues the frame until it is scheduled"""
+    # overloaded from CCSDS.ASSEMBLER.Assembler
+    self.frameQueue.append(tmFrameDu)
+
+# =============================================================================
+class PriorityScheduler(object):
+  """The virtual channel with the highest priority is served first"""
+  # ---------------------------------------------------------------------------
+  def selectVirtualChannel(self, virtualChannels):
+    """selects one of the virtual channels, which are sorted by VCID"""
+    selected = virtualChannels[0]
+    for virtualChannel in virtualChannels:
+      if virtualChannel.priority > selected.priority:
+        selected = virtualChannel
+    return selected
+
+# =============================================================================
+class RoundRobinScheduler(object):
+  """
+  Smooth weighted round robin: the waiting virtual channels are served
+  interleaved with a frame rate that is proportional to their weight
+  """
+  # ---------------------------------------------------------------------------
+  def selectVirtualChannel(self, virtualChannels):
+    """selects one of the virtual channels, which are sorted by VCID"""
+    selected = None
+    totalWeight = 0
+    for virtualChannel in virtualChannels:
+      virtualChannel.credit += virtualChannel.weight
+      totalWeight += virtualChannel.weight
+      if selected == None or virtualChannel.credit > selected.credit:
+        selected = virtualChannel
+    selected.credit -= totalWeight
+    return selected
+
+# =============================================================================
+class BitrateScheduler(object):
+  """
+  Start time fair queueing: each virtual channel gets the share of the
+  master channel bitrate that corresponds to its weight, a virtual channel
+  without frames does not accumulate credit for a later burst
+  """
+  # ---------------------------------------------------------------------------
+  def __init__(self):
+    """default constructor"""
+    self.virtualTime = 0.0
+  # ---------------------------------------------------------------------------
+  def selectVirtualChannel(self, virtualChannels):
+    """selects one of the virtual channels, which are sorted by VCID"""
+    selected = None
+    selectedStartTime = 0.0
+    for virtualChannel in virtualChannels:
+      startTime = max(virtualChannel.finishTime, self.virtualTime)
+      if selected == None or startTime < selectedStartTime:
+        selected = virtualChannel
+        selectedStartTime = startTime
+    self.virtualTime = selectedStartTime
+    selected.finishTime = selectedStartTime + 1.0 / selected.weight
+    return selected
+
+# =============================================================================
+class Multiplexer(object):
+  """Converter from TM packets to TM frames of several virtual channels"""
+  # ---------------------------------------------------------------------------
+  def __init__(self, scheduling=ROUND_ROBIN_SCHEDULING,
+                     idleVirtualChannelId=IDLE_VIRTUAL_CHANNEL_ID):
+    """the virtual channels must be added with addVirtualChannel"""
+    if scheduling == PRIORITY_SCHEDULING:
+      self.scheduler = PriorityScheduler()
+    elif scheduling == ROUND_ROBIN_SCHEDULING:
+      self.scheduler = RoundRobinScheduler()
+    elif scheduling == BITRATE_SCHEDULING:
+      self.scheduler = BitrateScheduler()
+    else:
+      raise Error("invalid virtual channel scheduling: " + str(scheduling))
+    # virtual channels, sorted by VCID
+    self.virtualChannels = []
+    self.virtualChannelMap = {}
+    self.apidVirtualChannels = {}
+    self.defaultVirtualChannel = None
+    self.idleVirtualChannel = VirtualChannelAssembler(idleVirtualChannelId,
+                                                      weight=1,
+                                                      priority=0,
+                                                      fillPolicy=FILL_NEVER)
+    self.masterChannelFrameCount = 0
+    self.setCLCW(self.idleVirtualChannel.getCLCW())
+  # ---------------------------------------------------------------------------
+  def addVirtualChannel(self, virtualChannelId, apids=[], weight=1,
+                        priority=0, fillPolicy=FILL_WITH_IDLE_PACKET):
+    """
+    adds a virtual channel for the TM packets with apids,
+    the first virtual channel gets also packets with other APIDs
+    """
+    if virtualChannelId < 0 or virtualChannelId > MAX_VIRTUAL_CHANNEL_ID:
+      raise Error("invalid virtual channel " + str(virtualChannelId))
+    if virtualChannelId in self.virtualChannelMap:
+      raise Error("virtual channel " + str(virtualChannelId) + " already defined")
+    if virtualChannelId == self.idleVirtualChannel.virtualChannelId:
+      raise Error("virtual channel " + str(virtualChannelId) + " is used for idle frames")
+    if weight <= 0:
+      raise Error("virtual channel " + str(virtualChannelId) + " needs a positive weight")
+    virtualChannel = VirtualChannelAssembler(virtualChannelId,
+                                             weight,
+                                             priority,
+                                             fillPolicy)
+    virtualChannel.clcw = self.clcw
+    self.virtualChannelMap[virtualChannelId] = virtualChannel
+    self.virtualChannels.append(virtualChannel)
+    self.virtualChannels.sort(key=lambda vc: vc.virtualChannelId)
+    for apid in apids:
+      self.apidVirtualChannels[apid] = virtualChannel
+    if self.defaultVirtualChannel == None:
+      self.defaultVirtualChannel = virtualChannel
+    return virtualChannel
+  # ---------------------------------------------------------------------------
+  def getVirtualChannel(self, virtualChannelId):
+    """returns the assembler of a virtual channel"""
+    return self.virtualChannelMap[virtualChannelId]
+  # ---------------------------------------------------------------------------
+  def initCLCW(self, clcwDefaults):
+    """initialise the CLCW of all virtual channels"""
+    self.idleVirtualChannel.initCLCW(clcwDefaults)
+    self.setCLCW(self.idleVirtualChannel.getCLCW())
+  # ---------------------------------------------------------------------------
+  def setCLCW(self, clcw):
+    """all virtual channels share the same CLCW"""
+    self.clcw = clcw
+    self.idleVirtualChannel.clcw = clcw
+    for virtualChannel in self.virtualChannels:
+      virtualChannel.clcw = clcw
+  # ---------------------------------------------------------------------------
+  def getCLCW(self):
+    """returns the CLCW for the next TM frame"""
+    return self.clcw
+  # ---------------------------------------------------------------------------
+  def setCLCWcount(self, value):
+    """sets the counter in the CLCW for the next TM frame"""
+    self.clcw.reportValue = value
+  # ---------------------------------------------------------------------------
+  def reset(self):
+    """resets pending and queued frames of all virtual channels"""
+    for virtualChannel in self.virtualChannels:
+      virtualChannel.reset()
+  # ---------------------------------------------------------------------------
+  def pushTMpacket(self, binPacket):
+    """routes the TM packet to the virtual channel of its APID"""
+    apid = CCSDS.PACKET.getApplicationProcessId(binPacket)
+    virtualChannel = self.apidVirtualChannels.get(apid, self.defaultVirtualChannel)
+    if virtualChannel == None:
+      LOG_ERROR("no virtual channel for TM packet with APID " + str(apid), "SPACE")
+      return
+    virtualChannel.pushTMpacket(binPacket)
+  # ---------------------------------------------------------------------------
+  def isFrameReady(self):
+    """checks if there is a full frame in any virtual channel"""
+    for virtualChannel in self.virtualChannels:
+      if virtualChannel.isFrameReady():
+        return True
+    return False
+  # ---------------------------------------------------------------------------
+  def emitTMframe(self):
+    """
+    emits the next frame on the master channel: a full frame of the
+    scheduled virtual channel, a pending frame that is filled or an idle frame,
+    returns the virtual channel of the frame
+    """
+    readyVirtualChannels = [virtualChannel
+                            for virtualChannel in self.virtualChannels
+                            if virtualChannel.isFrameReady()]
+    if len(readyVirtualChannels) > 0:
+      virtualChannel = self.scheduler.selectVirtualChannel(readyVirtualChannels)
+    else:
+      fillableVirtualChannels = [virtualChannel
+                                 for virtualChannel in self.virtualChannels
+                                 if virtualChannel.isFrameFillable()]
+      if len(fillableVirtualChannels) > 0:
+        virtualChannel = self.scheduler.selectVirtualChannel(fillableVirtualChannels)
+        virtualChannel.flushTMframe()
+      else:
+        virtualChannel = self.idleVirtualChannel
+        virtualChannel.flushTMframeOrIdleFrame()
+    # the master channel frame count is assigned when the frame is emitted
+    tmFrameDu = virtualChannel.frameQueue.popleft()
+    tmFrameDu.buffer[CCSDS.ASSEMBLER.MASTER_CHANNEL_FRAME_COUNT_BYTE_POS] = \
+      self.masterChannelFrameCount
+    self.masterChannelFrameCount += 1
+    self.masterChannelFrameCount %= 256
+    if CCSDS.FRAME.CRC_CHECK:
+      tmFrameDu.setChecksum()
+    virtualChannel.emittedFrameCount += 1
+    self.notifyTMframeCallback(tmFrameDu)
+    return virtualChannel
+  # ---------------------------------------------------------------------------
+  def emitReadyTMframes(self):
+    """emits all full frames in the order of the scheduler"""
+    while self.isFrameReady():
+      self.emitTMframe()
+  # ---------------------------------------------------------------------------
+  def flushTMframeOrIdleFrame(self):
+    """emits the next frame, compatible with the Assembler"""
+    self.emitTMframe()
+  # ---------------------------------------------------------------------------
+  def notifyTMframeCallback(self, tmFrameDu):
+    """notifies when the next TM frame is emitted on the master channel"""
+    # shall be overloaded in derived class, default implementaion logs frame
+    LOG(lambda: "Multiplexer.notifyTMframeCallback" + UTIL.DU.array2str(tmFrameDu.getBuffer()), "SPACE")
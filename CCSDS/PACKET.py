@@ -37,6 +37,7 @@ UNSEGMENTED = 3
 # - value: fieldOffset, fieldLength, fieldType
 # -----------------------------------------------------------------------------
 PRIMARY_HEADER_BYTE_SIZE = 6
+PACKET_MAX_BYTE_SIZE = PRIMARY_HEADER_BYTE_SIZE + MAX_DATA_FIELD_BYTE_SIZE
 PRIMARY_HEADER_ATTRIBUTES = {
   "versionNumber":        ( 0,  3, BITS),
   "packetType":           ( 3,  1, BITS),
@@ -69,6 +70,12 @@ def getApplicationProcessId(binaryString, startPos=0):
     raise Error("packet header is too small")
   return (((binaryString[startPos + 0] * 256) + binaryString[startPos + 1]) & 0x07FF)
 # -----------------------------------------------------------------------------
+def getSequenceControlCount(binaryString, startPos=0):
+  """returns the sequence control count field"""
+  if (len(binaryString) - startPos) < PRIMARY_HEADER_BYTE_SIZE:
+    raise Error("packet header is too small")
+  return (((binaryString[startPos + 2] * 256) + binaryString[startPos + 3]) & 0x3FFF)
+# -----------------------------------------------------------------------------
 def getPacketLength(binaryString, startPos=0):
   """returns the packet length field"""
   if (len(binaryString) - startPos) < PRIMARY_HEADER_BYTE_SIZE:
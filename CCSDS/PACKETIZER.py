@@ -12,12 +12,26 @@
 #******************************************************************************
 # CCSDS Stack - Packetizer that converts TM frames to TM packets              *
 # Must be overloaded to handle the packet callback.                           *
-# Restriction: Supports only one virtual channel                              *
+# The Packetizer supports only one virtual channel, the Demultiplexer         *
+# dispatches the frames of all virtual channels to one Packetizer per         *
+# (spacecraft ID, virtual channel ID).                                        *
 #******************************************************************************
+import concurrent.futures, multiprocessing, os
 from UTIL.SYS import Error, LOG, LOG_INFO, LOG_WARNING, LOG_ERROR
 import CCSDS.FRAME, CCSDS.PACKET
 import UTIL.DU
 
+#############
+# constants #
+#############
+# a spillover packet is at most one frame larger than the maximum packet
+# (the transfer frame size is limited by the 11 bit first header pointer)
+REASSEMBLY_BUFFER_SIZE = CCSDS.PACKET.PACKET_MAX_BYTE_SIZE + 2048
+# the virtual channel frame count (low byte) wraps around
+VC_FRAME_COUNT_MODULO = 256
+# configuration value for the demultiplexing of all virtual channels
+ALL_VIRTUAL_CHANNELS = "ALL"
+
 ###########
 # classes #
 ###########
@@ -25,10 +39,21 @@ import UTIL.DU
 class Packetizer():
   """Converter from TM frames to TM packets"""
   # ---------------------------------------------------------------------------
-  def __init__(self, expectedVCID):
-    """default constructor"""
+  def __init__(self, expectedVCID, zeroCopy=False):
+    """
+    default constructor,
+    zeroCopy: packets are passed to notifyTMpacketCallback as memoryviews
+              into the frame buffer, which are only valid during the call
+    """
     self.pendingPacketFragment = None
     self.expectedVCID = expectedVCID
+    self.zeroCopy = zeroCopy
+    if zeroCopy:
+      # spillover packets are assembled in a reusable buffer, which is
+      # preallocated with the maximum size and never resized
+      self.reassemblyBuffer = bytearray(REASSEMBLY_BUFFER_SIZE)
+    else:
+      self.reassemblyBuffer = None
   # ---------------------------------------------------------------------------
   def reset(self):
     """resets pending packet fragment"""
@@ -43,7 +68,10 @@ class Packetizer():
     # extract packets incl. fragments from frame
     try:
       frameDU = CCSDS.FRAME.TMframe(binFrame)
-      leadingFragment, packets, trailingFragment = frameDU.getPackets()
+      if self.zeroCopy:
+        leadingFragment, packets, trailingFragment = frameDU.getPacketViews()
+      else:
+        leadingFragment, packets, trailingFragment = frameDU.getPackets()
     except Exception as ex:
       LOG_ERROR("error in TM packet extraction from TM frame: " + str(ex))
       self.reset()
@@ -56,7 +84,7 @@ class Packetizer():
     if leadingFragment:
       # there must be a pending packet fragment from the previous frame
       if self.pendingPacketFragment:
-        packet = self.pendingPacketFragment + leadingFragment
+        packet = self.joinFragments(self.pendingPacketFragment, leadingFragment)
         newPacketSize = len(packet)
         expectedPacketSize = CCSDS.PACKET.getPacketSize(packet)
         if newPacketSize < expectedPacketSize:
@@ -71,6 +99,9 @@ class Packetizer():
         elif newPacketSize == expectedPacketSize:
           # spillover packet complete assembled
           self.notifyTMpacketCallback(packet)
+          if self.zeroCopy:
+            # the reassembly buffer is reused for the next spillover packet
+            packet.release()
           self.reset()
         else:
           # assembled packet does not match the expected size (too large)
@@ -85,9 +116,261 @@ class Packetizer():
         self.notifyTMpacketCallback(packet)
     # --- trailing fragment ---
     if trailingFragment:
-      self.pendingPacketFragment = trailingFragment
+      self.pendingPacketFragment = self.joinFragments(None, trailingFragment)
+  # ---------------------------------------------------------------------------
+  def joinFragments(self, pendingFragment, fragment):
+    """
+    returns the concatenation of a pending fragment and a fragment,
+    in zero copy mode the result is a view into the reassembly buffer
+    """
+    if not self.zeroCopy:
+      if pendingFragment == None:
+        return fragment
+      return pendingFragment + fragment
+    if pendingFragment == None:
+      pendingSize = 0
+    else:
+      # the pending fragment is already in the reassembly buffer
+      pendingSize = len(pendingFragment)
+    packetSize = min(pendingSize + len(fragment), len(self.reassemblyBuffer))
+    # note: assignment of a slice with the same size does not resize
+    self.reassemblyBuffer[pendingSize:packetSize] = fragment[:packetSize-pendingSize]
+    return memoryview(self.reassemblyBuffer)[0:packetSize]
   # ---------------------------------------------------------------------------
   def notifyTMpacketCallback(self, binPacket):
     """notifies when the next TM packet is assembled"""
     # shall be overloaded in derived class, default implementaion logs packet
     LOG("Packetizer.notifyTMpacketCallback" + UTIL.DU.array2str(binPacket))
+
+# =============================================================================
+class VirtualChannelPacketizer(Packetizer):
+  """Packetizer of one virtual channel of a Demultiplexer"""
+  # ---------------------------------------------------------------------------
+  def __init__(self, demultiplexer, spacecraftId, virtualChannelId, zeroCopy):
+    """initialise attributes only"""
+    Packetizer.__init__(self, virtualChannelId, zeroCopy)
+    self.demultiplexer = demultiplexer
+    self.spacecraftId = spacecraftId
+    self.nextFrameCount = None
+    self.frameCountGaps = 0
+  # ---------------------------------------------------------------------------
+  def pushVCframe(self, binFrame, frameCount):
+    """
+    consumes a telemetry frame of this virtual channel,
+    a gap in the frame count discards the pending packet fragment
+    """
+    if self.nextFrameCount != None and frameCount != self.nextFrameCount:
+      self.frameCountGaps += 1
+      LOG_WARNING("frame count gap on virtual channel " +
+                  str(self.expectedVCID) + " of spacecraft " +
+                  str(self.spacecraftId) + ": expected " +
+                  str(self.nextFrameCount) + ", received " + str(frameCount))
+      self.reset()
+    self.nextFrameCount = (frameCount + 1) % VC_FRAME_COUNT_MODULO
+    self.pushTMframe(binFrame)
+  # ---------------------------------------------------------------------------
+  def getState(self):
+    """returns the pending packet fragment (copy) and the next frame count"""
+    if self.pendingPacketFragment == None:
+      return (None, self.nextFrameCount)
+    return (bytes(self.pendingPacketFragment), self.nextFrameCount)
+  # ---------------------------------------------------------------------------
+  def setState(self, state):
+    """restores a state that is returned by getState"""
+    pendingPacketFragment, self.nextFrameCount = state
+    if pendingPacketFragment == None:
+      self.reset()
+    else:
+      self.pendingPacketFragment = self.joinFragments(None, pendingPacketFragment)
+  # ---------------------------------------------------------------------------
+  def notifyTMpacketCallback(self, binPacket):
+    """notifies when the next TM packet is assembled"""
+    # overloaded from Packetizer
+    self.demultiplexer.dispatchTMpacket(self, binPacket)
+
+# =============================================================================
+class Demultiplexer(object):
+  """
+  Converter from TM frames of several virtual channels to TM packets,
+  must be overloaded to handle the packet callback
+  """
+  # ---------------------------------------------------------------------------
+  def __init__(self, virtualChannelIds=None, zeroCopy=False):
+    """
+    default constructor,
+    virtualChannelIds: frames of other virtual channels are ignored,
+                       None: all virtual channels are processed
+    zeroCopy: see Packetizer
+    """
+    if virtualChannelIds == None:
+      self.virtualChannelIds = None
+    else:
+      self.virtualChannelIds = set(virtualChannelIds)
+    self.zeroCopy = zeroCopy
+    # key: (spacecraftId, virtualChannelId), value: VirtualChannelPacketizer
+    self.packetizers = {}
+    # identification of the frame of the packet in notifyTMpacketCallback
+    self.spacecraftId = None
+    self.virtualChannelId = None
+  # ---------------------------------------------------------------------------
+  def reset(self):
+    """resets the pending packet fragments of all virtual channels"""
+    for packetizer in self.packetizers.values():
+      packetizer.reset()
+      packetizer.nextFrameCount = None
+  # ---------------------------------------------------------------------------
+  def isPacketPending(self):
+    """checks if there is a pending packet on any virtual channel"""
+    for packetizer in self.packetizers.values():
+      if packetizer.isPacketPending():
+        return True
+    return False
+  # ---------------------------------------------------------------------------
+  def getPacketizer(self, spacecraftId, virtualChannelId):
+    """returns the packetizer of a virtual channel, it is created on demand"""
+    key = (spacecraftId, virtualChannelId)
+    packetizer = self.packetizers.get(key)
+    if packetizer == None:
+      packetizer = VirtualChannelPacketizer(self,
+                                            spacecraftId,
+                                            virtualChannelId,
+                                            self.zeroCopy)
+      self.packetizers[key] = packetizer
+    return packetizer
+  # ---------------------------------------------------------------------------
+  def getFrameCountGaps(self):
+    """returns the number of frame count gaps over all virtual channels"""
+    frameCountGaps = 0
+    for packetizer in self.packetizers.values():
+      frameCountGaps += packetizer.frameCountGaps
+    return frameCountGaps
+  # ---------------------------------------------------------------------------
+  def getFrameKey(self, binFrame):
+    """
+    returns (spacecraftId, virtualChannelId, frameCount) of a frame
+    or None if the frame shall not be processed
+    """
+    if len(binFrame) < CCSDS.FRAME.TM_FRAME_PRIMARY_HEADER_BYTE_SIZE:
+      LOG_ERROR("TM frame is too short: " + str(len(binFrame)) + " bytes")
+      return None
+    # the primary header is decoded directly, the Packetizer decodes the
+    # complete frame only for the relevant virtual channels
+    spacecraftId = ((binFrame[0] & 0x3F) << 4) | (binFrame[1] >> 4)
+    virtualChannelId = (binFrame[1] >> 1) & 0x07
+    if self.virtualChannelIds != None and \
+       virtualChannelId not in self.virtualChannelIds:
+      return None
+    return (spacecraftId, virtualChannelId, binFrame[3])
+  # ---------------------------------------------------------------------------
+  def pushTMframe(self, binFrame):
+    """consumes a telemetry frame of any virtual channel"""
+    frameKey = self.getFrameKey(binFrame)
+    if frameKey == None:
+      return
+    spacecraftId, virtualChannelId, frameCount = frameKey
+    packetizer = self.getPacketizer(spacecraftId, virtualChannelId)
+    packetizer.pushVCframe(binFrame, frameCount)
+  # ---------------------------------------------------------------------------
+  def pushTMframes(self, binFrames, parallel=False):
+    """
+    consumes a sequence of telemetry frames,
+    parallel: the frames of each virtual channel are converted in a worker
+              process, the packets are notified per virtual channel (and not
+              interleaved in the order of the frames), this only pays off
+              for big frame dumps with several virtual channels
+    """
+    if parallel and "fork" not in multiprocessing.get_all_start_methods():
+      parallel = False
+    if not parallel:
+      for binFrame in binFrames:
+        self.pushTMframe(binFrame)
+      return
+    # split the frames in one pass
+    vcFrames = {}
+    for binFrame in binFrames:
+      frameKey = self.getFrameKey(binFrame)
+      if frameKey == None:
+        continue
+      spacecraftId, virtualChannelId, frameCount = frameKey
+      vcFrames.setdefault((spacecraftId, virtualChannelId), []).append(
+        (bytes(binFrame), frameCount))
+    if len(vcFrames) == 0:
+      return
+    workerCount = min(len(vcFrames), os.cpu_count() or 1)
+    executor = concurrent.futures.ProcessPoolExecutor(
+      max_workers=workerCount,
+      mp_context=multiprocessing.get_context("fork"))
+    try:
+      futures = {}
+      for key in sorted(vcFrames):
+        packetizer = self.getPacketizer(*key)
+        futures[key] = executor.submit(extractPackets,
+                                       key,
+                                       packetizer.getState(),
+                                       vcFrames[key])
+      for key in sorted(vcFrames):
+        binPackets, state, frameCountGaps = futures[key].result()
+        packetizer = self.packetizers[key]
+        packetizer.frameCountGaps += frameCountGaps
+        for binPacket in binPackets:
+          self.dispatchTMpacket(packetizer, binPacket)
+        packetizer.setState(state)
+    finally:
+      executor.shutdown()
+  # ---------------------------------------------------------------------------
+  def dispatchTMpacket(self, packetizer, binPacket):
+    """forwards a packet of a virtual channel to notifyTMpacketCallback"""
+    self.spacecraftId = packetizer.spacecraftId
+    self.virtualChannelId = packetizer.expectedVCID
+    self.notifyTMpacketCallback(binPacket)
+  # ---------------------------------------------------------------------------
+  def notifyTMpacketCallback(self, binPacket):
+    """
+    notifies when the next TM packet is assembled,
+    self.spacecraftId and self.virtualChannelId identify the frame
+    """
+    # shall be overloaded in derived class, default implementaion logs packet
+    LOG("Demultiplexer.notifyTMpacketCallback" + UTIL.DU.array2str(binPacket))
+
+# =============================================================================
+class PacketCollector(Demultiplexer):
+  """Demultiplexer that collects packet copies, used in worker processes"""
+  # ---------------------------------------------------------------------------
+  def __init__(self):
+    """initialise attributes only"""
+    Demultiplexer.__init__(self, zeroCopy=True)
+    self.binPackets = []
+  # ---------------------------------------------------------------------------
+  def notifyTMpacketCallback(self, binPacket):
+    """notifies when the next TM packet is assembled"""
+    # overloaded from Demultiplexer
+    self.binPackets.append(bytes(binPacket))
+
+#############
+# functions #
+#############
+def extractPackets(key, state, vcFrames):
+  """
+  worker function of Demultiplexer.pushTMframes,
+  converts the frames (binFrame, frameCount) of one virtual channel,
+  returns the packets, the final state and the number of frame count gaps
+  """
+  collector = PacketCollector()
+  packetizer = collector.getPacketizer(*key)
+  packetizer.setState(state)
+  for binFrame, frameCount in vcFrames:
+    packetizer.pushVCframe(binFrame, frameCount)
+  return (collector.binPackets, packetizer.getState(), packetizer.frameCountGaps)
+# -----------------------------------------------------------------------------
+def parseVirtualChannelIds(configValue):
+  """
+  parses a comma separated list of virtual channel IDs,
+  returns None for ALL_VIRTUAL_CHANNELS (no filtering)
+  """
+  configValue = configValue.strip()
+  if configValue.upper() == ALL_VIRTUAL_CHANNELS:
+    return None
+  try:
+    return [int(vcid) for vcid in configValue.split(",")]
+  except ValueError:
+    raise Error("invalid virtual channel IDs: " + configValue)
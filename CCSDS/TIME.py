@@ -16,9 +16,13 @@
 # Note: Time format CUC4 (4 bytes coarse time and 4 bytes fine time) can only *
 #       be represented in a CCSDS time p-field when the p-field extension is  *
 #       used. This is only relevant when the p-field is transmitted.          *
+#                                                                             *
+# encodeTime/decodeTime read and write the time fields directly at an offset  *
+# in a buffer, the convert... functions provide time data units.              *
 #******************************************************************************
-import time
+import array, struct, time
 from UTIL.DU import BITS, BYTES, UNSIGNED, STRING, TIME, BinaryUnit
+from UTIL.SYS import Error
 import UTIL.TIME
 
 #############
@@ -69,6 +73,16 @@ CUC4_TIME_BYTE_SIZE = 8
 CUC4_TIME_ATTRIBUTES = {
   "coarse": (0, 4, UNSIGNED),
   "fine":   (4, 4, UNSIGNED)}
+# struct formats of the time fields,
+# the 3 byte fine time of CUC3 is split into 1 + 2 bytes
+CDS1_TIME_STRUCT = struct.Struct(">HI")
+CDS2_TIME_STRUCT = struct.Struct(">HIH")
+CDS3_TIME_STRUCT = struct.Struct(">HII")
+CUC0_TIME_STRUCT = struct.Struct(">I")
+CUC1_TIME_STRUCT = struct.Struct(">IB")
+CUC2_TIME_STRUCT = struct.Struct(">IH")
+CUC3_TIME_STRUCT = struct.Struct(">IBH")
+CUC4_TIME_STRUCT = struct.Struct(">II")
 
 #############
 # functions #
@@ -159,37 +173,19 @@ def createCDS(byteArray):
 # -----------------------------------------------------------------------------
 def convertToCDS(pyTime, timeFormat):
   """returns a CDS binary data unit representation of time"""
-  days = int(pyTime) // UTIL.TIME.SECONDS_OF_DAY
-  secsOfDay = pyTime - (days * UTIL.TIME.SECONDS_OF_DAY)
-  milsOfDay = secsOfDay * 1000.0
-  mils = int(milsOfDay)
-  milsFine = milsOfDay - mils
   if timeFormat == TIME_FORMAT_CDS1:
-    mils = int(round(secsOfDay * 1000.0))
-    timeDU = BinaryUnit("\0" * CDS1_TIME_BYTE_SIZE,
-                        CDS1_TIME_BYTE_SIZE,
-                        CDS1_TIME_ATTRIBUTES)
+    return BinaryUnit(CDS1_TIME_STRUCT.pack(*encodeCDS1(pyTime)),
+                      CDS1_TIME_BYTE_SIZE,
+                      CDS1_TIME_ATTRIBUTES)
   elif timeFormat == TIME_FORMAT_CDS2:
-    mics = int(round(secsOfDay * 1000000.0))
-    mils = mics // 1000
-    mics %= 1000
-    timeDU = BinaryUnit("\0" * CDS2_TIME_BYTE_SIZE,
-                        CDS2_TIME_BYTE_SIZE,
-                        CDS2_TIME_ATTRIBUTES)
-    timeDU.mics = mics
+    return BinaryUnit(CDS2_TIME_STRUCT.pack(*encodeCDS2(pyTime)),
+                      CDS2_TIME_BYTE_SIZE,
+                      CDS2_TIME_ATTRIBUTES)
   elif timeFormat == TIME_FORMAT_CDS3:
-    pics = int(round(secsOfDay * 1000000000000.0))
-    mils = pics // 1000000000
-    pics %= 1000000000
-    timeDU = BinaryUnit("\0" * CDS3_TIME_BYTE_SIZE,
-                        CDS3_TIME_BYTE_SIZE,
-                        CDS3_TIME_ATTRIBUTES)
-    timeDU.pics = pics
-  else:
-    return None
-  timeDU.days = days
-  timeDU.mils = mils
-  return timeDU
+    return BinaryUnit(CDS3_TIME_STRUCT.pack(*encodeCDS3(pyTime)),
+                      CDS3_TIME_BYTE_SIZE,
+                      CDS3_TIME_ATTRIBUTES)
+  return None
 # -----------------------------------------------------------------------------
 def convertFromCDS(timeDU):
   """returns python time representation from CDS binary data unit"""
@@ -221,39 +217,27 @@ def createCUC(byteArray):
 # -----------------------------------------------------------------------------
 def convertToCUC(pyTime, timeFormat):
   """returns a CUC binary data unit representation of time"""
-  coarseTime = int(pyTime)
   if timeFormat == TIME_FORMAT_CUC0:
-    timeDU = BinaryUnit("\0" * CUC0_TIME_BYTE_SIZE,
-                        CUC0_TIME_BYTE_SIZE,
-                        CUC0_TIME_ATTRIBUTES)
+    return BinaryUnit(CUC0_TIME_STRUCT.pack(*encodeCUC0(pyTime)),
+                      CUC0_TIME_BYTE_SIZE,
+                      CUC0_TIME_ATTRIBUTES)
   elif timeFormat == TIME_FORMAT_CUC1:
-    fineTime = pyTime - coarseTime
-    timeDU = BinaryUnit("\0" * CUC1_TIME_BYTE_SIZE,
-                        CUC1_TIME_BYTE_SIZE,
-                        CUC1_TIME_ATTRIBUTES)
-    timeDU.fine = int(fineTime * 0x100)
+    return BinaryUnit(CUC1_TIME_STRUCT.pack(*encodeCUC1(pyTime)),
+                      CUC1_TIME_BYTE_SIZE,
+                      CUC1_TIME_ATTRIBUTES)
   elif timeFormat == TIME_FORMAT_CUC2:
-    fineTime = pyTime - coarseTime
-    timeDU = BinaryUnit("\0" * CUC2_TIME_BYTE_SIZE,
-                        CUC2_TIME_BYTE_SIZE,
-                        CUC2_TIME_ATTRIBUTES)
-    timeDU.fine = int(fineTime * 0x10000)
+    return BinaryUnit(CUC2_TIME_STRUCT.pack(*encodeCUC2(pyTime)),
+                      CUC2_TIME_BYTE_SIZE,
+                      CUC2_TIME_ATTRIBUTES)
   elif timeFormat == TIME_FORMAT_CUC3:
-    fineTime = pyTime - coarseTime
-    timeDU = BinaryUnit("\0" * CUC3_TIME_BYTE_SIZE,
-                        CUC3_TIME_BYTE_SIZE,
-                        CUC3_TIME_ATTRIBUTES)
-    timeDU.fine = int(fineTime * 0x1000000)
+    return BinaryUnit(CUC3_TIME_STRUCT.pack(*encodeCUC3(pyTime)),
+                      CUC3_TIME_BYTE_SIZE,
+                      CUC3_TIME_ATTRIBUTES)
   elif timeFormat == TIME_FORMAT_CUC4:
-    fineTime = pyTime - coarseTime
-    timeDU = BinaryUnit("\0" * CUC4_TIME_BYTE_SIZE,
-                        CUC4_TIME_BYTE_SIZE,
-                        CUC4_TIME_ATTRIBUTES)
-    timeDU.fine = int(fineTime * 0x100000000)
-  else:
-    return None
-  timeDU.coarse = coarseTime
-  return timeDU
+    return BinaryUnit(CUC4_TIME_STRUCT.pack(*encodeCUC4(pyTime)),
+                      CUC4_TIME_BYTE_SIZE,
+                      CUC4_TIME_ATTRIBUTES)
+  return None
 # -----------------------------------------------------------------------------
 def convertFromCUC(timeDU):
   """returns python time representation from CUC binary data unit"""
@@ -310,3 +294,120 @@ def convertFromCCSDS(timeDU, timeFormat):
   if isCUCtimeFormat(timeFormat):
     return convertFromCUC(timeDU)
   return None
+# -----------------------------------------------------------------------------
+def splitCDStime(pyTime):
+  """returns the days and the seconds of day of a python time"""
+  days = int(pyTime) // UTIL.TIME.SECONDS_OF_DAY
+  return (days, pyTime - (days * UTIL.TIME.SECONDS_OF_DAY))
+# -----------------------------------------------------------------------------
+def encodeCDS1(pyTime):
+  """returns the CDS1 field values (days, mils)"""
+  days, secsOfDay = splitCDStime(pyTime)
+  return (days, int(round(secsOfDay * 1000.0)))
+# -----------------------------------------------------------------------------
+def encodeCDS2(pyTime):
+  """returns the CDS2 field values (days, mils, mics)"""
+  days, secsOfDay = splitCDStime(pyTime)
+  mics = int(round(secsOfDay * 1000000.0))
+  return (days, mics // 1000, mics % 1000)
+# -----------------------------------------------------------------------------
+def encodeCDS3(pyTime):
+  """returns the CDS3 field values (days, mils, pics)"""
+  days, secsOfDay = splitCDStime(pyTime)
+  pics = int(round(secsOfDay * 1000000000000.0))
+  return (days, pics // 1000000000, pics % 1000000000)
+# -----------------------------------------------------------------------------
+def encodeCUC0(pyTime):
+  """returns the CUC0 field values (coarse,)"""
+  return (int(pyTime),)
+# -----------------------------------------------------------------------------
+def encodeCUC1(pyTime):
+  """returns the CUC1 field values (coarse, fine)"""
+  coarseTime = int(pyTime)
+  return (coarseTime, int((pyTime - coarseTime) * 0x100))
+# -----------------------------------------------------------------------------
+def encodeCUC2(pyTime):
+  """returns the CUC2 field values (coarse, fine)"""
+  coarseTime = int(pyTime)
+  return (coarseTime, int((pyTime - coarseTime) * 0x10000))
+# -----------------------------------------------------------------------------
+def encodeCUC3(pyTime):
+  """returns the CUC3 field values (coarse, fine high byte, fine low word)"""
+  coarseTime = int(pyTime)
+  fineTime = int((pyTime - coarseTime) * 0x1000000)
+  return (coarseTime, fineTime >> 16, fineTime & 0xFFFF)
+# -----------------------------------------------------------------------------
+def encodeCUC4(pyTime):
+  """returns the CUC4 field values (coarse, fine)"""
+  coarseTime = int(pyTime)
+  return (coarseTime, int((pyTime - coarseTime) * 0x100000000))
+# -----------------------------------------------------------------------------
+def decodeCDS1(days, mils):
+  """returns python time from the CDS1 field values"""
+  return (days * UTIL.TIME.SECONDS_OF_DAY * 1.0) + (mils / 1000.0)
+# -----------------------------------------------------------------------------
+def decodeCDS2(days, mils, mics):
+  """returns python time from the CDS2 field values"""
+  return (days * UTIL.TIME.SECONDS_OF_DAY * 1.0) + (mils / 1000.0) + (mics / 1000000.0)
+# -----------------------------------------------------------------------------
+def decodeCDS3(days, mils, pics):
+  """returns python time from the CDS3 field values"""
+  return (days * UTIL.TIME.SECONDS_OF_DAY * 1.0) + (mils / 1000.0) + (pics / 1000000000000.0)
+# -----------------------------------------------------------------------------
+def decodeCUC0(coarse):
+  """returns python time from the CUC0 field values"""
+  return coarse * 1.0
+# -----------------------------------------------------------------------------
+def decodeCUC1(coarse, fine):
+  """returns python time from the CUC1 field values"""
+  return coarse + (fine / 0x100)
+# -----------------------------------------------------------------------------
+def decodeCUC2(coarse, fine):
+  """returns python time from the CUC2 field values"""
+  return coarse + (fine / 0x10000)
+# -----------------------------------------------------------------------------
+def decodeCUC3(coarse, fineHigh, fineLow):
+  """returns python time from the CUC3 field values"""
+  return coarse + (((fineHigh << 16) | fineLow) / 0x1000000)
+# -----------------------------------------------------------------------------
+def decodeCUC4(coarse, fine):
+  """returns python time from the CUC4 field values"""
+  return coarse + (fine / 0x100000000)
+# -----------------------------------------------------------------------------
+# key: time format, value: (struct, encode function, decode function)
+TIME_CODECS = {
+  TIME_FORMAT_CDS1: (CDS1_TIME_STRUCT, encodeCDS1, decodeCDS1),
+  TIME_FORMAT_CDS2: (CDS2_TIME_STRUCT, encodeCDS2, decodeCDS2),
+  TIME_FORMAT_CDS3: (CDS3_TIME_STRUCT, encodeCDS3, decodeCDS3),
+  TIME_FORMAT_CUC0: (CUC0_TIME_STRUCT, encodeCUC0, decodeCUC0),
+  TIME_FORMAT_CUC1: (CUC1_TIME_STRUCT, encodeCUC1, decodeCUC1),
+  TIME_FORMAT_CUC2: (CUC2_TIME_STRUCT, encodeCUC2, decodeCUC2),
+  TIME_FORMAT_CUC3: (CUC3_TIME_STRUCT, encodeCUC3, decodeCUC3),
+  TIME_FORMAT_CUC4: (CUC4_TIME_STRUCT, encodeCUC4, decodeCUC4)}
+# -----------------------------------------------------------------------------
+def getTimeCodec(timeFormat):
+  """returns (struct, encode function, decode function) of a time format"""
+  try:
+    return TIME_CODECS[timeFormat]
+  except KeyError:
+    raise Error("invalid time format: " + str(timeFormat))
+# -----------------------------------------------------------------------------
+def encodeTime(buffer, bytePos, timeFormat, pyTime):
+  """writes a python time in the time format at bytePos into buffer"""
+  timeStruct, encode, decode = getTimeCodec(timeFormat)
+  timeStruct.pack_into(buffer, bytePos, *encode(pyTime))
+# -----------------------------------------------------------------------------
+def decodeTime(buffer, bytePos, timeFormat):
+  """returns python time from the time format at bytePos in buffer"""
+  timeStruct, encode, decode = getTimeCodec(timeFormat)
+  return decode(*timeStruct.unpack_from(buffer, bytePos))
+# -----------------------------------------------------------------------------
+def decodeTimeColumn(timeColumn, timeFormat):
+  """
+  returns python times (array of doubles) from a buffer with consecutive
+  time fields of the time format, e.g. the time tags of archived packets
+  """
+  timeStruct, encode, decode = getTimeCodec(timeFormat)
+  if len(timeColumn) % timeStruct.size != 0:
+    raise Error("time column size is not a multiple of " + str(timeStruct.size))
+  return array.array("d", [decode(*fields) for fields in timeStruct.iter_unpack(timeColumn)])
@@ -31,7 +31,7 @@ import MC.IF, MC.TCGEN, MC.TCmodel, MC.TMmodel
 import MCUI.CFGgui, MCUI.TMgui, MCUI.TCgui
 import SUPP.DEF, SUPP.IF, SUPP.TMrecorder
 import UI.TKI
-import UTIL.SYS, UTIL.TCO, UTIL.TASK
+import UTIL.SYS, UTIL.TCO, UTIL.TASK, UTIL.TIME
 
 #############
 # constants #
@@ -53,6 +53,7 @@ SYS_CONFIGURATION = [
   ["ERT_MISSION_EPOCH_STR", UTIL.TCO.TAI_MISSION_EPOCH_STR],
   ["ERT_LEAP_SECONDS", str(UTIL.TCO.GPS_LEAP_SECONDS_2017)],
   ["SYS_COLOR_LOG", "1"],
+  ["SYS_LOG_LEVEL", "LOG"],
   ["SYS_APP_MNEMO", "CS"],
   ["SYS_APP_NAME", "Control System"],
   ["SYS_APP_VERSION", "3.2"],
@@ -95,6 +96,8 @@ class ModelTask(UTIL.TASK.ProcessingTask):
       retStatus = self.quitCmd(argv)
     elif (cmd == "U") or (cmd == "DUMPCONFIGURATION"):
       retStatus = self.dumpConfigurationCmd(argv)
+    elif (cmd == "LL") or (cmd == "LOGLEVEL"):
+      retStatus = self.logLevelCmd(argv)
     elif (cmd == "L") or (cmd == "LISTPACKETS"):
       retStatus = self.listPacketsCmd(argv)
     elif (cmd == "G") or (cmd == "GENERATE"):
@@ -125,6 +128,8 @@ class ModelTask(UTIL.TASK.ProcessingTask):
       retStatus = self.disconnectEDEN2cmd(argv)
     elif (cmd == "PF") or (cmd == "REPLAYFRAMES"):
       retStatus = self.replayFramesCmd(argv)
+    elif (cmd == "SF") or (cmd == "SEEKFRAMES"):
+      retStatus = self.seekFramesCmd(argv)
     elif (cmd == "N1") or (cmd == "CONNECTNCTRS1"):
       retStatus = self.connectNCTRS1cmd(argv)
     elif (cmd == "O1") or (cmd == "DISCONNECTNCTRS1"):
@@ -154,6 +159,7 @@ class ModelTask(UTIL.TASK.ProcessingTask):
     LOG("h  | help ...............provides this information", "CFG")
     LOG("q  | quit ...............terminates SIM application", "CFG")
     LOG("u  | dumpConfiguration...dumps the configuration", "CFG")
+    LOG("ll | logLevel [<level> [<subsystem>]] sets/shows the log thresholds", "CFG")
     LOG("l  | listPackets.........lists available packets", "CFG")
     LOG("g  | generate............generates the testdata.sim file in testbin directory", "CFG")
     LOG_INFO("Available monitoring commands:", "TM")
@@ -162,7 +168,8 @@ class ModelTask(UTIL.TASK.ProcessingTask):
     LOG("h  | help ................provides this information", "TM")
     LOG("q  | quit ................terminates SIM application", "TM")
     LOG("u  | dumpConfiguration....dumps the configuration", "TM")
-    LOG("rp | recordPackets <recordFile> records TM packets", "TM")
+    LOG("ll | logLevel [<level> [<subsystem>]] sets/shows the log thresholds", "TM")
+    LOG("rp | recordPackets <archiveDir> records TM packets", "TM")
     LOG("sp | stopPacketRecorder...stops recording of TM packets", "TM")
     LOG_INFO("Available control commands:", "TC")
     LOG("", "TC")
@@ -170,6 +177,7 @@ class ModelTask(UTIL.TASK.ProcessingTask):
     LOG("h  | help ...............provides this information", "TC")
     LOG("q  | quit ...............terminates SIM application", "TC")
     LOG("u  | dumpConfiguration...dumps the configuration", "TC")
+    LOG("ll | logLevel [<level> [<subsystem>]] sets/shows the log thresholds", "TC")
     LOG("p  | setPacketData <pktMnemonic> <route>", "TC")
     LOG("                         predefine data for the next TC packet", "TC")
     LOG("s  | sendPacket [<pktMnemonic> <route>]", "TC")
@@ -180,6 +188,7 @@ class ModelTask(UTIL.TASK.ProcessingTask):
     LOG("h  | help ...............provides this information", "CNC")
     LOG("q  | quit ...............terminates SIM application", "CNC")
     LOG("u  | dumpConfiguration...dumps the configuration", "CNC")
+    LOG("ll | logLevel [<level> [<subsystem>]] sets/shows the log thresholds", "CNC")
     LOG("c1 | connectCNC..........connect to CNC port 1", "CNC")
     LOG("d1 | disconnectCNC.......disconnect from CNC port 1", "CNC")
     LOG("c2 | connectCNC2.........connect to CNC port 2", "CNC")
@@ -190,6 +199,7 @@ class ModelTask(UTIL.TASK.ProcessingTask):
     LOG("h  | help ...............provides this information", "EDEN")
     LOG("q  | quit ...............terminates SIM application", "EDEN")
     LOG("u  | dumpConfiguration...dumps the configuration", "EDEN")
+    LOG("ll | logLevel [<level> [<subsystem>]] sets/shows the log thresholds", "EDEN")
     LOG("e1 | connectEDEN.........connect to EDEN port 1", "EDEN")
     LOG("f1 | disconnectEDEN......disconnect from EDEN port 1", "EDEN")
     LOG("e2 | connectEDEN2........connect to EDEN port 2", "EDEN")
@@ -200,13 +210,17 @@ class ModelTask(UTIL.TASK.ProcessingTask):
     LOG("h  | help ...............provides this information", "FRAME")
     LOG("q  | quit ...............terminates SIM application", "FRAME")
     LOG("u  | dumpConfiguration...dumps the configuration", "FRAME")
-    LOG("pf | replayFrames <replayFile> replays NCTRS frames", "FRAME")
+    LOG("ll | logLevel [<level> [<subsystem>]] sets/shows the log thresholds", "FRAME")
+    LOG("pf | replayFrames <replayFile> [<rate> [<startERT>]] replays NCTRS frames", "FRAME")
+    LOG("                             rate = max | multiplier of the recorded ERTs", "FRAME")
+    LOG("sf | seekFrames <ERT>........continues the replay at the ERT", "FRAME")
     LOG_INFO("Available control commands:", "NCTRS")
     LOG("", "NCTRS")
     LOG("x  | exit ...............terminates client connection (only for TCP/IP clients)", "NCTRS")
     LOG("h  | help ...............provides this information", "NCTRS")
     LOG("q  | quit ...............terminates SIM application", "NCTRS")
     LOG("u  | dumpConfiguration...dumps the configuration", "NCTRS")
+    LOG("ll | logLevel [<level> [<subsystem>]] sets/shows the log thresholds", "NCTRS")
     LOG("n1 | connectNCTRS1.......connect to NCTRS port 1", "NCTRS")
     LOG("o1 | disconnectNCTRS1....disconnect from NCTRS port 1", "NCTRS")
     LOG("n2 | connectNCTRS2.......connect to NCTRS port 2", "NCTRS")
@@ -398,16 +412,53 @@ class ModelTask(UTIL.TASK.ProcessingTask):
     self.logMethod("replayFramesCmd", "FRAME")
 
     # consistency check
-    if len(argv) != 2:
+    if len(argv) < 2 or len(argv) > 4:
       LOG_WARNING("invalid parameters passed for replayFrames", "FRAME")
       return False
 
     # extract the arguments
     replayFile = argv[1]
+    rateMultiplier = None
+    startERT = None
+    try:
+      if len(argv) >= 3:
+        if argv[2].upper() == "MAX":
+          rateMultiplier = CS.FRAMErply.REPLAY_AS_FAST_AS_POSSIBLE
+        else:
+          rateMultiplier = float(argv[2])
+          if rateMultiplier <= 0.0:
+            raise Error("rate must be > 0")
+      if len(argv) == 4:
+        startERT = UTIL.TIME.getTimeFromASDstr(argv[3])
+        if startERT == 0.0:
+          raise Error("startERT must be YYYY.DDD.hh.mm.ss.MMM")
+    except Exception as ex:
+      LOG_WARNING("invalid parameters passed for replayFrames: " + str(ex), "FRAME")
+      return False
 
     # start replay
     frameRateMs = 1000.0
-    CS.FRAMErply.s_frameReplayer.startReplay(replayFile, frameRateMs)
+    return CS.FRAMErply.s_frameReplayer.startReplay(replayFile,
+                                                    frameRateMs,
+                                                    rateMultiplier,
+                                                    startERT)
+  # ---------------------------------------------------------------------------
+  def seekFramesCmd(self, argv):
+    """Decoded seekFramesCmd command"""
+    self.logMethod("seekFramesCmd", "FRAME")
+
+    # consistency check
+    if len(argv) != 2:
+      LOG_WARNING("invalid parameters passed for seekFrames", "FRAME")
+      return False
+
+    # extract the arguments
+    ertUTC = UTIL.TIME.getTimeFromASDstr(argv[1])
+    if ertUTC == 0.0:
+      LOG_WARNING("invalid ERT passed for seekFrames", "FRAME")
+      return False
+
+    return CS.FRAMErply.s_frameReplayer.seek(ertUTC)
   # ---------------------------------------------------------------------------
   def connectNCTRS1cmd(self, argv):
     """Decoded connectNCTRS1cmd command"""
@@ -520,7 +571,8 @@ def printUsage(launchScriptName):
   print(launchScriptName)
   print("\t[ -i | -interpreter | -c | -cmdprompt | -bg | -background ]")
   print("\t[ -n | -nogui ] [ -p <port> | -port <port> ]")
-  print("\t[ -l <logfile> | -logfile <logfile> ] [ -h | -help ]")
+  print("\t[ -l <logfile> | -logfile <logfile> ] [ -al | -asynclog ]")
+  print("\t[ -h | -help ]")
   print("")
 
 ########
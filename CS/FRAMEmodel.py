@@ -31,13 +31,16 @@ SEND_AS_CLTU = 2
 # classes #
 ###########
 # =============================================================================
-class FrameModel(CCSDS.PACKETIZER.Packetizer, CCSDS.TCENCODER.TCencoder):
+class FrameModel(CCSDS.PACKETIZER.Demultiplexer, CCSDS.TCENCODER.TCencoder):
   """Implementation of the CS side frame processing"""
   # ---------------------------------------------------------------------------
   def __init__(self):
     """Initialise attributes only"""
-    frameVCID = int(UTIL.SYS.s_configuration.TM_TRANSFER_FRAME_VCID)
-    CCSDS.PACKETIZER.Packetizer.__init__(self, frameVCID)
+    # comma separated list of VCIDs or ALL
+    frameVCIDs = CCSDS.PACKETIZER.parseVirtualChannelIds(
+      UTIL.SYS.s_configuration.TM_TRANSFER_FRAME_VCID)
+    # packets are only copied into TM packet DUs when they are not filtered
+    CCSDS.PACKETIZER.Demultiplexer.__init__(self, frameVCIDs, zeroCopy=True)
     CCSDS.TCENCODER.TCencoder.__init__(self)
     self.ignoreIdlePackets = (UTIL.SYS.s_configuration.IGNORE_IDLE_PACKETS == "1")
   # ---------------------------------------------------------------------------
@@ -69,11 +72,12 @@ class FrameModel(CCSDS.PACKETIZER.Packetizer, CCSDS.TCENCODER.TCencoder):
   # ---------------------------------------------------------------------------
   def notifyTMpacketCallback(self, binPacket):
     """notifies when the next TM packet is assembled"""
-    # overloaded from Packetizer
+    # overloaded from Demultiplexer
     if self.ignoreIdlePackets:
       apid = CCSDS.PACKET.getApplicationProcessId(binPacket)
       if apid == CCSDS.PACKET.IDLE_PKT_APID:
         return
+    # the binPacket is a view into the frame --> the DU takes a copy
     if PUS.PACKET.isPUSpacket(binPacket):
       # PUS packet
       tmPacketDu = PUS.PACKET.TMpacket(binPacket)
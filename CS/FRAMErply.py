@@ -12,84 +12,241 @@
 #******************************************************************************
 # FRAME layer - NCTRS frame file replayer                                     *
 #******************************************************************************
+import bisect, mmap, os, time
+from array import array
 from UTIL.SYS import Error, LOG, LOG_INFO, LOG_WARNING, LOG_ERROR
 import CS.FRAMEmodel
-import GRND.NCTRS
-import UTIL.TASK
+import GRND.FRAMEREC, GRND.NCTRS
+import UTIL.TASK, UTIL.TCO
+
+#############
+# constants #
+#############
+# rateMultiplier for replaying the frames as fast as possible
+REPLAY_AS_FAST_AS_POSSIBLE = 0
+# maximum number of frames that are replayed in one tick
+REPLAY_BATCH_SIZE = 500
 
 ###########
 # classes #
 ###########
+# =============================================================================
+class FrameIndex(object):
+  """ERTs (UTC) and file offsets of the NCTRS frames in a replay file"""
+  # ---------------------------------------------------------------------------
+  def __init__(self, buffer, fileName):
+    """
+    uses the index file of GRND.FRAMEREC if available, the frames that are
+    not indexed are found by scanning the data unit headers in buffer
+    """
+    self.erts = array("d")
+    self.offsets = array("Q")
+    offset = 0
+    if os.path.exists(fileName + GRND.FRAMEREC.INDEX_FILE_EXTENSION):
+      # the index file is written when the recorder flushes, the frames
+      # after the last index entry (e.g. of an interrupted recording) are
+      # found by scanning the headers, starting with the last indexed frame
+      for ertUTC, entryOffset in GRND.FRAMEREC.readIndex(fileName):
+        if entryOffset >= len(buffer):
+          break
+        self.erts.append(ertUTC)
+        self.offsets.append(entryOffset)
+      if len(self.offsets) > 0:
+        self.erts.pop()
+        offset = self.offsets.pop()
+    headerByteSize = GRND.NCTRS.getTMdataUnitHeaderByteSize()
+    while offset + headerByteSize <= len(buffer):
+      tmDu = GRND.NCTRS.createTMdataUnit(buffer[offset:offset + headerByteSize])
+      packetSize = tmDu.packetSize
+      if packetSize <= headerByteSize or offset + packetSize > len(buffer):
+        LOG_WARNING("invalid NCTRS frame at offset " + str(offset) +
+                    " of " + fileName, "FRAME")
+        break
+      ertUTC = UTIL.TCO.correlateFromERTmissionEpoch(tmDu.earthReceptionTime)
+      self.erts.append(ertUTC)
+      self.offsets.append(offset)
+      offset += packetSize
+    # the end of the last frame
+    self.offsets.append(offset)
+  # ---------------------------------------------------------------------------
+  def __len__(self):
+    """number of frames"""
+    return len(self.erts)
+  # ---------------------------------------------------------------------------
+  def findFrame(self, ertUTC):
+    """index of the first frame with ERT >= ertUTC (ERT sorted frames)"""
+    return bisect.bisect_left(self.erts, ertUTC)
+
 # =============================================================================
 class FrameReplayer(object):
-  """Replayer of NCTRS frame files"""
+  """
+  Replayer of NCTRS frame files, the file is memory mapped.
+  Replay speed:
+  - rateMultiplier None: one frame every frameRateMs
+  - rateMultiplier REPLAY_AS_FAST_AS_POSSIBLE: batches of frames
+  - rateMultiplier > 0: the frames follow the recorded ERTs,
+    accelerated by rateMultiplier (e.g. 1, 10, 100)
+  """
   # ---------------------------------------------------------------------------
   def __init__(self):
     """default constructor"""
     self.running = False
-    self.nctrsFramesFile = None
+    self.replayMap = None
+    self.buffer = None
+    self.frameIndex = None
+    self.nextFrame = 0
     self.frameRateMs = None
+    self.rateMultiplier = None
+    self.startERT = None
+    self.startTime = None
+    self.timerHandle = None
     self.frameNr = 0
   # ---------------------------------------------------------------------------
-  def startReplay(self, replayFileName, frameRateMs):
-    """starts reading NCTRS frames from a replay file"""
+  def startReplay(self, replayFileName, frameRateMs,
+                  rateMultiplier=None, startERT=None):
+    """
+    starts reading NCTRS frames from a replay file,
+    the replay starts at the first frame with ERT >= startERT (UTC)
+    """
     LOG_WARNING("startReplay(" + replayFileName + ")", "FRAME")
-    # read the NCTRS frames file
+    if self.running:
+      self.stopReplay()
+    # map the NCTRS frames file
     try:
-      self.nctrsFramesFile = open(replayFileName, "rb")
-    except:
-      LOG_ERROR("cannot read " + replayFileName, "FRAME")
+      self.frameIndex, self.replayMap = getFrameIndex(replayFileName)
+    except Exception as ex:
+      LOG_ERROR("cannot read " + replayFileName + ": " + str(ex), "FRAME")
       return False
+    self.buffer = memoryview(self.replayMap)
     self.frameRateMs = frameRateMs
+    self.rateMultiplier = rateMultiplier
     self.running = True
     self.frameNr = 0
+    self.nextFrame = 0
+    if startERT != None:
+      self.nextFrame = self.frameIndex.findFrame(startERT)
+    self.resetReplayTime()
     UTIL.TASK.s_processingTask.notifyGUItask("UPDATE_REPLAY")
-    # read the first frame, other frames are read automatically
-    self.readFrame()
+    # replay the first frame(s), other frames are replayed automatically
+    self.replayFrames()
+    return True
   # ---------------------------------------------------------------------------
   def stopReplay(self):
     """stops reading NCTRS frames"""
     LOG_WARNING("stopReplay", "FRAME")
     self.running = False
-    if self.nctrsFramesFile != None:
-      self.nctrsFramesFile.close()
-      self.nctrsFramesFile = None
+    if self.timerHandle != None:
+      UTIL.TASK.s_processingTask.cancelTimeHandler(self.timerHandle)
+      self.timerHandle = None
+    if self.buffer != None:
+      self.buffer.release()
+      self.buffer = None
+    self.replayMap = None
+    self.frameIndex = None
     self.frameRateMs = None
     UTIL.TASK.s_processingTask.notifyGUItask("UPDATE_REPLAY")
   # ---------------------------------------------------------------------------
-  def readFrame(self):
-    """reads the next NCTRS frame from the replay file"""
+  def seek(self, ertUTC):
+    """continues the replay with the first frame with ERT >= ertUTC"""
+    if not self.running:
+      LOG_WARNING("replay not started", "FRAME")
+      return False
+    self.nextFrame = self.frameIndex.findFrame(ertUTC)
+    LOG_INFO("seek to frame " + str(self.nextFrame), "FRAME")
+    self.resetReplayTime()
+    return True
+  # ---------------------------------------------------------------------------
+  def setRateMultiplier(self, rateMultiplier):
+    """changes the replay speed, see FrameReplayer"""
+    self.rateMultiplier = rateMultiplier
+    self.resetReplayTime()
+  # ---------------------------------------------------------------------------
+  def resetReplayTime(self):
+    """the ERT of the next frame is replayed now"""
+    self.startTime = time.monotonic()
+    if self.nextFrame < len(self.frameIndex):
+      self.startERT = self.frameIndex.erts[self.nextFrame]
+  # ---------------------------------------------------------------------------
+  def replayFrames(self):
+    """replays the frames that are due and schedules the next replay"""
+    self.timerHandle = None
     # skip when the replay is not running anymore
     if not self.running:
       return
-    # read the next NCTRS frame
-    try:
-      tmDu = GRND.NCTRS.readNCTRSframe(self.nctrsFramesFile)
-    except Exception as ex:
-      errorMessage = str(ex)
-      if errorMessage != "":
-        LOG_ERROR(errorMessage)
+    frameIndex = self.frameIndex
+    frameCount = len(frameIndex)
+    if self.rateMultiplier == None:
+      lastFrame = min(self.nextFrame + 1, frameCount)
+    elif self.rateMultiplier == REPLAY_AS_FAST_AS_POSSIBLE:
+      lastFrame = min(self.nextFrame + REPLAY_BATCH_SIZE, frameCount)
+    else:
+      replayERT = self.startERT + \
+        (time.monotonic() - self.startTime) * self.rateMultiplier
+      lastFrame = bisect.bisect_right(frameIndex.erts, replayERT,
+                                      self.nextFrame,
+                                      min(self.nextFrame + REPLAY_BATCH_SIZE,
+                                          frameCount))
+    # extract the TM frames from the NCTRS data units
+    # and send them to the frame processing
+    headerByteSize = GRND.NCTRS.getTMdataUnitHeaderByteSize()
+    offsets = frameIndex.offsets
+    for i in range(self.nextFrame, lastFrame):
+      frame = self.buffer[offsets[i] + headerByteSize:offsets[i + 1]]
+      CS.FRAMEmodel.s_frameModel.receiveTMframe(frame)
+      frame.release()
+    self.frameNr += lastFrame - self.nextFrame
+    self.nextFrame = lastFrame
+    UTIL.TASK.s_processingTask.notifyGUItask("UPDATE_REPLAY_NR")
+    if lastFrame >= frameCount:
+      LOG_WARNING("replay finished", "FRAME")
       self.stopReplay()
       return
-    # extract the TM frame from the NCTRS data unit
-    # and send it to the frame processing
-    frame = tmDu.getFrame()
-    self.frameNr += 1
-    CS.FRAMEmodel.s_frameModel.receiveTMframe(frame)
-    UTIL.TASK.s_processingTask.notifyGUItask("UPDATE_REPLAY_NR")
-    # read the next frame later
-    UTIL.TASK.s_processingTask.createTimeHandler(self.frameRateMs,
-                                                 self.readFrame)
+    # replay the next frames later
+    if self.rateMultiplier == None:
+      delayMs = self.frameRateMs
+    elif self.rateMultiplier == REPLAY_AS_FAST_AS_POSSIBLE:
+      delayMs = 0
+    else:
+      nextERT = frameIndex.erts[lastFrame]
+      replayERT = self.startERT + \
+        (time.monotonic() - self.startTime) * self.rateMultiplier
+      delayMs = max(0, (nextERT - replayERT) * 1000 / self.rateMultiplier)
+    self.timerHandle = UTIL.TASK.s_processingTask.createTimeHandler(
+      delayMs, self.replayFrames)
 
 ####################
 # global variables #
 ####################
 # NCTRS clients are singletons
 s_frameReplayer = None
+# replay file name --> ((file size, modification time), FrameIndex)
+s_frameIndexes = {}
 
 #############
 # functions #
 #############
+def getFrameIndex(replayFileName):
+  """
+  maps the replay file and returns (frame index, mmap),
+  the index is built once per file (and file modification)
+  """
+  replayFile = open(replayFileName, "rb")
+  try:
+    fileStat = os.fstat(replayFile.fileno())
+    if fileStat.st_size == 0:
+      raise Error("empty replay file")
+    replayMap = mmap.mmap(replayFile.fileno(), 0, access=mmap.ACCESS_READ)
+  finally:
+    replayFile.close()
+  fileKey = (fileStat.st_size, fileStat.st_mtime)
+  if replayFileName in s_frameIndexes:
+    indexFileKey, frameIndex = s_frameIndexes[replayFileName]
+    if indexFileKey == fileKey:
+      return (frameIndex, replayMap)
+  frameIndex = FrameIndex(replayMap, replayFileName)
+  s_frameIndexes[replayFileName] = (fileKey, frameIndex)
+  return (frameIndex, replayMap)
+# -----------------------------------------------------------------------------
 def init():
   """initialise singleton(s)"""
   global s_frameReplayer
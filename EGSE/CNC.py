@@ -44,6 +44,13 @@ s_tcAckNakSSCparamByteOffset = DEFAULT_TC_ACKNAK_SSC_PARAM_BYTE_OFFSET
 # functions #
 #############
 # -----------------------------------------------------------------------------
+def createPacketDecoder():
+  """creates a stream decoder for CnC and CCSDS packets"""
+  # packetLength is the data field length - 1
+  return UTIL.TCP.DataUnitDecoder(CCSDS.PACKET.PRIMARY_HEADER_BYTE_SIZE,
+                                  CCSDS.PACKET.PRIMARY_HEADER_ATTRIBUTES["packetLength"],
+                                  sizeFieldDelta=CCSDS.PACKET.PRIMARY_HEADER_BYTE_SIZE + 1)
+# -----------------------------------------------------------------------------
 def setTCackNakParamsProperties(tcAckNakAPIDparamByteOffset,
                                 tcAckNakSSCparamByteOffset):
   """changes the global positions of the TC ACK/NAK attributes"""
@@ -95,6 +102,7 @@ class TCserver(UTIL.TCP.SingleClientServer):
     """Initialise attributes only"""
     modelTask = UTIL.TASK.s_processingTask
     UTIL.TCP.SingleClientServer.__init__(self, modelTask, portNr)
+    self.dataUnitDecoder = createPacketDecoder()
     self.tcAckNakSSC = 0
   # ---------------------------------------------------------------------------
   def sendCNCackNak(self, cncCommandDU, okStatus):
@@ -163,18 +171,12 @@ class TCserver(UTIL.TCP.SingleClientServer):
   # ---------------------------------------------------------------------------
   def receiveCallback(self, socket, stateMask):
     """Callback when the CCS has send data"""
-    # read the packet header from the data socket
-    strBuffer = self.recv(CCSDS.PACKET.PRIMARY_HEADER_BYTE_SIZE)
-    if strBuffer == None:
-      # failure handling was done automatically by derived logic
-      return
-    packetHeader = array.array("B", strBuffer)
-    # consistency check
-    packetHeaderLen = len(packetHeader)
-    if packetHeaderLen != CCSDS.PACKET.PRIMARY_HEADER_BYTE_SIZE:
-      LOG_ERROR("Read of CnC header failed: invalid size: " + str(packetHeaderLen))
-      self.disconnectClient()
-      return
+    self.dispatchDataUnits(self.receiveTCpacket)
+  # ---------------------------------------------------------------------------
+  def receiveTCpacket(self, packetData):
+    """a complete CnC command or CCSDS telecommand is received"""
+    packetHeader = array.array("B", packetData[:CCSDS.PACKET.PRIMARY_HEADER_BYTE_SIZE])
+    dataField = packetData[CCSDS.PACKET.PRIMARY_HEADER_BYTE_SIZE:]
     packetVersionNumber = packetHeader[0] >> 5
     if packetVersionNumber == EGSE.CNCPDU.VERSION_NUMBER:
       LOG_INFO("CNC.TCserver.receiveCallback(CnC command)")
@@ -182,18 +184,6 @@ class TCserver(UTIL.TCP.SingleClientServer):
     else:
       LOG_INFO("CNC.TCserver.receiveCallback(CCSDS telecommand)")
       tcPacketDU = CCSDS.PACKET.TCpacket(packetHeader)
-    # read the data field for the packet from the data socket
-    dataFieldLength = tcPacketDU.packetLength + 1
-    dataField = self.recv(dataFieldLength)
-    if dataField == None:
-      # failure handling was done automatically by derived logic
-      return
-    # consistency check
-    remainingSizeRead = len(dataField)
-    if remainingSizeRead != dataFieldLength:
-      LOG_ERROR("Read of remaining packet failed: invalid remaining size: " + str(remainingSizeRead))
-      self.disconnectClient()
-      return
     tcPacketDU.setDataField(dataField)
     # dispatch the telecommand
     try:
@@ -230,6 +220,7 @@ class TCclient(UTIL.TCP.Client):
     """Initialise attributes only"""
     modelTask = UTIL.TASK.s_processingTask
     UTIL.TCP.Client.__init__(self, modelTask)
+    self.dataUnitDecoder = createPacketDecoder()
   # ---------------------------------------------------------------------------
   def recvError(self, errorMessage):
     """
@@ -256,31 +247,11 @@ class TCclient(UTIL.TCP.Client):
   # ---------------------------------------------------------------------------
   def receiveCallback(self, socket, stateMask):
     """Callback when the SCOE has send data"""
-    # read the packet header from the data socket
-    packetHeader = self.recv(CCSDS.PACKET.PRIMARY_HEADER_BYTE_SIZE)
-    if packetHeader == None:
-      # failure handling was done automatically by derived logic
-      return
-    # consistency check
-    packetHeaderLen = len(packetHeader)
-    if packetHeaderLen != CCSDS.PACKET.PRIMARY_HEADER_BYTE_SIZE:
-      LOG_ERROR("Read of CnC header failed: invalid size: " + str(packetHeaderLen), "CNC")
-      self.disconnectFromServer()
-      return
-    ccsdsTMpacketDU = CCSDS.PACKET.TMpacket(packetHeader)
-    # read the data field for the packet from the data socket
-    dataFieldLength = ccsdsTMpacketDU.packetLength + 1
-    dataField = self.recv(dataFieldLength)
-    if dataField == None:
-      # failure handling was done automatically by derived logic
-      return
-    # consistency check
-    remainingSizeRead = len(dataField)
-    if remainingSizeRead != dataFieldLength:
-      LOG_ERROR("Read of remaining packet failed: invalid remaining size: " + str(remainingSizeRead), "CNC")
-      self.disconnectFromServer()
-      return
-    ccsdsTMpacketDU.append(dataField)
+    self.dispatchDataUnits(self.receiveTMpacket)
+  # ---------------------------------------------------------------------------
+  def receiveTMpacket(self, packetData):
+    """a complete CCSDS TM packet is received"""
+    ccsdsTMpacketDU = CCSDS.PACKET.TMpacket(packetData)
     # convert and dispatch the data depending on the CNC/TM packet type
     try:
       if ccsdsTMpacketDU.versionNumber == EGSE.CNCPDU.VERSION_NUMBER:
@@ -340,6 +311,7 @@ class TMclient(UTIL.TCP.Client):
     """Initialise attributes only"""
     modelTask = UTIL.TASK.s_processingTask
     UTIL.TCP.Client.__init__(self, modelTask)
+    self.dataUnitDecoder = createPacketDecoder()
   # ---------------------------------------------------------------------------
   def recvError(self, errorMessage):
     """
@@ -361,31 +333,11 @@ class TMclient(UTIL.TCP.Client):
   # ---------------------------------------------------------------------------
   def receiveCallback(self, socket, stateMask):
     """Callback when the SCOE has send data"""
-    # read the packet header from the data socket
-    packetHeader = self.recv(CCSDS.PACKET.PRIMARY_HEADER_BYTE_SIZE)
-    if packetHeader == None:
-      # failure handling was done automatically by derived logic
-      return
-    # consistency check
-    packetHeaderLen = len(packetHeader)
-    if packetHeaderLen != CCSDS.PACKET.PRIMARY_HEADER_BYTE_SIZE:
-      LOG_ERROR("Read of CCSDS packet header failed: invalid size: " + str(packetHeaderLen), "CNC")
-      self.disconnectFromServer()
-      return
-    ccsdsTMpacketDU = CCSDS.PACKET.TMpacket(packetHeader)
-    # read the data field for the packet from the data socket
-    dataFieldLength = ccsdsTMpacketDU.packetLength + 1
-    dataField = self.recv(dataFieldLength)
-    if dataField == None:
-      # failure handling was done automatically by derived logic
-      return
-    # consistency check
-    remainingSizeRead = len(dataField)
-    if remainingSizeRead != dataFieldLength:
-      LOG_ERROR("Read of remaining packet failed: invalid remaining size: " + str(remainingSizeRead), "CNC")
-      self.disconnectFromServer()
-      return
-    ccsdsTMpacketDU.append(dataField)
+    self.dispatchDataUnits(self.receiveTMpacket)
+  # ---------------------------------------------------------------------------
+  def receiveTMpacket(self, packetData):
+    """a complete CCSDS TM packet is received"""
+    ccsdsTMpacketDU = CCSDS.PACKET.TMpacket(packetData)
     # dispatch the CCSDS tm packet
     try:
       LOG_INFO("CNC.TMclient.receiveCallback(TM packet)", "CNC")
@@ -18,6 +18,16 @@ from UTIL.SYS import Error, LOG, LOG_INFO, LOG_WARNING, LOG_ERROR
 import EGSE.EDENPDU, EGSE.IF
 import UTIL.TASK, UTIL.TCP, UTIL.TIME
 
+#############
+# functions #
+#############
+# -----------------------------------------------------------------------------
+def createPDUdecoder():
+  """creates a stream decoder for EDEN PDUs"""
+  return UTIL.TCP.DataUnitDecoder(EGSE.EDENPDU.PDU_HEADER_BYTE_SIZE,
+                                  EGSE.EDENPDU.PDU_HEADER_ATTRIBUTES["dataFieldLength"],
+                                  sizeFieldDelta=EGSE.EDENPDU.PDU_HEADER_BYTE_SIZE)
+
 ###########
 # classes #
 ###########
@@ -30,6 +40,7 @@ class Server(UTIL.TCP.SingleClientServer):
     """Initialise attributes only"""
     modelTask = UTIL.TASK.s_processingTask
     UTIL.TCP.SingleClientServer.__init__(self, modelTask, portNr)
+    self.dataUnitDecoder = createPDUdecoder()
   # ---------------------------------------------------------------------------
   def sendPDU(self, pdu):
     """Send the PDU to CCS"""
@@ -139,32 +150,11 @@ class Server(UTIL.TCP.SingleClientServer):
   # ---------------------------------------------------------------------------
   def receiveCallback(self, socket, stateMask):
     """Callback when the CCS has send data"""
-    # read the PDU header
-    pduHeader = self.recv(EGSE.EDENPDU.PDU_HEADER_BYTE_SIZE)
-    if pduHeader == None:
-      # failure handling was done automatically by derived logic
-      return
-    # consistency check
-    pduHeaderLen = len(pduHeader)
-    if pduHeaderLen != EGSE.EDENPDU.PDU_HEADER_BYTE_SIZE:
-      LOG_ERROR("Read of PDU header failed: invalid size: " + str(pduHeaderLen))
-      self.disconnectClient()
-      return
-    pdu = EGSE.EDENPDU.PDU(pduHeader)
-    # read the data field for the PDU
-    dataFieldLength = pdu.dataFieldLength
-    if dataFieldLength > 0:
-      dataField = self.recv(dataFieldLength)
-      if dataField == None:
-        # failure handling was done automatically by derived logic
-        return
-      # consistency check
-      remainingSizeRead = len(dataField)
-      if remainingSizeRead != dataFieldLength:
-        LOG_ERROR("Read of remaining PDU failed: invalid remaining size: " + str(remainingSizeRead))
-        self.disconnectClient()
-        return
-      pdu.setDataField(dataField)
+    self.dispatchDataUnits(self.receivePDU)
+  # ---------------------------------------------------------------------------
+  def receivePDU(self, pduData):
+    """a complete PDU is received"""
+    pdu = EGSE.EDENPDU.PDU(pduData)
     # dispatch depending on pduType and subType
     try:
       if pdu.pduType == EGSE.EDENPDU.PDU_TYPE_TC:
@@ -237,6 +227,7 @@ class Client(UTIL.TCP.Client):
     """Initialise attributes only"""
     modelTask = UTIL.TASK.s_processingTask
     UTIL.TCP.Client.__init__(self, modelTask)
+    self.dataUnitDecoder = createPDUdecoder()
   # ---------------------------------------------------------------------------
   def recvError(self, errorMessage):
     """
@@ -286,32 +277,11 @@ class Client(UTIL.TCP.Client):
   # ---------------------------------------------------------------------------
   def receiveCallback(self, socket, stateMask):
     """Callback when the SCOE has send data"""
-    # read the PDU header
-    pduHeader = self.recv(EGSE.EDENPDU.PDU_HEADER_BYTE_SIZE)
-    if pduHeader == None:
-      # failure handling was done automatically by derived logic
-      return
-    # consistency check
-    pduHeaderLen = len(pduHeader)
-    if pduHeaderLen != EGSE.EDENPDU.PDU_HEADER_BYTE_SIZE:
-      LOG_ERROR("Read of PDU header failed: invalid size: " + str(pduHeaderLen), "EDEN")
-      self.disconnectFromServer()
-      return
-    pdu = EGSE.EDENPDU.PDU(pduHeader)
-    # read the data field for the PDU
-    dataFieldLength = pdu.dataFieldLength
-    if dataFieldLength > 0:
-      dataField = self.recv(dataFieldLength)
-      if dataField == None:
-        # failure handling was done automatically by derived logic
-        return
-      # consistency check
-      remainingSizeRead = len(dataField)
-      if remainingSizeRead != dataFieldLength:
-        LOG_ERROR("Read of remaining PDU failed: invalid remaining size: " + str(remainingSizeRead), "EDEN")
-        self.disconnectFromServer()
-        return
-      pdu.setDataField(dataField)
+    self.dispatchDataUnits(self.receivePDU)
+  # ---------------------------------------------------------------------------
+  def receivePDU(self, pduData):
+    """a complete PDU is received"""
+    pdu = EGSE.EDENPDU.PDU(pduData)
     # dispatch depending on pduType and subType
     try:
       if pdu.pduType == EGSE.EDENPDU.PDU_TYPE_TC_A:
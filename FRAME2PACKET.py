@@ -26,6 +26,12 @@
 # with the recordFrames function:                                             *
 # - Generate NCTRS frames: TM_FRAME_FORMAT = NCTRS                            *
 # - Generate CRYOSAT format: TM_FRAME_FORMAT = CRYOSAT                        *
+#                                                                             *
+# The frames of all virtual channels are converted in one pass:               *
+# - Selected virtual channels: TM_TRANSFER_FRAME_VCID = 0,1,2                 *
+# - All virtual channels: TM_TRANSFER_FRAME_VCID = ALL                        *
+# - One worker process per virtual channel: PARALLEL_VIRTUAL_CHANNELS = 1     *
+#   (the packets are written grouped by virtual channel)                      *
 #******************************************************************************
 # Command line: FRAME2PACKET.py <frame dump file name> <packet file name>     *
 #******************************************************************************
@@ -43,6 +49,7 @@ SYS_CONFIGURATION = [
   ["TM_FRAME_FORMAT", "NCTRS"],
   ["TM_TRANSFER_FRAME_SIZE", "1115"],
   ["TM_TRANSFER_FRAME_VCID", "0"],
+  ["PARALLEL_VIRTUAL_CHANNELS", "0"],
   ["IGNORE_IDLE_PACKETS", "1"],
   ["INSERT_LINE", "sleep(1000)"],
   ["SYS_COLOR_LOG", "1"]]
@@ -62,13 +69,14 @@ def printUsage(launchScriptName):
 ###########
 # classes #
 ###########
-class PacketizerImpl(CCSDS.PACKETIZER.Packetizer):
-  """adds file handling to the derived packetizer functionality"""
+class PacketizerImpl(CCSDS.PACKETIZER.Demultiplexer):
+  """adds file handling to the derived demultiplexer functionality"""
   # ---------------------------------------------------------------------------
   def __init__(self, frameDumpFileName, packetFileName):
-    """delegates to Packetizer"""
-    frameVCID = int(UTIL.SYS.s_configuration.TM_TRANSFER_FRAME_VCID)
-    CCSDS.PACKETIZER.Packetizer.__init__(self, frameVCID)
+    """delegates to Demultiplexer"""
+    frameVCIDs = CCSDS.PACKETIZER.parseVirtualChannelIds(
+      UTIL.SYS.s_configuration.TM_TRANSFER_FRAME_VCID)
+    CCSDS.PACKETIZER.Demultiplexer.__init__(self, frameVCIDs, zeroCopy=True)
     self.frameDumpFileName = frameDumpFileName
     self.frameDumpFormat = UTIL.SYS.s_configuration.TM_FRAME_FORMAT
     self.frameSize = int(UTIL.SYS.s_configuration.TM_TRANSFER_FRAME_SIZE)
@@ -76,6 +84,10 @@ class PacketizerImpl(CCSDS.PACKETIZER.Packetizer):
     self.packetFile = None
     self.ignoreIdlePackets = (UTIL.SYS.s_configuration.IGNORE_IDLE_PACKETS == "1")
     self.insertLine = UTIL.SYS.s_configuration.INSERT_LINE
+    self.parallel = (UTIL.SYS.s_configuration.PARALLEL_VIRTUAL_CHANNELS == "1")
+    # frames are collected for the parallel conversion
+    self.ccsdsFrames = []
+    self.lastVirtualChannelKey = None
   # ---------------------------------------------------------------------------
   def generatePackets(self):
     """Extracts CCSDS TM packets from CCSDS TM transfer frames"""
@@ -99,6 +111,9 @@ class PacketizerImpl(CCSDS.PACKETIZER.Packetizer):
     else:
       LOG_ERROR("invalid frame dump format in config option TM_FRAME_FORMAT: " + self.frameDumpFormat)
       sys.exit(-1)
+    if self.parallel:
+      self.pushTMframes(self.ccsdsFrames, parallel=True)
+      self.ccsdsFrames = []
     # close files
     self.packetFile.close()
     frameDumpFile.close()
@@ -141,18 +156,28 @@ class PacketizerImpl(CCSDS.PACKETIZER.Packetizer):
   def generatePacketsFromCCSDSframe(self, ccsdsFrame, frameNumber):
     """Extracts CCSDS TM packets from CCSDS TM transfer frames"""
     LOG_INFO("frame " + str(frameNumber))
+    if self.parallel:
+      self.ccsdsFrames.append(ccsdsFrame)
+      return
     self.packetFile.write("# frame" + str(frameNumber) + "\n")
     self.pushTMframe(ccsdsFrame)
   # ---------------------------------------------------------------------------
   def notifyTMpacketCallback(self, binPacket):
     """notifies when the next TM packet is assembled"""
-    # overloaded from Packetizer
+    # overloaded from Demultiplexer
     if self.ignoreIdlePackets:
       apid = CCSDS.PACKET.getApplicationProcessId(binPacket)
       if apid == CCSDS.PACKET.IDLE_PKT_APID:
         return
-    for byte in binPacket:
-      self.packetFile.write("%02X" % byte)
+    if self.parallel:
+      # the packets are grouped by virtual channel
+      virtualChannelKey = (self.spacecraftId, self.virtualChannelId)
+      if virtualChannelKey != self.lastVirtualChannelKey:
+        self.packetFile.write("# spacecraft " + str(self.spacecraftId) +
+                              " virtual channel " + str(self.virtualChannelId) + "\n")
+        self.lastVirtualChannelKey = virtualChannelKey
+    # binPacket is a memoryview into the frame or a copy (parallel)
+    self.packetFile.write(binPacket.hex().upper())
     self.packetFile.write("\n")
     if self.insertLine != "":
       self.packetFile.write(self.insertLine + "\n")
@@ -0,0 +1,276 @@
+#******************************************************************************
+# (C) 2020, Stefan Korner, Austria                                            *
+#                                                                             *
+# The Space Python Library is free software; you can redistribute it and/or   *
+# modify it under under the terms of the MIT License as published by the      *
+# Massachusetts Institute of Technology.                                      *
+#                                                                             *
+# The Space Python Library is distributed in the hope that it will be useful, *
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              *
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the MIT License    *
+# for more details.                                                           *
+#******************************************************************************
+# Ground Simulation - TM Frame Recorder                                       *
+#                                                                             *
+# The frames are recorded in the binary NCTRS or CRYOSAT format: the data     *
+# unit headers are built from a prebuilt header template and collected with   *
+# the frames in large blocks, which are written by a background thread.       *
+# Each recording file has an index file (<file>.idx) with the ERT and the     *
+# file offset of each frame. The ASCII formats are rendered from the binary   *
+# file when the file is completed (<file> is then the ASCII file and the      *
+# binary file is <file>.bin).                                                 *
+#******************************************************************************
+import bisect, os, struct
+from UTIL.SYS import Error, LOG, LOG_INFO, LOG_WARNING, LOG_ERROR
+import CCSDS.FRAME
+import GRND.CRYOSATDU, GRND.NCTRS
+import UTIL.DU, UTIL.TCO, UTIL.TIME, UTIL.WRITER
+
+#############
+# constants #
+#############
+BINARY_FORMATS = {
+  "NCTRS": "NCTRS",
+  "NCTRS_ASCII": "NCTRS",
+  "NCTRS_ASCII_DETAILS": "NCTRS",
+  "CRYOSAT": "CRYOSAT",
+  "CRYOSAT_ASCII": "CRYOSAT",
+  "CRYOSAT_ASCII_DETAILS": "CRYOSAT"}
+# ERT (UTC), file offset of the data unit
+INDEX_ENTRY_FORMAT = ">dQ"
+INDEX_ENTRY_BYTE_SIZE = struct.calcsize(INDEX_ENTRY_FORMAT)
+INDEX_FILE_EXTENSION = ".idx"
+BINARY_FILE_EXTENSION = ".bin"
+RECORD_QUEUE_SIZE = UTIL.WRITER.WRITE_QUEUE_SIZE
+RECORD_BLOCK_SIZE = 1048576
+RECORD_FLUSH_PERIOD = UTIL.WRITER.WRITE_FLUSH_PERIOD
+s_indexEntryStruct = struct.Struct(INDEX_ENTRY_FORMAT)
+
+###########
+# classes #
+###########
+# =============================================================================
+class FrameRecorder(UTIL.WRITER.BackgroundWriter):
+  """
+  Records TM frames in a background thread, the recording files are
+  rotated when they exceed maxBytes or when the ERT of a frame is
+  filePeriod seconds after the first frame of the file (0 = no rotation)
+  """
+  # ---------------------------------------------------------------------------
+  def __init__(self,
+               fileName,
+               recordFormat,
+               nctrsTMfields=None,
+               maxBytes=0,
+               filePeriod=0,
+               queueSize=RECORD_QUEUE_SIZE,
+               blockSize=RECORD_BLOCK_SIZE,
+               flushPeriod=RECORD_FLUSH_PERIOD):
+    """opens the first recording file, raises Error on a wrong format"""
+    if recordFormat not in BINARY_FORMATS:
+      raise Error("invalid FRAME_RECORD_FORMAT: " + recordFormat)
+    self.fileName = fileName
+    self.recordFormat = recordFormat
+    self.binaryFormat = BINARY_FORMATS[recordFormat]
+    self.maxBytes = maxBytes
+    self.filePeriod = filePeriod
+    self.blockSize = blockSize
+    # prebuilt data unit header, only the size and the ERT are changed
+    if self.binaryFormat == "NCTRS":
+      self.headerDu = GRND.NCTRS.createTMdataUnit()
+      self.headerDu.spacecraftId = nctrsTMfields.spacecraftId
+      self.headerDu.dataStreamType = nctrsTMfields.dataStreamType
+      self.headerDu.virtualChannelId = nctrsTMfields.virtualChannelId
+      self.headerDu.routeId = nctrsTMfields.routeId
+      self.headerDu.sequenceFlag = nctrsTMfields.sequenceFlag
+      self.headerDu.qualityFlag = nctrsTMfields.qualityFlag
+    else:
+      self.headerDu = GRND.CRYOSATDU.TMframeDataUnit()
+      self.headerDu.numberCorrSymbols = 0
+      self.headerDu.rsErorFlag = 0
+      self.headerDu.spare = 0
+      self.headerDu.padding = 0
+    self.headerByteSize = len(self.headerDu)
+    self.frameByteSize = None
+    self.block = bytearray()
+    self.indexBlock = bytearray()
+    self.fileNr = 0
+    self.recordedFiles = []
+    self.openFile()
+    UTIL.WRITER.BackgroundWriter.__init__(self, queueSize, flushPeriod)
+  # ---------------------------------------------------------------------------
+  def pushFrame(self, frame, ertUTC):
+    """passes a copy of the frame to the writer thread"""
+    self.putItem((bytes(frame), ertUTC))
+  # ---------------------------------------------------------------------------
+  def writeItem(self, item):
+    """records a queued frame"""
+    self.recordFrame(*item)
+    return False
+  # ---------------------------------------------------------------------------
+  def isFlushNeeded(self):
+    """the block is written when it exceeds the block size"""
+    return len(self.block) >= self.blockSize
+  # ---------------------------------------------------------------------------
+  def closeOutput(self):
+    """closes (and renders) the actual file when the thread terminates"""
+    self.closeFile()
+  # ---------------------------------------------------------------------------
+  def writeError(self, action, ex):
+    """the recording must not terminate the writer thread"""
+    LOG_ERROR("cannot " + action + " frame recording file: " + str(ex), "GRND")
+  # ---------------------------------------------------------------------------
+  def recordFrame(self, frame, ertUTC):
+    """adds header and frame to the block, rotates the file on demand"""
+    recordSize = self.headerByteSize + len(frame)
+    if self.fileStartERT == None:
+      self.fileStartERT = ertUTC
+    elif (self.maxBytes > 0 and self.fileSize + recordSize > self.maxBytes) or \
+         (self.filePeriod > 0 and ertUTC - self.fileStartERT >= self.filePeriod):
+      self.closeFile()
+      self.fileNr += 1
+      self.openFile()
+      self.fileStartERT = ertUTC
+    ertTime = UTIL.TCO.correlateToERTmissionEpoch(ertUTC)
+    headerDu = self.headerDu
+    if self.binaryFormat == "NCTRS":
+      if len(frame) != self.frameByteSize:
+        headerDu.packetSize = recordSize
+        self.frameByteSize = len(frame)
+      headerDu.earthReceptionTime = ertTime
+    else:
+      coarseTime = int(ertTime)
+      headerDu.downlinkTimeSec = coarseTime
+      headerDu.downlinkTimeMicro = int((ertTime - coarseTime) * 1000000)
+    self.indexBlock += s_indexEntryStruct.pack(ertUTC, self.fileSize)
+    self.block += headerDu.getBuffer()
+    self.block += frame
+    self.fileSize += recordSize
+  # ---------------------------------------------------------------------------
+  def openFile(self):
+    """opens the next binary recording file and its index file"""
+    binaryFileName = getFileName(self.fileName, self.fileNr)
+    if self.binaryFormat != self.recordFormat:
+      # ASCII format, the binary file is rendered when it is completed
+      binaryFileName += BINARY_FILE_EXTENSION
+    self.binaryFileName = binaryFileName
+    self.binaryFile = open(binaryFileName, "wb")
+    self.indexFile = open(binaryFileName + INDEX_FILE_EXTENSION, "wb")
+    self.fileSize = 0
+    self.fileStartERT = None
+  # ---------------------------------------------------------------------------
+  def closeFile(self):
+    """writes the block, closes the actual file and renders it on demand"""
+    self.flush()
+    self.binaryFile.close()
+    self.indexFile.close()
+    if self.binaryFormat != self.recordFormat:
+      renderFrameFile(self.binaryFileName,
+                      getFileName(self.fileName, self.fileNr),
+                      self.recordFormat)
+    self.recordedFiles.append(self.binaryFileName)
+  # ---------------------------------------------------------------------------
+  def flush(self):
+    """writes the block before the related index entries"""
+    if len(self.block) > 0:
+      self.binaryFile.write(self.block)
+      self.binaryFile.flush()
+      self.block = bytearray()
+    if len(self.indexBlock) > 0:
+      self.indexFile.write(self.indexBlock)
+      self.indexFile.flush()
+      self.indexBlock = bytearray()
+
+#############
+# functions #
+#############
+# -----------------------------------------------------------------------------
+def getFileName(fileName, fileNr):
+  """name of the fileNr-th recording file"""
+  if fileNr == 0:
+    return fileName
+  return fileName + "." + str(fileNr)
+# -----------------------------------------------------------------------------
+def readIndex(binaryFileName):
+  """returns the (ERT, offset) entries of a recording file"""
+  try:
+    indexFile = open(binaryFileName + INDEX_FILE_EXTENSION, "rb")
+  except:
+    raise Error("cannot read " + binaryFileName + INDEX_FILE_EXTENSION)
+  indexData = indexFile.read()
+  indexFile.close()
+  indexSize = len(indexData) - (len(indexData) % INDEX_ENTRY_BYTE_SIZE)
+  return list(s_indexEntryStruct.iter_unpack(indexData[:indexSize]))
+# -----------------------------------------------------------------------------
+def findFrameIndex(indexEntries, ertUTC):
+  """index of the first frame with ERT >= ertUTC (ERT sorted entries)"""
+  return bisect.bisect_left(indexEntries, (ertUTC, 0))
+# -----------------------------------------------------------------------------
+def renderFrameFile(binaryFileName, asciiFileName, recordFormat):
+  """renders a binary recording file in an ASCII record format"""
+  binaryFormat = BINARY_FORMATS[recordFormat]
+  details = recordFormat.endswith("_DETAILS")
+  indexEntries = readIndex(binaryFileName)
+  binaryFile = open(binaryFileName, "rb")
+  binaryData = binaryFile.read()
+  binaryFile.close()
+  asciiFile = open(asciiFileName, "w")
+  try:
+    for i, (ertUTC, offset) in enumerate(indexEntries):
+      if i + 1 < len(indexEntries):
+        nextOffset = indexEntries[i + 1][1]
+      else:
+        nextOffset = len(binaryData)
+      record = binaryData[offset:nextOffset]
+      if binaryFormat == "NCTRS":
+        tmDu = GRND.NCTRS.createTMdataUnit(record)
+      else:
+        tmDu = GRND.CRYOSATDU.TMframeDataUnit(record)
+      asciiFile.write(renderDataUnit(tmDu, recordFormat, binaryFormat, details))
+  finally:
+    asciiFile.close()
+# -----------------------------------------------------------------------------
+def renderDataUnit(tmDu, recordFormat, binaryFormat, details):
+  """ASCII representation of a recorded data unit"""
+  lines = ["\n" + recordFormat + " Frame Header:"]
+  if details:
+    if binaryFormat == "NCTRS":
+      lines.append("\ntmDu.packetSize = " + str(tmDu.packetSize))
+      lines.append("\ntmDu.spacecraftId = " + str(tmDu.spacecraftId))
+      lines.append("\ntmDu.dataStreamType = " + str(tmDu.dataStreamType))
+      lines.append("\ntmDu.virtualChannelId = " + str(tmDu.virtualChannelId))
+      lines.append("\ntmDu.routeId = " + str(tmDu.routeId))
+      ertTimeStr = UTIL.TIME.getASDtimeStr(tmDu.earthReceptionTime)
+      lines.append("\ntmDu.earthReceptionTime = " + ertTimeStr)
+      lines.append("\ntmDu.sequenceFlag = " + str(tmDu.sequenceFlag))
+      lines.append("\ntmDu.qualityFlag = " + str(tmDu.qualityFlag))
+    else:
+      lines.append("\ntmDu.downlinkTimeSec = " + str(tmDu.downlinkTimeSec))
+      lines.append("\ntmDu.downlinkTimeMicro = " + str(tmDu.downlinkTimeMicro))
+      lines.append("\ntmDu.numberCorrSymbols = " + str(tmDu.numberCorrSymbols))
+      lines.append("\ntmDu.rsErorFlag = " + str(tmDu.rsErorFlag))
+  lines.append(UTIL.DU.array2str(tmDu.getBufferHeader()))
+  lines.append("\n" + recordFormat + " Frame Body:")
+  if details:
+    frame = tmDu.getFrame()
+    tmFrameDu = CCSDS.FRAME.TMframe(frame)
+    if tmFrameDu.secondaryHeaderFlag:
+      tmFrameDu = CCSDS.FRAME.TMframe(frame, enableSecondaryHeader=True)
+    lines.append("\ntmFrameDu.versionNumber = " + str(tmFrameDu.versionNumber))
+    lines.append("\ntmFrameDu.spacecraftId = " + str(tmFrameDu.spacecraftId))
+    lines.append("\ntmFrameDu.virtualChannelId = " + str(tmFrameDu.virtualChannelId))
+    lines.append("\ntmFrameDu.operationalControlField = " + str(tmFrameDu.operationalControlField))
+    lines.append("\ntmFrameDu.masterChannelFrameCount = " + str(tmFrameDu.masterChannelFrameCount))
+    lines.append("\ntmFrameDu.virtualChannelFCountLow = " + str(tmFrameDu.virtualChannelFCountLow))
+    lines.append("\ntmFrameDu.secondaryHeaderFlag = " + str(tmFrameDu.secondaryHeaderFlag))
+    lines.append("\ntmFrameDu.synchronisationFlag = " + str(tmFrameDu.synchronisationFlag))
+    lines.append("\ntmFrameDu.packetOrderFlag = " + str(tmFrameDu.packetOrderFlag))
+    lines.append("\ntmFrameDu.segmentLengthId = " + str(tmFrameDu.segmentLengthId))
+    lines.append("\ntmFrameDu.firstHeaderPointer = " + str(tmFrameDu.firstHeaderPointer))
+    if tmFrameDu.secondaryHeaderFlag:
+      lines.append("\ntmFrameDu.secondaryHeaderVersionNr = " + str(tmFrameDu.secondaryHeaderVersionNr))
+      lines.append("\ntmFrameDu.secondaryHeaderSize = " + str(tmFrameDu.secondaryHeaderSize))
+      lines.append("\ntmFrameDu.virtualChannelFCountHigh = " + str(tmFrameDu.virtualChannelFCountHigh))
+  lines.append(UTIL.DU.array2str(tmDu.getBufferBody()))
+  lines.append("\n")
+  return "".join(lines)
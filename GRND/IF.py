@@ -66,6 +66,7 @@ class Configuration(object):
     self.grndAck1 = ENABLE_ACK
     self.grndAck2 = ENABLE_ACK
     self.frameRecordFile = None
+    self.frameRecorder = None
     self.frameRecordFormat = UTIL.SYS.s_configuration.TM_RECORD_FORMAT
   # ---------------------------------------------------------------------------
   def dump(self):
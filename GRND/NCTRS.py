@@ -39,6 +39,7 @@ class TMreceiver(UTIL.TCP.Client):
     """Initialise attributes only"""
     modelTask = UTIL.TASK.s_processingTask
     UTIL.TCP.Client.__init__(self, modelTask)
+    self.dataUnitDecoder = createTMdataUnitDecoder()
   # ---------------------------------------------------------------------------
   def recvError(self, errorMessage):
     """
@@ -60,18 +61,11 @@ class TMreceiver(UTIL.TCP.Client):
   # ---------------------------------------------------------------------------
   def receiveCallback(self, socket, stateMask):
     """Callback when NCTRS has send data"""
-    # read the TM data unit
-    try:
-      # note: automatic failure handling of derived method
-      #       UTIL.TCP.Client.recvError() cannot be used here,
-      #       because the derived method UTIL.TCP.Client.recv()
-      #       cannot be used by readNCTRSframe()
-      tmDu = readNCTRSframe(self.dataSocket)
-    except Exception as ex:
-      # explicit failure handling
-      self.recvError(str(ex))
-      return
-    self.notifyTMdataUnit(tmDu)
+    self.dispatchDataUnits(self.receiveTMdataUnit)
+  # ---------------------------------------------------------------------------
+  def receiveTMdataUnit(self, tmDuData):
+    """a complete TM data unit is received"""
+    self.notifyTMdataUnit(createTMdataUnit(tmDuData))
   # ---------------------------------------------------------------------------
   def notifyTMdataUnit(self, tmDu):
     """TM frame received: hook for derived classes"""
@@ -139,6 +133,7 @@ class TCreceiver(UTIL.TCP.SingleClientServer):
     modelTask = UTIL.TASK.s_processingTask
     UTIL.TCP.SingleClientServer.__init__(self, modelTask, portNr)
     self.groundstationId = groundstationId
+    self.dataUnitDecoder = createTCdataUnitDecoder()
   # ---------------------------------------------------------------------------
   def sendTcDataUnit(self, tcDu):
     """Send the TC data unit to the TC sender"""
@@ -149,36 +144,13 @@ class TCreceiver(UTIL.TCP.SingleClientServer):
   # ---------------------------------------------------------------------------
   def receiveCallback(self, socket, stateMask):
     """Callback when the MCS has send data"""
-    # read the TC data unit header
-    tcDuHeader = self.recv(GRND.NCTRSDU.TC_DU_HEADER_BYTE_SIZE)
-    if tcDuHeader == None:
-      # failure handling was done automatically by derived logic
-      return
-    # consistency check
-    tcDuHeaderLen = len(tcDuHeader)
-    if tcDuHeaderLen != GRND.NCTRSDU.TC_DU_HEADER_BYTE_SIZE:
-      LOG_ERROR("Read of TC DU header failed: invalid size: " + str(tcDuHeaderLen))
-      self.disconnectClient()
-      return
+    self.dispatchDataUnits(self.receiveTCdataUnit)
+  # ---------------------------------------------------------------------------
+  def receiveTCdataUnit(self, tcDuData):
+    """a complete TC data unit is received"""
+    tcDuHeader = tcDuData[:GRND.NCTRSDU.TC_DU_HEADER_BYTE_SIZE]
+    tcRemaining = tcDuData[GRND.NCTRSDU.TC_DU_HEADER_BYTE_SIZE:]
     tcDu = GRND.NCTRSDU.TCdataUnit(tcDuHeader)
-    # consistency check
-    packetSize = tcDu.packetSize
-    remainingSizeExpected = packetSize - GRND.NCTRSDU.TC_DU_HEADER_BYTE_SIZE
-    if remainingSizeExpected <= 0:
-      LOG_ERROR("Read of TC DU header failed: invalid packet size field: " + str(remainingSizeExpected))
-      self.disconnectClient()
-      return
-    # read the remaining bytes for the TC data unit
-    tcRemaining = self.recv(remainingSizeExpected)
-    if tcRemaining == None:
-      # failure handling was done automatically by derived logic
-      return
-    # consistency check
-    remainingSizeRead = len(tcRemaining)
-    if remainingSizeRead != remainingSizeExpected:
-      LOG_ERROR("Read of remaining TC DU failed: invalid remaining size: " + str(remainingSizeRead))
-      self.disconnectClient()
-      return
     dataUnitType = tcDu.dataUnitType
     try:
       if dataUnitType == GRND.NCTRSDU.TC_PACKET_HEADER_DU_TYPE:
@@ -309,6 +281,7 @@ class TCsender(UTIL.TCP.Client):
     """Initialise attributes only"""
     modelTask = UTIL.TASK.s_processingTask
     UTIL.TCP.Client.__init__(self, modelTask)
+    self.dataUnitDecoder = createTCdataUnitDecoder()
   # ---------------------------------------------------------------------------
   def recvError(self, errorMessage):
     """
@@ -349,36 +322,13 @@ class TCsender(UTIL.TCP.Client):
   # ---------------------------------------------------------------------------
   def receiveCallback(self, socket, stateMask):
     """Callback when NCTRS has send data"""
-    # read the TC data unit header
-    tcDuHeader = self.recv(GRND.NCTRSDU.TC_DU_HEADER_BYTE_SIZE)
-    if tcDuHeader == None:
-      # failure handling was done automatically by derived logic
-      return
-    # consistency check
-    tcDuHeaderLen = len(tcDuHeader)
-    if tcDuHeaderLen != GRND.NCTRSDU.TC_DU_HEADER_BYTE_SIZE:
-      LOG_ERROR("Read of TC DU header failed: invalid size: " + str(tcDuHeaderLen), "NCTRS")
-      self.disconnectFromServer()
-      return
+    self.dispatchDataUnits(self.receiveTCdataUnit)
+  # ---------------------------------------------------------------------------
+  def receiveTCdataUnit(self, tcDuData):
+    """a complete TC data unit is received"""
+    tcDuHeader = tcDuData[:GRND.NCTRSDU.TC_DU_HEADER_BYTE_SIZE]
+    tcRemaining = tcDuData[GRND.NCTRSDU.TC_DU_HEADER_BYTE_SIZE:]
     tcDu = GRND.NCTRSDU.TCdataUnit(tcDuHeader)
-    # consistency check
-    packetSize = tcDu.packetSize
-    remainingSizeExpected = packetSize - GRND.NCTRSDU.TC_DU_HEADER_BYTE_SIZE
-    if remainingSizeExpected <= 0:
-      LOG_ERROR("Read of TC DU header failed: invalid packet size field: " + str(remainingSizeExpected), "NCTRS")
-      self.disconnectFromServer()
-      return
-    # read the remaining bytes for the TC data unit
-    tcRemaining = self.recv(remainingSizeExpected)
-    if tcRemaining == None:
-      # failure handling was done automatically by derived logic
-      return
-    # consistency check
-    remainingSizeRead = len(tcRemaining)
-    if remainingSizeRead != remainingSizeExpected:
-      LOG_ERROR("Read of remaining TC DU failed: invalid remaining size: " + str(remainingSizeRead), "NCTRS")
-      self.disconnectFromServer()
-      return
     dataUnitType = tcDu.dataUnitType
     if dataUnitType == GRND.NCTRSDU.TC_PACKET_RESPONSE_DU_TYPE:
       # AD packet / BD segment response
@@ -462,6 +412,10 @@ class AdminMessageReceiver(UTIL.TCP.Client):
     """Initialise attributes only"""
     modelTask = UTIL.TASK.s_processingTask
     UTIL.TCP.Client.__init__(self, modelTask)
+    self.dataUnitDecoder = UTIL.TCP.DataUnitDecoder(
+      GRND.NCTRSDU.MESSAGE_HEADER_BYTE_SIZE,
+      GRND.NCTRSDU.MESSAGE_HEADER_ATTRIBUTES["packetSize"],
+      minDataUnitSize=GRND.NCTRSDU.MESSAGE_HEADER_BYTE_SIZE + 1)
   # ---------------------------------------------------------------------------
   def recvError(self, errorMessage):
     """
@@ -483,36 +437,13 @@ class AdminMessageReceiver(UTIL.TCP.Client):
   # ---------------------------------------------------------------------------
   def receiveCallback(self, socket, stateMask):
     """Callback when NCTRS has send data"""
-    # read the admin message unit header
-    messageHeader = self.recv(GRND.NCTRSDU.MESSAGE_HEADER_BYTE_SIZE)
-    if messageHeader == None:
-      # failure handling was done automatically by derived logic
-      return
-    # consistency check
-    messageHeaderLen = len(messageHeader)
-    if messageHeaderLen != GRND.NCTRSDU.MESSAGE_HEADER_BYTE_SIZE:
-      LOG_ERROR("Read of admin message DU header failed: invalid size: " + str(messageHeaderLen), "NCTRS")
-      self.disconnectFromServer()
-      return
+    self.dispatchDataUnits(self.receiveAdminMessageDataUnit)
+  # ---------------------------------------------------------------------------
+  def receiveAdminMessageDataUnit(self, messageDuData):
+    """a complete admin message data unit is received"""
+    messageHeader = messageDuData[:GRND.NCTRSDU.MESSAGE_HEADER_BYTE_SIZE]
+    messageRemaining = messageDuData[GRND.NCTRSDU.MESSAGE_HEADER_BYTE_SIZE:]
     messageDu = GRND.NCTRSDU.AdminMessageDataUnit(messageHeader)
-    # consistency check
-    packetSize = messageDu.packetSize
-    remainingSizeExpected = packetSize - GRND.NCTRSDU.MESSAGE_HEADER_BYTE_SIZE
-    if remainingSizeExpected <= 0:
-      LOG_ERROR("Read of admin message DU header failed: invalid packet size field: " + str(remainingSizeExpected), "NCTRS")
-      self.disconnectFromServer()
-      return
-    # read the remaining bytes for the TC data unit
-    messageRemaining = self.recv(remainingSizeExpected)
-    if messageRemaining == None:
-      # failure handling was done automatically by derived logic
-      return
-    # consistency check
-    remainingSizeRead = len(messageRemaining)
-    if remainingSizeRead != remainingSizeExpected:
-      LOG_ERROR("Read of remaining admin message DU failed: invalid remaining size: " + str(remainingSizeRead), "NCTRS")
-      self.disconnectFromServer()
-      return
     # set the message
     messageDu.setMessage(messageRemaining)
     self.notifyAdminMessageDataUnit(messageDu)
@@ -558,20 +489,39 @@ def createTMdataUnit(binaryString=None):
   LOG_ERROR("Invalid s_tmDUtype " + str(s_tmDUtype), "NCTRS")
   sys.exit(-1)
 # -----------------------------------------------------------------------------
-def readNCTRStmFrameHeader(fd):
-  """creates a NCTRS TM data unit according to the NCTRS_TM_DU_VERSION"""
-  # the function raises an exception when the read fails
+def getTMdataUnitHeaderByteSize():
+  """returns the NCTRS TM data unit header size for NCTRS_TM_DU_VERSION"""
   tmDUtype = getTMdataUnitType()
   if s_tmDUtype == GRND.NCTRSDU.TM_V0_ERT_FORMAT:
-    tmDuHeaderByteSize =  GRND.NCTRSDU.TM_DU_V0_HEADER_BYTE_SIZE
+    return GRND.NCTRSDU.TM_DU_V0_HEADER_BYTE_SIZE
   elif s_tmDUtype == GRND.NCTRSDU.TM_V1_CDS1_ERT_FORMAT:
-    tmDuHeaderByteSize =  GRND.NCTRSDU.TM_DU_V1_CDS1_HEADER_BYTE_SIZE
+    return GRND.NCTRSDU.TM_DU_V1_CDS1_HEADER_BYTE_SIZE
   elif s_tmDUtype == GRND.NCTRSDU.TM_V1_CDS2_ERT_FORMAT:
-    tmDuHeaderByteSize =  GRND.NCTRSDU.TM_DU_V1_CDS2_HEADER_BYTE_SIZE
+    return GRND.NCTRSDU.TM_DU_V1_CDS2_HEADER_BYTE_SIZE
   elif s_tmDUtype == GRND.NCTRSDU.TM_V1_CDS3_ERT_FORMAT:
-    tmDuHeaderByteSize =  GRND.NCTRSDU.TM_DU_V1_CDS3_HEADER_BYTE_SIZE
-  else:
-    raise Error("Invalid s_tmDUtype " + str(s_tmDUtype))
+    return GRND.NCTRSDU.TM_DU_V1_CDS3_HEADER_BYTE_SIZE
+  raise Error("Invalid s_tmDUtype " + str(s_tmDUtype))
+# -----------------------------------------------------------------------------
+def createTMdataUnitDecoder():
+  """creates a stream decoder for NCTRS TM data units"""
+  tmDuHeaderByteSize = getTMdataUnitHeaderByteSize()
+  # the position of the packetSize field depends on NCTRS_TM_DU_VERSION
+  packetSizeAttribute = createTMdataUnit().attributeMap1["packetSize"]
+  return UTIL.TCP.DataUnitDecoder(tmDuHeaderByteSize,
+                                  packetSizeAttribute,
+                                  minDataUnitSize=tmDuHeaderByteSize + 1)
+# -----------------------------------------------------------------------------
+def createTCdataUnitDecoder():
+  """creates a stream decoder for NCTRS TC data units"""
+  tcDuHeaderByteSize = GRND.NCTRSDU.TC_DU_HEADER_BYTE_SIZE
+  return UTIL.TCP.DataUnitDecoder(tcDuHeaderByteSize,
+                                  GRND.NCTRSDU.TC_DU_HEADER_ATTRIBUTES["packetSize"],
+                                  minDataUnitSize=tcDuHeaderByteSize + 1)
+# -----------------------------------------------------------------------------
+def readNCTRStmFrameHeader(fd):
+  """creates a NCTRS TM data unit according to the NCTRS_TM_DU_VERSION"""
+  # the function raises an exception when the read fails
+  tmDuHeaderByteSize = getTMdataUnitHeaderByteSize()
   # read the TM data unit header
   if type(fd) == SOCKET_TYPE:
     tmDuHeader = fd.recv(tmDuHeaderByteSize)
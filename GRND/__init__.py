@@ -12,4 +12,4 @@
 #******************************************************************************
 # Ground Simulation                                                           *
 #******************************************************************************
-__all__ = ["IF", "CRYOSATDU", "NCTRS", "NCTRSDU", "NCTRSDUhelpers"]
+__all__ = ["IF", "CRYOSATDU", "FRAMEREC", "NCTRS", "NCTRSDU", "NCTRSDUhelpers"]
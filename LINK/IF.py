@@ -50,6 +50,10 @@ class SpaceLink(object):
   def pushTCcltu(self, cltu):
     """consumes a command link transfer unit"""
     pass
+  # ---------------------------------------------------------------------------
+  def pushTCcltus(self, cltus):
+    """consumes a list of command link transfer units"""
+    pass
 
 # =============================================================================
 class GroundLink(object):
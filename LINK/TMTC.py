@@ -14,7 +14,7 @@
 #******************************************************************************
 import array
 from UTIL.SYS import Error, LOG, LOG_INFO, LOG_WARNING, LOG_ERROR
-import CCSDS.ASSEMBLER, CCSDS.CLTU, CCSDS.FRAME, CCSDS.PACKET, CCSDS.SEGMENT, CCSDS.SEGMENThelpers
+import CCSDS.ASSEMBLER, CCSDS.CLTU, CCSDS.FRAME, CCSDS.MULTIPLEXER, CCSDS.PACKET, CCSDS.SEGMENT, CCSDS.SEGMENThelpers
 import GRND.IF
 import LINK.IF
 import SPACE.IF
@@ -26,10 +26,28 @@ import UTIL.SYS, UTIL.TASK, UTIL.TIME
 CHECK_CYCLIC_PERIOD_MS = 100
 UPLINK_DELAY_SEC = 2
 DOWNLINK_DELAY_SEC = 2
+# distance of frames with the same reception time in the link queues
+QUEUE_TIME_RESOLUTION_SEC = 0.000001
 
 ###########
 # classes #
 ###########
+# =============================================================================
+class TMmultiplexer(CCSDS.MULTIPLEXER.Multiplexer):
+  """Multiplexer for several virtual channels in the downlink"""
+  # ---------------------------------------------------------------------------
+  def __init__(self, groundSpace, scheduling):
+    """Initialise parent class and attributes"""
+    CCSDS.MULTIPLEXER.Multiplexer.__init__(self, scheduling)
+    self.groundSpace = groundSpace
+  # ---------------------------------------------------------------------------
+  def notifyTMframeCallback(self, tmFrameDu):
+    """
+    notifies when the next TM frame is emitted:
+    implementation of CCSDS.MULTIPLEXER.Multiplexer.notifyTMframeCallback
+    """
+    self.groundSpace.notifyTMframeCallback(tmFrameDu)
+
 # =============================================================================
 class CCSDSgroundSpace(CCSDS.ASSEMBLER.Assembler, LINK.IF.SpaceLink, LINK.IF.GroundLink):
   """
@@ -39,12 +57,16 @@ class CCSDSgroundSpace(CCSDS.ASSEMBLER.Assembler, LINK.IF.SpaceLink, LINK.IF.Gro
   # ---------------------------------------------------------------------------
   def __init__(self):
     """Initialise parent class and attributes"""
-    CCSDS.ASSEMBLER.Assembler.__init__(self)
+    self.multiplexer = None
+    CCSDS.ASSEMBLER.Assembler.__init__(self, useFrameTemplate=True)
     self.segmentDus = []
     self.uplinkQueue = {}
     self.downlinkQueue = {}
     self.ertUTC = None
     self.tmFrameFlowMs = int(UTIL.SYS.s_configuration.TM_FRAME_FLOW_MS)
+    self.multiplexer = createTMmultiplexer(self)
+    if self.multiplexer != None:
+      self.multiplexer.setCLCW(self.clcw)
     self.checkTMflowCallback()
     self.checkCyclicCallback()
   # ---------------------------------------------------------------------------
@@ -67,27 +89,41 @@ class CCSDSgroundSpace(CCSDS.ASSEMBLER.Assembler, LINK.IF.SpaceLink, LINK.IF.Gro
     consumes a command link transfer unit:
     implementation of LINK.IF.SpaceLink.pushTCcltu
     """
-    # extract the frame from the CLTU
-    frame = CCSDS.CLTU.decodeCltu(cltu)
-    if frame == None:
-      LOG_ERROR("CLTU decoding failed", "LINK")
-      return
-    tcFrameDu = CCSDS.FRAME.TCframe(frame)
-    # remove the fill bytes from the end of the frame
-    frameLength = tcFrameDu.frameLength + 1
-    if frameLength > len(tcFrameDu):
-      LOG_ERROR("invalid TC frame length", "LINK")
-      return
-    tcFrameDu.setLen(frameLength)
-    # check the frame
-    if CCSDS.FRAME.CRC_CHECK:
-      if not tcFrameDu.checkChecksum():
-        LOG_ERROR("invalid TC frame CRC", "LINK")
-        return
-    # put the TC frame into the uplink queue to simulate the uplink delay
-    receptionTime = UTIL.TIME.getActualTime() + UPLINK_DELAY_SEC
-    self.uplinkQueue[receptionTime] = tcFrameDu
-    UTIL.TASK.s_processingTask.notifyGUItask("TC_FRAME")
+    self.pushTCcltus([cltu])
+  # ---------------------------------------------------------------------------
+  def pushTCcltus(self, cltus):
+    """
+    consumes a list of command link transfer units:
+    implementation of LINK.IF.SpaceLink.pushTCcltus
+    """
+    # extract the frames from the CLTUs in one step
+    frames = CCSDS.CLTU.decodeCltus(cltus)
+    frameReceived = False
+    for frame in frames:
+      if frame == None:
+        LOG_ERROR("CLTU decoding failed", "LINK")
+        continue
+      tcFrameDu = CCSDS.FRAME.TCframe(frame)
+      # remove the fill bytes from the end of the frame
+      frameLength = tcFrameDu.frameLength + 1
+      if frameLength > len(tcFrameDu):
+        LOG_ERROR("invalid TC frame length", "LINK")
+        continue
+      tcFrameDu.setLen(frameLength)
+      # check the frame
+      if CCSDS.FRAME.CRC_CHECK:
+        if not tcFrameDu.checkChecksum():
+          LOG_ERROR("invalid TC frame CRC", "LINK")
+          continue
+      # put the TC frame into the uplink queue to simulate the uplink delay
+      receptionTime = UTIL.TIME.getActualTime() + UPLINK_DELAY_SEC
+      # frames of the same batch must not replace each other
+      while receptionTime in self.uplinkQueue:
+        receptionTime += QUEUE_TIME_RESOLUTION_SEC
+      self.uplinkQueue[receptionTime] = tcFrameDu
+      frameReceived = True
+    if frameReceived:
+      UTIL.TASK.s_processingTask.notifyGUItask("TC_FRAME")
   # ---------------------------------------------------------------------------
   def pushTMpacketAndERT(self, tmPacketDu, ertUTC):
     """
@@ -95,8 +131,22 @@ class CCSDSgroundSpace(CCSDS.ASSEMBLER.Assembler, LINK.IF.SpaceLink, LINK.IF.Gro
     implementation of LINK.IF.GroundLink.pushTMpacketAndERT
     """
     self.ertUTC = ertUTC
+    if self.multiplexer != None:
+      self.multiplexer.pushTMpacket(tmPacketDu.getBuffer())
+      self.multiplexer.emitReadyTMframes()
+      return
     CCSDS.ASSEMBLER.Assembler.pushTMpacket(self, tmPacketDu.getBuffer())
   # ---------------------------------------------------------------------------
+  def initCLCW(self, clcwDefaults):
+    """
+    initialise CLCW
+    implementation of LINK.IF.GroundLink.initCLCW
+    """
+    CCSDS.ASSEMBLER.Assembler.initCLCW(self, clcwDefaults)
+    # the virtual channels of the multiplexer share the same CLCW
+    if self.multiplexer != None:
+      self.multiplexer.setCLCW(self.clcw)
+  # ---------------------------------------------------------------------------
   def notifyTMframeCallback(self, tmFrameDu):
     """
     notifies when the next TM frame is assembled:
@@ -104,6 +154,9 @@ class CCSDSgroundSpace(CCSDS.ASSEMBLER.Assembler, LINK.IF.SpaceLink, LINK.IF.Gro
     """
     # put the TM frame into the downlink queue to simulate the downlink delay
     receptionTime = UTIL.TIME.getActualTime() + DOWNLINK_DELAY_SEC
+    # frames that are emitted together must not replace each other
+    while receptionTime in self.downlinkQueue:
+      receptionTime += QUEUE_TIME_RESOLUTION_SEC
     self.downlinkQueue[receptionTime] = (tmFrameDu, self.ertUTC)
     UTIL.TASK.s_processingTask.notifyGUItask("TM_FRAME")
   # ---------------------------------------------------------------------------
@@ -114,7 +167,10 @@ class CCSDSgroundSpace(CCSDS.ASSEMBLER.Assembler, LINK.IF.SpaceLink, LINK.IF.Gro
     UTIL.TASK.s_processingTask.createTimeHandler(self.tmFrameFlowMs,
                                                  self.checkTMflowCallback)
     if LINK.IF.s_configuration.enableTMflow:
-      self.flushTMframeOrIdleFrame()
+      if self.multiplexer != None:
+        self.multiplexer.flushTMframeOrIdleFrame()
+      else:
+        self.flushTMframeOrIdleFrame()
   # ---------------------------------------------------------------------------
   def checkCyclicCallback(self):
     """
@@ -237,6 +293,29 @@ class CCSDSgroundSpace(CCSDS.ASSEMBLER.Assembler, LINK.IF.SpaceLink, LINK.IF.Gro
 #############
 # functions #
 #############
+def createTMmultiplexer(groundSpace):
+  """
+  creates the multiplexer for the virtual channels in the configuration
+  TM_VIRTUAL_CHANNEL_APIDS = "<VCID>:<weight>:<APID>,<APID>,... ...",
+  returns None if only the virtual channel TM_VIRTUAL_CHANNEL_ID is used
+  """
+  virtualChannelApids = UTIL.SYS.s_configuration.TM_VIRTUAL_CHANNEL_APIDS.split()
+  if len(virtualChannelApids) == 0:
+    return None
+  scheduling = UTIL.SYS.s_configuration.TM_VIRTUAL_CHANNEL_SCHEDULING
+  multiplexer = TMmultiplexer(groundSpace, scheduling)
+  # the virtual channel from TM_VIRTUAL_CHANNEL_ID gets the other APIDs
+  defaultVirtualChannelId = int(UTIL.SYS.s_configuration.TM_VIRTUAL_CHANNEL_ID)
+  multiplexer.addVirtualChannel(defaultVirtualChannelId)
+  for virtualChannelEntry in virtualChannelApids:
+    try:
+      virtualChannelId, weight, apids = virtualChannelEntry.split(":")
+      apids = [int(apid) for apid in apids.split(",")]
+      multiplexer.addVirtualChannel(int(virtualChannelId), apids, int(weight))
+    except ValueError:
+      raise Error("invalid TM_VIRTUAL_CHANNEL_APIDS entry: " + virtualChannelEntry)
+  return multiplexer
+# -----------------------------------------------------------------------------
 def init():
   """initialise singleton(s)"""
   LINK.IF.s_groundLink = CCSDSgroundSpace()
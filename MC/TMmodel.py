@@ -13,6 +13,7 @@
 # Monitoring and Control (M&C) - Telemetry Model                              *
 #******************************************************************************
 from UTIL.SYS import Error, LOG, LOG_INFO, LOG_WARNING, LOG_ERROR
+import UTIL.SYS
 import CCSDS.PACKET
 import MC.IF
 import PUS.PACKET, PUS.SERVICES, PUS.VP
@@ -37,13 +38,13 @@ class TMmodel(MC.IF.TMmodel):
     """
     LOG_INFO("pushTMpacket", "TM")
     # other packet info
-    LOG("APID =    " + str(tmPacketDu.applicationProcessId), "TM")
-    LOG("SSC =     " + str(tmPacketDu.sequenceControlCount), "TM")
+    LOG("APID =    %s", "TM", tmPacketDu.applicationProcessId)
+    LOG("SSC =     %s", "TM", tmPacketDu.sequenceControlCount)
     if PUS.PACKET.isPUSpacketDU(tmPacketDu):
       # PUS packet
-      object.__setattr__(tmPacketDu, "attributeMap2", PUS.PACKET.TM_PACKET_DATAFIELD_HEADER_ATTRIBUTES)
-      LOG("TYPE =    " + str(tmPacketDu.serviceType), "TM")
-      LOG("SUBTYPE = " + str(tmPacketDu.serviceSubType), "TM")
+      tmPacketDu.setAttributeMap2(PUS.PACKET.TM_PACKET_DATAFIELD_HEADER_ATTRIBUTES)
+      LOG("TYPE =    %s", "TM", tmPacketDu.serviceType)
+      LOG("SUBTYPE = %s", "TM", tmPacketDu.serviceSubType)
       # the existence of a CRC for PUS packets is mission dependant
       # for SCOS-2000 compatibility we expect a CRC
       if not tmPacketDu.checkChecksum():
@@ -51,20 +52,28 @@ class TMmodel(MC.IF.TMmodel):
     else:
       # CCSDS packet
       LOG("non-PUS packet", "TM")
-      LOG("tmPacketDu = " + str(tmPacketDu), "TM")
+      LOG("tmPacketDu = %s", "TM", tmPacketDu)
     try:
       # try to decode the packet
       tmPacketKey = SUPP.IF.s_definitions.getTMpacketKey(tmPacketDu)
-      LOG("KEY =     " + str(tmPacketKey), "TM")
+      LOG("KEY =     %s", "TM", tmPacketKey)
       tmPktDef = SUPP.IF.s_definitions.getTMpktDefBySPID(tmPacketKey)
       if tmPktDef == None:
         LOG_WARNING("packet cannot be identified - don't decode it", "TM")
       else:
+        # extract all parameters in one pass with the precompiled plan
+        extractionPlan = tmPktDef.getExtractionPlan()
+        tmParamValues = extractionPlan.extractAll(tmPacketDu.getBuffer())
+        for tmParamExtraction, tmParamValue in zip(extractionPlan.paramExtractions, tmParamValues):
+          LOG("%s = %s", "TM", tmParamExtraction.name, tmParamValue)
         tmStructDef = tmPktDef.tmStructDef
         structBitPos = (CCSDS.PACKET.PRIMARY_HEADER_BYTE_SIZE + tmPktDef.pktDFHsize) << 3
         tmStruct = PUS.VP.Struct(tmStructDef)
-        tmStruct.decode(tmPacketDu, structBitPos)
-        LOG("tmStruct =" + str(tmStruct), "TM")
+        # list entries are decoded lazily, the complete struct is only
+        # decoded for the dump when TM is logged on LOG level
+        tmStruct.decode(tmPacketDu, structBitPos, lazy=True)
+        if UTIL.SYS.isLogEnabled(UTIL.SYS.LOG_LEVEL, "TM"):
+          LOG("tmStruct =%s", "TM", tmStruct)
     except Exception as ex:
       LOG_WARNING("packet cannot be decoded: " + str(ex), "TM")
     # processing of PUS telecommands
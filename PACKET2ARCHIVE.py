@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+#******************************************************************************
+# (C) 2020, Stefan Korner, Austria                                            *
+#                                                                             *
+# The Space Python Library is free software; you can redistribute it and/or   *
+# modify it under under the terms of the MIT License as published by the      *
+# Massachusetts Institute of Technology.                                      *
+#                                                                             *
+# The Space Python Library is distributed in the hope that it will be useful, *
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              *
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the MIT License    *
+# for more details.                                                           *
+#******************************************************************************
+# Converts TM packet dumps with hex raw packets (written by former versions   *
+# of SUPP.TMrecorder or by FRAME2PACKET) into a binary TM archive, which is   *
+# defined by SUPP.TMARCHIVE.                                                  *
+#                                                                             *
+# ERT lines are applied to the following packets, other replay statements     *
+# (e.g. sleep) are skipped.                                                   *
+#******************************************************************************
+# Command line: PACKET2ARCHIVE.py <packet file name> <archive directory>      *
+#******************************************************************************
+import sys
+from UTIL.SYS import Error, LOG, LOG_INFO, LOG_WARNING, LOG_ERROR
+import SUPP.TMARCHIVE
+import UTIL.SYS
+
+#############
+# constants #
+#############
+SYS_CONFIGURATION = [
+  ["SYS_COLOR_LOG", "1"]]
+
+#############
+# functions #
+#############
+def printUsage(launchScriptName):
+  """Prints the commandline options"""
+  print("")
+  print("usage:")
+  print("------")
+  print("")
+  print(launchScriptName + " <packet file name> <archive directory>")
+  print("")
+
+########
+# main #
+########
+# process command line
+if len(sys.argv) != 3:
+  print("error: invalid command line!")
+  launchScriptName = sys.argv[0]
+  printUsage(launchScriptName)
+  sys.exit(-1)
+packetFileName = sys.argv[1]
+archiveDir = sys.argv[2]
+# initialise the system configuration
+UTIL.SYS.s_configuration.setDefaults(SYS_CONFIGURATION)
+LOG("packetFileName = " + packetFileName)
+LOG("archiveDir = " + archiveDir)
+# do the conversion
+try:
+  packetsNr = SUPP.TMARCHIVE.convertReplayFile(packetFileName, archiveDir)
+except Error as ex:
+  LOG_ERROR(str(ex))
+  sys.exit(-1)
+LOG_INFO(str(packetsNr) + " packets converted")
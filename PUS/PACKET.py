@@ -137,4 +137,6 @@ def isPUSpacket(binaryString, startPos=0):
 def isPUSpacketDU(packetDU):
   """checks if a packet data-unit is a PUS packet"""
   packetType = type(packetDU)
+  # data units with compiled accessors are instances of a generated subclass
+  packetType = getattr(packetType, "compiledBaseClass", packetType)
   return packetType == TMpacket or packetType == TCpacket
@@ -21,11 +21,24 @@
 # Note: The packet information must be loaded from outside.                   *
 #       Separate instances for TM and TC packet identification are needed.    *
 #       The keys are implemented as tupples.                                  *
+#                                                                             *
+# The identification can also be performed on the raw packet bytes without a *
+# data unit: the results are memoised in a bounded LRU cache that is keyed on *
+# the identifying header fields (APID, TYPE, SUBTYPE, PI1, PI2).             *
 #******************************************************************************
+import collections
 from UTIL.SYS import Error, LOG, LOG_INFO, LOG_WARNING, LOG_ERROR
 import CCSDS.PACKET
 import PUS.PACKET
 
+#############
+# constants #
+#############
+DEFAULT_CACHE_SIZE = 4096
+# positions of the identifying fields in the packet header
+SERVICE_TYPE_BYTE_POS = CCSDS.PACKET.PRIMARY_HEADER_BYTE_SIZE + 1
+SERVICE_SUBTYPE_BYTE_POS = CCSDS.PACKET.PRIMARY_HEADER_BYTE_SIZE + 2
+
 ###########
 # classes #
 ###########
@@ -33,10 +46,33 @@ import PUS.PACKET
 class PacketIdentificator(object):
   """PUS packet identificator"""
   # ---------------------------------------------------------------------------
-  def __init__(self):
+  def __init__(self, cacheSize=DEFAULT_CACHE_SIZE):
     """default constructor"""
     self.keyFieldIDs = {}
     self.packetIDs = {}
+    self.cacheSize = cacheSize
+    self.resetCaches()
+  # ---------------------------------------------------------------------------
+  def __getstate__(self):
+    """the caches are not pickled, they are rebuilt on demand"""
+    state = self.__dict__.copy()
+    state["keyFieldCache"] = None
+    state["packetKeyCache"] = None
+    return state
+  # ---------------------------------------------------------------------------
+  def __setstate__(self, state):
+    """supports also pickled identificators without caches"""
+    self.__dict__.update(state)
+    if not "cacheSize" in state:
+      self.cacheSize = DEFAULT_CACHE_SIZE
+    self.resetCaches()
+  # ---------------------------------------------------------------------------
+  def resetCaches(self):
+    """invalidates the memoised identification results"""
+    # (apid, serviceType, serviceSubType) --> PI1/PI2 extraction or None
+    self.keyFieldCache = {}
+    # (apid, serviceType, serviceSubType, pi1, pi2) --> packet key
+    self.packetKeyCache = collections.OrderedDict()
   # ---------------------------------------------------------------------------
   def addKeyFieldRecord(self,
                         apid, serviceType, serviceSubType,
@@ -59,6 +95,7 @@ class PacketIdentificator(object):
         raise Error("key " + str(key) + " is already defined in key field ID map")
     else:
       self.keyFieldIDs[key] = value
+      self.resetCaches()
   # ---------------------------------------------------------------------------
   def addPacketIDrecord(self,
                         apid, serviceType, serviceSubType, pi1, pi2,
@@ -71,39 +108,112 @@ class PacketIdentificator(object):
       raise Error("key " + str(key) + " is already defined in packet ID map")
     value = packetID
     self.packetIDs[key] = value
+    self.resetCaches()
   # ---------------------------------------------------------------------------
   def getPacketKey(self, packetDU):
     """retrieves the packet key from the packet data unit"""
-    # key field identification
-    apid = packetDU.applicationProcessId
-    if PUS.PACKET.isPUSpacketDU(packetDU):
-      # we have a PUS packet
-      serviceType = packetDU.serviceType
-      serviceSubType = packetDU.serviceSubType
-    else:
-      # we have a CCSDS packet
-      serviceType = None
-      serviceSubType = None
+    return self.identifyHeader(packetDU.buffer,
+                               packetDU.usedBufferSize,
+                               PUS.PACKET.isPUSpacketDU(packetDU))
+  # ---------------------------------------------------------------------------
+  def getKeyFieldExtraction(self, apid, serviceType, serviceSubType):
+    """
+    returns the precomputed PI1/PI2 extraction for the key field record
+    or None if there is no matching record
+    """
     key1 = (apid, serviceType, serviceSubType)
+    if key1 in self.keyFieldCache:
+      return self.keyFieldCache[key1]
     if key1 in self.keyFieldIDs:
-      pi1bitPos, pi1bitSize, pi2bitPos, pi2bitSize = self.keyFieldIDs[key1]
+      keyFieldRecord = self.keyFieldIDs[key1]
     else:
-      key1 = (None, serviceType, serviceSubType)
-      if key1 in self.keyFieldIDs:
-        pi1bitPos, pi1bitSize, pi2bitPos, pi2bitSize = self.keyFieldIDs[key1]
-      else:
-        return None
-    # key field extraction
-    if pi1bitPos != None:
-      pi1 = packetDU.getBits(pi1bitPos, pi1bitSize)
+      keyFieldRecord = self.keyFieldIDs.get((None, serviceType, serviceSubType))
+    if keyFieldRecord == None:
+      extraction = None
+    else:
+      pi1bitPos, pi1bitSize, pi2bitPos, pi2bitSize = keyFieldRecord
+      extraction = (compileBitsExtraction(pi1bitPos, pi1bitSize),
+                    compileBitsExtraction(pi2bitPos, pi2bitSize))
+    if len(self.keyFieldCache) >= self.cacheSize:
+      self.keyFieldCache.clear()
+    self.keyFieldCache[key1] = extraction
+    return extraction
+  # ---------------------------------------------------------------------------
+  def identifyHeader(self, buffer, bufferSize, isPUSpacket):
+    """retrieves the packet key from the raw packet bytes"""
+    if bufferSize < CCSDS.PACKET.PRIMARY_HEADER_BYTE_SIZE:
+      raise Error("packet header is too small")
+    apid = ((buffer[0] & 0x07) << 8) | buffer[1]
+    if isPUSpacket:
+      if bufferSize <= SERVICE_SUBTYPE_BYTE_POS:
+        raise Error("packet data field header is too small")
+      serviceType = buffer[SERVICE_TYPE_BYTE_POS]
+      serviceSubType = buffer[SERVICE_SUBTYPE_BYTE_POS]
+    else:
+      serviceType = None
+      serviceSubType = None
+    # key field identification and extraction
+    extraction = self.getKeyFieldExtraction(apid, serviceType, serviceSubType)
+    if extraction == None:
+      return None
+    pi1extraction, pi2extraction = extraction
+    if pi1extraction != None:
+      pi1 = extractBits(buffer, bufferSize, pi1extraction)
     else:
       pi1 = None
-    if pi2bitPos != None:
-      pi2 = packetDU.getBits(pi2bitPos, pi2bitSize)
+    if pi2extraction != None:
+      pi2 = extractBits(buffer, bufferSize, pi2extraction)
     else:
       pi2 = None
-    # packet identification
+    # packet identification via the LRU cache
     key2 = (apid, serviceType, serviceSubType, pi1, pi2)
-    if not key2 in self.packetIDs:
-      return None
-    return self.packetIDs[key2]
+    packetKeyCache = self.packetKeyCache
+    if key2 in packetKeyCache:
+      packetKeyCache.move_to_end(key2)
+      return packetKeyCache[key2]
+    packetKey = self.packetIDs.get(key2)
+    packetKeyCache[key2] = packetKey
+    if len(packetKeyCache) > self.cacheSize:
+      packetKeyCache.popitem(last=False)
+    return packetKey
+  # ---------------------------------------------------------------------------
+  def identifyBuffer(self, buffer):
+    """retrieves the packet key from the raw packet bytes"""
+    bufferSize = len(buffer)
+    if bufferSize < CCSDS.PACKET.PRIMARY_HEADER_BYTE_SIZE:
+      raise Error("packet header is too small")
+    isPUSpacket = ((buffer[0] >> 5) == PUS.PACKET.VERSION_NUMBER and \
+                   (buffer[0] & 0x08) != 0)
+    return self.identifyHeader(buffer, bufferSize, isPUSpacket)
+  # ---------------------------------------------------------------------------
+  def identify(self, buffers):
+    """retrieves the packet keys of several raw packets, e.g. of an archive"""
+    identifyBuffer = self.identifyBuffer
+    return [identifyBuffer(buffer) for buffer in buffers]
+
+#############
+# functions #
+#############
+# -----------------------------------------------------------------------------
+def compileBitsExtraction(bitPos, bitSize):
+  """
+  returns the precomputed extraction of a bit field:
+  (first byte, end byte, shift, mask) or None if the field is not used
+  """
+  if bitPos == None:
+    return None
+  if bitPos < 0:
+    raise IndexError("invalid bitPos")
+  if bitSize <= 0:
+    raise IndexError("invalid bitLength")
+  lastBitPos = bitPos + bitSize - 1
+  return (bitPos >> 3, (lastBitPos >> 3) + 1, 7 - (lastBitPos & 7), (1 << bitSize) - 1)
+# -----------------------------------------------------------------------------
+def extractBits(buffer, bufferSize, extraction):
+  """extracts a bit field as unsigned value from raw bytes"""
+  firstBytePos, endBytePos, shift, mask = extraction
+  if endBytePos > bufferSize:
+    raise IndexError("bitPos/bitLength out of buffer")
+  if endBytePos - firstBytePos == 1:
+    return (buffer[firstBytePos] >> shift) & mask
+  return (int.from_bytes(buffer[firstBytePos:endBytePos], "big") >> shift) & mask
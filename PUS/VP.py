@@ -12,8 +12,20 @@
 #******************************************************************************
 # PUS Services - Variable packet support                                      *
 #******************************************************************************
+import array, struct, weakref
 from UTIL.SYS import Error
-import UTIL.DU, UTIL.TIME
+import CCSDS.TIME, UTIL.DU, UTIL.TIME
+
+#############
+# constants #
+#############
+# Struct.encode/decode use the compiled codec of the struct definition,
+# False selects the interpretive processing of the entity tree
+COMPILED_CODECS = True
+# struct.Struct format characters of byte aligned numbers, per byte size
+UNSIGNED_FORMAT_CHARS = {1: "B", 2: "H", 4: "I", 8: "Q"}
+SIGNED_FORMAT_CHARS = {1: "b", 2: "h", 4: "i", 8: "q"}
+FLOAT_FORMAT_CHARS = {4: "f", 8: "d"}
 
 ####################
 # definition level #
@@ -102,9 +114,9 @@ class TimeParamDef(ParamDef):
   def __str__(self, indent="TimeParamDef"):
     """string representation"""
     if self.isReadOnly:
-      return ("\n" + indent + "." + self.paramName + " = " + CCSDS.TIME.timeFormatString(self.timeFormat) + ", " + str(self.defaultValue) + " RO")
+      return ("\n" + indent + "." + self.paramName + " = " + CCSDS.TIME.timeFormatStr(self.timeFormat) + ", " + str(self.defaultValue) + " RO")
     else:
-      return ("\n" + indent + "." + self.paramName + " = " + CCSDS.TIME.timeFormatString(self.timeFormat) + ", " + str(self.defaultValue) + " RW")
+      return ("\n" + indent + "." + self.paramName + " = " + CCSDS.TIME.timeFormatStr(self.timeFormat) + ", " + str(self.defaultValue) + " RW")
   # ---------------------------------------------------------------------------
   def getParamType(self):
     """accessor"""
@@ -408,19 +420,66 @@ class Struct(Entity):
     encodes the contens into a data unit, returns the new position
     overloaded from Entity
     """
+    if COMPILED_CODECS:
+      return getStructCodec(self.structDef).encode(self, du, bitPos)
     for slot in self.slots:
       bitPos = slot.encode(du, bitPos)
     return bitPos
   # ---------------------------------------------------------------------------
-  def decode(self, du, bitPos):
+  def decode(self, du, bitPos, lazy=False):
     """
     decodes the contens from a data unit, returns the new position
-    overloaded from Entity
+    overloaded from Entity,
+    lazy: list entries are only located, they are decoded on first access,
+    du must not be modified as long as the list entries are accessed
     """
+    if COMPILED_CODECS or lazy:
+      return getStructCodec(self.structDef).decode(self, du, bitPos, lazy)
     for slot in self.slots:
       bitPos = slot.decode(du, bitPos)
     return bitPos
-    
+
+# =============================================================================
+class LazyEntries(object):
+  """
+  Entries of a lazy decoded list: only the positions of the entries are
+  recorded, an entry is decoded when it is accessed the first time
+  """
+  # ---------------------------------------------------------------------------
+  def __init__(self, entryDef, du, entryBitPositions):
+    """entryBitPositions is a sequence (e.g. range or array)"""
+    self.entryDef = entryDef
+    self.du = du
+    self.entryBitPositions = entryBitPositions
+    self.decodedEntries = {}
+  # ---------------------------------------------------------------------------
+  def __len__(self):
+    """number of entries"""
+    return len(self.entryBitPositions)
+  # ---------------------------------------------------------------------------
+  def __getitem__(self, index):
+    """returns the entry, it is decoded on first access"""
+    if isinstance(index, slice):
+      return [self[i] for i in range(*index.indices(len(self)))]
+    if index < 0:
+      index += len(self)
+    entry = self.decodedEntries.get(index)
+    if entry == None:
+      entryBitPos = self.entryBitPositions[index]
+      entry = Struct(self.entryDef)
+      entry.decode(self.du, entryBitPos, lazy=True)
+      self.decodedEntries[index] = entry
+    return entry
+  # ---------------------------------------------------------------------------
+  def __iter__(self):
+    """iterates over all entries"""
+    for index in range(len(self)):
+      yield self[index]
+  # ---------------------------------------------------------------------------
+  def isDecoded(self, index):
+    """checks if the entry is already decoded"""
+    return index in self.decodedEntries
+
 # =============================================================================
 class List(Entity):
   """Definition of a list in a variable packet"""
@@ -447,6 +506,8 @@ class List(Entity):
   def setLen(self, length):
     """change the length of the list (number of entries)"""
     oldLen = len(self.entries)
+    if length != oldLen and self.isLazy():
+      self.entries = list(self.entries)
     if length < oldLen:
       # list must be shrinked
       self.entries = self.entries[:length - oldLen]
@@ -460,6 +521,10 @@ class List(Entity):
     """index operator"""
     return self.entries[key]
   # ---------------------------------------------------------------------------
+  def isLazy(self):
+    """checks if the entries are lazy decoded"""
+    return type(self.entries) == LazyEntries
+  # ---------------------------------------------------------------------------
   def getLenParamName(self):
     """accessor"""
     return self.listDef.lenParamDef.paramName
@@ -514,7 +579,304 @@ class List(Entity):
     lengthValue = du.getUnsigned(lengthValueBytePos, lengthValueByteWidth)
     bitPos += lengthValueBitWidth
     # decode the list entries
+    if self.isLazy():
+      self.entries = []
     self.setLen(lengthValue)
     for entry in self.entries:
       bitPos = entry.decode(du, bitPos)
     return bitPos
+
+##################
+# compiled codec #
+##################
+
+# =============================================================================
+class StructCodec(object):
+  """
+  Encoder/decoder of Struct entities that is compiled for a StructDef:
+  each sequence of fixed size parameters is processed with precomputed
+  offsets, byte aligned numbers that follow each other are read/written with
+  one precompiled struct.Struct, only the list entries are processed in a loop
+  """
+  # ---------------------------------------------------------------------------
+  def __init__(self, structDef):
+    """compiles the segments of the struct definition"""
+    # the codec must not reference structDef, see s_structCodecs
+    # per segment: function(slots, du, bitPos) that returns the new position,
+    # lazy decoders only locate list entries, skippers only locate segments
+    self.decoders = []
+    self.lazyDecoders = []
+    self.encoders = []
+    self.skippers = []
+    # size of the struct if all parameters have a fixed size
+    self.fixedBitWidth = 0
+    fixedSlots = []
+    for slotIndex, slotDef in enumerate(structDef.slotDefs):
+      childDef = slotDef.childDef
+      childType = type(childDef)
+      if childType == SimpleParamDef or childType == TimeParamDef:
+        fixedSlots.append((slotIndex, childDef))
+        continue
+      if len(fixedSlots) > 0:
+        self.compileFixedSegment(fixedSlots)
+        fixedSlots = []
+      self.fixedBitWidth = None
+      if childType == VariableParamDef:
+        self.compileVariableSegment(slotIndex, childDef)
+      elif childType == ListDef:
+        self.compileListSegment(slotIndex, childDef)
+      else:
+        raise Error("child type " + str(childType) + " not supported")
+    if len(fixedSlots) > 0:
+      self.compileFixedSegment(fixedSlots)
+  # ---------------------------------------------------------------------------
+  def compileFixedSegment(self, fixedSlots):
+    """compiles slots with parameters of fixed size"""
+    slotIndexes = [slotIndex for slotIndex, paramDef in fixedSlots]
+    # steps: function(slots, du, bitPos) with the segment start position
+    decodeSteps = []
+    encodeSteps = []
+    runBytePos = None
+    runFormat = ""
+    runSlotIndexes = []
+    relBitPos = 0
+    for slotIndex, paramDef in fixedSlots:
+      paramType = paramDef.getParamType()
+      bitWidth = paramDef.getBitWidth()
+      formatChar = None
+      if (relBitPos & 7) == 0 and (bitWidth & 7) == 0:
+        byteWidth = bitWidth >> 3
+        if paramType == UTIL.DU.UNSIGNED or paramType == UTIL.DU.BITS:
+          formatChar = UNSIGNED_FORMAT_CHARS.get(byteWidth)
+        elif paramType == UTIL.DU.SIGNED or paramType == UTIL.DU.SBITS:
+          formatChar = SIGNED_FORMAT_CHARS.get(byteWidth)
+        elif paramType == UTIL.DU.FLOAT:
+          formatChar = FLOAT_FORMAT_CHARS.get(byteWidth)
+      if formatChar != None:
+        if runFormat == "":
+          runBytePos = relBitPos >> 3
+        runFormat += formatChar
+        runSlotIndexes.append(slotIndex)
+      else:
+        if runFormat != "":
+          self.compileRunSteps(decodeSteps, encodeSteps,
+                               runBytePos, runFormat, runSlotIndexes)
+          runFormat = ""
+          runSlotIndexes = []
+        self.compileParamSteps(decodeSteps, encodeSteps,
+                               slotIndex, paramType, relBitPos, bitWidth)
+      relBitPos += bitWidth
+    if runFormat != "":
+      self.compileRunSteps(decodeSteps, encodeSteps,
+                           runBytePos, runFormat, runSlotIndexes)
+    segmentBitWidth = relBitPos
+    def decodeSegment(slots, du, bitPos):
+      if (bitPos & 7) != 0:
+        # not byte aligned: the generic processing handles bit fields
+        # and reports the alignment errors of byte oriented parameters
+        for slotIndex in slotIndexes:
+          bitPos = slots[slotIndex].child.decode(du, bitPos)
+        return bitPos
+      for decodeStep in decodeSteps:
+        decodeStep(slots, du, bitPos)
+      return bitPos + segmentBitWidth
+    def encodeSegment(slots, du, bitPos):
+      if (bitPos & 7) != 0:
+        for slotIndex in slotIndexes:
+          bitPos = slots[slotIndex].child.encode(du, bitPos)
+        return bitPos
+      for encodeStep in encodeSteps:
+        encodeStep(slots, du, bitPos)
+      return bitPos + segmentBitWidth
+    def skipSegment(du, bitPos):
+      return bitPos + segmentBitWidth
+    if self.fixedBitWidth != None:
+      self.fixedBitWidth += segmentBitWidth
+    self.decoders.append(decodeSegment)
+    self.lazyDecoders.append(decodeSegment)
+    self.encoders.append(encodeSegment)
+    self.skippers.append(skipSegment)
+  # ---------------------------------------------------------------------------
+  def compileRunSteps(self, decodeSteps, encodeSteps,
+                      runBytePos, runFormat, runSlotIndexes):
+    """compiles the steps for a run of byte aligned numbers"""
+    runStruct = struct.Struct(">" + runFormat)
+    runByteSize = runStruct.size
+    unpackFrom = runStruct.unpack_from
+    packInto = runStruct.pack_into
+    def decodeRun(slots, du, bitPos):
+      bytePos = (bitPos >> 3) + runBytePos
+      if bytePos + runByteSize > du.usedBufferSize:
+        raise IndexError("bytePos/byteLength out of buffer")
+      for slotIndex, value in zip(runSlotIndexes, unpackFrom(du.buffer, bytePos)):
+        slots[slotIndex].child.value = value
+    def encodeRun(slots, du, bitPos):
+      bytePos = (bitPos >> 3) + runBytePos
+      if bytePos + runByteSize > du.usedBufferSize:
+        raise IndexError("bytePos/byteLength out of buffer")
+      values = [slots[slotIndex].child.value for slotIndex in runSlotIndexes]
+      try:
+        packInto(du.buffer, bytePos, *values)
+      except (struct.error, TypeError, OverflowError):
+        # values that must be converted or are out of range
+        # are handled by the generic processing
+        paramBitPos = bytePos << 3
+        for slotIndex in runSlotIndexes:
+          paramBitPos = slots[slotIndex].child.encode(du, paramBitPos)
+    decodeSteps.append(decodeRun)
+    encodeSteps.append(encodeRun)
+  # ---------------------------------------------------------------------------
+  def compileParamSteps(self, decodeSteps, encodeSteps,
+                        slotIndex, paramType, relBitPos, bitWidth):
+    """compiles the steps for a parameter that is not part of a run"""
+    if paramType == UTIL.DU.BITS or paramType == UTIL.DU.SBITS:
+      if paramType == UTIL.DU.BITS:
+        getterName, setterName = "getBits", "setBits"
+      else:
+        getterName, setterName = "getSBits", "setSBits"
+      def decodeParam(slots, du, bitPos):
+        slots[slotIndex].child.value = \
+          getattr(du, getterName)(bitPos + relBitPos, bitWidth)
+      def encodeParam(slots, du, bitPos):
+        getattr(du, setterName)(bitPos + relBitPos, bitWidth,
+                                slots[slotIndex].child.value)
+    else:
+      # byte oriented parameters without struct format, e.g. strings
+      def decodeParam(slots, du, bitPos):
+        slots[slotIndex].child.decode(du, bitPos + relBitPos)
+      def encodeParam(slots, du, bitPos):
+        slots[slotIndex].child.encode(du, bitPos + relBitPos)
+    decodeSteps.append(decodeParam)
+    encodeSteps.append(encodeParam)
+  # ---------------------------------------------------------------------------
+  def compileVariableSegment(self, slotIndex, paramDef):
+    """compiles a slot with a parameter of variable size"""
+    paramName = paramDef.paramName
+    lengthBytes = paramDef.lengthBytes
+    def decodeSegment(slots, du, bitPos):
+      return slots[slotIndex].child.decode(du, bitPos)
+    def encodeSegment(slots, du, bitPos):
+      return slots[slotIndex].child.encode(du, bitPos)
+    def skipSegment(du, bitPos):
+      if (bitPos & 7) != 0:
+        raise Error("parameter " + paramName + " position is not byte aligned")
+      bytePos = bitPos >> 3
+      byteLength = du.getUnsigned(bytePos, lengthBytes)
+      return (bytePos + lengthBytes + byteLength) << 3
+    self.decoders.append(decodeSegment)
+    self.lazyDecoders.append(decodeSegment)
+    self.encoders.append(encodeSegment)
+    self.skippers.append(skipSegment)
+  # ---------------------------------------------------------------------------
+  def compileListSegment(self, slotIndex, listDef):
+    """compiles a slot with a list, the entries are decoded in a loop"""
+    lenParamName = listDef.lenParamDef.paramName
+    lengthValueBitWidth = listDef.lenParamDef.bitWidth
+    lengthValueByteWidth = lengthValueBitWidth >> 3
+    entryCodec = getStructCodec(listDef.entryDef)
+    def checkLengthValue(bitPos):
+      if (bitPos & 7) != 0:
+        raise Error("parameter " + lenParamName + " position is not byte aligned")
+      if (lengthValueBitWidth & 7) != 0:
+        raise Error("parameter " + lenParamName + " size is not byte aligned")
+    def decodeSegment(slots, du, bitPos):
+      checkLengthValue(bitPos)
+      lengthValue = du.getUnsigned(bitPos >> 3, lengthValueByteWidth)
+      bitPos += lengthValueBitWidth
+      listEntity = slots[slotIndex].child
+      if listEntity.isLazy():
+        listEntity.entries = []
+      listEntity.setLen(lengthValue)
+      decodeEntry = entryCodec.decode
+      for entry in listEntity.entries:
+        bitPos = decodeEntry(entry, du, bitPos)
+      return bitPos
+    def encodeSegment(slots, du, bitPos):
+      checkLengthValue(bitPos)
+      listEntity = slots[slotIndex].child
+      du.setUnsigned(bitPos >> 3, lengthValueByteWidth, len(listEntity.entries))
+      bitPos += lengthValueBitWidth
+      encodeEntry = entryCodec.encode
+      for entry in listEntity.entries:
+        bitPos = encodeEntry(entry, du, bitPos)
+      return bitPos
+    def locateEntries(du, bitPos):
+      # returns the entry positions and the position after the list
+      checkLengthValue(bitPos)
+      lengthValue = du.getUnsigned(bitPos >> 3, lengthValueByteWidth)
+      bitPos += lengthValueBitWidth
+      entryBitWidth = entryCodec.fixedBitWidth
+      if entryBitWidth != None and entryBitWidth > 0:
+        # fixed entry size: the positions are calculated
+        nextBitPos = bitPos + (lengthValue * entryBitWidth)
+        if nextBitPos > (du.usedBufferSize << 3):
+          raise IndexError("bitPos/bitLength out of buffer")
+        return (range(bitPos, nextBitPos, entryBitWidth), nextBitPos)
+      # variable entry size: the entries are scanned
+      entryBitPositions = array.array("Q")
+      skipEntry = entryCodec.skip
+      for i in range(lengthValue):
+        entryBitPositions.append(bitPos)
+        bitPos = skipEntry(du, bitPos)
+      return (entryBitPositions, bitPos)
+    def decodeLazySegment(slots, du, bitPos):
+      entryBitPositions, nextBitPos = locateEntries(du, bitPos)
+      listEntity = slots[slotIndex].child
+      listEntity.entries = LazyEntries(listDef.entryDef, du, entryBitPositions)
+      return nextBitPos
+    def skipSegment(du, bitPos):
+      return locateEntries(du, bitPos)[1]
+    self.decoders.append(decodeSegment)
+    self.lazyDecoders.append(decodeLazySegment)
+    self.encoders.append(encodeSegment)
+    self.skippers.append(skipSegment)
+  # ---------------------------------------------------------------------------
+  def decode(self, structEntity, du, bitPos, lazy=False):
+    """
+    decodes a Struct of the compiled definition, returns the new position,
+    lazy: list entries are only located, see LazyEntries
+    """
+    slots = structEntity.slots
+    if lazy:
+      decoders = self.lazyDecoders
+    else:
+      decoders = self.decoders
+    for decodeSegment in decoders:
+      bitPos = decodeSegment(slots, du, bitPos)
+    return bitPos
+  # ---------------------------------------------------------------------------
+  def encode(self, structEntity, du, bitPos):
+    """encodes a Struct of the compiled definition, returns the new position"""
+    slots = structEntity.slots
+    for encodeSegment in self.encoders:
+      bitPos = encodeSegment(slots, du, bitPos)
+    return bitPos
+  # ---------------------------------------------------------------------------
+  def skip(self, du, bitPos):
+    """returns the position after a Struct without decoding it"""
+    for skipSegment in self.skippers:
+      bitPos = skipSegment(du, bitPos)
+    return bitPos
+
+####################
+# global variables #
+####################
+# compiled codecs: structDef --> codec, the entries of replaced
+# definitions (e.g. after a reload) are released with the definitions
+s_structCodecs = weakref.WeakKeyDictionary()
+
+#############
+# functions #
+#############
+# -----------------------------------------------------------------------------
+def getStructCodec(structDef):
+  """
+  returns the codec of structDef, it is compiled on first use and cached,
+  note: struct definitions must not be modified after their first usage
+  """
+  codec = s_structCodecs.get(structDef)
+  if codec != None:
+    return codec
+  codec = StructCodec(structDef)
+  s_structCodecs[structDef] = codec
+  return codec
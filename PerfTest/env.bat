@@ -0,0 +1,19 @@
+::*****************************************************************************
+:: (C) 2018, Stefan Korner, Austria                                           *
+::                                                                            *
+:: The Space Python Library is free software; you can redistribute it and/or  *
+:: modify it under under the terms of the MIT License as published by the     *
+:: Massachusetts Institute of Technology.                                     *
+::                                                                            *
+:: The Space Python Library is distributed in the hope that it will be useful,*
+:: but WITHOUT ANY WARRANTY; without even the implied warranty of             *
+:: MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the MIT License   *
+:: for more details.                                                          *
+::*****************************************************************************
+:: Setup the Windows environment for Perf. Tests, file needs to be sourced.   *
+:: The file must be adopted if the library is installed in a different folder *
+:: than C:\Programming\SpacePyLibrary                                         *
+::*****************************************************************************
+set PYTHONPATH=C:\Programming\SpacePyLibrary
+set TESTENV=C:\Programming\SpacePyLibrary\TESTENV
+set HOST=127.0.0.1
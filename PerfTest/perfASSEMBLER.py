@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+#******************************************************************************
+# (C) 2019, Stefan Korner, Austria                                            *
+#                                                                             *
+# The Space Python Library is free software; you can redistribute it and/or   *
+# modify it under under the terms of the MIT License as published by the      *
+# Massachusetts Institute of Technology.                                      *
+#                                                                             *
+# The Space Python Library is distributed in the hope that it will be useful, *
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              *
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the MIT License    *
+# for more details.                                                           *
+#******************************************************************************
+# Performance Tests - assembly of TM frames from TM packets                   *
+#******************************************************************************
+import time
+import CCSDS.ASSEMBLER, CCSDS.MULTIPLEXER, CCSDS.PACKET
+import UTIL.SYS
+
+#############
+# constants #
+#############
+FRAME_COUNT = 20000
+PACKET_SIZES = [100, 250, 40, 600, 1200]
+# all VCIDs of TM transfer frames, except the VC for idle frames
+VIRTUAL_CHANNEL_COUNT = CCSDS.MULTIPLEXER.MAX_VIRTUAL_CHANNEL_ID
+
+###########
+# classes #
+###########
+# =============================================================================
+class Assembler(CCSDS.ASSEMBLER.Assembler):
+  """counts the assembled frames"""
+  # ---------------------------------------------------------------------------
+  def __init__(self, useFrameTemplate):
+    """Initialise attributes only"""
+    CCSDS.ASSEMBLER.Assembler.__init__(self, useFrameTemplate=useFrameTemplate)
+    self.frameCount = 0
+  # ---------------------------------------------------------------------------
+  def notifyTMframeCallback(self, tmFrameDu):
+    """notifies when the next TM frame is assembled"""
+    self.frameCount += 1
+
+# =============================================================================
+class Multiplexer(CCSDS.MULTIPLEXER.Multiplexer):
+  """counts the emitted frames"""
+  # ---------------------------------------------------------------------------
+  def __init__(self, scheduling):
+    """one virtual channel per APID"""
+    CCSDS.MULTIPLEXER.Multiplexer.__init__(self, scheduling)
+    self.frameCount = 0
+    for virtualChannelId in range(VIRTUAL_CHANNEL_COUNT):
+      self.addVirtualChannel(virtualChannelId,
+                             [1000 + virtualChannelId],
+                             weight=virtualChannelId + 1,
+                             priority=virtualChannelId)
+  # ---------------------------------------------------------------------------
+  def notifyTMframeCallback(self, tmFrameDu):
+    """notifies when the next TM frame is emitted"""
+    self.frameCount += 1
+
+#############
+# functions #
+#############
+# -----------------------------------------------------------------------------
+def measure(name, function, referenceTime=None):
+  """measures the assembly of FRAME_COUNT frames, returns the duration"""
+  startTime = time.perf_counter()
+  function()
+  duration = time.perf_counter() - startTime
+  framesPerSecond = FRAME_COUNT / duration
+  if referenceTime == None:
+    print("%-28s %8.4f s, %10.0f frames/s" % (name, duration, framesPerSecond))
+  else:
+    print("%-28s %8.4f s, %10.0f frames/s, speedup %7.1f" %
+          (name, duration, framesPerSecond, referenceTime / duration))
+  return duration
+# -----------------------------------------------------------------------------
+def assemblePackets(assembler, binPackets):
+  """pushes packets until FRAME_COUNT frames are assembled"""
+  i = 0
+  while assembler.frameCount < FRAME_COUNT:
+    assembler.pushTMpacket(binPackets[i % len(binPackets)])
+    i += 1
+# -----------------------------------------------------------------------------
+def multiplexPackets(multiplexer):
+  """pushes packets of all VCs until FRAME_COUNT frames are emitted"""
+  binPackets = []
+  for i in range(VIRTUAL_CHANNEL_COUNT * len(PACKET_SIZES)):
+    packet = CCSDS.PACKET.createIdlePacket(PACKET_SIZES[i % len(PACKET_SIZES)])
+    packet.applicationProcessId = 1000 + i % VIRTUAL_CHANNEL_COUNT
+    binPackets.append(packet.getBuffer())
+  i = 0
+  while multiplexer.frameCount < FRAME_COUNT:
+    multiplexer.pushTMpacket(binPackets[i % len(binPackets)])
+    # emit a frame for every 2nd packet, the rest is queued
+    if i % 2 == 0:
+      multiplexer.emitTMframe()
+    i += 1
+# -----------------------------------------------------------------------------
+def assembleIdleFrames(assembler):
+  """creates FRAME_COUNT idle frames"""
+  for i in range(FRAME_COUNT):
+    assembler.flushTMframeOrIdleFrame()
+
+########
+# main #
+########
+if __name__ == "__main__":
+  UTIL.SYS.s_configuration.setDefaults([
+    ["SPACECRAFT_ID", "758"],
+    ["TM_VIRTUAL_CHANNEL_ID", "0"],
+    ["TM_TRANSFER_FRAME_SIZE", "1115"],
+    ["TM_TRANSFER_FRAME_HAS_SEC_HDR", "0"],
+    ["TM_TRANSFER_FRAME_HAS_N_PKTS", "1"]])
+  binPackets = [CCSDS.PACKET.createIdlePacket(packetSize).getBuffer()
+                for packetSize in PACKET_SIZES]
+  print("assembly of %d frames with 1115 bytes:" % FRAME_COUNT)
+  referenceTime = measure("packets, attributes",
+    lambda: assemblePackets(Assembler(useFrameTemplate=False), binPackets))
+  measure("packets, frame template",
+    lambda: assemblePackets(Assembler(useFrameTemplate=True), binPackets),
+    referenceTime)
+  referenceTime = measure("idle frames, attributes",
+    lambda: assembleIdleFrames(Assembler(useFrameTemplate=False)))
+  measure("idle frames, frame template",
+    lambda: assembleIdleFrames(Assembler(useFrameTemplate=True)),
+    referenceTime)
+  print("multiplexing of %d frames on %d virtual channels:" % (FRAME_COUNT, VIRTUAL_CHANNEL_COUNT))
+  for scheduling in [CCSDS.MULTIPLEXER.PRIORITY_SCHEDULING,
+                     CCSDS.MULTIPLEXER.ROUND_ROBIN_SCHEDULING,
+                     CCSDS.MULTIPLEXER.BITRATE_SCHEDULING]:
+    measure(scheduling.lower() + " scheduling",
+            lambda: multiplexPackets(Multiplexer(scheduling)))
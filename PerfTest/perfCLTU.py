@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+#******************************************************************************
+# (C) 2019, Stefan Korner, Austria                                            *
+#                                                                             *
+# The Space Python Library is free software; you can redistribute it and/or   *
+# modify it under under the terms of the MIT License as published by the      *
+# Massachusetts Institute of Technology.                                      *
+#                                                                             *
+# The Space Python Library is distributed in the hope that it will be useful, *
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              *
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the MIT License    *
+# for more details.                                                           *
+#******************************************************************************
+# Performance Tests - CLTU encoding and decoding of TC frames                 *
+#******************************************************************************
+import array, random, time
+import CCSDS.CLTU, UTIL.BCH
+
+#############
+# constants #
+#############
+FRAME_SIZE = 1024
+FRAME_COUNT = 200
+
+#############
+# functions #
+#############
+# -----------------------------------------------------------------------------
+def encodeCltuBytewise(frame):
+  """byte wise reference encoding"""
+  netto = list(frame)
+  while len(netto) % CCSDS.CLTU.BCH_NETTO_SIZE != 0:
+    netto.append(CCSDS.CLTU.CLTU_FILL_BYTE)
+  cltu = array.array("B", CCSDS.CLTU.CLTU_START_SEQUENCE)
+  codeBlkIdx = 0
+  for nextByte in netto:
+    if codeBlkIdx == 0:
+      sreg = UTIL.BCH.encodeStart()
+    cltu.append(nextByte)
+    sreg = UTIL.BCH.encodeStep(sreg, nextByte)
+    codeBlkIdx += 1
+    if codeBlkIdx >= CCSDS.CLTU.BCH_NETTO_SIZE:
+      cltu.append(UTIL.BCH.encodeStop(sreg))
+      codeBlkIdx = 0
+  cltu.extend(CCSDS.CLTU.CLTU_TRAILER_SEQUENCE)
+  return cltu
+# -----------------------------------------------------------------------------
+def measure(name, function, referenceTime=None):
+  """measures the processing of all frames, returns the duration"""
+  startTime = time.perf_counter()
+  function()
+  duration = time.perf_counter() - startTime
+  framesPerSecond = FRAME_COUNT / duration
+  if referenceTime == None:
+    print("%-16s %8.4f s, %10.0f frames/s" % (name, duration, framesPerSecond))
+  else:
+    print("%-16s %8.4f s, %10.0f frames/s, speedup %7.1f" %
+          (name, duration, framesPerSecond, referenceTime / duration))
+  return duration
+
+########
+# main #
+########
+if __name__ == "__main__":
+  random.seed(4711)
+  frames = []
+  for i in range(FRAME_COUNT):
+    frames.append(array.array("B", [random.randrange(256) for j in range(FRAME_SIZE)]))
+  print("CLTUs of %d frames with %d bytes:" % (FRAME_COUNT, FRAME_SIZE))
+  referenceTime = measure("bytewise encode",
+                          lambda: [encodeCltuBytewise(frame) for frame in frames])
+  measure("encodeCltu",
+          lambda: [CCSDS.CLTU.encodeCltu(frame) for frame in frames],
+          referenceTime)
+  cltus = [CCSDS.CLTU.encodeCltu(frame) for frame in frames]
+  identical = all([encodeCltuBytewise(frame) == cltu for frame, cltu in zip(frames, cltus)])
+  print("identical CLTUs = %s" % identical)
+  measure("decodeCltu",
+          lambda: [CCSDS.CLTU.decodeCltu(cltu) for cltu in cltus],
+          referenceTime)
+  measure("decodeCltus",
+          lambda: CCSDS.CLTU.decodeCltus(cltus),
+          referenceTime)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+#******************************************************************************
+# (C) 2019, Stefan Korner, Austria                                            *
+#                                                                             *
+# The Space Python Library is free software; you can redistribute it and/or   *
+# modify it under under the terms of the MIT License as published by the      *
+# Massachusetts Institute of Technology.                                      *
+#                                                                             *
+# The Space Python Library is distributed in the hope that it will be useful, *
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              *
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the MIT License    *
+# for more details.                                                           *
+#******************************************************************************
+# Performance Tests - CRC implementations on TM frames                        *
+#******************************************************************************
+import array, random, time
+import UTIL.CRC
+
+#############
+# constants #
+#############
+FRAME_SIZE = 1115
+FRAME_COUNT = 200
+
+#############
+# functions #
+#############
+# -----------------------------------------------------------------------------
+def measure(name, function, frames, referenceTime=None):
+  """measures the CRC calculation of all frames, returns the duration"""
+  startTime = time.perf_counter()
+  for frame in frames:
+    function(frame)
+  duration = time.perf_counter() - startTime
+  framesPerSecond = len(frames) / duration
+  if referenceTime == None:
+    print("%-12s %8.4f s, %10.0f frames/s" % (name, duration, framesPerSecond))
+  else:
+    print("%-12s %8.4f s, %10.0f frames/s, speedup %7.1f" %
+          (name, duration, framesPerSecond, referenceTime / duration))
+  return duration
+
+########
+# main #
+########
+if __name__ == "__main__":
+  random.seed(4711)
+  frames = []
+  for i in range(FRAME_COUNT):
+    frames.append(array.array("B", [random.randrange(256) for j in range(FRAME_SIZE - 2)]))
+  print("CRC of %d frames with %d bytes:" % (FRAME_COUNT, FRAME_SIZE))
+  bitwiseTime = measure("bitwise", UTIL.CRC.calculateBitwise, frames)
+  measure("table", lambda frame: UTIL.CRC.updateTable(UTIL.CRC.INITIAL_VALUE, frame), frames, bitwiseTime)
+  measure("calculate", UTIL.CRC.calculate, frames, bitwiseTime)
+  # batch check of frames in one buffer
+  buffer = array.array("B")
+  for frame in frames:
+    crc = UTIL.CRC.calculate(frame)
+    buffer.extend(frame)
+    buffer.extend([crc >> 8, crc & 0xFF])
+  startTime = time.perf_counter()
+  results = UTIL.CRC.checkFrames(buffer, FRAME_SIZE)
+  duration = time.perf_counter() - startTime
+  print("%-12s %8.4f s, %10.0f frames/s, speedup %7.1f, valid = %s" %
+        ("checkFrames", duration, FRAME_COUNT / duration, bitwiseTime / duration, all(results)))
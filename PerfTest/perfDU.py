@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+#******************************************************************************
+# (C) 2019, Stefan Korner, Austria                                            *
+#                                                                             *
+# The Space Python Library is free software; you can redistribute it and/or   *
+# modify it under under the terms of the MIT License as published by the      *
+# Massachusetts Institute of Technology.                                      *
+#                                                                             *
+# The Space Python Library is distributed in the hope that it will be useful, *
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              *
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the MIT License    *
+# for more details.                                                           *
+#******************************************************************************
+# Performance Tests - compiled vs. generic data unit attribute access         *
+#******************************************************************************
+import time
+import CCSDS.FRAME, PUS.PACKET, UTIL.DU
+
+#############
+# constants #
+#############
+REPETITIONS = 100000
+
+#############
+# functions #
+#############
+# -----------------------------------------------------------------------------
+def readAttributes(tmFrame, tmPacket):
+  """reads typical header attributes in the ground chain"""
+  for i in range(REPETITIONS):
+    tmFrame.virtualChannelId
+    tmFrame.firstHeaderPointer
+    tmPacket.applicationProcessId
+    tmPacket.sequenceControlCount
+    tmPacket.packetLength
+    tmPacket.serviceType
+# -----------------------------------------------------------------------------
+def writeAttributes(tmFrame, tmPacket):
+  """writes typical header attributes in the ground chain"""
+  for i in range(REPETITIONS):
+    tmFrame.masterChannelFrameCount = i & 0xFF
+    tmFrame.virtualChannelFCountLow = i & 0xFF
+    tmFrame.firstHeaderPointer = i & 0x07FF
+    tmPacket.sequenceControlCount = i & 0x3FFF
+    tmPacket.packetLength = i & 0xFFFF
+    tmPacket.serviceSubType = i & 0xFF
+# -----------------------------------------------------------------------------
+def measure(compiled):
+  """measures read and write access, returns the durations"""
+  UTIL.DU.COMPILED_ACCESSORS = compiled
+  tmFrame = CCSDS.FRAME.TMframe("\0" * 1115)
+  tmPacket = PUS.PACKET.TMpacket()
+  startTime = time.perf_counter()
+  readAttributes(tmFrame, tmPacket)
+  readTime = time.perf_counter() - startTime
+  startTime = time.perf_counter()
+  writeAttributes(tmFrame, tmPacket)
+  writeTime = time.perf_counter() - startTime
+  return (readTime, writeTime)
+
+########
+# main #
+########
+if __name__ == "__main__":
+  genericRead, genericWrite = measure(False)
+  compiledRead, compiledWrite = measure(True)
+  accesses = REPETITIONS * 6
+  print("attribute reads:  generic %8.3f s, compiled %8.3f s, speedup %5.1f (%d accesses)" %
+        (genericRead, compiledRead, genericRead / compiledRead, accesses))
+  print("attribute writes: generic %8.3f s, compiled %8.3f s, speedup %5.1f (%d accesses)" %
+        (genericWrite, compiledWrite, genericWrite / compiledWrite, accesses))
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+#******************************************************************************
+# (C) 2020, Stefan Korner, Austria                                            *
+#                                                                             *
+# The Space Python Library is free software; you can redistribute it and/or   *
+# modify it under under the terms of the MIT License as published by the      *
+# Massachusetts Institute of Technology.                                      *
+#                                                                             *
+# The Space Python Library is distributed in the hope that it will be useful, *
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              *
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the MIT License    *
+# for more details.                                                           *
+#******************************************************************************
+# Performance Tests - recording of NCTRS TM frames                            *
+#******************************************************************************
+import os, shutil, tempfile, time
+import CCSDS.FRAME
+import GRND.FRAMEREC, GRND.NCTRS
+import UTIL.SYS, UTIL.TCO
+
+#############
+# constants #
+#############
+FRAME_COUNT = 20000
+FRAME_SIZE = 1115
+START_TIME = 1600000000.0
+
+#############
+# functions #
+#############
+# -----------------------------------------------------------------------------
+def measure(name, function, referenceTime=None):
+  """measures the recording of FRAME_COUNT frames, returns the duration"""
+  startTime = time.perf_counter()
+  function()
+  duration = time.perf_counter() - startTime
+  framesPerSecond = FRAME_COUNT / duration
+  if referenceTime == None:
+    print("%-32s %8.4f s, %10.0f frames/s" % (name, duration, framesPerSecond))
+  else:
+    print("%-32s %8.4f s, %10.0f frames/s, speedup %7.1f" %
+          (name, duration, framesPerSecond, referenceTime / duration))
+  return duration
+# -----------------------------------------------------------------------------
+def recordFramesDirectly(fileName, frame, nctrsTMfields):
+  """creates and writes one NCTRS data unit per frame"""
+  recordFile = open(fileName, "wb")
+  for i in range(FRAME_COUNT):
+    ertTime = UTIL.TCO.correlateToERTmissionEpoch(START_TIME + i)
+    tmDu = GRND.NCTRS.createTMdataUnit()
+    tmDu.setFrame(frame)
+    tmDu.spacecraftId = nctrsTMfields.spacecraftId
+    tmDu.dataStreamType = nctrsTMfields.dataStreamType
+    tmDu.virtualChannelId = nctrsTMfields.virtualChannelId
+    tmDu.routeId = nctrsTMfields.routeId
+    tmDu.earthReceptionTime = ertTime
+    tmDu.sequenceFlag = nctrsTMfields.sequenceFlag
+    tmDu.qualityFlag = nctrsTMfields.qualityFlag
+    tmDu.packetSize = len(tmDu)
+    recordFile.write(tmDu.getBuffer())
+    recordFile.flush()
+  recordFile.close()
+# -----------------------------------------------------------------------------
+def pushFrames(frameRecorder, frame):
+  """passes the frames to the recorder thread"""
+  for i in range(FRAME_COUNT):
+    frameRecorder.pushFrame(frame, START_TIME + i)
+
+########
+# main #
+########
+if __name__ == "__main__":
+  UTIL.SYS.s_configuration.setDefaults([
+    ["NCTRS_TM_DU_VERSION", "V1_CDS3"]])
+  frame = CCSDS.FRAME.TMframe(bytes(FRAME_SIZE)).getBuffer()
+  nctrsTMfields = GRND.NCTRS.NCTRStmFields()
+  recordDir = tempfile.mkdtemp()
+  try:
+    print("recording of %d NCTRS frames with %d bytes:" % (FRAME_COUNT, FRAME_SIZE))
+    referenceTime = measure("data unit per frame",
+      lambda: recordFramesDirectly(os.path.join(recordDir, "direct.nctrs"),
+                                   frame,
+                                   nctrsTMfields))
+    frameRecorder = GRND.FRAMEREC.FrameRecorder(
+      os.path.join(recordDir, "recorder.nctrs"), "NCTRS", nctrsTMfields)
+    measure("recorder, processing thread",
+      lambda: pushFrames(frameRecorder, frame),
+      referenceTime)
+    frameRecorder.close()
+    frameRecorder = GRND.FRAMEREC.FrameRecorder(
+      os.path.join(recordDir, "recorder2.nctrs"), "NCTRS", nctrsTMfields)
+    measure("recorder, until written",
+      lambda: (pushFrames(frameRecorder, frame), frameRecorder.close()),
+      referenceTime)
+  finally:
+    shutil.rmtree(recordDir)
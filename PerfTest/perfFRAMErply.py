@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+#******************************************************************************
+# (C) 2020, Stefan Korner, Austria                                            *
+#                                                                             *
+# The Space Python Library is free software; you can redistribute it and/or   *
+# modify it under under the terms of the MIT License as published by the      *
+# Massachusetts Institute of Technology.                                      *
+#                                                                             *
+# The Space Python Library is distributed in the hope that it will be useful, *
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              *
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the MIT License    *
+# for more details.                                                           *
+#******************************************************************************
+# Performance Tests - replay of NCTRS TM frames                               *
+#******************************************************************************
+import os, shutil, tempfile, time
+import CCSDS.FRAME
+import CS.FRAMEmodel, CS.FRAMErply
+import GRND.FRAMEREC, GRND.NCTRS
+import UTIL.SYS, UTIL.TASK
+
+#############
+# constants #
+#############
+FRAME_COUNT = 20000
+FRAME_SIZE = 1115
+START_TIME = 1600000000.0
+
+###########
+# classes #
+###########
+# =============================================================================
+class ProcessingTask(object):
+  """processing task that executes the time handlers immediately"""
+  # ---------------------------------------------------------------------------
+  def __init__(self):
+    self.timeHandlers = []
+  # ---------------------------------------------------------------------------
+  def notifyGUItask(self, status):
+    pass
+  # ---------------------------------------------------------------------------
+  def createTimeHandler(self, ms, handler):
+    self.timeHandlers.append(handler)
+    return handler
+  # ---------------------------------------------------------------------------
+  def cancelTimeHandler(self, timeHandler):
+    self.timeHandlers.remove(timeHandler)
+  # ---------------------------------------------------------------------------
+  def run(self):
+    while len(self.timeHandlers) > 0:
+      self.timeHandlers.pop(0)()
+
+# =============================================================================
+class FrameModel(object):
+  """counts the replayed frames"""
+  # ---------------------------------------------------------------------------
+  def __init__(self):
+    self.frameNr = 0
+  # ---------------------------------------------------------------------------
+  def receiveTMframe(self, frame):
+    self.frameNr += 1
+
+#############
+# functions #
+#############
+# -----------------------------------------------------------------------------
+def measure(name, function, referenceTime=None):
+  """measures the replay of FRAME_COUNT frames, returns the duration"""
+  CS.FRAMEmodel.s_frameModel = FrameModel()
+  startTime = time.perf_counter()
+  function()
+  duration = time.perf_counter() - startTime
+  if CS.FRAMEmodel.s_frameModel.frameNr != FRAME_COUNT:
+    print("%-32s replayed %d frames" % (name, CS.FRAMEmodel.s_frameModel.frameNr))
+  framesPerSecond = FRAME_COUNT / duration
+  if referenceTime == None:
+    print("%-32s %8.4f s, %10.0f frames/s" % (name, duration, framesPerSecond))
+  else:
+    print("%-32s %8.4f s, %10.0f frames/s, speedup %7.1f" %
+          (name, duration, framesPerSecond, referenceTime / duration))
+  return duration
+# -----------------------------------------------------------------------------
+def readFramesDirectly(fileName):
+  """reads one NCTRS data unit per tick with read() calls"""
+  replayFile = open(fileName, "rb")
+  for i in range(FRAME_COUNT):
+    tmDu = GRND.NCTRS.readNCTRSframe(replayFile)
+    CS.FRAMEmodel.s_frameModel.receiveTMframe(tmDu.getFrame())
+    UTIL.TASK.s_processingTask.notifyGUItask("UPDATE_REPLAY_NR")
+  replayFile.close()
+# -----------------------------------------------------------------------------
+def replayFrames(fileName):
+  """replays the file as fast as possible"""
+  frameReplayer = CS.FRAMErply.FrameReplayer()
+  frameReplayer.startReplay(fileName, 0,
+                            CS.FRAMErply.REPLAY_AS_FAST_AS_POSSIBLE)
+  UTIL.TASK.s_processingTask.run()
+
+########
+# main #
+########
+if __name__ == "__main__":
+  UTIL.SYS.s_configuration.setDefaults([
+    ["NCTRS_TM_DU_VERSION", "V1_CDS3"]])
+  UTIL.TASK.s_processingTask = ProcessingTask()
+  frame = CCSDS.FRAME.TMframe(bytes(FRAME_SIZE)).getBuffer()
+  recordDir = tempfile.mkdtemp()
+  try:
+    fileName = os.path.join(recordDir, "frames.nctrs")
+    frameRecorder = GRND.FRAMEREC.FrameRecorder(
+      fileName, "NCTRS", GRND.NCTRS.NCTRStmFields())
+    for i in range(FRAME_COUNT):
+      frameRecorder.pushFrame(frame, START_TIME + i)
+    frameRecorder.close()
+    print("replay of %d NCTRS frames with %d bytes:" % (FRAME_COUNT, FRAME_SIZE))
+    referenceTime = measure("read() per frame",
+      lambda: readFramesDirectly(fileName))
+    measure("mmap batches, recorder index",
+      lambda: replayFrames(fileName),
+      referenceTime)
+    os.remove(fileName + GRND.FRAMEREC.INDEX_FILE_EXTENSION)
+    CS.FRAMErply.s_frameIndexes.clear()
+    measure("mmap batches, scanned index",
+      lambda: replayFrames(fileName),
+      referenceTime)
+    measure("mmap batches, cached index",
+      lambda: replayFrames(fileName),
+      referenceTime)
+  finally:
+    shutil.rmtree(recordDir)
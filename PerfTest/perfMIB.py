@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+#******************************************************************************
+# (C) 2019, Stefan Korner, Austria                                            *
+#                                                                             *
+# The Space Python Library is free software; you can redistribute it and/or   *
+# modify it under under the terms of the MIT License as published by the      *
+# Massachusetts Institute of Technology.                                      *
+#                                                                             *
+# The Space Python Library is distributed in the hope that it will be useful, *
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              *
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the MIT License    *
+# for more details.                                                           *
+#******************************************************************************
+# Performance Tests - reading of SCOS MIB tables                              *
+#******************************************************************************
+import os, shutil, tempfile, time
+import SCOS.ENV, SCOS.MIB
+
+#############
+# constants #
+#############
+PKT_COUNT = 10000
+PARAM_COUNT = 50000
+# rows per table, fields without the line break
+TABLE_ROWS = {
+  "pid.dat": (PKT_COUNT, lambda i: "3\t25\t1234\t%d\t0\t%d\tpacket %d\t\t-1\t12\tY\t\tY\t1\tN\t" % (i, 20000 + i, i)),
+  "pic.dat": (1, lambda i: "3\t25\t0\t8\t-1\t0\t1234"),
+  "tpcf.dat": (PKT_COUNT, lambda i: "%d\tPKT%d\t64" % (20000 + i, i)),
+  "pcf.dat": (PARAM_COUNT, lambda i: "PAR%d\tParameter %d\t\t\t3\t14\t1\t\t\tN\tR\t\tF\tN\t0\t\t1234\t1\tR\tY\t\t0\tB" % (i, i)),
+  "plf.dat": (PARAM_COUNT * 2, lambda i: "PAR%d\t%d\t%d\t0\t1\t0\t0\t1" % (i // 2, 20000 + i % PKT_COUNT, 16 + (i % 12) * 4)),
+  "vpd.dat": (PARAM_COUNT // 2, lambda i: "%d\t%d\tPAR%d\t0\t0\tN\tN\tPAR\t5\tL\tN\t0\tN\t0" % (20000 + i // 25, i % 25, i)),
+  "ccf.dat": (PKT_COUNT, lambda i: "CMD%d\tCommand %d\t\tR\t\t\t8\t1\t1234\t4\t\t\t\t" % (i, i)),
+  "cpc.dat": (PARAM_COUNT // 2, lambda i: "CPAR%d\tParameter %d\t3\t14\t\tR\t\t\t\t\t\t\t0\t\t" % (i, i)),
+  "cdf.dat": (PARAM_COUNT * 2, lambda i: "CMD%d\tE\tParameter %d\t32\t%d\t0\tCPAR%d\tR\t0\t" % (i % PKT_COUNT, i, (i // PKT_COUNT) * 32, i % (PARAM_COUNT // 2)))}
+
+#############
+# functions #
+#############
+# -----------------------------------------------------------------------------
+def createMIB(runtimeRoot):
+  """creates big MIB tables in runtimeRoot/data/ASCII"""
+  mibDir = runtimeRoot + "/data/ASCII"
+  os.makedirs(mibDir)
+  for tableName, (rowCount, createRow) in TABLE_ROWS.items():
+    tableFile = open(mibDir + "/" + tableName, "w")
+    for i in range(rowCount):
+      tableFile.write(createRow(i) + "\n")
+    tableFile.close()
+# -----------------------------------------------------------------------------
+def measure(name, function, referenceTime=None):
+  """measures the reading of all tables, returns the duration"""
+  startTime = time.perf_counter()
+  tableMaps = function()
+  duration = time.perf_counter() - startTime
+  recordCount = 0
+  for tableMap in tableMaps.values():
+    recordCount += len(tableMap)
+  message = "%-32s %8.3f s for %d keys" % (name, duration, recordCount)
+  if referenceTime != None:
+    message += " (%.1fx)" % (referenceTime / duration)
+  print(message)
+  return duration
+
+########
+# main #
+########
+if __name__ == "__main__":
+  runtimeRoot = tempfile.mkdtemp()
+  try:
+    createMIB(runtimeRoot)
+    SCOS.ENV.s_environment.runtimeRoot = runtimeRoot
+    tableNames = SCOS.MIB.TABLE_NAMES
+    referenceTime = measure("serial", lambda: SCOS.MIB.readTables(tableNames, parallel=False))
+    measure("worker processes (%d CPUs)" % os.cpu_count(),
+            lambda: SCOS.MIB.readTables(tableNames, parallel=True),
+            referenceTime)
+  finally:
+    shutil.rmtree(runtimeRoot)
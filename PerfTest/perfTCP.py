@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+#******************************************************************************
+# (C) 2019, Stefan Korner, Austria                                            *
+#                                                                             *
+# The Space Python Library is free software; you can redistribute it and/or   *
+# modify it under under the terms of the MIT License as published by the      *
+# Massachusetts Institute of Technology.                                      *
+#                                                                             *
+# The Space Python Library is distributed in the hope that it will be useful, *
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              *
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the MIT License    *
+# for more details.                                                           *
+#******************************************************************************
+# Performance Tests - decoding of data unit streams                           *
+#******************************************************************************
+import random, socket, threading, time
+from UTIL.DU import UNSIGNED
+import UTIL.TCP
+
+#############
+# constants #
+#############
+DU_COUNT = 20000
+HEADER_BYTE_SIZE = 8
+# NCTRS like header: packetSize = size of the whole data unit
+SIZE_FIELD_ATTRIBUTE = (0, 4, UNSIGNED)
+
+#############
+# functions #
+#############
+# -----------------------------------------------------------------------------
+def createStream():
+  """creates a byte stream of data units with random sizes"""
+  stream = bytearray()
+  for i in range(DU_COUNT):
+    dataUnitSize = random.randrange(HEADER_BYTE_SIZE + 1, 1200)
+    stream += dataUnitSize.to_bytes(4, "big")
+    stream += bytes([i % 256]) * (dataUnitSize - 4)
+  return stream
+# -----------------------------------------------------------------------------
+def decodeChunks(stream, chunkSize):
+  """feeds the stream in chunks into a decoder, returns the nr of DUs"""
+  decoder = UTIL.TCP.DataUnitDecoder(HEADER_BYTE_SIZE, SIZE_FIELD_ATTRIBUTE)
+  dataUnitCount = 0
+  with memoryview(stream) as streamView:
+    for pos in range(0, len(stream), chunkSize):
+      decoder.feed(streamView[pos:pos + chunkSize])
+      dataUnitCount += len(decoder.decode())
+  return dataUnitCount
+# -----------------------------------------------------------------------------
+def sendStream(dataSocket, stream):
+  """sends the stream in a background thread"""
+  sender = threading.Thread(target=dataSocket.sendall, args=(stream,))
+  sender.start()
+  return sender
+# -----------------------------------------------------------------------------
+def recvTwoReads(dataSocket):
+  """reads header and remaining data unit with 2 blocking recv calls"""
+  dataUnitCount = 0
+  while dataUnitCount < DU_COUNT:
+    header = dataSocket.recv(HEADER_BYTE_SIZE, socket.MSG_WAITALL)
+    dataUnitSize = int.from_bytes(header[0:4], "big")
+    dataSocket.recv(dataUnitSize - HEADER_BYTE_SIZE, socket.MSG_WAITALL)
+    dataUnitCount += 1
+  return dataUnitCount
+# -----------------------------------------------------------------------------
+def recvDecoder(dataSocket):
+  """reads with recv_into and decodes zero, one or many data units per read"""
+  decoder = UTIL.TCP.DataUnitDecoder(HEADER_BYTE_SIZE, SIZE_FIELD_ATTRIBUTE)
+  dataUnitCount = 0
+  while dataUnitCount < DU_COUNT:
+    decoder.recvFrom(dataSocket)
+    dataUnitCount += len(decoder.decode())
+  return dataUnitCount
+# -----------------------------------------------------------------------------
+def measure(name, function, referenceTime=None):
+  """measures the decoding of all data units, returns the duration"""
+  startTime = time.perf_counter()
+  dataUnitCount = function()
+  duration = time.perf_counter() - startTime
+  dataUnitsPerSecond = dataUnitCount / duration
+  if referenceTime == None:
+    print("%-16s %8.4f s, %10.0f DUs/s" % (name, duration, dataUnitsPerSecond))
+  else:
+    print("%-16s %8.4f s, %10.0f DUs/s, speedup %7.1f" %
+          (name, duration, dataUnitsPerSecond, referenceTime / duration))
+  return duration
+# -----------------------------------------------------------------------------
+def measureSocket(name, recvFunction, stream, referenceTime=None):
+  """measures the reception of the stream over a socket pair"""
+  senderSocket, receiverSocket = socket.socketpair()
+  sender = sendStream(senderSocket, stream)
+  duration = measure(name, lambda: recvFunction(receiverSocket), referenceTime)
+  sender.join()
+  senderSocket.close()
+  receiverSocket.close()
+  return duration
+
+########
+# main #
+########
+if __name__ == "__main__":
+  random.seed(4711)
+  stream = createStream()
+  print("decoding of %d data units, %d bytes:" % (DU_COUNT, len(stream)))
+  fragmentedTime = measure("fragmented 64", lambda: decodeChunks(stream, 64))
+  measure("fragmented 1000", lambda: decodeChunks(stream, 1000), fragmentedTime)
+  measure("coalesced 65536", lambda: decodeChunks(stream, 65536), fragmentedTime)
+  twoReadsTime = measureSocket("socket 2 recvs", recvTwoReads, stream)
+  measureSocket("socket decoder", recvDecoder, stream, twoReadsTime)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+#******************************************************************************
+# (C) 2019, Stefan Korner, Austria                                            *
+#                                                                             *
+# The Space Python Library is free software; you can redistribute it and/or   *
+# modify it under under the terms of the MIT License as published by the      *
+# Massachusetts Institute of Technology.                                      *
+#                                                                             *
+# The Space Python Library is distributed in the hope that it will be useful, *
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              *
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the MIT License    *
+# for more details.                                                           *
+#******************************************************************************
+# Performance Tests - CCSDS time encoding and decoding                        *
+#******************************************************************************
+import array, time
+import CCSDS.DU, CCSDS.TIME
+from UTIL.DU import BinaryUnit
+
+#############
+# constants #
+#############
+TIME_COUNT = 50000
+TIME_FORMATS = [CCSDS.TIME.TIME_FORMAT_CDS2, CCSDS.TIME.TIME_FORMAT_CUC4]
+# legacy encoding via a temporary data unit
+LEGACY_ATTRIBUTES = {
+  CCSDS.TIME.TIME_FORMAT_CDS2: CCSDS.TIME.CDS2_TIME_ATTRIBUTES,
+  CCSDS.TIME.TIME_FORMAT_CUC4: CCSDS.TIME.CUC4_TIME_ATTRIBUTES}
+
+#############
+# functions #
+#############
+# -----------------------------------------------------------------------------
+def setTimeLegacy(dataUnit, bytePos, timeFormat, pyTime):
+  """reference: temporary data unit with attribute access, copied into du"""
+  byteSize = CCSDS.TIME.byteArraySize(timeFormat)
+  timeDU = BinaryUnit("\0" * byteSize, byteSize, LEGACY_ATTRIBUTES[timeFormat])
+  if timeFormat == CCSDS.TIME.TIME_FORMAT_CDS2:
+    days, mils, mics = CCSDS.TIME.encodeCDS2(pyTime)
+    timeDU.days = days
+    timeDU.mils = mils
+    timeDU.mics = mics
+  else:
+    coarse, fine = CCSDS.TIME.encodeCUC4(pyTime)
+    timeDU.coarse = coarse
+    timeDU.fine = fine
+  dataUnit.setBytes(bytePos, byteSize, timeDU.getBuffer())
+# -----------------------------------------------------------------------------
+def getTimeLegacy(dataUnit, bytePos, timeFormat):
+  """reference: temporary data unit with attribute access"""
+  byteSize = CCSDS.TIME.byteArraySize(timeFormat)
+  timeDU = CCSDS.TIME.createCCSDS(dataUnit.getBytes(bytePos, byteSize), timeFormat)
+  return CCSDS.TIME.convertFromCCSDS(timeDU, timeFormat)
+# -----------------------------------------------------------------------------
+def measure(name, function, referenceTime=None):
+  """measures the processing of all times, returns the duration"""
+  startTime = time.perf_counter()
+  function()
+  duration = time.perf_counter() - startTime
+  timesPerSecond = TIME_COUNT / duration
+  if referenceTime == None:
+    print("%-20s %8.4f s, %10.0f times/s" % (name, duration, timesPerSecond))
+  else:
+    print("%-20s %8.4f s, %10.0f times/s, speedup %7.1f" %
+          (name, duration, timesPerSecond, referenceTime / duration))
+  return duration
+
+########
+# main #
+########
+if __name__ == "__main__":
+  pyTimes = [1234567.0 + i * 0.0123 for i in range(TIME_COUNT)]
+  for timeFormat in TIME_FORMATS:
+    print("%s:" % CCSDS.TIME.timeFormatStr(timeFormat))
+    dataUnit = CCSDS.DU.DataUnit(array.array("B", [0] * 32))
+    referenceTime = measure("legacy setTime",
+                            lambda: [setTimeLegacy(dataUnit, 10, timeFormat, pyTime) for pyTime in pyTimes])
+    measure("setTime",
+            lambda: [dataUnit.setTime(10, timeFormat, pyTime) for pyTime in pyTimes],
+            referenceTime)
+    referenceTime = measure("legacy getTime",
+                            lambda: [getTimeLegacy(dataUnit, 10, timeFormat) for pyTime in pyTimes])
+    measure("getTime",
+            lambda: [dataUnit.getTime(10, timeFormat) for pyTime in pyTimes],
+            referenceTime)
+    timeColumn = bytearray(CCSDS.TIME.byteArraySize(timeFormat) * TIME_COUNT)
+    for i, pyTime in enumerate(pyTimes):
+      CCSDS.TIME.encodeTime(timeColumn, i * CCSDS.TIME.byteArraySize(timeFormat), timeFormat, pyTime)
+    measure("decodeTimeColumn",
+            lambda: CCSDS.TIME.decodeTimeColumn(timeColumn, timeFormat),
+            referenceTime)
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+#******************************************************************************
+# (C) 2020, Stefan Korner, Austria                                            *
+#                                                                             *
+# The Space Python Library is free software; you can redistribute it and/or   *
+# modify it under under the terms of the MIT License as published by the      *
+# Massachusetts Institute of Technology.                                      *
+#                                                                             *
+# The Space Python Library is distributed in the hope that it will be useful, *
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              *
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the MIT License    *
+# for more details.                                                           *
+#******************************************************************************
+# Performance Tests - recording and reading of TM packets                     *
+#******************************************************************************
+import os, shutil, tempfile, time
+import CCSDS.PACKET
+import SUPP.TMARCHIVE
+import UTIL.TIME
+
+#############
+# constants #
+#############
+PACKET_COUNT = 50000
+PACKET_SIZES = [100, 250, 40, 600, 1200]
+START_TIME = 1600000000.0
+
+#############
+# functions #
+#############
+# -----------------------------------------------------------------------------
+def measure(name, function, referenceTime=None):
+  """measures the processing of PACKET_COUNT packets, returns the duration"""
+  startTime = time.perf_counter()
+  function()
+  duration = time.perf_counter() - startTime
+  packetsPerSecond = PACKET_COUNT / duration
+  if referenceTime == None:
+    print("%-28s %8.4f s, %10.0f packets/s" % (name, duration, packetsPerSecond))
+  else:
+    print("%-28s %8.4f s, %10.0f packets/s, speedup %7.1f" %
+          (name, duration, packetsPerSecond, referenceTime / duration))
+  return duration
+# -----------------------------------------------------------------------------
+def writeHexFile(fileName, binPackets):
+  """records the packets like the former hex text recorder"""
+  tmPacketsFile = open(fileName, "w")
+  for i in range(PACKET_COUNT):
+    tmPacketsFile.write("# packet " + str(i + 1) + "\n")
+    tmPacketsFile.write(UTIL.TIME.getASDtimeStr(START_TIME + i) + "\n")
+    for byte in binPackets[i % len(binPackets)]:
+      tmPacketsFile.write("%02X" % byte)
+    tmPacketsFile.write("\n")
+  tmPacketsFile.close()
+# -----------------------------------------------------------------------------
+def readHexFile(fileName):
+  """parses the packets from a hex text file"""
+  tmPacketsFile = open(fileName)
+  for line in tmPacketsFile:
+    if line[0] == "#":
+      continue
+    line = line.strip()
+    if len(line.split(".")) == 6:
+      ert = UTIL.TIME.getTimeFromASDstr(line)
+    else:
+      binPacket = bytes.fromhex(line)
+  tmPacketsFile.close()
+# -----------------------------------------------------------------------------
+def writeArchive(archiveDir, binPackets):
+  """records the packets into a TM archive"""
+  archiveWriter = SUPP.TMARCHIVE.ArchiveWriter(archiveDir)
+  for i in range(PACKET_COUNT):
+    archiveWriter.pushPacket(binPackets[i % len(binPackets)], START_TIME + i)
+  archiveWriter.close()
+# -----------------------------------------------------------------------------
+def readArchive(archiveDir, **selection):
+  """reads the (selected) packets from a TM archive"""
+  archiveReader = SUPP.TMARCHIVE.ArchiveReader(archiveDir)
+  for ert, apid, spid, ssc, binPacket in archiveReader.readPackets(**selection):
+    pass
+  archiveReader.close()
+# -----------------------------------------------------------------------------
+def getSize(path):
+  """file size or summed up size of the files in a directory"""
+  if os.path.isdir(path):
+    return sum([os.path.getsize(os.path.join(path, fileName))
+                for fileName in os.listdir(path)])
+  return os.path.getsize(path)
+
+########
+# main #
+########
+if __name__ == "__main__":
+  binPackets = []
+  for i, packetSize in enumerate(PACKET_SIZES):
+    tmPacket = CCSDS.PACKET.createIdlePacket(packetSize)
+    tmPacket.applicationProcessId = 1000 + i
+    binPackets.append(tmPacket.getBuffer())
+  workDir = tempfile.mkdtemp()
+  try:
+    hexFileName = os.path.join(workDir, "packets.hex")
+    archiveDir = os.path.join(workDir, "archive")
+    print("recording of %d packets:" % PACKET_COUNT)
+    referenceTime = measure("hex text file",
+      lambda: writeHexFile(hexFileName, binPackets))
+    measure("binary archive",
+      lambda: writeArchive(archiveDir, binPackets),
+      referenceTime)
+    print("size: hex text file %d bytes, binary archive %d bytes" %
+          (getSize(hexFileName), getSize(archiveDir)))
+    print("reading of %d packets:" % PACKET_COUNT)
+    referenceTime = measure("hex text file",
+      lambda: readHexFile(hexFileName))
+    measure("binary archive",
+      lambda: readArchive(archiveDir),
+      referenceTime)
+    measure("binary archive, 1 hour",
+      lambda: readArchive(archiveDir, startTime=START_TIME + 7200,
+                                      stopTime=START_TIME + 10800),
+      referenceTime)
+    measure("binary archive, 1 APID",
+      lambda: readArchive(archiveDir, apids=[1000]),
+      referenceTime)
+  finally:
+    shutil.rmtree(workDir)
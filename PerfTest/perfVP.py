@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+#******************************************************************************
+# (C) 2019, Stefan Korner, Austria                                            *
+#                                                                             *
+# The Space Python Library is free software; you can redistribute it and/or   *
+# modify it under under the terms of the MIT License as published by the      *
+# Massachusetts Institute of Technology.                                      *
+#                                                                             *
+# The Space Python Library is distributed in the hope that it will be useful, *
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              *
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the MIT License    *
+# for more details.                                                           *
+#******************************************************************************
+# Performance Tests - compiled codec of variable packet structures            *
+#******************************************************************************
+import time
+import PUS.VP, UTIL.DU
+
+#############
+# constants #
+#############
+REPEAT = 20
+# list entries on each nesting level
+LIST_LENGTHS = (10, 10, 10)
+
+#############
+# functions #
+#############
+# -----------------------------------------------------------------------------
+def createSlotDef(slotName, paramType, bitWidth, defaultValue):
+  """slot with a simple parameter"""
+  return PUS.VP.SlotDef(slotName,
+    PUS.VP.SimpleParamDef(slotName, paramType, bitWidth, defaultValue, False))
+# -----------------------------------------------------------------------------
+def createStructDef(level=0):
+  """struct with fixed size parameters and a nested list per level"""
+  slotDefs = [
+    createSlotDef("flags" + str(level), UTIL.DU.BITS, 4, 5),
+    createSlotDef("mode" + str(level), UTIL.DU.BITS, 4, 3),
+    createSlotDef("count" + str(level), UTIL.DU.UNSIGNED, 16, 1234),
+    createSlotDef("offset" + str(level), UTIL.DU.SIGNED, 32, -42),
+    createSlotDef("value" + str(level), UTIL.DU.FLOAT, 64, 3.25)]
+  if level < len(LIST_LENGTHS):
+    lenParamDef = PUS.VP.SimpleParamDef("len" + str(level),
+                                        UTIL.DU.UNSIGNED,
+                                        16,
+                                        LIST_LENGTHS[level],
+                                        False)
+    slotDefs.append(PUS.VP.SlotDef("list" + str(level),
+      PUS.VP.ListDef(lenParamDef, createStructDef(level + 1))))
+  return PUS.VP.StructDef("", slotDefs)
+# -----------------------------------------------------------------------------
+def measure(name, structDef, du, referenceTime=None, lazy=False):
+  """measures encoding and decoding, returns the duration"""
+  struct = PUS.VP.Struct(structDef)
+  dStruct = PUS.VP.Struct(structDef)
+  startTime = time.perf_counter()
+  for i in range(REPEAT):
+    struct.encode(du, 0)
+    dStruct.decode(du, 0, lazy)
+  duration = time.perf_counter() - startTime
+  message = "%-32s %8.3f s for %d encodings/decodings" % (name, duration, REPEAT)
+  if referenceTime != None:
+    message += " (%.1fx)" % (referenceTime / duration)
+  print(message)
+  return duration
+
+########
+# main #
+########
+if __name__ == "__main__":
+  structDef = createStructDef()
+  du = UTIL.DU.BinaryUnit()
+  du.setLen(PUS.VP.Struct(structDef).getBitWidth() >> 3)
+  print("struct size: %d bytes" % len(du))
+  PUS.VP.COMPILED_CODECS = False
+  referenceTime = measure("interpretive", structDef, du)
+  PUS.VP.COMPILED_CODECS = True
+  measure("compiled codec", structDef, du, referenceTime)
+  measure("compiled codec, lazy decode", structDef, du, referenceTime, lazy=True)
@@ -62,6 +62,7 @@ SYS_CONFIGURATION = [
   ["OBT_MISSION_EPOCH_STR", UTIL.TCO.UNIX_MISSION_EPOCH_STR],
   ["OBT_LEAP_SECONDS", "0"],
   ["SYS_COLOR_LOG", "1"],
+  ["SYS_LOG_LEVEL", "LOG"],
   ["SYS_APP_MNEMO", "SCOE"],
   ["SYS_APP_NAME", "Special Checkout Equipment"],
   ["SYS_APP_VERSION", "3.2"],
@@ -99,6 +100,8 @@ class ModelTask(UTIL.TASK.ProcessingTask):
       retStatus = self.quitCmd(argv)
     elif (cmd == "U") or (cmd == "DUMPCONFIGURATION"):
       retStatus = self.dumpConfigurationCmd(argv)
+    elif (cmd == "LL") or (cmd == "LOGLEVEL"):
+      retStatus = self.logLevelCmd(argv)
     elif (cmd == "AA") or (cmd == "EGSEENABLEACK1"):
       retStatus = self.egseEnableAck1Cmd(argv)
     elif (cmd == "NA") or (cmd == "EGSEENABLENAK1"):
@@ -174,6 +177,7 @@ class ModelTask(UTIL.TASK.ProcessingTask):
     LOG("h  | help ...............provides this information", "EGSE")
     LOG("q  | quit ...............terminates SIM application", "EGSE")
     LOG("u  | dumpConfiguration...dumps the configuration", "EGSE")
+    LOG("ll | logLevel [<level> [<subsystem>]] sets/shows the log thresholds", "EGSE")
     LOG("aa | egseEnableAck1......enables autom. sending of ACK1 for TCs", "EGSE")
     LOG("na | egseEnableNak1......enables autom. sending of NAK1 for TCs", "EGSE")
     LOG("da | egseDisableAck1.....disables autom. sending of ACK1 for TCs", "EGSE")
@@ -186,6 +190,7 @@ class ModelTask(UTIL.TASK.ProcessingTask):
     LOG("h  | help ...............provides this information", "SPACE")
     LOG("q  | quit ...............terminates SIM application", "SPACE")
     LOG("u  | dumpConfiguration...dumps the configuration", "SPACE")
+    LOG("ll | logLevel [<level> [<subsystem>]] sets/shows the log thresholds", "SPACE")
     LOG("p  | setPacketData <pktMnemonic> [<params> <values>]", "SPACE")
     LOG("                         predefine data for the next TM packet", "SPACE")
     LOG("s  | sendPacket [<pktMnemonic> [<params> <values>]]", "SPACE")
@@ -736,7 +741,8 @@ def printUsage(launchScriptName):
   print(launchScriptName)
   print("\t[ -i | -interpreter | -c | -cmdprompt | -bg | -background ]")
   print("\t[ -n | -nogui ] [ -p <port> | -port <port> ]")
-  print("\t[ -l <logfile> | -logfile <logfile> ] [ -h | -help ]")
+  print("\t[ -l <logfile> | -logfile <logfile> ] [ -al | -asynclog ]")
+  print("\t[ -h | -help ]")
   print("")
 
 ########
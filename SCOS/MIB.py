@@ -13,14 +13,35 @@
 # SCOS - Mission Database (MIB) handling                                      *
 # implements (partly) egos-mcs-s2k-icd-0001-version69_signed.pdf              *
 #******************************************************************************
+import concurrent.futures, csv, multiprocessing, os
 import SCOS.ENV
 
+#############
+# constants #
+#############
+TABLE_NAMES = ["pid.dat", "pic.dat", "tpcf.dat", "pcf.dat", "plf.dat",
+               "vpd.dat", "ccf.dat", "cpc.dat", "cdf.dat"]
+# tables with multiple records per key
+MULTIPLE_KEYS_TABLE_NAMES = ["plf.dat", "vpd.dat", "cdf.dat"]
+
 ###########
 # classes #
 ###########
 # =============================================================================
-class PIDrecord:
+class MIBrecord(object):
+  """Base class of the MIB records"""
+  __slots__ = ()
+  # ---------------------------------------------------------------------------
+  def getValues(self):
+    """returns the attribute values in __slots__ order"""
+    return tuple([getattr(self, name) for name in self.__slots__])
+
+# =============================================================================
+class PIDrecord(MIBrecord):
   """MIB record from pid.dat"""
+  # only the used fields are stored, records have no __dict__
+  __slots__ = ("pidType", "pidSType", "pidAPID", "pidPI1", "pidPI2", "pidSPID",
+               "pidDescr", "pidTPSD", "pidDFHsize", "pidCheck")
   # ---------------------------------------------------------------------------
   def __init__(self, fields):
     """initialise selected attributes from the record"""
@@ -35,6 +56,12 @@ class PIDrecord:
     self.pidDFHsize = int(fields[9])
     self.pidCheck = bool(int((fields[13]+"0")[0]))
   # ---------------------------------------------------------------------------
+  def setValues(self, values):
+    """initialise the attributes from values in __slots__ order"""
+    (self.pidType, self.pidSType, self.pidAPID, self.pidPI1, self.pidPI2,
+     self.pidSPID, self.pidDescr, self.pidTPSD, self.pidDFHsize,
+     self.pidCheck) = values
+  # ---------------------------------------------------------------------------
   def key(self):
     """record key"""
     return self.pidSPID
@@ -48,8 +75,10 @@ class PIDrecord:
     return str([self.pidType, self.pidSType, -1])
 
 # =============================================================================
-class PICrecord:
+class PICrecord(MIBrecord):
   """MIB record from pic.dat"""
+  __slots__ = ("picType", "picSType", "picPI1off", "picPI1wid", "picPI2off",
+               "picPI2wid", "picAPID")
   # ---------------------------------------------------------------------------
   def __init__(self, fields):
     """initialise selected attributes from the record"""
@@ -70,13 +99,19 @@ class PICrecord:
       # SCOS 3.1
       self.picAPID = -1
   # ---------------------------------------------------------------------------
+  def setValues(self, values):
+    """initialise the attributes from values in __slots__ order"""
+    (self.picType, self.picSType, self.picPI1off, self.picPI1wid,
+     self.picPI2off, self.picPI2wid, self.picAPID) = values
+  # ---------------------------------------------------------------------------
   def key(self):
     """record key"""
     return str([self.picType, self.picSType, self.picAPID])
 
 # =============================================================================
-class TPCFrecord:
+class TPCFrecord(MIBrecord):
   """MIB record from pid.dat"""
+  __slots__ = ("tpcfSPID", "tpcfName", "tpcfSize")
   # ---------------------------------------------------------------------------
   def __init__(self, fields):
     """initialise selected attributes from the record"""
@@ -93,13 +128,18 @@ class TPCFrecord:
       # no optional field with length
       self.tpcfSize = 0
   # ---------------------------------------------------------------------------
+  def setValues(self, values):
+    """initialise the attributes from values in __slots__ order"""
+    (self.tpcfSPID, self.tpcfName, self.tpcfSize) = values
+  # ---------------------------------------------------------------------------
   def key(self):
     """record key"""
     return self.tpcfSPID
 
 # =============================================================================
-class PCFrecord:
+class PCFrecord(MIBrecord):
   """MIB record from pcf.dat"""
+  __slots__ = ("pcfName", "pcfDescr", "pcfPtc", "pcfPfc", "pcfParVal")
   # ---------------------------------------------------------------------------
   def __init__(self, fields):
     """initialise selected attributes from the record"""
@@ -109,13 +149,20 @@ class PCFrecord:
     self.pcfPfc = int(fields[5])
     self.pcfParVal = fields[15]
   # ---------------------------------------------------------------------------
+  def setValues(self, values):
+    """initialise the attributes from values in __slots__ order"""
+    (self.pcfName, self.pcfDescr, self.pcfPtc, self.pcfPfc,
+     self.pcfParVal) = values
+  # ---------------------------------------------------------------------------
   def key(self):
     """record key"""
     return self.pcfName
 
 # =============================================================================
-class PLFrecord:
+class PLFrecord(MIBrecord):
   """MIB record from plf.dat"""
+  __slots__ = ("plfName", "plfSPID", "plfOffby", "plfOffbi", "plfNbocc",
+               "plfLgocc")
   # ---------------------------------------------------------------------------
   def __init__(self, fields):
     """initialise selected attributes from the record"""
@@ -135,13 +182,20 @@ class PLFrecord:
     else:
       self.plfLgocc = int(plfLgocc)
   # ---------------------------------------------------------------------------
+  def setValues(self, values):
+    """initialise the attributes from values in __slots__ order"""
+    (self.plfName, self.plfSPID, self.plfOffby, self.plfOffbi, self.plfNbocc,
+     self.plfLgocc) = values
+  # ---------------------------------------------------------------------------
   def key(self):
     """record key"""
     return self.plfName
 
 # =============================================================================
-class VPDrecord:
+class VPDrecord(MIBrecord):
   """MIB record from vpd.dat"""
+  __slots__ = ("vpdTPSD", "vpdPos", "vpdName", "vpdGrpSize", "vpdFixRep",
+               "vpdDisDesc")
   # ---------------------------------------------------------------------------
   def __init__(self, fields):
     """initialise selected attributes from the record"""
@@ -157,13 +211,20 @@ class VPDrecord:
     self.vpdFixRep = fields[4]
     self.vpdDisDesc = fields[7]
   # ---------------------------------------------------------------------------
+  def setValues(self, values):
+    """initialise the attributes from values in __slots__ order"""
+    (self.vpdTPSD, self.vpdPos, self.vpdName, self.vpdGrpSize, self.vpdFixRep,
+     self.vpdDisDesc) = values
+  # ---------------------------------------------------------------------------
   def key(self):
     """record key"""
     return self.vpdTPSD
 
 # =============================================================================
-class CCFrecord:
+class CCFrecord(MIBrecord):
   """MIB record from ccf.dat"""
+  __slots__ = ("ccfCName", "ccfDescr", "ccfDescr2", "ccfCType", "ccfType",
+               "ccfSType", "ccfAPID", "ccfNPars")
   # ---------------------------------------------------------------------------
   def __init__(self, fields):
     """initialise selected attributes from the record"""
@@ -184,13 +245,19 @@ class CCFrecord:
     self.ccfAPID = int(fields[8])
     self.ccfNPars = int(fields[9])
   # ---------------------------------------------------------------------------
+  def setValues(self, values):
+    """initialise the attributes from values in __slots__ order"""
+    (self.ccfCName, self.ccfDescr, self.ccfDescr2, self.ccfCType, self.ccfType,
+     self.ccfSType, self.ccfAPID, self.ccfNPars) = values
+  # ---------------------------------------------------------------------------
   def key(self):
     """record key"""
     return self.ccfCName
 
 # =============================================================================
-class CPCrecord:
+class CPCrecord(MIBrecord):
   """MIB record from pcp.dat"""
+  __slots__ = ("cpcPName", "cpcDescr", "cpcPtc", "cpcPfc", "cpcDefVal")
   # ---------------------------------------------------------------------------
   def __init__(self, fields):
     """initialise selected attributes from the record"""
@@ -200,13 +267,20 @@ class CPCrecord:
     self.cpcPfc = int(fields[3])
     self.cpcDefVal = fields[12]
   # ---------------------------------------------------------------------------
+  def setValues(self, values):
+    """initialise the attributes from values in __slots__ order"""
+    (self.cpcPName, self.cpcDescr, self.cpcPtc, self.cpcPfc,
+     self.cpcDefVal) = values
+  # ---------------------------------------------------------------------------
   def key(self):
     """record key"""
     return self.cpcPName
 
 # =============================================================================
-class CDFrecord:
+class CDFrecord(MIBrecord):
   """MIB record from cdf.dat"""
+  __slots__ = ("cdfCName", "cdfElType", "cdfDescr", "cdfBit", "cdfGrpSize",
+               "cdfPName", "cdfValue")
   # ---------------------------------------------------------------------------
   def __init__(self, fields):
     """initialise selected attributes from the record"""
@@ -223,10 +297,27 @@ class CDFrecord:
     self.cdfPName = fields[6]
     self.cdfValue = fields[8]
   # ---------------------------------------------------------------------------
+  def setValues(self, values):
+    """initialise the attributes from values in __slots__ order"""
+    (self.cdfCName, self.cdfElType, self.cdfDescr, self.cdfBit,
+     self.cdfGrpSize, self.cdfPName, self.cdfValue) = values
+  # ---------------------------------------------------------------------------
   def key(self):
     """record key"""
     return self.cdfCName
 
+# record class per table name
+RECORD_CLASSES = {
+  "pid.dat": PIDrecord,
+  "pic.dat": PICrecord,
+  "tpcf.dat": TPCFrecord,
+  "pcf.dat": PCFrecord,
+  "plf.dat": PLFrecord,
+  "vpd.dat": VPDrecord,
+  "ccf.dat": CCFrecord,
+  "cpc.dat": CPCrecord,
+  "cdf.dat": CDFrecord}
+
 #############
 # functions #
 #############
@@ -256,72 +347,157 @@ def getMinFieldNr(tableName):
 # -----------------------------------------------------------------------------
 def createRecord(tableName, fields):
   """helper function: factory function"""
-  if tableName == "pid.dat":
-    return PIDrecord(fields)
-  if tableName == "pic.dat":
-    return PICrecord(fields)
-  if tableName == "tpcf.dat":
-    return TPCFrecord(fields)
-  if tableName == "pcf.dat":
-    return PCFrecord(fields)
-  if tableName == "plf.dat":
-    return PLFrecord(fields)
-  if tableName == "vpd.dat":
-    return VPDrecord(fields)
-  if tableName == "ccf.dat":
-    return CCFrecord(fields)
-  if tableName == "cpc.dat":
-    return CPCrecord(fields)
-  if tableName == "cdf.dat":
-    return CDFrecord(fields)
-  raise Exception("invalid table name: " + tableName)
+  if tableName not in RECORD_CLASSES:
+    raise Exception("invalid table name: " + tableName)
+  return RECORD_CLASSES[tableName](fields)
 
 # -----------------------------------------------------------------------------
 def readTable(tableName, uniqueKeys = True):
   """Reads a MIB table"""
+  mibDir = SCOS.ENV.s_environment.mibDir()
+  return readTableFile(mibDir + "/" + tableName, tableName, uniqueKeys)
+
+# -----------------------------------------------------------------------------
+def readTableFile(tableFileName, tableName, uniqueKeys):
+  """
+  Reads a MIB table file line by line, the tab separated fields are
+  split by the csv module and only the record objects are kept
+  """
   # getMinFieldNr raise an exception in case on an invalid table name
   # ---> used for consistency check
   # ---> the result value is used later on in this function
   minFieldNr = getMinFieldNr(tableName)
-  mibDir = SCOS.ENV.s_environment.mibDir()
-  tableFile = open(mibDir + "/" + tableName)
-  tableFileContents = tableFile.readlines()
-  tableFile.close()
+  recordClass = RECORD_CLASSES[tableName]
   tableMap = {}
-  lineNr = 1
-  for line in tableFileContents:
+  tableFile = open(tableFileName, newline="")
+  try:
+    tableReader = csv.reader(tableFile,
+                             delimiter="\t",
+                             quoting=csv.QUOTE_NONE,
+                             strict=False)
     try:
-      # tab separated table, remove line break
-      fields = line[:-1].split("\t")
-      if len(fields) < minFieldNr:
-        raise Exception(tableName + ": line " + str(lineNr) + " has wrong structure")
-      record = createRecord(tableName, fields)
-      key = record.key()
       if uniqueKeys:
-        if key in tableMap:
-          raise Exception(tableName + ": multiple records assigned for key " + str(key))
-        tableMap[key] = record
+        for fields in tableReader:
+          if len(fields) < minFieldNr:
+            raise Exception("has wrong structure")
+          record = recordClass(fields)
+          key = record.key()
+          if key in tableMap:
+            raise Exception("multiple records assigned for key " + str(key))
+          tableMap[key] = record
       else:
         # multiple keys allowed ---> use a list for all records with same key
-        if not key in tableMap:
-          # first record with this key
-          tableMap[key] = []
-        tableMap[key].append(record)
-      lineNr += 1
+        for fields in tableReader:
+          if len(fields) < minFieldNr:
+            raise Exception("has wrong structure")
+          record = recordClass(fields)
+          key = record.key()
+          if key in tableMap:
+            tableMap[key].append(record)
+          else:
+            # first record with this key
+            tableMap[key] = [record]
     except Exception as ex:
-      raise Exception(tableName + ": line " + str(lineNr) + ": " + str(ex))
+      raise Exception(tableName + ": line " + str(tableReader.line_num) + ": " + str(ex))
+  finally:
+    tableFile.close()
   return tableMap
 
 # -----------------------------------------------------------------------------
 def readAllTables():
   """Reads all MIB tables"""
-  pidMap = SCOS.MIB.readTable("pid.dat")
-  picMap = SCOS.MIB.readTable("pic.dat")
-  tpcfMap = SCOS.MIB.readTable("tpcf.dat")
-  pcfMap = SCOS.MIB.readTable("pcf.dat")
-  plfMap = SCOS.MIB.readTable("plf.dat", uniqueKeys=False)
-  vpdMap = SCOS.MIB.readTable("vpd.dat", uniqueKeys=False)
-  ccfMap = SCOS.MIB.readTable("ccf.dat")
-  cpcMap = SCOS.MIB.readTable("cpc.dat")
-  cdfMap = SCOS.MIB.readTable("cdf.dat", uniqueKeys=False)
-  return (pidMap, picMap, tpcfMap, pcfMap, plfMap, vpdMap, ccfMap, cpcMap, cdfMap)
+  tableMaps = readTables(TABLE_NAMES)
+  return tuple([tableMaps[tableName] for tableName in TABLE_NAMES])
+
+# -----------------------------------------------------------------------------
+def readTables(tableNames, parallel=False):
+  """
+  Reads the MIB tables, returns a map with the table maps per table name.
+  parallel: each table is read in a worker process, this only pays off
+            for big tables on several CPUs
+  """
+  mibDir = SCOS.ENV.s_environment.mibDir()
+  tableFileNames = {}
+  for tableName in tableNames:
+    tableFileNames[tableName] = mibDir + "/" + tableName
+  # the worker processes are forked: the applications have no main guard
+  if parallel and "fork" not in multiprocessing.get_all_start_methods():
+    parallel = False
+  tableMaps = {}
+  if not parallel:
+    for tableName in tableNames:
+      uniqueKeys = (tableName not in MULTIPLE_KEYS_TABLE_NAMES)
+      tableMaps[tableName] = readTableFile(tableFileNames[tableName], tableName, uniqueKeys)
+    return tableMaps
+  # the workers return record values, the records are created here
+  workerCount = min(len(tableNames), os.cpu_count() or 1)
+  executor = concurrent.futures.ProcessPoolExecutor(
+    max_workers=workerCount,
+    mp_context=multiprocessing.get_context("fork"))
+  try:
+    futureTableNames = {}
+    for tableName in tableNames:
+      uniqueKeys = (tableName not in MULTIPLE_KEYS_TABLE_NAMES)
+      future = executor.submit(readTableValues,
+                               tableFileNames[tableName],
+                               tableName,
+                               uniqueKeys)
+      futureTableNames[future] = tableName
+    for future in concurrent.futures.as_completed(futureTableNames):
+      tableName = futureTableNames[future]
+      uniqueKeys = (tableName not in MULTIPLE_KEYS_TABLE_NAMES)
+      tableMaps[tableName] = createRecords(tableName, future.result(), uniqueKeys)
+  finally:
+    executor.shutdown()
+  return tableMaps
+
+# -----------------------------------------------------------------------------
+def readTableValues(tableFileName, tableName, uniqueKeys):
+  """
+  Reads a MIB table file in a worker process of readTables, the record
+  values are returned because they are transferred much faster than records
+  """
+  tableMap = readTableFile(tableFileName, tableName, uniqueKeys)
+  if uniqueKeys:
+    for key, record in tableMap.items():
+      tableMap[key] = record.getValues()
+  else:
+    for key, records in tableMap.items():
+      tableMap[key] = [record.getValues() for record in records]
+  return tableMap
+
+# -----------------------------------------------------------------------------
+def createRecords(tableName, valueMap, uniqueKeys):
+  """Replaces the record values from readTableValues by records"""
+  recordClass = RECORD_CLASSES[tableName]
+  newRecord = recordClass.__new__
+  if uniqueKeys:
+    for key, values in valueMap.items():
+      record = newRecord(recordClass)
+      record.setValues(values)
+      valueMap[key] = record
+  else:
+    for key, valuesList in valueMap.items():
+      records = []
+      for values in valuesList:
+        record = newRecord(recordClass)
+        record.setValues(values)
+        records.append(record)
+      valueMap[key] = records
+  return valueMap
+
+# -----------------------------------------------------------------------------
+def getTableFingerprints():
+  """
+  Returns for each MIB table (size, mtime) of the table file,
+  or None when the table file is not present
+  """
+  mibDir = SCOS.ENV.s_environment.mibDir()
+  fingerprints = {}
+  for tableName in TABLE_NAMES:
+    try:
+      fileStat = os.stat(mibDir + "/" + tableName)
+      fingerprints[tableName] = (fileStat.st_size, fileStat.st_mtime_ns)
+    except OSError:
+      fingerprints[tableName] = None
+  return fingerprints
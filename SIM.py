@@ -58,8 +58,12 @@ SYS_CONFIGURATION = [
   ["TM_TT_TIME_FORMAT", "CUC4"],
   ["TM_TT_TIME_BYTE_OFFSET", "<<shall be passed as environment variable>>"],
   ["TM_RECORD_FORMAT", "CRYOSAT"],
+  ["TM_RECORD_FILE_SIZE", "0"],
+  ["TM_RECORD_FILE_PERIOD", "0"],
   ["TM_REPLAY_KEY", "SPID"],
   ["TM_VIRTUAL_CHANNEL_ID", "0"],
+  ["TM_VIRTUAL_CHANNEL_APIDS", ""],
+  ["TM_VIRTUAL_CHANNEL_SCHEDULING", "ROUND_ROBIN"],
   ["TM_TRANSFER_FRAME_SIZE", "1115"],
   ["TM_TRANSFER_FRAME_HAS_SEC_HDR", "0"],
   ["TM_TRANSFER_FRAME_HAS_N_PKTS", "1"],
@@ -70,6 +74,7 @@ SYS_CONFIGURATION = [
   ["ERT_MISSION_EPOCH_STR", UTIL.TCO.TAI_MISSION_EPOCH_STR],
   ["ERT_LEAP_SECONDS", str(UTIL.TCO.GPS_LEAP_SECONDS_2017)],
   ["SYS_COLOR_LOG", "1"],
+  ["SYS_LOG_LEVEL", "LOG"],
   ["SYS_APP_MNEMO", "SIM"],
   ["SYS_APP_NAME", "Simulator"],
   ["SYS_APP_VERSION", "3.2"],
@@ -107,6 +112,8 @@ class ModelTask(UTIL.TASK.ProcessingTask):
       retStatus = self.quitCmd(argv)
     elif (cmd == "U") or (cmd == "DUMPCONFIGURATION"):
       retStatus = self.dumpConfigurationCmd(argv)
+    elif (cmd == "LL") or (cmd == "LOGLEVEL"):
+      retStatus = self.logLevelCmd(argv)
     elif (cmd == "I") or (cmd == "INITIALISEAD"):
       retStatus = self.initialiseADcmd(argv)
     elif (cmd == "AA") or (cmd == "GRNDENABLEACK1"):
@@ -183,6 +190,8 @@ class ModelTask(UTIL.TASK.ProcessingTask):
       retStatus = self.listPacketsCmd(argv)
     elif (cmd == "G") or (cmd == "GENERATE"):
       retStatus = self.generateCmd(argv)
+    elif (cmd == "RD") or (cmd == "RELOADDEFINITIONS"):
+      retStatus = self.reloadDefinitionsCmd(argv)
     elif (cmd == "A5") or (cmd == "OBQENABLEACK1"):
       retStatus = self.obqEnableAck1Cmd(argv)
     elif (cmd == "N5") or (cmd == "OBQENABLENAK1"):
@@ -224,6 +233,7 @@ class ModelTask(UTIL.TASK.ProcessingTask):
     LOG("h  | help ...............provides this information", "GRND")
     LOG("q  | quit ...............terminates SIM application", "GRND")
     LOG("u  | dumpConfiguration...dumps the configuration", "GRND")
+    LOG("ll | logLevel [<level> [<subsystem>]] sets/shows the log thresholds", "GRND")
     LOG("i  | initialiseAD........initialise AD mode", "GRND")
     LOG("aa | grndEnableAck1......enables autom. sending of ACK1 for TCs", "GRND")
     LOG("na | grndEnableNak1......enables autom. sending of NAK1 for TCs", "GRND")
@@ -239,6 +249,7 @@ class ModelTask(UTIL.TASK.ProcessingTask):
     LOG("h | help ................provides this information", "LINK")
     LOG("q | quit ................terminates SIM application", "LINK")
     LOG("u | dumpConfiguration....dumps the configuration", "LINK")
+    LOG("ll | logLevel [<level> [<subsystem>]] sets/shows the log thresholds", "LINK")
     LOG("t | setCLCW <value>......set the CLCW report value", "LINK")
     LOG("f | enableTMflow.........enables continous TM frame flow", "LINK")
     LOG("n | disableTMflow........disables continous TM frame flow", "LINK")
@@ -252,6 +263,7 @@ class ModelTask(UTIL.TASK.ProcessingTask):
     LOG("h  | help ...............provides this information", "SPACE")
     LOG("q  | quit ...............terminates SIM application", "SPACE")
     LOG("u  | dumpConfiguration...dumps the configuration", "SPACE")
+    LOG("ll | logLevel [<level> [<subsystem>]] sets/shows the log thresholds", "SPACE")
     LOG("p  | setPacketData <pktMnemonic> [<params> <values>]", "SPACE")
     LOG("                         predefine data for the next TM packet", "SPACE")
     LOG("s  | sendPacket [<pktMnemonic> [<params> <values>]]", "SPACE")
@@ -271,17 +283,19 @@ class ModelTask(UTIL.TASK.ProcessingTask):
     LOG("n4 | obcEnableNak4.......enables autom. sending of NAK4 for TCs", "SPACE")
     LOG("d4 | obcDisableAck4......disables autom. sending of ACK4 for TCs", "SPACE")
     LOG("a  | sendAck <apid> <ssc> <stype> sends a TC acknowledgement", "SPACE")
-    LOG("rp | recordPackets <recordFile> records TM packets", "SPACE")
+    LOG("rp | recordPackets <archiveDir> records TM packets", "SPACE")
     LOG("sp | stopPacketRecorder..stops recording of TM packets", "SPACE")
     LOG("pp | replayPackets <replayFile> replays TM packets", "SPACE")
     LOG("l  | listPackets.........lists available packets", "SPACE")
     LOG("g  | generate............generates the testdata.sim file in testbin directory", "SPACE")
+    LOG("rd | reloadDefinitions...reloads the definitions of changed MIB tables", "SPACE")
     LOG_INFO("Available onboard queue commands:", "OBQ")
     LOG("", "OBQ")
     LOG("x  | exit ...............terminates client connection (only for TCP/IP clients)", "OBQ")
     LOG("h  | help ...............provides this information", "OBQ")
     LOG("q  | quit ...............terminates SIM application", "OBQ")
     LOG("u  | dumpConfiguration...dumps the configuration", "OBQ")
+    LOG("ll | logLevel [<level> [<subsystem>]] sets/shows the log thresholds", "OBQ")
     LOG("a5 | obqEnableAck1.......enables autom. sending of ACK1 for OBQ TCs", "OBQ")
     LOG("n5 | obqEnableNak1.......enables autom. sending of NAK1 for OBQ TCs", "OBQ")
     LOG("d5 | obqDisableAck1......disables autom. sending of ACK1 for OBQ TCs", "OBQ")
@@ -877,6 +891,25 @@ class ModelTask(UTIL.TASK.ProcessingTask):
       return False
     return True
   # ---------------------------------------------------------------------------
+  def reloadDefinitionsCmd(self, argv):
+    """Decoded reloadDefinitions command"""
+    self.logMethod("reloadDefinitionsCmd", "SPACE")
+    # consistency check
+    if len(argv) != 1:
+      LOG_WARNING("invalid parameters passed", "SPACE")
+      return False
+    # recreate the changed definitions, they are swapped in place
+    try:
+      changedParts = SUPP.IF.s_definitions.reloadDefinitions()
+      if len(changedParts) == 0:
+        LOG("definitions are up to date", "SPACE")
+      else:
+        LOG(", ".join(changedParts) + " reloaded", "SPACE")
+    except Exception as ex:
+      LOG_ERROR("Reload Error: " + str(ex), "SPACE")
+      return False
+    return True
+  # ---------------------------------------------------------------------------
   def obqEnableAck1Cmd(self, argv):
     """Decoded obqEnableAck1 command"""
     self.logMethod("obqEnableAck1Cmd", "OBQ")
@@ -1123,7 +1156,8 @@ def printUsage(launchScriptName):
   print(launchScriptName)
   print("\t[ -i | -interpreter | -c | -cmdprompt | -bg | -background ]")
   print("\t[ -n | -nogui ] [ -p <port> | -port <port> ]")
-  print("\t[ -l <logfile> | -logfile <logfile> ] [ -h | -help ]")
+  print("\t[ -l <logfile> | -logfile <logfile> ] [ -al | -asynclog ]")
+  print("\t[ -h | -help ]")
   print("")
 
 ########
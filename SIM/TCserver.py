@@ -31,6 +31,19 @@ class NCTRStcReceiver(GRND.NCTRS.TCreceiver):
   def __init__(self, portNr, groundstationId):
     """Initialise attributes only"""
     GRND.NCTRS.TCreceiver.__init__(self, portNr, groundstationId)
+    self.receivedCltus = None
+  # ---------------------------------------------------------------------------
+  def receiveCallback(self, socket, stateMask):
+    """Callback when the MCS has send data"""
+    # the CLTUs of all received data units are passed in one batch
+    self.receivedCltus = []
+    try:
+      GRND.NCTRS.TCreceiver.receiveCallback(self, socket, stateMask)
+    finally:
+      cltus = self.receivedCltus
+      self.receivedCltus = None
+      if len(cltus) > 0:
+        LINK.IF.s_spaceLink.pushTCcltus(cltus)
   # ---------------------------------------------------------------------------
   def clientAccepted(self):
     """hook for derived classes"""
@@ -77,7 +90,10 @@ class NCTRStcReceiver(GRND.NCTRS.TCreceiver):
   def notifyCltu(self, cltu):
     """CLTU received"""
     # delegate the CLTU processing from GROUND to SPACE
-    LINK.IF.s_spaceLink.pushTCcltu(cltu)
+    if self.receivedCltus == None:
+      LINK.IF.s_spaceLink.pushTCcltu(cltu)
+    else:
+      self.receivedCltus.append(cltu)
 
 ####################
 # global variables #
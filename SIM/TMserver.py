@@ -14,9 +14,9 @@
 #******************************************************************************
 import sys
 from UTIL.SYS import Error, LOG, LOG_INFO, LOG_WARNING, LOG_ERROR
-import GRND.CRYOSATDU, GRND.IF, GRND.NCTRS, GRND.NCTRSDU
+import GRND.FRAMEREC, GRND.IF, GRND.NCTRS
 import SPACE.OBC
-import UTIL.DU, UTIL.SYS, UTIL.TASK, UTIL.TCO, UTIL.TIME
+import UTIL.SYS, UTIL.TASK, UTIL.TIME
 
 ###########
 # classes #
@@ -46,120 +46,12 @@ class TMsender(GRND.NCTRS.TMsender, GRND.IF.TMmcsLink):
     consumes a telemetry frame:
     implementation of GROUND.IF.TMmcsLink.pushTMframe
     """
-    recordFile = GRND.IF.s_configuration.frameRecordFile
-    if recordFile:
+    frameRecorder = GRND.IF.s_configuration.frameRecorder
+    if frameRecorder != None:
       if ertUTC == None:
         ertUTC = UTIL.TIME.getActualTime()
-      recordFormat = GRND.IF.s_configuration.frameRecordFormat
-      try:
-        if recordFormat == "NCTRS" or \
-           recordFormat == "NCTRS_ASCII" or \
-           recordFormat == "NCTRS_ASCII_DETAILS":
-          LOG_INFO(GRND.IF.s_configuration.frameRecordFormat + " Frame recorded", "GRND")
-          # Prepare the TM frame for recording
-          ertTime = UTIL.TCO.correlateToERTmissionEpoch(ertUTC)
-          tmDu = GRND.NCTRS.createTMdataUnit()
-          tmDu.setFrame(tmFrameDu.getBuffer())
-          tmDu.spacecraftId = self.nctrsTMfields.spacecraftId
-          tmDu.dataStreamType = self.nctrsTMfields.dataStreamType
-          tmDu.virtualChannelId = self.nctrsTMfields.virtualChannelId
-          tmDu.routeId = self.nctrsTMfields.routeId
-          tmDu.earthReceptionTime = ertTime
-          tmDu.sequenceFlag = self.nctrsTMfields.sequenceFlag
-          tmDu.qualityFlag = self.nctrsTMfields.qualityFlag
-          # ensure a correct size attribute
-          tmDu.packetSize = len(tmDu)
-          # write the DU to file
-          if recordFormat == "NCTRS":
-            recordFile.write(tmDu.getBuffer())
-          else:
-            # NCTRS_ASCII or NCTRS_ASCII_DETAILS
-            recordFile.write("\n" + GRND.IF.s_configuration.frameRecordFormat + " Frame Header:")
-            if recordFormat == "NCTRS_ASCII_DETAILS":
-              recordFile.write("\ntmDu.packetSize = " + str(tmDu.packetSize))
-              recordFile.write("\ntmDu.spacecraftId = " + str(tmDu.spacecraftId))
-              recordFile.write("\ntmDu.dataStreamType = " + str(tmDu.dataStreamType))
-              recordFile.write("\ntmDu.virtualChannelId = " + str(tmDu.virtualChannelId))
-              recordFile.write("\ntmDu.routeId = " + str(tmDu.routeId))
-              ertTime = tmDu.earthReceptionTime
-              ertTimeStr = UTIL.TIME.getASDtimeStr(ertTime)
-              recordFile.write("\ntmDu.earthReceptionTime = " + ertTimeStr)
-              recordFile.write("\ntmDu.sequenceFlag = " + str(tmDu.sequenceFlag))
-              recordFile.write("\ntmDu.qualityFlag = " + str(tmDu.qualityFlag))
-            recordFile.write(UTIL.DU.array2str(tmDu.getBufferHeader()))
-            recordFile.write("\n" + GRND.IF.s_configuration.frameRecordFormat + " Frame Body:")
-            if recordFormat == "NCTRS_ASCII_DETAILS":
-              recordFile.write("\ntmFrameDu.versionNumber = " + str(tmFrameDu.versionNumber))
-              recordFile.write("\ntmFrameDu.spacecraftId = " + str(tmFrameDu.spacecraftId))
-              recordFile.write("\ntmFrameDu.virtualChannelId = " + str(tmFrameDu.virtualChannelId))
-              recordFile.write("\ntmFrameDu.operationalControlField = " + str(tmFrameDu.operationalControlField))
-              recordFile.write("\ntmFrameDu.masterChannelFrameCount = " + str(tmFrameDu.masterChannelFrameCount))
-              recordFile.write("\ntmFrameDu.virtualChannelFCountLow = " + str(tmFrameDu.virtualChannelFCountLow))
-              recordFile.write("\ntmFrameDu.secondaryHeaderFlag = " + str(tmFrameDu.secondaryHeaderFlag))
-              recordFile.write("\ntmFrameDu.synchronisationFlag = " + str(tmFrameDu.synchronisationFlag))
-              recordFile.write("\ntmFrameDu.packetOrderFlag = " + str(tmFrameDu.packetOrderFlag))
-              recordFile.write("\ntmFrameDu.segmentLengthId = " + str(tmFrameDu.segmentLengthId))
-              recordFile.write("\ntmFrameDu.firstHeaderPointer = " + str(tmFrameDu.firstHeaderPointer))
-              if tmFrameDu.secondaryHeaderFlag:
-                recordFile.write("\ntmFrameDu.secondaryHeaderVersionNr = " + str(tmFrameDu.secondaryHeaderVersionNr))
-                recordFile.write("\ntmFrameDu.secondaryHeaderSize = " + str(tmFrameDu.secondaryHeaderSize))
-                recordFile.write("\ntmFrameDu.virtualChannelFCountHigh = " + str(tmFrameDu.virtualChannelFCountHigh))
-            recordFile.write(UTIL.DU.array2str(tmDu.getBufferBody()))
-            recordFile.write("\n")
-          recordFile.flush()
-        elif recordFormat == "CRYOSAT" or \
-             recordFormat == "CRYOSAT_ASCII" or \
-             recordFormat == "CRYOSAT_ASCII_DETAILS":
-          LOG_INFO(GRND.IF.s_configuration.frameRecordFormat + " Frame recorded", "GRND")
-          # Prepare the TM frame for recording
-          tmDu = GRND.CRYOSATDU.TMframeDataUnit()
-          tmDu.setFrame(tmFrameDu.getBuffer())
-          ertTime = UTIL.TCO.correlateToERTmissionEpoch(ertUTC)
-          coarseTime = int(ertTime)
-          fineTime = int((ertTime - coarseTime) * 1000000)
-          tmDu.downlinkTimeSec = coarseTime
-          tmDu.downlinkTimeMicro = fineTime
-          tmDu.numberCorrSymbols = 0
-          tmDu.rsErorFlag = 0
-          tmDu.spare = 0
-          tmDu.padding = 0
-          # write the DU to file
-          if recordFormat == "CRYOSAT":
-            recordFile.write(tmDu.getBuffer())
-          else:
-            # CRYOSAT_ASCII or CRYOSAT_ASCII_DETAILS
-            recordFile.write("\n" + GRND.IF.s_configuration.frameRecordFormat + " Frame Header:")
-            if recordFormat == "CRYOSAT_ASCII_DETAILS":
-              recordFile.write("\ntmDu.downlinkTimeSec = " + str(tmDu.downlinkTimeSec))
-              recordFile.write("\ntmDu.downlinkTimeMicro = " + str(tmDu.downlinkTimeMicro))
-              recordFile.write("\ntmDu.numberCorrSymbols = " + str(tmDu.numberCorrSymbols))
-              recordFile.write("\ntmDu.rsErorFlag = " + str(tmDu.rsErorFlag))
-            recordFile.write(UTIL.DU.array2str(tmDu.getBufferHeader()))
-            recordFile.write("\n" + GRND.IF.s_configuration.frameRecordFormat + " Frame Body:")
-            if recordFormat == "CRYOSAT_ASCII_DETAILS":
-              recordFile.write("\ntmFrameDu.versionNumber = " + str(tmFrameDu.versionNumber))
-              recordFile.write("\ntmFrameDu.spacecraftId = " + str(tmFrameDu.spacecraftId))
-              recordFile.write("\ntmFrameDu.virtualChannelId = " + str(tmFrameDu.virtualChannelId))
-              recordFile.write("\ntmFrameDu.operationalControlField = " + str(tmFrameDu.operationalControlField))
-              recordFile.write("\ntmFrameDu.masterChannelFrameCount = " + str(tmFrameDu.masterChannelFrameCount))
-              recordFile.write("\ntmFrameDu.virtualChannelFCountLow = " + str(tmFrameDu.virtualChannelFCountLow))
-              recordFile.write("\ntmFrameDu.secondaryHeaderFlag = " + str(tmFrameDu.secondaryHeaderFlag))
-              recordFile.write("\ntmFrameDu.synchronisationFlag = " + str(tmFrameDu.synchronisationFlag))
-              recordFile.write("\ntmFrameDu.packetOrderFlag = " + str(tmFrameDu.packetOrderFlag))
-              recordFile.write("\ntmFrameDu.segmentLengthId = " + str(tmFrameDu.segmentLengthId))
-              recordFile.write("\ntmFrameDu.firstHeaderPointer = " + str(tmFrameDu.firstHeaderPointer))
-              if tmFrameDu.secondaryHeaderFlag:
-                recordFile.write("\ntmFrameDu.secondaryHeaderVersionNr = " + str(tmFrameDu.secondaryHeaderVersionNr))
-                recordFile.write("\ntmFrameDu.secondaryHeaderSize = " + str(tmFrameDu.secondaryHeaderSize))
-                recordFile.write("\ntmFrameDu.virtualChannelFCountHigh = " + str(tmFrameDu.virtualChannelFCountHigh))
-            recordFile.write(UTIL.DU.array2str(tmDu.getBufferBody()))
-            recordFile.write("\n")
-          recordFile.flush()
-        else:
-          LOG_ERROR("invalid FRAME_RECORD_FORMAT: " + recordFormat, "GRND")
-      except Exception as ex:
-        LOG_ERROR("cannot write to frame recording file", "GRND")
-        LOG(str(ex), "GRND")
+      # the data unit is created and written by the recorder thread
+      frameRecorder.pushFrame(tmFrameDu.getBuffer(), ertUTC)
     if GRND.IF.s_configuration.nctrsTMconn:
       self.sendFrame(tmFrameDu.getBuffer())
   # ---------------------------------------------------------------------------
@@ -170,17 +62,17 @@ class TMsender(GRND.NCTRS.TMsender, GRND.IF.TMmcsLink):
     """
     # open the TM frame recording file
     try:
-      recordFormat = GRND.IF.s_configuration.frameRecordFormat
-      if recordFormat == "NCTRS" or recordFormat == "CRYOSAT":
-        # recording file has binary format
-        recordingFile = open(recordFileName, "wb")
-      else:
-        # recording file has ASCII format
-        recordingFile = open(recordFileName, "w")
-    except:
-      LOG_ERROR("cannot open " + recordFileName, "GRND")
+      frameRecorder = GRND.FRAMEREC.FrameRecorder(
+        recordFileName,
+        GRND.IF.s_configuration.frameRecordFormat,
+        self.nctrsTMfields,
+        maxBytes=int(UTIL.SYS.s_configuration.TM_RECORD_FILE_SIZE),
+        filePeriod=int(UTIL.SYS.s_configuration.TM_RECORD_FILE_PERIOD))
+    except Exception as ex:
+      LOG_ERROR("cannot open " + recordFileName + ": " + str(ex), "GRND")
       return
-    GRND.IF.s_configuration.frameRecordFile = recordingFile
+    GRND.IF.s_configuration.frameRecorder = frameRecorder
+    GRND.IF.s_configuration.frameRecordFile = recordFileName
     # notify the GUI
     UTIL.TASK.s_processingTask.notifyGUItask("FRAME_REC_STARTED")
   # ---------------------------------------------------------------------------
@@ -189,9 +81,10 @@ class TMsender(GRND.NCTRS.TMsender, GRND.IF.TMmcsLink):
     stops TM frame recording:
     implementation of GROUND.IF.TMmcsLink.stopFrameRecorder
     """
-    # open the TM frame recording file
+    # close the TM frame recording file, ASCII formats are rendered
     try:
-      GRND.IF.s_configuration.frameRecordFile.close()
+      GRND.IF.s_configuration.frameRecorder.close()
+      GRND.IF.s_configuration.frameRecorder = None
       GRND.IF.s_configuration.frameRecordFile = None
     except:
       LOG_ERROR("cannot close frame recording file", "GRND")
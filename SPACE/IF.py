@@ -197,6 +197,13 @@ class TMpacketGenerator(object):
                   reuse=True):
     """creates a CCSDS TM packet with optional parameter values"""
     pass
+  # ---------------------------------------------------------------------------
+  def createTMpacket(self, tmPktDef):
+    """
+    creates a TM packet with the default values of the packet definition,
+    without side effects on the generated packet stream
+    """
+    pass
 
 # =============================================================================
 class TMpacketReplayer(object):
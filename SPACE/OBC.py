@@ -44,7 +44,7 @@ class OnboardComputerImpl(SPACE.IF.OnboardComputer):
     LOG("SSC =     " + str(tcPacketDu.sequenceControlCount), "SPACE")
     if tcPacketDu.dataFieldHeaderFlag == 1:
       # CCSDS packet is a PUS packet
-      object.__setattr__(tcPacketDu, "attributeMap2", PUS.PACKET.TC_PACKET_DATAFIELD_HEADER_ATTRIBUTES)
+      tcPacketDu.setAttributeMap2(PUS.PACKET.TC_PACKET_DATAFIELD_HEADER_ATTRIBUTES)
       LOG("TYPE =    " + str(tcPacketDu.serviceType), "SPACE")
       LOG("SUBTYPE = " + str(tcPacketDu.serviceSubType), "SPACE")
       # the existence of a CRC for PUS packets is mission dependant
@@ -160,9 +160,9 @@ class OnboardComputerImpl(SPACE.IF.OnboardComputer):
       LOG_ERROR("packet creation failed: SPID = " + str(spid), "SPACE")
       return False
     if tmPacketDu.dataFieldHeaderFlag:
-      LOG("PUS Packet:" + tmPacketDu.getDumpString(16), "SPACE")
+      LOG(lambda: "PUS Packet:" + tmPacketDu.getDumpString(16), "SPACE")
     else:
-      LOG("CCSDS Packet:" + tmPacketDu.getDumpString(16), "SPACE")
+      LOG(lambda: "CCSDS Packet:" + tmPacketDu.getDumpString(16), "SPACE")
     # send the TM packet
     return self.pushTMpacket(tmPacketDu, ertUTC)
   # ---------------------------------------------------------------------------
@@ -12,12 +12,23 @@
 #******************************************************************************
 # Space Simulation - Telemetry Packet Generator                               *
 #******************************************************************************
+import collections
 from UTIL.SYS import Error, LOG, LOG_INFO, LOG_WARNING, LOG_ERROR
 import CCSDS.DU, CCSDS.PACKET, CCSDS.TIME
 import PUS.PACKET, PUS.SERVICES
 import SPACE.IF
 import SUPP.IF
-import UTIL.SYS, UTIL.TCO, UTIL.TIME
+import UTIL.DU, UTIL.SYS, UTIL.TCO, UTIL.TIME
+
+#############
+# constants #
+#############
+# maximum number of cached populate plans
+POPULATE_PLAN_CACHE_SIZE = 1024
+# special parameters for PUS service 1 TC acknowledgements
+PUS_TYPE1_SETTERS = {
+  "PUS_TYPE1_APID": lambda packet, value: PUS.SERVICES.service1_setTCackAPID(packet, int(value)),
+  "PUS_TYPE1_SSC": lambda packet, value: PUS.SERVICES.service1_setTCackSSC(packet, int(value))}
 
 ###########
 # classes #
@@ -35,13 +46,66 @@ class TMpacketDefaults(object):
     # only applicable for PUS packets
     self.hasTmTT = (int(UTIL.SYS.s_configuration.TM_TT_TIME_BYTE_OFFSET) > 0)
 
+# =============================================================================
+class TMpopulatePlan(object):
+  """
+  Precompiled setters for the parameters of a TM packet,
+  compiled once per (SPID, parameter names)
+  """
+  # ---------------------------------------------------------------------------
+  def __init__(self, tmPktDef, paramNames):
+    """compiles a setter per parameter, None for unknown parameters"""
+    self.spid = tmPktDef.pktSPID
+    self.paramNames = paramNames
+    self.setters = []
+    for paramName in paramNames:
+      if paramName in PUS_TYPE1_SETTERS:
+        self.setters.append(PUS_TYPE1_SETTERS[paramName])
+        continue
+      paramExtraction = tmPktDef.getParamExtraction(paramName)
+      if paramExtraction == None:
+        self.setters.append(None)
+      else:
+        self.setters.append(self.compileSetter(paramExtraction))
+  # ---------------------------------------------------------------------------
+  def compileSetter(self, paramExtraction):
+    """returns a function setter(packet, value) for a parameter"""
+    bitPos = paramExtraction.bitPos
+    bitLength = paramExtraction.bitWidth
+    valueType = paramExtraction.valueType
+    if valueType == UTIL.DU.BITS or valueType == UTIL.DU.SBITS:
+      getter, setter = UTIL.DU.compileFieldAccessors(bitPos, bitLength, valueType)
+      return setter
+    bytePos = bitPos // 8
+    byteLength = bitLength // 8
+    if valueType == UTIL.DU.UNSIGNED or valueType == UTIL.DU.SIGNED or \
+       valueType == UTIL.DU.FLOAT:
+      getter, setter = UTIL.DU.compileFieldAccessors(bytePos, byteLength, valueType)
+      return setter
+    # TIME and other types are passed as string
+    # TODO: use specific encodings
+    def setter(packet, value):
+      packet.setString(bytePos, byteLength, value)
+    return setter
+  # ---------------------------------------------------------------------------
+  def populate(self, packet, paramValues):
+    """writes the values (same order as the parameter names) into packet"""
+    for setter, paramValue, paramName in zip(self.setters, paramValues, self.paramNames):
+      if setter == None:
+        LOG_WARNING("packet with SPID " + str(self.spid) + " does not have a parameter " + paramName, "SPACE")
+      else:
+        setter(packet, paramValue)
+
 # =============================================================================
 class TMpacketGeneratorImpl(SPACE.IF.TMpacketGenerator):
   """Implementation of the generator for telemetry packets"""
   # ---------------------------------------------------------------------------
-  def __init__(self):
+  def __init__(self, populatePlanCacheSize=POPULATE_PLAN_CACHE_SIZE):
     """default constructor"""
     self.packetCache = {}
+    # (SPID, parameter names) --> (TMpktDef, TMpopulatePlan), LRU ordered
+    self.populatePlans = collections.OrderedDict()
+    self.populatePlanCacheSize = populatePlanCacheSize
     self.sequenceCounters = {}
     self.packetDefaults = TMpacketDefaults()
   # ---------------------------------------------------------------------------
@@ -86,37 +150,15 @@ class TMpacketGeneratorImpl(SPACE.IF.TMpacketGenerator):
       raise Error("invalid SPID for packet creation: " + str(spid))
     binarySize = tmPktDef.pktSPsize
     applicationProcessId = tmPktDef.pktAPID
-    if reuse and spid in self.packetCache:
-      # reuse a packet with the same definition from the cache
-      packet = self.packetCache[spid]
+    cachedPktDef, packet = self.packetCache.get(spid, (None, None))
+    if reuse and cachedPktDef == tmPktDef:
+      # reuse a packet with the same definition from the cache,
+      # reloaded definitions are new objects and invalidate the entry
       packet.setLen(binarySize)
       packet.setPacketLength()
     else:
-      # create the TM packet
-      if tmPktDef.pktHasDFhdr:
-        # PUS packet
-        serviceType = tmPktDef.pktType
-        serviceSubType = tmPktDef.pktSType
-        packet = self.getTMpacketHelper(binarySize,
-                                        applicationProcessId,
-                                        serviceType,
-                                        serviceSubType)
-        # initialise PI1 and PI2 if configured
-        if tmPktDef.pktPI1val != None:
-          pi1BitPos = tmPktDef.pktPI1off * 8
-          pi1BitWidth = tmPktDef.pktPI1wid
-          pi1Value = tmPktDef.pktPI1val
-          packet.setBits(pi1BitPos, pi1BitWidth, pi1Value)
-        if tmPktDef.pktPI2val != None:
-          pi2BitPos = tmPktDef.pktPI2off * 8
-          pi2BitWidth = tmPktDef.pktPI2wid
-          pi2Value = tmPktDef.pktPI2val
-          packet.setBits(pi2BitPos, pi2BitWidth, pi2Value)
-      else:
-        # CCSDS packet
-        packet = self.getTMpacketHelper(binarySize,
-                                        applicationProcessId)
-      self.packetCache[spid] = packet
+      packet = self.createTMpacket(tmPktDef)
+      self.packetCache[spid] = (tmPktDef, packet)
     # apply the segmentationFlags
     packet.segmentationFlags = segmentationFlags
     # apply the datafield
@@ -151,47 +193,10 @@ class TMpacketGeneratorImpl(SPACE.IF.TMpacketGenerator):
       #-- encode the struct
       tmStruct.encode(packet, structBitPos)
     # apply the parameters
-    for paramNameValue in parameterValues:
-      paramName, paramValue = paramNameValue
-      # special handling for PUS service 1 parameters for TC acknowledgement
-      if paramName == "PUS_TYPE1_APID":
-        PUS.SERVICES.service1_setTCackAPID(packet, int(paramValue))
-        continue
-      if paramName == "PUS_TYPE1_SSC":
-        PUS.SERVICES.service1_setTCackSSC(packet, int(paramValue))
-        continue
-      # search the definition of the parameter (TMparamExtraction)
-      paramExtraction = tmPktDef.getParamExtraction(paramName)
-      if paramExtraction == None:
-        LOG_WARNING("packet with SPID " + str(spid) + " does not have a parameter " + paramName, "SPACE")
-      else:
-        # apply the parameter value
-        bitPos = paramExtraction.bitPos
-        bitLength = paramExtraction.bitWidth
-        valueType = paramExtraction.valueType
-        if valueType == UTIL.DU.BITS:
-          packet.setBits(bitPos, bitLength, paramValue)
-        elif valueType == UTIL.DU.SBITS:
-          packet.setSBits(bitPos, bitLength, paramValue)
-        else:
-          bytePos = bitPos // 8
-          byteLength = bitLength // 8
-          if valueType == UTIL.DU.UNSIGNED:
-            packet.setUnsigned(bytePos, byteLength, paramValue)
-          elif valueType == UTIL.DU.SIGNED:
-            bytePos = bitPos // 8
-            byteLength = bitLength // 8
-            packet.setSigned(bytePos, byteLength, paramValue)
-          elif valueType == UTIL.DU.FLOAT:
-            bytePos = bitPos // 8
-            byteLength = bitLength // 8
-            packet.setFloat(bytePos, byteLength, paramValue)
-          else:
-            # TIME and other types are passed as string
-            # TODO: use specific encodings
-            bytePos = bitPos // 8
-            byteLength = bitLength // 8
-            packet.setString(bytePos, byteLength, paramValue)
+    if len(parameterValues) > 0:
+      paramNames = tuple([paramName for paramName, paramValue in parameterValues])
+      populatePlan = self.getPopulatePlan(tmPktDef, paramNames)
+      populatePlan.populate(packet, [paramValue for paramName, paramValue in parameterValues])
     # re-calculate the time stamp
     if tmPktDef.pktHasDFhdr and self.packetDefaults.hasTmTT:
       if obtUTC == None:
@@ -210,6 +215,55 @@ class TMpacketGeneratorImpl(SPACE.IF.TMpacketGenerator):
       packet.setChecksum()
     return packet
   # ---------------------------------------------------------------------------
+  def createTMpacket(self, tmPktDef):
+    """
+    creates a TM packet with the default values of the packet definition,
+    the cached packets and the sequence counters are not modified:
+    implementation of SPACE.IF.TMpacketGenerator.createTMpacket
+    """
+    binarySize = tmPktDef.pktSPsize
+    applicationProcessId = tmPktDef.pktAPID
+    if tmPktDef.pktHasDFhdr:
+      # PUS packet
+      serviceType = tmPktDef.pktType
+      serviceSubType = tmPktDef.pktSType
+      packet = self.getTMpacketHelper(binarySize,
+                                      applicationProcessId,
+                                      serviceType,
+                                      serviceSubType)
+      # initialise PI1 and PI2 if configured
+      if tmPktDef.pktPI1val != None:
+        pi1BitPos = tmPktDef.pktPI1off * 8
+        pi1BitWidth = tmPktDef.pktPI1wid
+        pi1Value = tmPktDef.pktPI1val
+        packet.setBits(pi1BitPos, pi1BitWidth, pi1Value)
+      if tmPktDef.pktPI2val != None:
+        pi2BitPos = tmPktDef.pktPI2off * 8
+        pi2BitWidth = tmPktDef.pktPI2wid
+        pi2Value = tmPktDef.pktPI2val
+        packet.setBits(pi2BitPos, pi2BitWidth, pi2Value)
+    else:
+      # CCSDS packet
+      packet = self.getTMpacketHelper(binarySize,
+                                      applicationProcessId)
+    return packet
+  # ---------------------------------------------------------------------------
+  def getPopulatePlan(self, tmPktDef, paramNames):
+    """returns the cached populate plan for the parameter names"""
+    populatePlans = self.populatePlans
+    key = (tmPktDef.pktSPID, paramNames)
+    cachedPktDef, populatePlan = populatePlans.get(key, (None, None))
+    if cachedPktDef == tmPktDef:
+      populatePlans.move_to_end(key)
+      return populatePlan
+    # reloaded definitions are new objects and invalidate the entry
+    populatePlan = TMpopulatePlan(tmPktDef, paramNames)
+    populatePlans[key] = (tmPktDef, populatePlan)
+    populatePlans.move_to_end(key)
+    if len(populatePlans) > self.populatePlanCacheSize:
+      populatePlans.popitem(last=False)
+    return populatePlan
+  # ---------------------------------------------------------------------------
   def getTMpacketHelper(self,
                         binarySize,
                         applicationProcessId,
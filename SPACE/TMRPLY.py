@@ -12,11 +12,12 @@
 #******************************************************************************
 # Space Simulation - Telemetry Packet Replayer                                *
 #******************************************************************************
+import os
 from UTIL.SYS import Error, LOG, LOG_INFO, LOG_WARNING, LOG_ERROR
 import CCSDS.PACKET
 import PUS.PACKET
 import SPACE.IF
-import SUPP.IF
+import SUPP.IF, SUPP.TMARCHIVE
 import UTIL.SYS, UTIL.TIME
 
 #############
@@ -41,6 +42,8 @@ class TMpacketReplayerImpl(SPACE.IF.TMpacketReplayer):
     implementation of SPACE.IF.TMpacketReplayer.readReplayFile
     """
     LOG_WARNING("replayPackets(" + replayFileName + ")", "SPACE")
+    if os.path.isdir(replayFileName):
+      return self.readArchive(replayFileName)
     useSPIDasKey = (UTIL.SYS.s_configuration.TM_REPLAY_KEY == "SPID") 
     # read the TM packets file
     try:
@@ -197,6 +200,20 @@ class TMpacketReplayerImpl(SPACE.IF.TMpacketReplayer):
           segmentationFlags = CCSDS.PACKET.UNSEGMENTED
     return True
   # ---------------------------------------------------------------------------
+  def readArchive(self, archiveDir):
+    """reads the TM packets with their ERT from a TM archive"""
+    try:
+      archiveReader = SUPP.TMARCHIVE.ArchiveReader(archiveDir)
+      for ert, apid, spid, ssc, binPacket in archiveReader.readPackets():
+        self.items.append((SPACE.IF.RPLY_ERT, ert))
+        self.items.append((SPACE.IF.RPLY_RAWPKT, bytearray(binPacket)))
+      archiveReader.close()
+    except Exception as ex:
+      LOG_ERROR("cannot read " + archiveDir + ": " + str(ex), "SPACE")
+      self.items = []
+      return False
+    return True
+  # ---------------------------------------------------------------------------
   def getItems(self):
     """
     returns items from the replay file
@@ -12,12 +12,12 @@
 #******************************************************************************
 # Supplement to TM/TC processing - Space Data Definitions                     *
 #******************************************************************************
-import os, pickle, time
+import copy, os, time
 from UTIL.SYS import Error, LOG, LOG_INFO, LOG_WARNING, LOG_ERROR
 import CCSDS.DU, CCSDS.PACKET, CCSDS.TIME
 import PUS.PACKET, PUS.PKTID, PUS.VP
 import SCOS.ENV, SCOS.MIB
-import SUPP.IF
+import SUPP.DEFFILE, SUPP.IF
 import UTIL.DU, UTIL.SYS
 
 #############
@@ -26,6 +26,31 @@ import UTIL.DU, UTIL.SYS
 # TODO: use the correct values from the MIB or from the configuration
 TC_PUS_PACKET_DEFAULT_DATAFIELD_HEADER_SIZE = 4
 TC_SOUCE_PACKET_DEFAULT_DATAFIELD_DATA_SIZE = 4
+# definition parts that can be recreated independently
+TM_PACKETS = "TM packets"
+TM_STRUCTURES = "TM structures"
+TC_PACKETS = "TC packets"
+DEFINITION_PARTS = [TM_PACKETS, TM_STRUCTURES, TC_PACKETS]
+# MIB tables that are read to recreate a definition part
+DEFINITION_PART_TABLES = {
+  TM_PACKETS: ["pid.dat", "pic.dat", "tpcf.dat", "pcf.dat", "plf.dat", "vpd.dat"],
+  TM_STRUCTURES: ["pid.dat", "pcf.dat", "vpd.dat"],
+  TC_PACKETS: ["ccf.dat", "cpc.dat", "cdf.dat"]}
+# dependency graph: definition part that must be recreated when a MIB table
+# or a configuration entry changes (TM packets include the TM structures)
+DEFINITION_DEPENDENCIES = {
+  "pid.dat": TM_PACKETS,
+  "pic.dat": TM_PACKETS,
+  "tpcf.dat": TM_PACKETS,
+  "pcf.dat": TM_PACKETS,
+  "plf.dat": TM_PACKETS,
+  "vpd.dat": TM_STRUCTURES,
+  "ccf.dat": TC_PACKETS,
+  "cpc.dat": TC_PACKETS,
+  "cdf.dat": TC_PACKETS,
+  "TM_PKT_SIZE_ADD": TM_PACKETS,
+  "TM_PARAM_LENGTH_BYTES": TM_STRUCTURES,
+  "TC_PARAM_LENGTH_BYTES": TC_PACKETS}
 
 ###########
 # classes #
@@ -54,6 +79,7 @@ class DefinitionsImpl(SUPP.IF.Definitions):
     self.definitionFileName = SCOS.ENV.s_environment.getRuntimeRoot() + \
         "/testbin/testdata.sim"
     self.definitionData = None
+    self.definitionFingerprints = None
     self.tmParamLengthBytes = int(UTIL.SYS.s_configuration.TM_PARAM_LENGTH_BYTES)
     self.tcParamLengthBytes = int(UTIL.SYS.s_configuration.TC_PARAM_LENGTH_BYTES)
   # ---------------------------------------------------------------------------
@@ -288,7 +314,7 @@ class DefinitionsImpl(SUPP.IF.Definitions):
     structDef, vpdRecordsPos = self.createTmStructDef(structName, sortedVpdRecords, vpdRecordsPos, vpdRecordsEnd, pcfMap)
     return structDef
   # ---------------------------------------------------------------------------
-  def createTMdefinitions(self, pidMap, picMap, tpcfMap, pcfMap, plfMap, vpdMap):
+  def createTMdefinitions(self, definitionData, pidMap, picMap, tpcfMap, pcfMap, plfMap, vpdMap):
     """helper method: create TM packet and parameter definitions from MIB tables"""
     tmPktDefs = []
     tmPktDefsSpidMap = {}
@@ -391,11 +417,34 @@ class DefinitionsImpl(SUPP.IF.Definitions):
         pi2bitPos,
         pi2bitSize)
     # step 5) update the global container attributes
-    self.definitionData.tmPktDefs = tmPktDefs
-    self.definitionData.tmPktDefsSpidMap = tmPktDefsSpidMap
-    self.definitionData.tmPktSpidNameMap = tmPktSpidNameMap
-    self.definitionData.tmPktIdentificator = tmPktIdentificator
-    self.definitionData.tmParamDefs = tmParamDefs
+    definitionData.tmPktDefs = tmPktDefs
+    definitionData.tmPktDefsSpidMap = tmPktDefsSpidMap
+    definitionData.tmPktSpidNameMap = tmPktSpidNameMap
+    definitionData.tmPktIdentificator = tmPktIdentificator
+    definitionData.tmParamDefs = tmParamDefs
+  # ---------------------------------------------------------------------------
+  def updateTMstructDefs(self, definitionData, pidMap, pcfMap, vpdMap):
+    """
+    helper method: recreate the TM packet definitions with a variable
+    structure, the other TM packet definitions are taken over unchanged
+    """
+    # the packet definitions are sorted by SPID ---> same order as the SPIDs
+    sortedSpids = sorted(pidMap.keys())
+    tmPktDefs = definitionData.tmPktDefs.copy()
+    if len(tmPktDefs) != len(sortedSpids):
+      raise Error("TM packet definitions do not match pid.dat")
+    for index, spid in enumerate(sortedSpids):
+      structID = pidMap[spid].pidTPSD
+      if structID == -1:
+        continue
+      tmPktDef = copy.copy(tmPktDefs[index])
+      if tmPktDef.pktSPID != spid:
+        raise Error("TM packet definitions do not match pid.dat")
+      tmPktDef.tmStructDef = self.createTmToplevelStructDef(structID, vpdMap, pcfMap)
+      tmPktDefs[index] = tmPktDef
+      LOG("TM packet " + tmPktDef.pktName + "(" + str(spid) + "), variable structure recreated", "SPACE")
+    definitionData.tmPktDefs = tmPktDefs
+    definitionData.tmPktDefsSpidMap = SUPP.DEFFILE.DefinitionMap(tmPktDefs, sortedSpids)
   # ---------------------------------------------------------------------------
   def createTCpktDef(self, ccfRecord, cdfMap, cpcMap):
     """creates a TM packet definition"""
@@ -520,7 +569,7 @@ class DefinitionsImpl(SUPP.IF.Definitions):
     structDef, cdfRecordsPos = self.createTcStructDef(structName, sortedCdfRecords, cdfRecordsPos, cdfRecordsEnd, cpcMap)
     return structDef
   # ---------------------------------------------------------------------------
-  def createTCdefinitions(self, ccfMap, cpcMap, cdfMap):
+  def createTCdefinitions(self, definitionData, ccfMap, cpcMap, cdfMap):
     """helper method: create TC packet and parameter definitions from MIB tables"""
     tcPktDefs = []
     tcPktDefsNameMap = {}
@@ -604,30 +653,119 @@ class DefinitionsImpl(SUPP.IF.Definitions):
         LOG_WARNING(str(ex), "SPACE")
     tcPktDefs.sort()
     # step 2) update the global container attributes
-    self.definitionData.tcPktDefs = tcPktDefs
-    self.definitionData.tcPktDefsNameMap = tcPktDefsNameMap
-    self.definitionData.tcPktIdentificator = tcPktIdentificator
+    definitionData.tcPktDefs = tcPktDefs
+    definitionData.tcPktDefsNameMap = tcPktDefsNameMap
+    definitionData.tcPktIdentificator = tcPktIdentificator
   # ---------------------------------------------------------------------------
   def createDefinitions(self):
     """
     creates the definition data:
     implementation of SUPP.IF.Definitions.createDefinitions
     """
-    self.definitionData = DefinitionData()
-    # read the mib tables and create the TM/TC definitions
-    pidMap, picMap, tpcfMap, pcfMap, plfMap, vpdMap, ccfMap, cpcMap, cdfMap = SCOS.MIB.readAllTables()
-    self.createTMdefinitions(pidMap, picMap, tpcfMap, pcfMap, plfMap, vpdMap)
-    self.createTCdefinitions(ccfMap, cpcMap, cdfMap)
+    self.updateDefinitions(DEFINITION_PARTS)
+  # ---------------------------------------------------------------------------
+  def updateDefinitions(self, changedParts):
+    """
+    recreates the changed definition parts from the MIB, takes over the
+    other parts from the actual definition data and saves the result
+    """
+    # fingerprints before reading: a MIB change during reading is detected
+    fingerprints = self.getDefinitionFingerprints()
+    # read only the mib tables that are needed for the changed parts
+    tableNames = []
+    for definitionPart in changedParts:
+      for tableName in DEFINITION_PART_TABLES[definitionPart]:
+        if tableName not in tableNames:
+          tableNames.append(tableName)
+    tableMaps = SCOS.MIB.readTables(tableNames)
+    oldDefinitionData = self.definitionData
+    definitionData = DefinitionData()
+    # TM definitions
+    if TM_PACKETS in changedParts:
+      self.createTMdefinitions(definitionData,
+                               tableMaps["pid.dat"],
+                               tableMaps["pic.dat"],
+                               tableMaps["tpcf.dat"],
+                               tableMaps["pcf.dat"],
+                               tableMaps["plf.dat"],
+                               tableMaps["vpd.dat"])
+    else:
+      definitionData.tmPktDefs = oldDefinitionData.tmPktDefs
+      definitionData.tmPktDefsSpidMap = oldDefinitionData.tmPktDefsSpidMap
+      definitionData.tmPktSpidNameMap = oldDefinitionData.tmPktSpidNameMap
+      definitionData.tmPktIdentificator = oldDefinitionData.tmPktIdentificator
+      definitionData.tmParamDefs = oldDefinitionData.tmParamDefs
+      if TM_STRUCTURES in changedParts:
+        self.updateTMstructDefs(definitionData,
+                                tableMaps["pid.dat"],
+                                tableMaps["pcf.dat"],
+                                tableMaps["vpd.dat"])
+    # TC definitions
+    if TC_PACKETS in changedParts:
+      self.createTCdefinitions(definitionData,
+                               tableMaps["ccf.dat"],
+                               tableMaps["cpc.dat"],
+                               tableMaps["cdf.dat"])
+    else:
+      definitionData.tcPktDefs = oldDefinitionData.tcPktDefs
+      definitionData.tcPktDefsNameMap = oldDefinitionData.tcPktDefsNameMap
+      definitionData.tcPktIdentificator = oldDefinitionData.tcPktIdentificator
     d = time.localtime()
-    self.definitionData.creationTime = "%04d.%02d.%02d %02d:%02d:%02d" % d[:6]
+    definitionData.creationTime = "%04d.%02d.%02d %02d:%02d:%02d" % d[:6]
     # save the definitions
     fileName = self.definitionFileName
     try:
-      file = open(fileName, "wb")
-      pickle.dump(self.definitionData, file)
-      file.close()
+      SUPP.DEFFILE.writeDefinitionFile(fileName, definitionData, fingerprints)
     except Exception as ex:
       LOG_ERROR("cannot save definitions: " + str(ex), "SPACE")
+    # swap the definitions
+    self.definitionData = definitionData
+    self.definitionFingerprints = fingerprints
+  # ---------------------------------------------------------------------------
+  def getDefinitionFingerprints(self):
+    """
+    returns the fingerprints of the MIB tables and configuration entries
+    the definition data depend on
+    """
+    fingerprints = SCOS.MIB.getTableFingerprints()
+    fingerprints["TM_PKT_SIZE_ADD"] = UTIL.SYS.s_configuration.TM_PKT_SIZE_ADD
+    fingerprints["TM_PARAM_LENGTH_BYTES"] = self.tmParamLengthBytes
+    fingerprints["TC_PARAM_LENGTH_BYTES"] = self.tcParamLengthBytes
+    return fingerprints
+  # ---------------------------------------------------------------------------
+  def getChangedDefinitionParts(self, fingerprints):
+    """
+    returns the definition parts that depend on changed fingerprints
+    (MIB tables or configuration entries)
+    """
+    oldFingerprints = self.definitionFingerprints
+    if oldFingerprints == None or \
+       sorted(oldFingerprints.keys()) != sorted(fingerprints.keys()):
+      return list(DEFINITION_PARTS)
+    changedParts = []
+    for sourceName in sorted(fingerprints.keys()):
+      if fingerprints[sourceName] == oldFingerprints[sourceName]:
+        continue
+      definitionPart = DEFINITION_DEPENDENCIES.get(sourceName)
+      if definitionPart == None:
+        return list(DEFINITION_PARTS)
+      if definitionPart not in changedParts:
+        changedParts.append(definitionPart)
+    return changedParts
+  # ---------------------------------------------------------------------------
+  def loadDefinitions(self, definitionFile):
+    """creates the definition data, the definitions are loaded on demand"""
+    definitionData = DefinitionData()
+    definitionData.creationTime = definitionFile.creationTime
+    definitionData.tmPktDefs = definitionFile.tmPktDefs
+    definitionData.tmPktDefsSpidMap = definitionFile.tmPktDefsSpidMap
+    definitionData.tmPktSpidNameMap = definitionFile.tmPktSpidNameMap
+    definitionData.tmPktIdentificator = definitionFile.loadTMpktIdentificator()
+    definitionData.tmParamDefs = definitionFile.tmParamDefs
+    definitionData.tcPktDefs = definitionFile.tcPktDefs
+    definitionData.tcPktDefsNameMap = definitionFile.tcPktDefsNameMap
+    definitionData.tcPktIdentificator = definitionFile.loadTCpktIdentificator()
+    return definitionData
   # ---------------------------------------------------------------------------
   def initDefinitions(self):
     """
@@ -637,18 +775,49 @@ class DefinitionsImpl(SUPP.IF.Definitions):
     if self.definitionData == None:
       # try to load the definition data
       fileName = self.definitionFileName
-      try:
-        os.stat(fileName)
-        try:
-          file = open(fileName, "rb")
-          self.definitionData = pickle.load(file)
-          file.close()
-        except Exception as ex:
-          LOG_ERROR("cannot load definitions: " + str(ex), "SPACE")
-          self.createDefinitions()
-      except:
+      if not os.path.exists(fileName):
         # definition file not present
         self.createDefinitions()
+        return
+      try:
+        definitionFile = SUPP.DEFFILE.DefinitionFile(fileName)
+        self.definitionData = self.loadDefinitions(definitionFile)
+        self.definitionFingerprints = definitionFile.fingerprints
+      except Exception as ex:
+        LOG_ERROR("cannot load definitions: " + str(ex), "SPACE")
+        self.createDefinitions()
+        return
+      # recreate the parts that are not up to date
+      try:
+        self.reloadDefinitions()
+      except Exception as ex:
+        LOG_ERROR("cannot reload definitions: " + str(ex), "SPACE")
+  # ---------------------------------------------------------------------------
+  def reloadDefinitions(self):
+    """
+    recreates the definition parts that depend on changed MIB tables:
+    implementation of SUPP.IF.Definitions.reloadDefinitions
+    """
+    if self.definitionData == None:
+      self.initDefinitions()
+      return []
+    fingerprints = self.getDefinitionFingerprints()
+    changedParts = self.getChangedDefinitionParts(fingerprints)
+    if len(changedParts) == 0:
+      return []
+    tableFingerprints = [fingerprints[tableName] for tableName in SCOS.MIB.TABLE_NAMES]
+    if tableFingerprints.count(None) == len(tableFingerprints):
+      LOG_WARNING("MIB not available, definitions of " + self.definitionData.creationTime + " are used", "SPACE")
+      return []
+    LOG_INFO("MIB or configuration changed since " + self.definitionData.creationTime + " ---> recreate " + ", ".join(changedParts), "SPACE")
+    try:
+      self.updateDefinitions(changedParts)
+    except Error as ex:
+      # inconsistent definition data ---> recreate everything
+      LOG_WARNING(str(ex) + " ---> recreate all definitions", "SPACE")
+      changedParts = list(DEFINITION_PARTS)
+      self.updateDefinitions(changedParts)
+    return changedParts
   # ---------------------------------------------------------------------------
   def getTMpktDefByIndex(self, index):
     """
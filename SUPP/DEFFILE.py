@@ -0,0 +1,259 @@
+#******************************************************************************
+# (C) 2020, Stefan Korner, Austria                                            *
+#                                                                             *
+# The Space Python Library is free software; you can redistribute it and/or   *
+# modify it under under the terms of the MIT License as published by the      *
+# Massachusetts Institute of Technology.                                      *
+#                                                                             *
+# The Space Python Library is distributed in the hope that it will be useful, *
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              *
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the MIT License    *
+# for more details.                                                           *
+#******************************************************************************
+# Supplement to TM/TC processing - Binary Definition File                     *
+#                                                                             *
+# The definition file (testdata.sim) is organised in independent records:    *
+# - header: magic, format version, position of the index record              *
+# - one record per TM packet, TM parameter and TC packet definition           *
+# - one record per packet identificator                                       *
+# - index record: fingerprints, creation time and the record positions        *
+# Each record is pickled on its own, the file is memory mapped and a record   *
+# is only unpickled when the related definition is accessed.                  *
+#******************************************************************************
+import mmap, os, pickle, struct
+from UTIL.SYS import Error, LOG, LOG_INFO, LOG_WARNING, LOG_ERROR
+
+#############
+# constants #
+#############
+MAGIC = b"SUPPDEF\0"
+FORMAT_VERSION = 1
+# magic, format version, index record offset, index record size
+HEADER_FORMAT = ">8sIQQ"
+HEADER_BYTE_SIZE = struct.calcsize(HEADER_FORMAT)
+PICKLE_PROTOCOL = pickle.HIGHEST_PROTOCOL
+
+###########
+# classes #
+###########
+# =============================================================================
+class DefinitionList(object):
+  """Sequence of definitions that are unpickled on demand"""
+  # ---------------------------------------------------------------------------
+  def __init__(self, definitionFile, entries):
+    """entries are the index entries (key fields..., offset, size)"""
+    self.definitionFile = definitionFile
+    self.entries = entries
+    self.definitions = [None] * len(entries)
+  # ---------------------------------------------------------------------------
+  def __len__(self):
+    """number of definitions"""
+    return len(self.entries)
+  # ---------------------------------------------------------------------------
+  def __getitem__(self, index):
+    """returns the definition, it is unpickled on first access"""
+    if isinstance(index, slice):
+      return [self[i] for i in range(*index.indices(len(self.entries)))]
+    definition = self.definitions[index]
+    if definition == None:
+      definition = self.definitionFile.loadRecord(self.entries[index][-2:])
+      self.definitions[index] = definition
+    return definition
+  # ---------------------------------------------------------------------------
+  def __setitem__(self, index, definition):
+    """replaces a definition, e.g. with a recreated one"""
+    self.definitions[index] = definition
+  # ---------------------------------------------------------------------------
+  def __iter__(self):
+    """iterates over all definitions"""
+    for index in range(len(self.entries)):
+      yield self[index]
+  # ---------------------------------------------------------------------------
+  def copy(self):
+    """shallow copy, the already unpickled definitions are shared"""
+    definitionList = DefinitionList(self.definitionFile, self.entries)
+    definitionList.definitions = list(self.definitions)
+    return definitionList
+  # ---------------------------------------------------------------------------
+  def isLoaded(self, index):
+    """checks if the definition is unpickled or replaced"""
+    return (self.definitions[index] != None)
+  # ---------------------------------------------------------------------------
+  def getRecord(self, index):
+    """returns the key fields and the pickled data of a definition"""
+    entry = self.entries[index]
+    offset, size = entry[-2:]
+    return (entry[:-2], self.definitionFile.buffer[offset:offset + size])
+
+# =============================================================================
+class DefinitionMap(object):
+  """
+  Read only mapping from a key to the entries of a definition sequence
+  (DefinitionList or list), the definitions are accessed on demand
+  """
+  # ---------------------------------------------------------------------------
+  def __init__(self, definitionList, keys):
+    """keys are in the same order as the definitions in definitionList"""
+    self.definitionList = definitionList
+    self.keyIndexes = {}
+    for index, key in enumerate(keys):
+      self.keyIndexes[key] = index
+  # ---------------------------------------------------------------------------
+  def __len__(self):
+    """number of definitions"""
+    return len(self.keyIndexes)
+  # ---------------------------------------------------------------------------
+  def __contains__(self, key):
+    """checks if there is a definition for key (without unpickling)"""
+    return key in self.keyIndexes
+  # ---------------------------------------------------------------------------
+  def __iter__(self):
+    """iterates over the keys"""
+    return iter(self.keyIndexes)
+  # ---------------------------------------------------------------------------
+  def __getitem__(self, key):
+    """returns the definition, it is unpickled on first access"""
+    return self.definitionList[self.keyIndexes[key]]
+  # ---------------------------------------------------------------------------
+  def get(self, key, default=None):
+    """returns the definition or default"""
+    if key in self.keyIndexes:
+      return self[key]
+    return default
+  # ---------------------------------------------------------------------------
+  def keys(self):
+    """returns the keys"""
+    return self.keyIndexes.keys()
+  # ---------------------------------------------------------------------------
+  def values(self):
+    """returns all definitions"""
+    return [self[key] for key in self.keyIndexes]
+  # ---------------------------------------------------------------------------
+  def items(self):
+    """returns all (key, definition) pairs"""
+    return [(key, self[key]) for key in self.keyIndexes]
+
+# =============================================================================
+class DefinitionFile(object):
+  """Read access to a memory mapped definition file"""
+  # ---------------------------------------------------------------------------
+  def __init__(self, fileName):
+    """opens the file and reads the index, raises Error on a wrong format"""
+    self.fileName = fileName
+    file = open(fileName, "rb")
+    try:
+      if os.fstat(file.fileno()).st_size < HEADER_BYTE_SIZE:
+        raise Error(fileName + " is not a binary definition file")
+      self.buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    finally:
+      file.close()
+    magic, formatVersion, indexOffset, indexSize = \
+      struct.unpack_from(HEADER_FORMAT, self.buffer)
+    if magic != MAGIC:
+      raise Error(fileName + " is not a binary definition file")
+    if formatVersion != FORMAT_VERSION:
+      raise Error(fileName + " has unsupported format version " + str(formatVersion))
+    if indexOffset + indexSize > len(self.buffer):
+      raise Error(fileName + " is truncated")
+    index = self.loadRecord((indexOffset, indexSize))
+    self.fingerprints = index["fingerprints"]
+    self.creationTime = index["creationTime"]
+    # TM packet definitions, sorted by SPID
+    tmPktEntries = index["tmPktDefs"]
+    self.tmPktDefs = DefinitionList(self, tmPktEntries)
+    self.tmPktDefsSpidMap = DefinitionMap(self.tmPktDefs,
+      [spid for spid, name, offset, size in tmPktEntries])
+    self.tmPktSpidNameMap = {}
+    for spid, name, offset, size in tmPktEntries:
+      self.tmPktSpidNameMap[name] = spid
+    # TM parameter definitions, sorted by name
+    self.tmParamDefs = DefinitionList(self, index["tmParamDefs"])
+    # TC packet definitions, sorted by name
+    tcPktEntries = index["tcPktDefs"]
+    self.tcPktDefs = DefinitionList(self, tcPktEntries)
+    self.tcPktDefsNameMap = DefinitionMap(self.tcPktDefs,
+      [name for name, offset, size in tcPktEntries])
+    self.tmPktIdentificatorLocation = index["tmPktIdentificator"]
+    self.tcPktIdentificatorLocation = index["tcPktIdentificator"]
+  # ---------------------------------------------------------------------------
+  def loadRecord(self, location):
+    """unpickles the record at location (offset, size)"""
+    offset, size = location
+    return pickle.loads(self.buffer[offset:offset + size])
+  # ---------------------------------------------------------------------------
+  def loadTMpktIdentificator(self):
+    """unpickles the TM packet identificator"""
+    return self.loadRecord(self.tmPktIdentificatorLocation)
+  # ---------------------------------------------------------------------------
+  def loadTCpktIdentificator(self):
+    """unpickles the TC packet identificator"""
+    return self.loadRecord(self.tcPktIdentificatorLocation)
+
+#############
+# functions #
+#############
+def writeRecord(file, record):
+  """pickles a record to file and returns its location (offset, size)"""
+  offset = file.tell()
+  recordData = pickle.dumps(record, PICKLE_PROTOCOL)
+  file.write(recordData)
+  return (offset, len(recordData))
+# -----------------------------------------------------------------------------
+def writeRecords(file, definitions, getKey):
+  """
+  writes the definitions to file and returns the index entries,
+  definitions of a DefinitionList that are not unpickled are copied
+  """
+  entries = []
+  for index in range(len(definitions)):
+    if isinstance(definitions, DefinitionList) and \
+       not definitions.isLoaded(index):
+      key, recordData = definitions.getRecord(index)
+      location = (file.tell(), len(recordData))
+      file.write(recordData)
+    else:
+      definition = definitions[index]
+      key = getKey(definition)
+      location = writeRecord(file, definition)
+    entries.append(key + location)
+  return entries
+# -----------------------------------------------------------------------------
+def writeDefinitionFile(fileName, definitionData, fingerprints):
+  """
+  writes the definition data (see SUPP.DEF.DefinitionData) to fileName,
+  the file is replaced atomically
+  """
+  index = {}
+  index["fingerprints"] = fingerprints
+  index["creationTime"] = definitionData.creationTime
+  tmpFileName = fileName + ".tmp"
+  file = open(tmpFileName, "wb")
+  try:
+    # the header is written when the index position is known
+    file.write(bytes(HEADER_BYTE_SIZE))
+    index["tmPktDefs"] = writeRecords(file,
+      definitionData.tmPktDefs,
+      lambda tmPktDef: (tmPktDef.pktSPID, tmPktDef.pktName))
+    index["tmParamDefs"] = writeRecords(file,
+      definitionData.tmParamDefs,
+      lambda tmParamDef: (tmParamDef.paramName,))
+    index["tcPktDefs"] = writeRecords(file,
+      definitionData.tcPktDefs,
+      lambda tcPktDef: (tcPktDef.pktName,))
+    index["tmPktIdentificator"] = \
+      writeRecord(file, definitionData.tmPktIdentificator)
+    index["tcPktIdentificator"] = \
+      writeRecord(file, definitionData.tcPktIdentificator)
+    indexOffset, indexSize = writeRecord(file, index)
+    file.seek(0)
+    file.write(struct.pack(HEADER_FORMAT,
+                           MAGIC,
+                           FORMAT_VERSION,
+                           indexOffset,
+                           indexSize))
+    file.close()
+  except:
+    file.close()
+    os.remove(tmpFileName)
+    raise
+  os.replace(tmpFileName, fileName)
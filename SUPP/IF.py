@@ -12,11 +12,26 @@
 #******************************************************************************
 # Supplement to TM/TC processing - Interface                                  *
 #******************************************************************************
-import string
+import array, string, struct
 from UTIL.SYS import Error, LOG, LOG_INFO, LOG_WARNING, LOG_ERROR
 import CCSDS.DU, CCSDS.PACKET
 import UTIL.DU
 
+#############
+# constants #
+#############
+# struct format characters of the extraction plan, index = byte size
+UNSIGNED_FORMAT_CHARS = {1: "B", 2: "H", 4: "I", 8: "Q"}
+SIGNED_FORMAT_CHARS = {1: "b", 2: "h", 4: "i", 8: "q"}
+FLOAT_FORMAT_CHARS = {4: "f", 8: "d"}
+# kinds of extraction steps in the extraction plan
+EXTRACT_VALUE = 0
+EXTRACT_BITS = 1
+EXTRACT_SBITS = 2
+EXTRACT_INTEGER = 3
+EXTRACT_BYTES = 4
+EXTRACT_STRING = 5
+
 ###########
 # classes #
 ###########
@@ -73,6 +88,129 @@ class TMparamExtraction(object):
       return False
     return (self.bitPos < other.bitPos)
 
+# =============================================================================
+class TMextractionPlan(object):
+  """
+  Precompiled extraction of all parameters of a TM packet:
+  byte aligned fields that follow each other without a gap are grouped into
+  runs, each run is read with one precompiled struct.Struct
+  """
+  # ---------------------------------------------------------------------------
+  def __init__(self, paramExtractions):
+    """paramExtractions are ordered by packet location"""
+    self.paramExtractions = paramExtractions
+    self.bitPositions = array.array("L")
+    self.bitWidths = array.array("L")
+    self.valueTypes = array.array("B")
+    # runs: (byte position, struct), the values of all runs are concatenated
+    self.runs = []
+    # per parameter: (kind, value index or None, byte position, byte length,
+    #                 bit width, shift, signed)
+    self.steps = []
+    self.byteSize = 0
+    runBytePos = None
+    runEndPos = None
+    runFormat = ""
+    lastWord = None
+    valueCount = 0
+    for paramExtraction in paramExtractions:
+      bitPos = paramExtraction.bitPos
+      bitWidth = paramExtraction.bitWidth
+      valueType = paramExtraction.valueType
+      self.bitPositions.append(bitPos)
+      self.bitWidths.append(bitWidth)
+      self.valueTypes.append(valueType)
+      bytePos = bitPos >> 3
+      lastBitPos = bitPos + bitWidth - 1
+      byteLength = (lastBitPos >> 3) - bytePos + 1
+      self.byteSize = max(self.byteSize, bytePos + byteLength)
+      shift = 7 - (lastBitPos & 7)
+      signed = (valueType == UTIL.DU.SBITS or valueType == UTIL.DU.SIGNED)
+      isAligned = ((bitPos & 7) == 0 and (bitWidth & 7) == 0)
+      if valueType == UTIL.DU.FLOAT and isAligned:
+        kind = EXTRACT_VALUE
+        formatChar = FLOAT_FORMAT_CHARS.get(byteLength)
+      elif valueType == UTIL.DU.STRING and isAligned:
+        kind = EXTRACT_STRING
+        formatChar = None
+      elif (valueType == UTIL.DU.BYTES or valueType == UTIL.DU.TIME) and isAligned:
+        # raw bytes, like the generic getBytes
+        kind = EXTRACT_BYTES
+        formatChar = None
+      elif (valueType == UTIL.DU.UNSIGNED or valueType == UTIL.DU.SIGNED) and isAligned:
+        kind = EXTRACT_INTEGER
+        if signed:
+          formatChar = SIGNED_FORMAT_CHARS.get(byteLength)
+        else:
+          formatChar = UNSIGNED_FORMAT_CHARS.get(byteLength)
+      else:
+        # bits are extracted from the unsigned word that covers the field
+        if signed:
+          kind = EXTRACT_SBITS
+        else:
+          kind = EXTRACT_BITS
+        formatChar = UNSIGNED_FORMAT_CHARS.get(byteLength)
+      if formatChar == None:
+        # no struct format: extracted from a slice of the packet
+        self.steps.append((kind, None, bytePos, byteLength, bitWidth, shift, signed))
+        continue
+      if kind == EXTRACT_INTEGER:
+        kind = EXTRACT_VALUE
+      word = (bytePos, formatChar)
+      if word == lastWord:
+        # several bit fields in the same word
+        valueIndex = valueCount - 1
+      else:
+        if runEndPos != bytePos:
+          # start a new run
+          if runFormat != "":
+            self.runs.append((runBytePos, struct.Struct(">" + runFormat)))
+          runBytePos = bytePos
+          runFormat = ""
+        runFormat += formatChar
+        runEndPos = bytePos + byteLength
+        lastWord = word
+        valueIndex = valueCount
+        valueCount += 1
+      self.steps.append((kind, valueIndex, bytePos, byteLength, bitWidth, shift, signed))
+    if runFormat != "":
+      self.runs.append((runBytePos, struct.Struct(">" + runFormat)))
+  # ---------------------------------------------------------------------------
+  def extractAll(self, packetBuffer):
+    """
+    returns the values of all parameters of a packet in one pass,
+    ordered like the paramExtractions
+    """
+    if len(packetBuffer) < self.byteSize:
+      raise IndexError("packet is too short for the parameter extraction")
+    words = []
+    for bytePos, runStruct in self.runs:
+      words.extend(runStruct.unpack_from(packetBuffer, bytePos))
+    values = []
+    for kind, valueIndex, bytePos, byteLength, bitWidth, shift, signed in self.steps:
+      if valueIndex != None:
+        word = words[valueIndex]
+        if kind == EXTRACT_VALUE:
+          values.append(word)
+          continue
+      else:
+        field = bytes(packetBuffer[bytePos:bytePos + byteLength])
+        if kind == EXTRACT_BYTES:
+          values.append(field)
+          continue
+        if kind == EXTRACT_STRING:
+          values.append(field.decode("ascii"))
+          continue
+        if kind == EXTRACT_INTEGER:
+          values.append(int.from_bytes(field, "big", signed=signed))
+          continue
+        word = int.from_bytes(field, "big")
+      value = (word >> shift) & ((1 << bitWidth) - 1)
+      if kind == EXTRACT_SBITS and value >= (1 << (bitWidth - 1)):
+        value -= (1 << bitWidth)
+      values.append(value)
+    return values
+
 # =============================================================================
 class TMpktDef(object):
   """Contains the most important definition data of a TM packet"""
@@ -98,6 +236,22 @@ class TMpktDef(object):
     self.pktSPDFdataSize = None
     self.paramLinks = None
     self.tmStructDef = None
+    # lazily built caches, see getExtractionPlan and getParamExtraction
+    self.extractionPlan = None
+    self.paramExtractionCache = None
+  # ---------------------------------------------------------------------------
+  def __getstate__(self):
+    """the caches are not pickled, they are rebuilt on demand"""
+    state = self.__dict__.copy()
+    state["extractionPlan"] = None
+    state["paramExtractionCache"] = None
+    return state
+  # ---------------------------------------------------------------------------
+  def __setstate__(self, state):
+    """supports also pickled definitions without caches"""
+    self.__dict__.update(state)
+    self.extractionPlan = None
+    self.paramExtractionCache = None
   # ---------------------------------------------------------------------------
   def __cmp__(self, other):
     """supports sorting by SPID"""
@@ -119,6 +273,12 @@ class TMpktDef(object):
     """used to append later on links to related parameters"""
     paramName = paramToPacket.paramDef.paramName
     self.paramLinks[paramName] = paramToPacket
+    self.resetExtractionCaches()
+  # ---------------------------------------------------------------------------
+  def resetExtractionCaches(self):
+    """must be called when the parameter locations are changed"""
+    self.extractionPlan = None
+    self.paramExtractionCache = None
   # ---------------------------------------------------------------------------
   def rangeOverlap(self, bitPos1, bitWidth1, bitPos2, bitWidth2):
     """checks if two ranges overlap"""
@@ -169,6 +329,17 @@ class TMpktDef(object):
   # ---------------------------------------------------------------------------
   def getParamExtraction(self, paramName):
     """returns a parameter extraction of a related parameters"""
+    if self.paramExtractionCache == None:
+      self.paramExtractionCache = {}
+    paramExtraction = self.paramExtractionCache.get(paramName)
+    if paramExtraction == None:
+      paramExtraction = self.createParamExtraction(paramName)
+      if paramExtraction != None:
+        self.paramExtractionCache[paramName] = paramExtraction
+    return paramExtraction
+  # ---------------------------------------------------------------------------
+  def createParamExtraction(self, paramName):
+    """creates a parameter extraction of a related parameters"""
     if paramName not in self.paramLinks:
       return None
     paramToPacket = self.paramLinks[paramName]
@@ -199,6 +370,23 @@ class TMpktDef(object):
   # ---------------------------------------------------------------------------
   def getParamExtractions(self):
     """returns all parameter extractions, ordered by packet location"""
+    return list(self.getExtractionPlan().paramExtractions)
+  # ---------------------------------------------------------------------------
+  def getExtractionPlan(self):
+    """returns the extraction plan, it is built on first access"""
+    if self.extractionPlan == None:
+      self.extractionPlan = TMextractionPlan(self.createParamExtractions())
+    return self.extractionPlan
+  # ---------------------------------------------------------------------------
+  def extractAll(self, packetBuffer):
+    """
+    returns the values of all parameters of a packet in one pass,
+    ordered like getParamExtractions
+    """
+    return self.getExtractionPlan().extractAll(packetBuffer)
+  # ---------------------------------------------------------------------------
+  def createParamExtractions(self):
+    """creates all parameter extractions, ordered by packet location"""
     retVal = []
     # insert PI1 and PI2 (if defined)
     pi1BitPos = None
@@ -471,6 +659,13 @@ class Definitions(object):
     """initialise the definition data from file or MIB"""
     pass
   # ---------------------------------------------------------------------------
+  def reloadDefinitions(self):
+    """
+    recreates the definition data that depend on changed MIB tables,
+    returns the names of the recreated definition parts
+    """
+    pass
+  # ---------------------------------------------------------------------------
   def getTMpktDefByIndex(self, index):
     """returns a TM packet definition"""
     pass
@@ -0,0 +1,413 @@
+#******************************************************************************
+# (C) 2020, Stefan Korner, Austria                                            *
+#                                                                             *
+# The Space Python Library is free software; you can redistribute it and/or   *
+# modify it under under the terms of the MIT License as published by the      *
+# Massachusetts Institute of Technology.                                      *
+#                                                                             *
+# The Space Python Library is distributed in the hope that it will be useful, *
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              *
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the MIT License    *
+# for more details.                                                           *
+#******************************************************************************
+# Supplement to TM/TC processing - Binary TM Packet Archive                   *
+#                                                                             *
+# An archive is a directory with time partitioned segment files:              *
+# - <YYYYMMDD_hhmmss>.tma: segment header followed by the packet records,     *
+#   each record is a fixed record header (packet size, ERT, APID, SPID, SSC)  *
+#   followed by the raw packet                                                *
+# - <YYYYMMDD_hhmmss>.tmi: sidecar index with one fixed entry per record      *
+#   (record offset, ERT, APID, SPID)                                          *
+# All packets of a segment have an ERT within the segment period that starts  *
+# at the time in the file name. The files are append only, records that are   *
+# written but not yet indexed (e.g. after a crash) are recovered by scanning, *
+# the writer completes the index of such a segment before it appends to it    *
+# and truncates an incomplete last record.                                    *
+#******************************************************************************
+import calendar, mmap, os, struct, time
+from UTIL.SYS import Error, LOG, LOG_INFO, LOG_WARNING, LOG_ERROR
+import CCSDS.PACKET
+import SUPP.IF
+import UTIL.TCO, UTIL.TIME, UTIL.WRITER
+
+#############
+# constants #
+#############
+SEGMENT_MAGIC = b"TMARCHIV"
+FORMAT_VERSION = 1
+# magic, format version, segment period in seconds
+SEGMENT_HEADER_FORMAT = ">8sII"
+SEGMENT_HEADER_BYTE_SIZE = struct.calcsize(SEGMENT_HEADER_FORMAT)
+# packet size, ERT, APID, SPID, SSC
+RECORD_HEADER_FORMAT = ">IdHIH"
+RECORD_HEADER_BYTE_SIZE = struct.calcsize(RECORD_HEADER_FORMAT)
+# record offset, ERT, APID, SPID
+INDEX_ENTRY_FORMAT = ">QdHI"
+INDEX_ENTRY_BYTE_SIZE = struct.calcsize(INDEX_ENTRY_FORMAT)
+SEGMENT_FILE_EXTENSION = ".tma"
+INDEX_FILE_EXTENSION = ".tmi"
+SEGMENT_TIME_FORMAT = "%Y%m%d_%H%M%S"
+SEGMENT_PERIOD = 3600
+# SPIDs are unsigned 32 bit values
+NO_SPID = 0xFFFFFFFF
+WRITE_QUEUE_SIZE = UTIL.WRITER.WRITE_QUEUE_SIZE
+WRITE_FLUSH_PERIOD = UTIL.WRITER.WRITE_FLUSH_PERIOD
+s_recordHeaderStruct = struct.Struct(RECORD_HEADER_FORMAT)
+s_indexEntryStruct = struct.Struct(INDEX_ENTRY_FORMAT)
+
+###########
+# classes #
+###########
+# =============================================================================
+class ArchiveWriter(UTIL.WRITER.BackgroundWriter):
+  """
+  Appends TM packets to an archive, the records are written in batches
+  by a background thread. The queue is bounded, when it is full the
+  producer is blocked (packets are never dropped).
+  """
+  # ---------------------------------------------------------------------------
+  def __init__(self,
+               archiveDir,
+               segmentPeriod=SEGMENT_PERIOD,
+               queueSize=WRITE_QUEUE_SIZE,
+               flushPeriod=WRITE_FLUSH_PERIOD):
+    """creates the archive directory on demand and starts the thread"""
+    os.makedirs(archiveDir, exist_ok=True)
+    self.archiveDir = archiveDir
+    self.segmentPeriod = segmentPeriod
+    self.segmentStart = None
+    self.segmentFile = None
+    self.indexFile = None
+    self.segmentSize = 0
+    UTIL.WRITER.BackgroundWriter.__init__(self, queueSize, flushPeriod)
+  # ---------------------------------------------------------------------------
+  def pushPacket(self, binPacket, ert, spid=NO_SPID):
+    """passes a copy of the raw packet to the writer thread"""
+    self.putItem((bytes(binPacket), ert, spid))
+  # ---------------------------------------------------------------------------
+  def writeItem(self, item):
+    """writes a queued packet"""
+    self.writeRecord(*item)
+    return False
+  # ---------------------------------------------------------------------------
+  def closeOutput(self):
+    """closes the actual segment when the writer thread terminates"""
+    self.closeSegment()
+  # ---------------------------------------------------------------------------
+  def writeError(self, action, ex):
+    """the archiving must not terminate the writer thread"""
+    LOG_ERROR("TM archive " + action + " error: " + str(ex))
+  # ---------------------------------------------------------------------------
+  def writeRecord(self, binPacket, ert, spid):
+    """
+    appends a record and its index entry to the related segment,
+    invalid records are rejected before anything is written
+    """
+    packetSize = len(binPacket)
+    if packetSize < CCSDS.PACKET.PRIMARY_HEADER_BYTE_SIZE:
+      raise Error("TM packet too short: " + str(packetSize) + " bytes")
+    apid = CCSDS.PACKET.getApplicationProcessId(binPacket)
+    ssc = CCSDS.PACKET.getSequenceControlCount(binPacket)
+    recordHeader = s_recordHeaderStruct.pack(packetSize, ert, apid, spid, ssc)
+    segmentStart = getSegmentStart(ert, self.segmentPeriod)
+    if segmentStart != self.segmentStart:
+      self.openSegment(segmentStart)
+    self.segmentFile.write(recordHeader)
+    self.segmentFile.write(binPacket)
+    self.indexFile.write(s_indexEntryStruct.pack(
+      self.segmentSize, ert, apid, spid))
+    self.segmentSize += RECORD_HEADER_BYTE_SIZE + packetSize
+  # ---------------------------------------------------------------------------
+  def openSegment(self, segmentStart):
+    """opens (or continues) the segment for segmentStart"""
+    self.closeSegment()
+    segmentBaseName = os.path.join(self.archiveDir,
+                                   getSegmentBaseName(segmentStart))
+    if os.path.exists(segmentBaseName + SEGMENT_FILE_EXTENSION):
+      # the segment might not have been closed properly (e.g. crash)
+      recoverSegment(segmentBaseName)
+    self.segmentFile = open(segmentBaseName + SEGMENT_FILE_EXTENSION, "ab")
+    self.indexFile = open(segmentBaseName + INDEX_FILE_EXTENSION, "ab")
+    self.segmentSize = self.segmentFile.tell()
+    if self.segmentSize == 0:
+      self.segmentFile.write(struct.pack(SEGMENT_HEADER_FORMAT,
+                                         SEGMENT_MAGIC,
+                                         FORMAT_VERSION,
+                                         self.segmentPeriod))
+      self.segmentSize = SEGMENT_HEADER_BYTE_SIZE
+    self.segmentStart = segmentStart
+  # ---------------------------------------------------------------------------
+  def closeSegment(self):
+    """flushes and closes the actual segment"""
+    if self.segmentFile != None:
+      self.flush()
+      self.segmentFile.close()
+      self.indexFile.close()
+      self.segmentFile = None
+      self.indexFile = None
+      self.segmentStart = None
+  # ---------------------------------------------------------------------------
+  def flush(self):
+    """flushes the records before the index entries"""
+    if self.segmentFile != None:
+      self.segmentFile.flush()
+      self.indexFile.flush()
+
+# =============================================================================
+class ArchiveReader(object):
+  """
+  Reads TM packets from an archive, the segments are memory mapped and
+  the packets are returned as memoryviews, they are valid until the
+  reader is closed
+  """
+  # ---------------------------------------------------------------------------
+  def __init__(self, archiveDir):
+    """raises Error if archiveDir is not a directory"""
+    if not os.path.isdir(archiveDir):
+      raise Error(archiveDir + " is not a TM archive directory")
+    self.archiveDir = archiveDir
+    # segment path --> (mmap, memoryview, segment period)
+    self.segmentMaps = {}
+  # ---------------------------------------------------------------------------
+  def getSegments(self):
+    """returns the (segment start, segment base name) pairs sorted by time"""
+    segments = []
+    for fileName in os.listdir(self.archiveDir):
+      segmentBaseName, extension = os.path.splitext(fileName)
+      if extension != SEGMENT_FILE_EXTENSION:
+        continue
+      try:
+        segmentStart = calendar.timegm(
+          time.strptime(segmentBaseName, SEGMENT_TIME_FORMAT))
+      except ValueError:
+        LOG_WARNING("unexpected file " + fileName + " in TM archive")
+        continue
+      segments.append((segmentStart, segmentBaseName))
+    segments.sort()
+    return segments
+  # ---------------------------------------------------------------------------
+  def readPackets(self, startTime=None, stopTime=None, apids=None, spids=None):
+    """
+    generator for (ERT, APID, SPID, SSC, packet) of the selected packets:
+    startTime <= ERT < stopTime, APID in apids, SPID in spids,
+    None selects all, the packets are in archive order
+    """
+    for segmentStart, segmentBaseName in self.getSegments():
+      if stopTime != None and segmentStart >= stopTime:
+        break
+      segmentPath = os.path.join(self.archiveDir, segmentBaseName)
+      buffer, segmentPeriod = self.mapSegment(segmentPath)
+      if buffer == None:
+        continue
+      if startTime != None and segmentStart + segmentPeriod <= startTime:
+        continue
+      for recordOffset, ert, apid, spid in loadIndex(segmentPath, buffer):
+        if startTime != None and ert < startTime:
+          continue
+        if stopTime != None and ert >= stopTime:
+          continue
+        if apids != None and apid not in apids:
+          continue
+        if spids != None and spid not in spids:
+          continue
+        packetSize, ert, apid, spid, ssc = \
+          s_recordHeaderStruct.unpack_from(buffer, recordOffset)
+        packetPos = recordOffset + RECORD_HEADER_BYTE_SIZE
+        yield (ert, apid, spid, ssc, buffer[packetPos:packetPos + packetSize])
+  # ---------------------------------------------------------------------------
+  def mapSegment(self, segmentPath):
+    """
+    memory maps a segment file, returns (memoryview, segment period)
+    or (None, None) for an empty segment, raises Error on a wrong format
+    """
+    if segmentPath in self.segmentMaps:
+      segmentMap, buffer, segmentPeriod = self.segmentMaps[segmentPath]
+      return (buffer, segmentPeriod)
+    segmentFileName = segmentPath + SEGMENT_FILE_EXTENSION
+    file = open(segmentFileName, "rb")
+    try:
+      if os.fstat(file.fileno()).st_size < SEGMENT_HEADER_BYTE_SIZE:
+        return (None, None)
+      segmentMap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    finally:
+      file.close()
+    magic, formatVersion, segmentPeriod = \
+      struct.unpack_from(SEGMENT_HEADER_FORMAT, segmentMap)
+    if magic != SEGMENT_MAGIC:
+      segmentMap.close()
+      raise Error(segmentFileName + " is not a TM archive segment")
+    if formatVersion != FORMAT_VERSION:
+      segmentMap.close()
+      raise Error(segmentFileName + " has unsupported format version " + str(formatVersion))
+    buffer = memoryview(segmentMap)
+    self.segmentMaps[segmentPath] = (segmentMap, buffer, segmentPeriod)
+    return (buffer, segmentPeriod)
+  # ---------------------------------------------------------------------------
+  def close(self):
+    """unmaps the segments, the returned packets must not be used anymore"""
+    for segmentMap, buffer, segmentPeriod in self.segmentMaps.values():
+      buffer.release()
+      try:
+        segmentMap.close()
+      except BufferError:
+        # packet views are still referenced, unmapped when released
+        pass
+    self.segmentMaps = {}
+
+#############
+# functions #
+#############
+# -----------------------------------------------------------------------------
+def getSegmentStart(ert, segmentPeriod):
+  """start time of the segment that contains ert"""
+  return int(ert // segmentPeriod) * segmentPeriod
+# -----------------------------------------------------------------------------
+def getSegmentBaseName(segmentStart):
+  """segment file name without directory and extension"""
+  return time.strftime(SEGMENT_TIME_FORMAT, time.gmtime(segmentStart))
+# -----------------------------------------------------------------------------
+def getTMpacketSPID(tmPacketDu):
+  """identifies the packet, returns NO_SPID if this is not possible"""
+  try:
+    spid = SUPP.IF.s_definitions.getTMpacketKey(tmPacketDu)
+  except Exception:
+    return NO_SPID
+  if spid == None:
+    return NO_SPID
+  return spid
+# -----------------------------------------------------------------------------
+def loadIndex(segmentPath, buffer):
+  """
+  returns the index entries (record offset, ERT, APID, SPID) of a mapped
+  segment, records that are not (completely) indexed are recovered
+  from the record headers, incomplete records are ignored
+  """
+  entries = []
+  segmentSize = len(buffer)
+  recordEnd = SEGMENT_HEADER_BYTE_SIZE
+  try:
+    indexFile = open(segmentPath + INDEX_FILE_EXTENSION, "rb")
+    indexData = indexFile.read()
+    indexFile.close()
+  except OSError:
+    indexData = b""
+  indexSize = len(indexData) - (len(indexData) % INDEX_ENTRY_BYTE_SIZE)
+  for entry in s_indexEntryStruct.iter_unpack(indexData[:indexSize]):
+    recordOffset = entry[0]
+    if recordOffset < recordEnd:
+      # corrupted index, the other records are scanned
+      break
+    if recordOffset > recordEnd:
+      # records that are not indexed before the indexed one, an incomplete
+      # record (e.g. written before a crash) is skipped
+      scanRecords(buffer, recordEnd, recordOffset, entries)
+    if recordOffset + RECORD_HEADER_BYTE_SIZE > segmentSize:
+      break
+    packetSize = s_recordHeaderStruct.unpack_from(buffer, recordOffset)[0]
+    nextRecordEnd = recordOffset + RECORD_HEADER_BYTE_SIZE + packetSize
+    if nextRecordEnd > segmentSize:
+      break
+    entries.append(entry)
+    recordEnd = nextRecordEnd
+  # scan the records behind the last indexed one
+  scanRecords(buffer, recordEnd, segmentSize, entries)
+  return entries
+# -----------------------------------------------------------------------------
+def scanRecords(buffer, recordEnd, scanEnd, entries):
+  """
+  appends the index entries of the complete records between recordEnd
+  and scanEnd to entries, returns the end of the last complete record
+  """
+  while recordEnd + RECORD_HEADER_BYTE_SIZE <= scanEnd:
+    packetSize, ert, apid, spid, ssc = \
+      s_recordHeaderStruct.unpack_from(buffer, recordEnd)
+    nextRecordEnd = recordEnd + RECORD_HEADER_BYTE_SIZE + packetSize
+    if nextRecordEnd > scanEnd:
+      break
+    entries.append((recordEnd, ert, apid, spid))
+    recordEnd = nextRecordEnd
+  return recordEnd
+# -----------------------------------------------------------------------------
+def recoverSegment(segmentPath):
+  """
+  prepares a segment that was not closed properly for appending:
+  an incomplete last record is truncated and the index entries of the
+  records that are not indexed are written
+  """
+  segmentFile = open(segmentPath + SEGMENT_FILE_EXTENSION, "r+b")
+  try:
+    segmentSize = os.fstat(segmentFile.fileno()).st_size
+    if segmentSize < SEGMENT_HEADER_BYTE_SIZE:
+      # incomplete segment header, the segment is started again
+      entries = []
+      recordEnd = 0
+    else:
+      segmentMap = mmap.mmap(segmentFile.fileno(), 0, access=mmap.ACCESS_READ)
+      buffer = memoryview(segmentMap)
+      try:
+        entries = loadIndex(segmentPath, buffer)
+        recordEnd = SEGMENT_HEADER_BYTE_SIZE
+        if len(entries) > 0:
+          recordOffset = entries[-1][0]
+          packetSize = s_recordHeaderStruct.unpack_from(buffer, recordOffset)[0]
+          recordEnd = recordOffset + RECORD_HEADER_BYTE_SIZE + packetSize
+      finally:
+        buffer.release()
+        segmentMap.close()
+    if recordEnd < segmentSize:
+      LOG_WARNING("incomplete record truncated in TM archive segment " + segmentPath)
+      segmentFile.truncate(recordEnd)
+  finally:
+    segmentFile.close()
+  indexFileName = segmentPath + INDEX_FILE_EXTENSION
+  indexData = b"".join([s_indexEntryStruct.pack(*entry) for entry in entries])
+  if not os.path.exists(indexFileName) or \
+     os.path.getsize(indexFileName) != len(indexData):
+    LOG_WARNING("index recovered for TM archive segment " + segmentPath)
+    indexFile = open(indexFileName, "wb")
+    indexFile.write(indexData)
+    indexFile.close()
+# -----------------------------------------------------------------------------
+def convertReplayFile(replayFileName, archiveDir, segmentPeriod=SEGMENT_PERIOD):
+  """
+  converts a hex replay file (written by SUPP.TMrecorder or FRAME2PACKET)
+  into a TM archive, returns the number of converted packets.
+  ERT lines (plain ASD times or ert(...) statements) are applied to the
+  following packets, other replay statements are skipped.
+  """
+  try:
+    replayFile = open(replayFileName)
+  except:
+    raise Error("cannot read " + replayFileName)
+  archiveWriter = ArchiveWriter(archiveDir, segmentPeriod)
+  ert = 0.0
+  packetsNr = 0
+  lineNr = 0
+  try:
+    for line in replayFile:
+      lineNr += 1
+      line = line.strip()
+      if line == "" or line[0] == "#":
+        continue
+      if line.startswith("ert("):
+        line = line[4:].split(")")[0].strip()
+      if len(line.split(".")) == 6:
+        # ERT in ASD format, recorded relative to the ERT mission epoch
+        ertMissionEpoch = UTIL.TIME.getTimeFromASDstr(line)
+        ert = UTIL.TCO.correlateFromERTmissionEpoch(ertMissionEpoch)
+        continue
+      try:
+        binPacket = bytes.fromhex(line)
+      except ValueError:
+        LOG_WARNING("line " + str(lineNr) + " of " + replayFileName + " skipped")
+        continue
+      if len(binPacket) < CCSDS.PACKET.PRIMARY_HEADER_BYTE_SIZE:
+        LOG_WARNING("line " + str(lineNr) + " of " + replayFileName + " skipped")
+        continue
+      tmPacketDu = CCSDS.PACKET.TMpacket(binPacket)
+      archiveWriter.pushPacket(binPacket, ert, getTMpacketSPID(tmPacketDu))
+      packetsNr += 1
+  finally:
+    replayFile.close()
+    archiveWriter.close()
+  return packetsNr
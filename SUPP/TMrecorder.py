@@ -11,10 +11,14 @@
 # for more details.                                                           *
 #******************************************************************************
 # Supplement to TM/TC processing - Telemetry Recorder                         *
+#                                                                             *
+# The TM packets are recorded into a binary TM archive (see SUPP.TMARCHIVE),  *
+# hex replay files of former recordings can be converted with                 *
+# SUPP.TMARCHIVE.convertReplayFile.                                           *
 #******************************************************************************
 from UTIL.SYS import Error, LOG, LOG_INFO, LOG_WARNING, LOG_ERROR
-import SUPP.IF
-import UTIL.TASK, UTIL.TCO, UTIL.TIME
+import SUPP.IF, SUPP.TMARCHIVE
+import UTIL.TASK, UTIL.TIME
 
 ###########
 # classes #
@@ -26,23 +30,20 @@ class PacketRecorder(SUPP.IF.TMrecorder):
   def __init__(self, subsystem):
     """default constructor"""
     self.subsystem = subsystem
-    self.tmPacketsFile = None
+    self.archiveWriter = None
     self.tmPacketsNr = 0
   # ---------------------------------------------------------------------------
   def startRecording(self, recordFileName):
     """
-    starts recording of TM packets,
+    starts recording of TM packets into the archive directory recordFileName,
     implementation of SUPP.IF.TMrecorder.startRecording
     """
     LOG_WARNING("startRecording(" + recordFileName + ")", self.subsystem)
     try:
-      self.tmPacketsFile = open(recordFileName, "w")
+      self.archiveWriter = SUPP.TMARCHIVE.ArchiveWriter(recordFileName)
     except:
       LOG_ERROR("cannot open " + recordFileName, self.subsystem)
       return False
-    self.tmPacketsFile.write("##############################################\n")
-    self.tmPacketsFile.write("# TM packet replay file with hex raw packets #\n")
-    self.tmPacketsFile.write("##############################################\n")
     self.tmPacketsNr = 0
     UTIL.TASK.s_processingTask.notifyGUItask("PACKET_REC_STARTED")
   # ---------------------------------------------------------------------------
@@ -52,9 +53,9 @@ class PacketRecorder(SUPP.IF.TMrecorder):
     implementation of SUPP.IF.TMrecorder.stopRecording
     """
     LOG_WARNING("stopRecording", self.subsystem)
-    if self.tmPacketsFile != None:
-      self.tmPacketsFile.close()
-      self.tmPacketsFile = None
+    if self.archiveWriter != None:
+      self.archiveWriter.close()
+      self.archiveWriter = None
     UTIL.TASK.s_processingTask.notifyGUItask("PACKET_REC_STOPPED")
   # ---------------------------------------------------------------------------
   def isRecording(self):
@@ -62,26 +63,23 @@ class PacketRecorder(SUPP.IF.TMrecorder):
     returns recording status,
     implementation of SUPP.IF.TMrecorder.isRecording
     """
-    return (self.tmPacketsFile != None)
+    return (self.archiveWriter != None)
   # ---------------------------------------------------------------------------
   def pushTMpacket(self, tmPacketDu, ertUTC):
     """
     consumes a telemetry packet,
     implementation of SUPP.IF.TMrecorder.pushTMpacket
     """
-    if self.tmPacketsFile == None:
+    if self.archiveWriter == None:
       return
     self.tmPacketsNr += 1
-    LOG("record TM packet " + str(self.tmPacketsNr), self.subsystem)
-    self.tmPacketsFile.write("# packet " + str(self.tmPacketsNr) + "\n")
-    if ertUTC:
-      ertTime = UTIL.TCO.correlateToERTmissionEpoch(ertUTC)
-      ertTimeStr = UTIL.TIME.getASDtimeStr(ertTime)
-      self.tmPacketsFile.write(ertTimeStr + "\n")
-    rawTmPacket = tmPacketDu.getBuffer()
-    for byte in rawTmPacket:
-      self.tmPacketsFile.write("%02X" % byte)
-    self.tmPacketsFile.write("\n")
+    LOG("record TM packet %d", self.subsystem, self.tmPacketsNr)
+    if not ertUTC:
+      ertUTC = UTIL.TIME.getActualTime()
+    # the packet is copied, the archive is written by a background thread
+    self.archiveWriter.pushPacket(tmPacketDu.getBuffer(),
+                                  ertUTC,
+                                  SUPP.TMARCHIVE.getTMpacketSPID(tmPacketDu))
 
 #############
 # functions #
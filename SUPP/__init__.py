@@ -12,4 +12,4 @@
 #******************************************************************************
 # Supplement to TM/TC processing                                              *
 #******************************************************************************
-__all__ = ["DEF", "IF", "TMrecorder"]
+__all__ = ["DEF", "IF", "TMARCHIVE", "TMrecorder"]
@@ -83,23 +83,88 @@ class GUItask(UTIL.TASK.Task):
     register a file descriptor handler - only works on single threaded UNIX,
     overloaded from UTIL.TASK.Task.createFileHandler
     """
-    tkinter.tkinter.createfilehandler(socket,
-                                      tkinter.tkinter.READABLE,
-                                      handler)
+    self.readDictionary[socket] = handler
+    self.updateSelector(socket)
   # ---------------------------------------------------------------------------
   def deleteFileHandler(self, socket):
     """
     unregister a file descriptor handler - only works on single threaded UNIX,
     overloaded from UTIL.TASK.Task.deleteFileHandler
     """
-    tkinter.tkinter.deletefilehandler(socket)
+    if socket in self.readDictionary:
+      del self.readDictionary[socket]
+      self.updateSelector(socket)
+  # ---------------------------------------------------------------------------
+  def createWriteHandler(self, socket, handler):
+    """
+    register a write readiness handler - only works on single threaded UNIX,
+    overloaded from UTIL.TASK.Task.createWriteHandler
+    """
+    self.writeDictionary[socket] = handler
+    self.updateSelector(socket)
+  # ---------------------------------------------------------------------------
+  def deleteWriteHandler(self, socket):
+    """
+    unregister a write readiness handler - only works on single threaded UNIX,
+    overloaded from UTIL.TASK.Task.deleteWriteHandler
+    """
+    if socket in self.writeDictionary:
+      del self.writeDictionary[socket]
+      self.updateSelector(socket)
   # ---------------------------------------------------------------------------
-  def createTimeHandler(self, ms, handler):
+  def updateSelector(self, socket):
+    """
+    tkinter has only one file handler per socket for reading and writing,
+    overloaded from UTIL.TASK.Task.updateSelector
+    """
+    eventMask = 0
+    if socket in self.readDictionary:
+      eventMask |= tkinter.tkinter.READABLE
+    if socket in self.writeDictionary:
+      eventMask |= tkinter.tkinter.WRITABLE
+    tkinter.tkinter.deletefilehandler(socket)
+    if eventMask != 0:
+      tkinter.tkinter.createfilehandler(socket,
+                                        eventMask,
+                                        self.fileHandlerCallback)
+  # ---------------------------------------------------------------------------
+  def fileHandlerCallback(self, socket, stateMask):
+    """dispatches a tkinter file event to the read and write handlers"""
+    if stateMask & tkinter.tkinter.READABLE:
+      readMethod = self.readDictionary.get(socket)
+      if readMethod != None:
+        readMethod(socket, stateMask)
+    if stateMask & tkinter.tkinter.WRITABLE:
+      writeMethod = self.writeDictionary.get(socket)
+      if writeMethod != None:
+        writeMethod(socket, stateMask)
+  # ---------------------------------------------------------------------------
+  def createTimeHandler(self, ms, handler, periodic=False):
     """
     register a time handler - only works on single threaded UNIX,
     overloaded from UTIL.TASK.Task.createTimeHandler
     """
-    s_gui.after(ms, handler)
+    if periodic:
+      if ms <= 0:
+        raise Error("invalid period for periodic time handler")
+      timerHandle = UTIL.TASK.TimerHandle(handler, ms)
+    else:
+      timerHandle = UTIL.TASK.TimerHandle(handler)
+    def timeout():
+      if timerHandle.cancelled:
+        return
+      if periodic:
+        s_gui.after(ms, timeout)
+      handler()
+    s_gui.after(ms, timeout)
+    return timerHandle
+  # ---------------------------------------------------------------------------
+  def cancelTimeHandler(self, timerHandle):
+    """
+    unregister a time handler,
+    overloaded from UTIL.TASK.Task.cancelTimeHandler
+    """
+    timerHandle.cancel()
 
 # =============================================================================
 class GUIview(tkinter.Frame, AppGrid, UTIL.TASK.View):
@@ -30,34 +30,195 @@
 #
 # size of the BCH code block
 CODE_BLOCK_SIZE = 8
-# galois field with all possible shift register states/transitions
-# this static table speeds up the BCH encoding / checking
-# it is a 128 x 256 bytes field:
-# the 1st index [0]...[127] defines the possible states of the shift register
-# the 2nd index [0]...[255] defines the possible input values
-# the values [0]...[127] defines the next state of the shift register
+# the shift register is linear, therefore a BCH step is composed of
+# the transition of the previous state and the transition of the value:
+# encodeStep(sreg, value) = STATE_TRANSITIONS[sreg] ^ VALUE_TRANSITIONS[value]
+# the tables are constant to avoid any generation during the import,
+# generateShiftRegisterValues() provides the reference values (unit test)
 #
-#     |    0 |    1 |    2 | ... |  255
-# ----+------+------+------+-----+-----
-#   0 | 0x00 | 0x45 | 0x45 | ... | 0x59
-# ----+------+------+------+-----+-----
-#   1 | 0x4F | 0x0A | 0x0A | ... | 0x16
-# ----+------+------+------+-----+-----
-#   2 | 0x5B | 0x1E | 0x1E | ... | 0x02
-# ----+------+------+------+-----+-----
-#   : |   :  |   :  |   :  |     |   :
-# ----+------+------+------+-----+-----
-# 127 | 0x1C | 0x59 | 0x59 | ... | 0x45
-#
-s_shiftRegisterStateTransitions = []
+# next shift register state for input value 0, index = shift register state
+STATE_TRANSITIONS = [
+  0x00, 0x4F, 0x5B, 0x14, 0x73, 0x3C, 0x28, 0x67, 0x23, 0x6C, 0x78, 0x37, 0x50, 0x1F, 0x0B, 0x44,
+  0x46, 0x09, 0x1D, 0x52, 0x35, 0x7A, 0x6E, 0x21, 0x65, 0x2A, 0x3E, 0x71, 0x16, 0x59, 0x4D, 0x02,
+  0x49, 0x06, 0x12, 0x5D, 0x3A, 0x75, 0x61, 0x2E, 0x6A, 0x25, 0x31, 0x7E, 0x19, 0x56, 0x42, 0x0D,
+  0x0F, 0x40, 0x54, 0x1B, 0x7C, 0x33, 0x27, 0x68, 0x2C, 0x63, 0x77, 0x38, 0x5F, 0x10, 0x04, 0x4B,
+  0x57, 0x18, 0x0C, 0x43, 0x24, 0x6B, 0x7F, 0x30, 0x74, 0x3B, 0x2F, 0x60, 0x07, 0x48, 0x5C, 0x13,
+  0x11, 0x5E, 0x4A, 0x05, 0x62, 0x2D, 0x39, 0x76, 0x32, 0x7D, 0x69, 0x26, 0x41, 0x0E, 0x1A, 0x55,
+  0x1E, 0x51, 0x45, 0x0A, 0x6D, 0x22, 0x36, 0x79, 0x3D, 0x72, 0x66, 0x29, 0x4E, 0x01, 0x15, 0x5A,
+  0x58, 0x17, 0x03, 0x4C, 0x2B, 0x64, 0x70, 0x3F, 0x7B, 0x34, 0x20, 0x6F, 0x08, 0x47, 0x53, 0x1C
+]
+# next shift register state for shift register state 0, index = value
+VALUE_TRANSITIONS = [
+  0x00, 0x45, 0x4F, 0x0A, 0x5B, 0x1E, 0x14, 0x51, 0x73, 0x36, 0x3C, 0x79, 0x28, 0x6D, 0x67, 0x22,
+  0x23, 0x66, 0x6C, 0x29, 0x78, 0x3D, 0x37, 0x72, 0x50, 0x15, 0x1F, 0x5A, 0x0B, 0x4E, 0x44, 0x01,
+  0x46, 0x03, 0x09, 0x4C, 0x1D, 0x58, 0x52, 0x17, 0x35, 0x70, 0x7A, 0x3F, 0x6E, 0x2B, 0x21, 0x64,
+  0x65, 0x20, 0x2A, 0x6F, 0x3E, 0x7B, 0x71, 0x34, 0x16, 0x53, 0x59, 0x1C, 0x4D, 0x08, 0x02, 0x47,
+  0x49, 0x0C, 0x06, 0x43, 0x12, 0x57, 0x5D, 0x18, 0x3A, 0x7F, 0x75, 0x30, 0x61, 0x24, 0x2E, 0x6B,
+  0x6A, 0x2F, 0x25, 0x60, 0x31, 0x74, 0x7E, 0x3B, 0x19, 0x5C, 0x56, 0x13, 0x42, 0x07, 0x0D, 0x48,
+  0x0F, 0x4A, 0x40, 0x05, 0x54, 0x11, 0x1B, 0x5E, 0x7C, 0x39, 0x33, 0x76, 0x27, 0x62, 0x68, 0x2D,
+  0x2C, 0x69, 0x63, 0x26, 0x77, 0x32, 0x38, 0x7D, 0x5F, 0x1A, 0x10, 0x55, 0x04, 0x41, 0x4B, 0x0E,
+  0x57, 0x12, 0x18, 0x5D, 0x0C, 0x49, 0x43, 0x06, 0x24, 0x61, 0x6B, 0x2E, 0x7F, 0x3A, 0x30, 0x75,
+  0x74, 0x31, 0x3B, 0x7E, 0x2F, 0x6A, 0x60, 0x25, 0x07, 0x42, 0x48, 0x0D, 0x5C, 0x19, 0x13, 0x56,
+  0x11, 0x54, 0x5E, 0x1B, 0x4A, 0x0F, 0x05, 0x40, 0x62, 0x27, 0x2D, 0x68, 0x39, 0x7C, 0x76, 0x33,
+  0x32, 0x77, 0x7D, 0x38, 0x69, 0x2C, 0x26, 0x63, 0x41, 0x04, 0x0E, 0x4B, 0x1A, 0x5F, 0x55, 0x10,
+  0x1E, 0x5B, 0x51, 0x14, 0x45, 0x00, 0x0A, 0x4F, 0x6D, 0x28, 0x22, 0x67, 0x36, 0x73, 0x79, 0x3C,
+  0x3D, 0x78, 0x72, 0x37, 0x66, 0x23, 0x29, 0x6C, 0x4E, 0x0B, 0x01, 0x44, 0x15, 0x50, 0x5A, 0x1F,
+  0x58, 0x1D, 0x17, 0x52, 0x03, 0x46, 0x4C, 0x09, 0x2B, 0x6E, 0x64, 0x21, 0x70, 0x35, 0x3F, 0x7A,
+  0x7B, 0x3E, 0x34, 0x71, 0x20, 0x65, 0x6F, 0x2A, 0x08, 0x4D, 0x47, 0x02, 0x53, 0x16, 0x1C, 0x59
+]
+# BCH check byte contribution of each of the 7 netto bytes of a code block,
+# the check byte is the XOR of all contributions and CHECK_BYTE_MASK:
+# check = CODE_BLOCK_TABLES[0][BY1] ^ ... ^ CODE_BLOCK_TABLES[6][BY7] ^ 0xFE
+CHECK_BYTE_MASK = 0xFE
+CODE_BLOCK_TABLES = (
+  # netto byte 1
+  [
+    0x00, 0xDA, 0x3E, 0xE4, 0x7C, 0xA6, 0x42, 0x98, 0xF8, 0x22, 0xC6, 0x1C, 0x84, 0x5E, 0xBA, 0x60,
+    0x7A, 0xA0, 0x44, 0x9E, 0x06, 0xDC, 0x38, 0xE2, 0x82, 0x58, 0xBC, 0x66, 0xFE, 0x24, 0xC0, 0x1A,
+    0xF4, 0x2E, 0xCA, 0x10, 0x88, 0x52, 0xB6, 0x6C, 0x0C, 0xD6, 0x32, 0xE8, 0x70, 0xAA, 0x4E, 0x94,
+    0x8E, 0x54, 0xB0, 0x6A, 0xF2, 0x28, 0xCC, 0x16, 0x76, 0xAC, 0x48, 0x92, 0x0A, 0xD0, 0x34, 0xEE,
+    0x62, 0xB8, 0x5C, 0x86, 0x1E, 0xC4, 0x20, 0xFA, 0x9A, 0x40, 0xA4, 0x7E, 0xE6, 0x3C, 0xD8, 0x02,
+    0x18, 0xC2, 0x26, 0xFC, 0x64, 0xBE, 0x5A, 0x80, 0xE0, 0x3A, 0xDE, 0x04, 0x9C, 0x46, 0xA2, 0x78,
+    0x96, 0x4C, 0xA8, 0x72, 0xEA, 0x30, 0xD4, 0x0E, 0x6E, 0xB4, 0x50, 0x8A, 0x12, 0xC8, 0x2C, 0xF6,
+    0xEC, 0x36, 0xD2, 0x08, 0x90, 0x4A, 0xAE, 0x74, 0x14, 0xCE, 0x2A, 0xF0, 0x68, 0xB2, 0x56, 0x8C,
+    0xC4, 0x1E, 0xFA, 0x20, 0xB8, 0x62, 0x86, 0x5C, 0x3C, 0xE6, 0x02, 0xD8, 0x40, 0x9A, 0x7E, 0xA4,
+    0xBE, 0x64, 0x80, 0x5A, 0xC2, 0x18, 0xFC, 0x26, 0x46, 0x9C, 0x78, 0xA2, 0x3A, 0xE0, 0x04, 0xDE,
+    0x30, 0xEA, 0x0E, 0xD4, 0x4C, 0x96, 0x72, 0xA8, 0xC8, 0x12, 0xF6, 0x2C, 0xB4, 0x6E, 0x8A, 0x50,
+    0x4A, 0x90, 0x74, 0xAE, 0x36, 0xEC, 0x08, 0xD2, 0xB2, 0x68, 0x8C, 0x56, 0xCE, 0x14, 0xF0, 0x2A,
+    0xA6, 0x7C, 0x98, 0x42, 0xDA, 0x00, 0xE4, 0x3E, 0x5E, 0x84, 0x60, 0xBA, 0x22, 0xF8, 0x1C, 0xC6,
+    0xDC, 0x06, 0xE2, 0x38, 0xA0, 0x7A, 0x9E, 0x44, 0x24, 0xFE, 0x1A, 0xC0, 0x58, 0x82, 0x66, 0xBC,
+    0x52, 0x88, 0x6C, 0xB6, 0x2E, 0xF4, 0x10, 0xCA, 0xAA, 0x70, 0x94, 0x4E, 0xD6, 0x0C, 0xE8, 0x32,
+    0x28, 0xF2, 0x16, 0xCC, 0x54, 0x8E, 0x6A, 0xB0, 0xD0, 0x0A, 0xEE, 0x34, 0xAC, 0x76, 0x92, 0x48
+  ],
+  # netto byte 2
+  [
+    0x00, 0xC8, 0x1A, 0xD2, 0x34, 0xFC, 0x2E, 0xE6, 0x68, 0xA0, 0x72, 0xBA, 0x5C, 0x94, 0x46, 0x8E,
+    0xD0, 0x18, 0xCA, 0x02, 0xE4, 0x2C, 0xFE, 0x36, 0xB8, 0x70, 0xA2, 0x6A, 0x8C, 0x44, 0x96, 0x5E,
+    0x2A, 0xE2, 0x30, 0xF8, 0x1E, 0xD6, 0x04, 0xCC, 0x42, 0x8A, 0x58, 0x90, 0x76, 0xBE, 0x6C, 0xA4,
+    0xFA, 0x32, 0xE0, 0x28, 0xCE, 0x06, 0xD4, 0x1C, 0x92, 0x5A, 0x88, 0x40, 0xA6, 0x6E, 0xBC, 0x74,
+    0x54, 0x9C, 0x4E, 0x86, 0x60, 0xA8, 0x7A, 0xB2, 0x3C, 0xF4, 0x26, 0xEE, 0x08, 0xC0, 0x12, 0xDA,
+    0x84, 0x4C, 0x9E, 0x56, 0xB0, 0x78, 0xAA, 0x62, 0xEC, 0x24, 0xF6, 0x3E, 0xD8, 0x10, 0xC2, 0x0A,
+    0x7E, 0xB6, 0x64, 0xAC, 0x4A, 0x82, 0x50, 0x98, 0x16, 0xDE, 0x0C, 0xC4, 0x22, 0xEA, 0x38, 0xF0,
+    0xAE, 0x66, 0xB4, 0x7C, 0x9A, 0x52, 0x80, 0x48, 0xC6, 0x0E, 0xDC, 0x14, 0xF2, 0x3A, 0xE8, 0x20,
+    0xA8, 0x60, 0xB2, 0x7A, 0x9C, 0x54, 0x86, 0x4E, 0xC0, 0x08, 0xDA, 0x12, 0xF4, 0x3C, 0xEE, 0x26,
+    0x78, 0xB0, 0x62, 0xAA, 0x4C, 0x84, 0x56, 0x9E, 0x10, 0xD8, 0x0A, 0xC2, 0x24, 0xEC, 0x3E, 0xF6,
+    0x82, 0x4A, 0x98, 0x50, 0xB6, 0x7E, 0xAC, 0x64, 0xEA, 0x22, 0xF0, 0x38, 0xDE, 0x16, 0xC4, 0x0C,
+    0x52, 0x9A, 0x48, 0x80, 0x66, 0xAE, 0x7C, 0xB4, 0x3A, 0xF2, 0x20, 0xE8, 0x0E, 0xC6, 0x14, 0xDC,
+    0xFC, 0x34, 0xE6, 0x2E, 0xC8, 0x00, 0xD2, 0x1A, 0x94, 0x5C, 0x8E, 0x46, 0xA0, 0x68, 0xBA, 0x72,
+    0x2C, 0xE4, 0x36, 0xFE, 0x18, 0xD0, 0x02, 0xCA, 0x44, 0x8C, 0x5E, 0x96, 0x70, 0xB8, 0x6A, 0xA2,
+    0xD6, 0x1E, 0xCC, 0x04, 0xE2, 0x2A, 0xF8, 0x30, 0xBE, 0x76, 0xA4, 0x6C, 0x8A, 0x42, 0x90, 0x58,
+    0x06, 0xCE, 0x1C, 0xD4, 0x32, 0xFA, 0x28, 0xE0, 0x6E, 0xA6, 0x74, 0xBC, 0x5A, 0x92, 0x40, 0x88
+  ],
+  # netto byte 3
+  [
+    0x00, 0xEA, 0x5E, 0xB4, 0xBC, 0x56, 0xE2, 0x08, 0xF2, 0x18, 0xAC, 0x46, 0x4E, 0xA4, 0x10, 0xFA,
+    0x6E, 0x84, 0x30, 0xDA, 0xD2, 0x38, 0x8C, 0x66, 0x9C, 0x76, 0xC2, 0x28, 0x20, 0xCA, 0x7E, 0x94,
+    0xDC, 0x36, 0x82, 0x68, 0x60, 0x8A, 0x3E, 0xD4, 0x2E, 0xC4, 0x70, 0x9A, 0x92, 0x78, 0xCC, 0x26,
+    0xB2, 0x58, 0xEC, 0x06, 0x0E, 0xE4, 0x50, 0xBA, 0x40, 0xAA, 0x1E, 0xF4, 0xFC, 0x16, 0xA2, 0x48,
+    0x32, 0xD8, 0x6C, 0x86, 0x8E, 0x64, 0xD0, 0x3A, 0xC0, 0x2A, 0x9E, 0x74, 0x7C, 0x96, 0x22, 0xC8,
+    0x5C, 0xB6, 0x02, 0xE8, 0xE0, 0x0A, 0xBE, 0x54, 0xAE, 0x44, 0xF0, 0x1A, 0x12, 0xF8, 0x4C, 0xA6,
+    0xEE, 0x04, 0xB0, 0x5A, 0x52, 0xB8, 0x0C, 0xE6, 0x1C, 0xF6, 0x42, 0xA8, 0xA0, 0x4A, 0xFE, 0x14,
+    0x80, 0x6A, 0xDE, 0x34, 0x3C, 0xD6, 0x62, 0x88, 0x72, 0x98, 0x2C, 0xC6, 0xCE, 0x24, 0x90, 0x7A,
+    0x64, 0x8E, 0x3A, 0xD0, 0xD8, 0x32, 0x86, 0x6C, 0x96, 0x7C, 0xC8, 0x22, 0x2A, 0xC0, 0x74, 0x9E,
+    0x0A, 0xE0, 0x54, 0xBE, 0xB6, 0x5C, 0xE8, 0x02, 0xF8, 0x12, 0xA6, 0x4C, 0x44, 0xAE, 0x1A, 0xF0,
+    0xB8, 0x52, 0xE6, 0x0C, 0x04, 0xEE, 0x5A, 0xB0, 0x4A, 0xA0, 0x14, 0xFE, 0xF6, 0x1C, 0xA8, 0x42,
+    0xD6, 0x3C, 0x88, 0x62, 0x6A, 0x80, 0x34, 0xDE, 0x24, 0xCE, 0x7A, 0x90, 0x98, 0x72, 0xC6, 0x2C,
+    0x56, 0xBC, 0x08, 0xE2, 0xEA, 0x00, 0xB4, 0x5E, 0xA4, 0x4E, 0xFA, 0x10, 0x18, 0xF2, 0x46, 0xAC,
+    0x38, 0xD2, 0x66, 0x8C, 0x84, 0x6E, 0xDA, 0x30, 0xCA, 0x20, 0x94, 0x7E, 0x76, 0x9C, 0x28, 0xC2,
+    0x8A, 0x60, 0xD4, 0x3E, 0x36, 0xDC, 0x68, 0x82, 0x78, 0x92, 0x26, 0xCC, 0xC4, 0x2E, 0x9A, 0x70,
+    0xE4, 0x0E, 0xBA, 0x50, 0x58, 0xB2, 0x06, 0xEC, 0x16, 0xFC, 0x48, 0xA2, 0xAA, 0x40, 0xF4, 0x1E
+  ],
+  # netto byte 4
+  [
+    0x00, 0x4A, 0x94, 0xDE, 0xA2, 0xE8, 0x36, 0x7C, 0xCE, 0x84, 0x5A, 0x10, 0x6C, 0x26, 0xF8, 0xB2,
+    0x16, 0x5C, 0x82, 0xC8, 0xB4, 0xFE, 0x20, 0x6A, 0xD8, 0x92, 0x4C, 0x06, 0x7A, 0x30, 0xEE, 0xA4,
+    0x2C, 0x66, 0xB8, 0xF2, 0x8E, 0xC4, 0x1A, 0x50, 0xE2, 0xA8, 0x76, 0x3C, 0x40, 0x0A, 0xD4, 0x9E,
+    0x3A, 0x70, 0xAE, 0xE4, 0x98, 0xD2, 0x0C, 0x46, 0xF4, 0xBE, 0x60, 0x2A, 0x56, 0x1C, 0xC2, 0x88,
+    0x58, 0x12, 0xCC, 0x86, 0xFA, 0xB0, 0x6E, 0x24, 0x96, 0xDC, 0x02, 0x48, 0x34, 0x7E, 0xA0, 0xEA,
+    0x4E, 0x04, 0xDA, 0x90, 0xEC, 0xA6, 0x78, 0x32, 0x80, 0xCA, 0x14, 0x5E, 0x22, 0x68, 0xB6, 0xFC,
+    0x74, 0x3E, 0xE0, 0xAA, 0xD6, 0x9C, 0x42, 0x08, 0xBA, 0xF0, 0x2E, 0x64, 0x18, 0x52, 0x8C, 0xC6,
+    0x62, 0x28, 0xF6, 0xBC, 0xC0, 0x8A, 0x54, 0x1E, 0xAC, 0xE6, 0x38, 0x72, 0x0E, 0x44, 0x9A, 0xD0,
+    0xB0, 0xFA, 0x24, 0x6E, 0x12, 0x58, 0x86, 0xCC, 0x7E, 0x34, 0xEA, 0xA0, 0xDC, 0x96, 0x48, 0x02,
+    0xA6, 0xEC, 0x32, 0x78, 0x04, 0x4E, 0x90, 0xDA, 0x68, 0x22, 0xFC, 0xB6, 0xCA, 0x80, 0x5E, 0x14,
+    0x9C, 0xD6, 0x08, 0x42, 0x3E, 0x74, 0xAA, 0xE0, 0x52, 0x18, 0xC6, 0x8C, 0xF0, 0xBA, 0x64, 0x2E,
+    0x8A, 0xC0, 0x1E, 0x54, 0x28, 0x62, 0xBC, 0xF6, 0x44, 0x0E, 0xD0, 0x9A, 0xE6, 0xAC, 0x72, 0x38,
+    0xE8, 0xA2, 0x7C, 0x36, 0x4A, 0x00, 0xDE, 0x94, 0x26, 0x6C, 0xB2, 0xF8, 0x84, 0xCE, 0x10, 0x5A,
+    0xFE, 0xB4, 0x6A, 0x20, 0x5C, 0x16, 0xC8, 0x82, 0x30, 0x7A, 0xA4, 0xEE, 0x92, 0xD8, 0x06, 0x4C,
+    0xC4, 0x8E, 0x50, 0x1A, 0x66, 0x2C, 0xF2, 0xB8, 0x0A, 0x40, 0x9E, 0xD4, 0xA8, 0xE2, 0x3C, 0x76,
+    0xD2, 0x98, 0x46, 0x0C, 0x70, 0x3A, 0xE4, 0xAE, 0x1C, 0x56, 0x88, 0xC2, 0xBE, 0xF4, 0x2A, 0x60
+  ],
+  # netto byte 5
+  [
+    0x00, 0x52, 0xA4, 0xF6, 0xC2, 0x90, 0x66, 0x34, 0x0E, 0x5C, 0xAA, 0xF8, 0xCC, 0x9E, 0x68, 0x3A,
+    0x1C, 0x4E, 0xB8, 0xEA, 0xDE, 0x8C, 0x7A, 0x28, 0x12, 0x40, 0xB6, 0xE4, 0xD0, 0x82, 0x74, 0x26,
+    0x38, 0x6A, 0x9C, 0xCE, 0xFA, 0xA8, 0x5E, 0x0C, 0x36, 0x64, 0x92, 0xC0, 0xF4, 0xA6, 0x50, 0x02,
+    0x24, 0x76, 0x80, 0xD2, 0xE6, 0xB4, 0x42, 0x10, 0x2A, 0x78, 0x8E, 0xDC, 0xE8, 0xBA, 0x4C, 0x1E,
+    0x70, 0x22, 0xD4, 0x86, 0xB2, 0xE0, 0x16, 0x44, 0x7E, 0x2C, 0xDA, 0x88, 0xBC, 0xEE, 0x18, 0x4A,
+    0x6C, 0x3E, 0xC8, 0x9A, 0xAE, 0xFC, 0x0A, 0x58, 0x62, 0x30, 0xC6, 0x94, 0xA0, 0xF2, 0x04, 0x56,
+    0x48, 0x1A, 0xEC, 0xBE, 0x8A, 0xD8, 0x2E, 0x7C, 0x46, 0x14, 0xE2, 0xB0, 0x84, 0xD6, 0x20, 0x72,
+    0x54, 0x06, 0xF0, 0xA2, 0x96, 0xC4, 0x32, 0x60, 0x5A, 0x08, 0xFE, 0xAC, 0x98, 0xCA, 0x3C, 0x6E,
+    0xE0, 0xB2, 0x44, 0x16, 0x22, 0x70, 0x86, 0xD4, 0xEE, 0xBC, 0x4A, 0x18, 0x2C, 0x7E, 0x88, 0xDA,
+    0xFC, 0xAE, 0x58, 0x0A, 0x3E, 0x6C, 0x9A, 0xC8, 0xF2, 0xA0, 0x56, 0x04, 0x30, 0x62, 0x94, 0xC6,
+    0xD8, 0x8A, 0x7C, 0x2E, 0x1A, 0x48, 0xBE, 0xEC, 0xD6, 0x84, 0x72, 0x20, 0x14, 0x46, 0xB0, 0xE2,
+    0xC4, 0x96, 0x60, 0x32, 0x06, 0x54, 0xA2, 0xF0, 0xCA, 0x98, 0x6E, 0x3C, 0x08, 0x5A, 0xAC, 0xFE,
+    0x90, 0xC2, 0x34, 0x66, 0x52, 0x00, 0xF6, 0xA4, 0x9E, 0xCC, 0x3A, 0x68, 0x5C, 0x0E, 0xF8, 0xAA,
+    0x8C, 0xDE, 0x28, 0x7A, 0x4E, 0x1C, 0xEA, 0xB8, 0x82, 0xD0, 0x26, 0x74, 0x40, 0x12, 0xE4, 0xB6,
+    0xA8, 0xFA, 0x0C, 0x5E, 0x6A, 0x38, 0xCE, 0x9C, 0xA6, 0xF4, 0x02, 0x50, 0x64, 0x36, 0xC0, 0x92,
+    0xB4, 0xE6, 0x10, 0x42, 0x76, 0x24, 0xD2, 0x80, 0xBA, 0xE8, 0x1E, 0x4C, 0x78, 0x2A, 0xDC, 0x8E
+  ],
+  # netto byte 6
+  [
+    0x00, 0xD6, 0x26, 0xF0, 0x4C, 0x9A, 0x6A, 0xBC, 0x98, 0x4E, 0xBE, 0x68, 0xD4, 0x02, 0xF2, 0x24,
+    0xBA, 0x6C, 0x9C, 0x4A, 0xF6, 0x20, 0xD0, 0x06, 0x22, 0xF4, 0x04, 0xD2, 0x6E, 0xB8, 0x48, 0x9E,
+    0xFE, 0x28, 0xD8, 0x0E, 0xB2, 0x64, 0x94, 0x42, 0x66, 0xB0, 0x40, 0x96, 0x2A, 0xFC, 0x0C, 0xDA,
+    0x44, 0x92, 0x62, 0xB4, 0x08, 0xDE, 0x2E, 0xF8, 0xDC, 0x0A, 0xFA, 0x2C, 0x90, 0x46, 0xB6, 0x60,
+    0x76, 0xA0, 0x50, 0x86, 0x3A, 0xEC, 0x1C, 0xCA, 0xEE, 0x38, 0xC8, 0x1E, 0xA2, 0x74, 0x84, 0x52,
+    0xCC, 0x1A, 0xEA, 0x3C, 0x80, 0x56, 0xA6, 0x70, 0x54, 0x82, 0x72, 0xA4, 0x18, 0xCE, 0x3E, 0xE8,
+    0x88, 0x5E, 0xAE, 0x78, 0xC4, 0x12, 0xE2, 0x34, 0x10, 0xC6, 0x36, 0xE0, 0x5C, 0x8A, 0x7A, 0xAC,
+    0x32, 0xE4, 0x14, 0xC2, 0x7E, 0xA8, 0x58, 0x8E, 0xAA, 0x7C, 0x8C, 0x5A, 0xE6, 0x30, 0xC0, 0x16,
+    0xEC, 0x3A, 0xCA, 0x1C, 0xA0, 0x76, 0x86, 0x50, 0x74, 0xA2, 0x52, 0x84, 0x38, 0xEE, 0x1E, 0xC8,
+    0x56, 0x80, 0x70, 0xA6, 0x1A, 0xCC, 0x3C, 0xEA, 0xCE, 0x18, 0xE8, 0x3E, 0x82, 0x54, 0xA4, 0x72,
+    0x12, 0xC4, 0x34, 0xE2, 0x5E, 0x88, 0x78, 0xAE, 0x8A, 0x5C, 0xAC, 0x7A, 0xC6, 0x10, 0xE0, 0x36,
+    0xA8, 0x7E, 0x8E, 0x58, 0xE4, 0x32, 0xC2, 0x14, 0x30, 0xE6, 0x16, 0xC0, 0x7C, 0xAA, 0x5A, 0x8C,
+    0x9A, 0x4C, 0xBC, 0x6A, 0xD6, 0x00, 0xF0, 0x26, 0x02, 0xD4, 0x24, 0xF2, 0x4E, 0x98, 0x68, 0xBE,
+    0x20, 0xF6, 0x06, 0xD0, 0x6C, 0xBA, 0x4A, 0x9C, 0xB8, 0x6E, 0x9E, 0x48, 0xF4, 0x22, 0xD2, 0x04,
+    0x64, 0xB2, 0x42, 0x94, 0x28, 0xFE, 0x0E, 0xD8, 0xFC, 0x2A, 0xDA, 0x0C, 0xB0, 0x66, 0x96, 0x40,
+    0xDE, 0x08, 0xF8, 0x2E, 0x92, 0x44, 0xB4, 0x62, 0x46, 0x90, 0x60, 0xB6, 0x0A, 0xDC, 0x2C, 0xFA
+  ],
+  # netto byte 7
+  [
+    0x00, 0x8A, 0x9E, 0x14, 0xB6, 0x3C, 0x28, 0xA2, 0xE6, 0x6C, 0x78, 0xF2, 0x50, 0xDA, 0xCE, 0x44,
+    0x46, 0xCC, 0xD8, 0x52, 0xF0, 0x7A, 0x6E, 0xE4, 0xA0, 0x2A, 0x3E, 0xB4, 0x16, 0x9C, 0x88, 0x02,
+    0x8C, 0x06, 0x12, 0x98, 0x3A, 0xB0, 0xA4, 0x2E, 0x6A, 0xE0, 0xF4, 0x7E, 0xDC, 0x56, 0x42, 0xC8,
+    0xCA, 0x40, 0x54, 0xDE, 0x7C, 0xF6, 0xE2, 0x68, 0x2C, 0xA6, 0xB2, 0x38, 0x9A, 0x10, 0x04, 0x8E,
+    0x92, 0x18, 0x0C, 0x86, 0x24, 0xAE, 0xBA, 0x30, 0x74, 0xFE, 0xEA, 0x60, 0xC2, 0x48, 0x5C, 0xD6,
+    0xD4, 0x5E, 0x4A, 0xC0, 0x62, 0xE8, 0xFC, 0x76, 0x32, 0xB8, 0xAC, 0x26, 0x84, 0x0E, 0x1A, 0x90,
+    0x1E, 0x94, 0x80, 0x0A, 0xA8, 0x22, 0x36, 0xBC, 0xF8, 0x72, 0x66, 0xEC, 0x4E, 0xC4, 0xD0, 0x5A,
+    0x58, 0xD2, 0xC6, 0x4C, 0xEE, 0x64, 0x70, 0xFA, 0xBE, 0x34, 0x20, 0xAA, 0x08, 0x82, 0x96, 0x1C,
+    0xAE, 0x24, 0x30, 0xBA, 0x18, 0x92, 0x86, 0x0C, 0x48, 0xC2, 0xD6, 0x5C, 0xFE, 0x74, 0x60, 0xEA,
+    0xE8, 0x62, 0x76, 0xFC, 0x5E, 0xD4, 0xC0, 0x4A, 0x0E, 0x84, 0x90, 0x1A, 0xB8, 0x32, 0x26, 0xAC,
+    0x22, 0xA8, 0xBC, 0x36, 0x94, 0x1E, 0x0A, 0x80, 0xC4, 0x4E, 0x5A, 0xD0, 0x72, 0xF8, 0xEC, 0x66,
+    0x64, 0xEE, 0xFA, 0x70, 0xD2, 0x58, 0x4C, 0xC6, 0x82, 0x08, 0x1C, 0x96, 0x34, 0xBE, 0xAA, 0x20,
+    0x3C, 0xB6, 0xA2, 0x28, 0x8A, 0x00, 0x14, 0x9E, 0xDA, 0x50, 0x44, 0xCE, 0x6C, 0xE6, 0xF2, 0x78,
+    0x7A, 0xF0, 0xE4, 0x6E, 0xCC, 0x46, 0x52, 0xD8, 0x9C, 0x16, 0x02, 0x88, 0x2A, 0xA0, 0xB4, 0x3E,
+    0xB0, 0x3A, 0x2E, 0xA4, 0x06, 0x8C, 0x98, 0x12, 0x56, 0xDC, 0xC8, 0x42, 0xE0, 0x6A, 0x7E, 0xF4,
+    0xF6, 0x7C, 0x68, 0xE2, 0x40, 0xCA, 0xDE, 0x54, 0x10, 0x9A, 0x8E, 0x04, 0xA6, 0x2C, 0x38, 0xB2
+  ])
 
 #############
 # functions #
 #############
 # -----------------------------------------------------------------------------
 def generateShiftRegisterValues():
-  """generates the values of the galois field"""
-  global s_shiftRegisterStateTransitions
+  """
+  generates the galois field with all shift register state transitions
+  bit by bit, this is the reference for the constant tables,
+  it is a 128 x 256 bytes field:
+  the 1st index [0]...[127] defines the possible states of the shift register
+  the 2nd index [0]...[255] defines the possible input values
+  the values [0]...[127] defines the next state of the shift register
+  """
+  shiftRegisterStateTransitions = []
   for sregState in range(0, 128):
     transitionField = []
     for value in range(0, 256):
@@ -73,7 +234,8 @@ def generateShiftRegisterValues():
         mask >>= 1                   # shift 7 bits in shift register right
       sreg &= 0x7F                   # keep 7 bits
       transitionField.append(sreg)
-    s_shiftRegisterStateTransitions.append(transitionField)
+    shiftRegisterStateTransitions.append(transitionField)
+  return shiftRegisterStateTransitions
 # -----------------------------------------------------------------------------
 def encodeStart():
   """starts the BCH encoding with the initial shift register state"""
@@ -81,17 +243,26 @@ def encodeStart():
 # -----------------------------------------------------------------------------
 def encodeStep(sreg, value):
   """performs an icremental step in the BCH encoding: 1,...,7 """
-  global s_shiftRegisterStateTransitions
-  return s_shiftRegisterStateTransitions[sreg][value]
+  return STATE_TRANSITIONS[sreg] ^ VALUE_TRANSITIONS[value]
 # -----------------------------------------------------------------------------
 def encodeStop(sreg):
   """final step: returns the BCH code from the shift register state"""
   sreg ^= 0xFF           # invert the shift register state
   sreg <<= 1             # make it the 7 most sign. bits
   return (sreg & 0xFE)   # filter the 7 most sign bits
-
-###########################
-# Initialisation sequence #
-###########################
-# initialise the galois field
-generateShiftRegisterValues()
+# -----------------------------------------------------------------------------
+def encodeBlocks(data):
+  """
+  returns the BCH check bytes of all code blocks in data (bytes),
+  the size of data must be a multiple of 7
+  """
+  t1, t2, t3, t4, t5, t6, t7 = CODE_BLOCK_TABLES
+  # process the n-th byte of all code blocks in parallel
+  return bytes([t1[b1] ^ t2[b2] ^ t3[b3] ^ t4[b4] ^ t5[b5] ^ t6[b6] ^ t7[b7] ^ CHECK_BYTE_MASK
+                for b1, b2, b3, b4, b5, b6, b7 in zip(data[0::7],
+                                                      data[1::7],
+                                                      data[2::7],
+                                                      data[3::7],
+                                                      data[4::7],
+                                                      data[5::7],
+                                                      data[6::7])])
@@ -13,13 +13,92 @@
 # Utilities - CRC Checksum Calculation                                        *
 #                                                                             *
 # CCSDS packets and Transfer Frames may contain a trailing CRC checksum.      *
+# The CRC is the CRC-16-CCITT (polynom 0x1021, preset 0xFFFF), which is       *
+# calculated table driven. The incremental API allows the calculation of the  *
+# CRC while a data unit is assembled:                                         *
+#   crc = update(INITIAL_VALUE, part1); crc = update(crc, part2); ...         *
 #******************************************************************************
+import binascii
+
+#############
+# constants #
+#############
+# shift register preset with all ones
+INITIAL_VALUE = 0x0000FFFF
+# generator polynom D0-D15: X^16 + X^12 + X^5 + X^0
+POLYNOM = 0x00001021
+CRC_BYTE_SIZE = 2
 
 #############
 # functions #
 #############
+# -----------------------------------------------------------------------------
+def generateTable():
+  """generates the table with the CRC contribution of each byte value"""
+  table = []
+  for byte in range(0, 256):
+    shiftReg = byte << 8
+    for bitNo in range(0, 8):
+      if (shiftReg & 0x8000) > 0:
+        shiftReg = ((shiftReg << 1) ^ POLYNOM) & 0xFFFF
+      else:
+        shiftReg = (shiftReg << 1) & 0xFFFF
+    table.append(shiftReg)
+  return tuple(table)
+# -----------------------------------------------------------------------------
+# table for the CRC calculation in Python, index = byte value
+CRC_TABLE = generateTable()
+# -----------------------------------------------------------------------------
 def calculate(byteArray):
   """calculates the CRC from the byte array"""
+  return update(INITIAL_VALUE, byteArray)
+# -----------------------------------------------------------------------------
+def update(crc, byteArray):
+  """
+  incremental CRC calculation: returns the CRC of the previous data (crc)
+  extended with the byte array, the start value is INITIAL_VALUE
+  """
+  # the table driven CRC-16-CCITT (XMODEM variant) of binascii is used with
+  # the CCSDS preset: it is implemented in C and accepts the previous CRC
+  try:
+    return binascii.crc_hqx(byteArray, crc)
+  except TypeError:
+    # sequences of integers (e.g. lists) are not bytes-like
+    return binascii.crc_hqx(bytes(byteArray), crc)
+# -----------------------------------------------------------------------------
+def updateTable(crc, byteArray):
+  """incremental CRC calculation in Python via CRC_TABLE, see update()"""
+  table = CRC_TABLE
+  for byte in byteArray:
+    crc = ((crc << 8) & 0xFF00) ^ table[(crc >> 8) ^ byte]
+  return crc
+# -----------------------------------------------------------------------------
+def checkFrames(byteArray, frameSize, startPos=0, frameCount=None):
+  """
+  validates the trailing CRC of consecutive data units with a fixed size
+  (e.g. TM frames) in one buffer, returns a list with a flag per data unit
+  """
+  if frameSize <= CRC_BYTE_SIZE:
+    raise ValueError("invalid frameSize")
+  if frameCount == None:
+    frameCount = (len(byteArray) - startPos) // frameSize
+  if startPos < 0 or startPos + (frameCount * frameSize) > len(byteArray):
+    raise IndexError("startPos/frameCount out of buffer")
+  if type(byteArray) == list:
+    byteArray = bytes(byteArray)
+  # the CRC over a data unit including its correct CRC is always 0
+  results = []
+  crcHqx = binascii.crc_hqx
+  with memoryview(byteArray) as view:
+    framePos = startPos
+    for i in range(frameCount):
+      nextFramePos = framePos + frameSize
+      results.append(crcHqx(view[framePos:nextFramePos], INITIAL_VALUE) == 0)
+      framePos = nextFramePos
+  return results
+# -----------------------------------------------------------------------------
+def calculateBitwise(byteArray):
+  """calculates the CRC from the byte array bit by bit (reference algorithm)"""
   # 32 bit shift register for CRC generation
   # D0  - D15  :CRC shift register
   # D16        : MSB after shift
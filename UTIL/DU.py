@@ -43,6 +43,31 @@ BIT_FILTER = [
   [None, None, None, None, None, None, None, 0xFE]]
 ARRAY_TYPE = type(array.array("B"))
 STRING_TYPE = type("")
+INT_TYPE = type(0)
+# attribute access via compiled field accessors (see compileAccessorClass)
+COMPILED_ACCESSORS = True
+# struct formats for byte aligned fields, index = byte size
+UNSIGNED_FORMATS = {1: "!B", 2: "!H", 4: "!I", 8: "!Q"}
+SIGNED_FORMATS = {1: "!b", 2: "!h", 4: "!i", 8: "!q"}
+FLOAT_FORMATS = {4: "!f", 8: "!d"}
+# generic accessor methods, index = field type
+FIELD_ACCESSOR_METHODS = {
+  BITS: ("getBits", "setBits"),
+  SBITS: ("getSBits", "setSBits"),
+  BYTES: ("getBytes", "setBytes"),
+  UNSIGNED: ("getUnsigned", "setUnsigned"),
+  SIGNED: ("getSigned", "setSigned"),
+  FLOAT: ("getFloat", "setFloat"),
+  TIME: ("getTime", "setTime"),
+  STRING: ("getString", "setString")}
+
+####################
+# global variables #
+####################
+# generated subclasses with compiled field accessors:
+# key = (baseClass, id(attributeMap1), attributesSize1, id(attributeMap2))
+# value = (attributeMap1, attributeMap2, compiledClass)
+s_compiledClasses = {}
 
 ###########
 # classes #
@@ -67,6 +92,7 @@ class BinaryUnit(object):
     object.__setattr__(self, "attributesSize1", attributesSize1)
     object.__setattr__(self, "attributeMap1", attributeMap1)
     object.__setattr__(self, "attributeMap2", attributeMap2)
+    self.compileAccessors()
     if emptyData:
       self.initAttributes()
   # ---------------------------------------------------------------------------
@@ -74,6 +100,25 @@ class BinaryUnit(object):
     """hook for initializing attributes, can be overloaded in derived class"""
     pass
   # ---------------------------------------------------------------------------
+  def compileAccessors(self):
+    """
+    binds the data unit to a generated subclass that provides the attributes
+    of attributeMap1 and attributeMap2 via compiled field accessors
+    """
+    if not COMPILED_ACCESSORS or self.attributeMap1 == None:
+      return
+    baseClass = type(self).__dict__.get("compiledBaseClass", type(self))
+    compiledClass = compileAccessorClass(baseClass,
+                                         self.attributesSize1,
+                                         self.attributeMap1,
+                                         self.attributeMap2)
+    object.__setattr__(self, "__class__", compiledClass)
+  # ---------------------------------------------------------------------------
+  def setAttributeMap2(self, attributeMap2):
+    """changes the attribute map of the secondary header"""
+    object.__setattr__(self, "attributeMap2", attributeMap2)
+    self.compileAccessors()
+  # ---------------------------------------------------------------------------
   def getBuffer(self):
     """returns the used elements of the buffer"""
     return self.buffer[0:self.usedBufferSize]
@@ -221,7 +266,7 @@ class BinaryUnit(object):
       self.buffer.extend(array.array("B", binaryString))
     object.__setattr__(self, "usedBufferSize", len(self.buffer))
     if attributeMap2 != None:
-      object.__setattr__(self, "attributeMap2", attributeMap2)
+      self.setAttributeMap2(attributeMap2)
   # ---------------------------------------------------------------------------
   def getBits(self, bitPos, bitLength):
     """extracts bits as numerical unsigned value"""
@@ -706,3 +751,216 @@ def signed2unsigned(value, byteSize):
       return (value + 0x100000000)
   # positive (or invalid byte size)
   return value
+# -----------------------------------------------------------------------------
+def compileAccessorClass(baseClass, attributesSize1, attributeMap1, attributeMap2):
+  """
+  returns the generated subclass of baseClass that implements the attributes
+  of attributeMap1 and attributeMap2 as compiled field accessors (properties),
+  the subclass is generated on first use and cached afterwards,
+  note: attribute maps must not be modified after their first usage
+  """
+  key = (baseClass, id(attributeMap1), attributesSize1, id(attributeMap2))
+  entry = s_compiledClasses.get(key)
+  if entry != None:
+    return entry[2]
+  # the entries of attributeMap1 take precedence over attributeMap2,
+  # attributes that conflict with class members are left to __getattr__
+  fields = {}
+  if attributeMap2 != None and attributesSize1 != None:
+    for name, fieldSpec in attributeMap2.items():
+      fields[name] = (fieldSpec, attributesSize1)
+  for name, fieldSpec in attributeMap1.items():
+    fields[name] = (fieldSpec, 0)
+  namespace = {"__module__": baseClass.__module__,
+               "__qualname__": baseClass.__qualname__,
+               "__doc__": baseClass.__doc__,
+               "compiledBaseClass": baseClass}
+  setters = {}
+  for name, (fieldSpec, byteOffset) in fields.items():
+    if hasattr(baseClass, name):
+      continue
+    fieldOffset, fieldLength, fieldType = fieldSpec
+    getter, setter = compileFieldAccessors(fieldOffset, fieldLength, fieldType, byteOffset)
+    namespace[name] = property(getter, setter)
+    setters[name] = setter
+  baseSetattr = baseClass.__setattr__
+  def compiledSetattr(self, name, value):
+    """write access to the data unit attributes"""
+    if name in setters:
+      setters[name](self, value)
+    else:
+      baseSetattr(self, name, value)
+  namespace["__setattr__"] = compiledSetattr
+  compiledClass = type(baseClass.__name__, (baseClass,), namespace)
+  s_compiledClasses[key] = (attributeMap1, attributeMap2, compiledClass)
+  return compiledClass
+# -----------------------------------------------------------------------------
+def compileFieldAccessors(fieldOffset, fieldLength, fieldType, byteOffset=0):
+  """
+  returns a getter and a setter function for a field of an attribute map,
+  byteOffset is the position of the attribute map in the data unit
+  """
+  if fieldType == BITS or fieldType == SBITS:
+    fieldOffset += (byteOffset << 3)
+    if fieldOffset >= 0 and (fieldLength > 1 or (fieldType == BITS and fieldLength > 0)):
+      return compileBitsAccessors(fieldOffset, fieldLength, fieldType == SBITS)
+  else:
+    fieldOffset += byteOffset
+    if fieldType == UNSIGNED or fieldType == SIGNED:
+      if fieldOffset >= 0 and fieldLength > 0:
+        return compileIntegerAccessors(fieldOffset, fieldLength, fieldType == SIGNED)
+    elif fieldType == FLOAT:
+      if fieldOffset >= 0 and fieldLength in FLOAT_FORMATS:
+        return compileFloatAccessors(fieldOffset, fieldLength)
+  # BYTES, TIME, STRING and invalid field specifications
+  # are delegated to the generic accessor methods
+  getterName, setterName = FIELD_ACCESSOR_METHODS[fieldType]
+  def getter(self):
+    return getattr(self, getterName)(fieldOffset, fieldLength)
+  def setter(self, value):
+    getattr(self, setterName)(fieldOffset, fieldLength, value)
+  return (getter, setter)
+# -----------------------------------------------------------------------------
+def compileBitsAccessors(bitPos, bitLength, signed):
+  """returns compiled getter and setter functions for a BITS/SBITS field"""
+  # the field is read and written as one big-endian word
+  # that covers all bytes with bits of the field
+  firstBytePos = bitPos >> 3
+  lastBitPos = bitPos + bitLength - 1
+  lastBytePos = lastBitPos >> 3
+  wordSize = lastBytePos - firstBytePos + 1
+  shift = 7 - (lastBitPos & 7)
+  valueMask = (1 << bitLength) - 1
+  clearMask = ((1 << (wordSize << 3)) - 1) ^ (valueMask << shift)
+  maxPosValue = (1 << (bitLength - 1)) - 1
+  signOffset = (1 << bitLength)
+  genericName = "setSBits" if signed else "setBits"
+  if wordSize == 1:
+    def readWord(buffer):
+      return buffer[firstBytePos]
+    def writeWord(buffer, word):
+      buffer[firstBytePos] = word
+  elif wordSize in UNSIGNED_FORMATS:
+    wordStruct = struct.Struct(UNSIGNED_FORMATS[wordSize])
+    unpackFrom = wordStruct.unpack_from
+    packInto = wordStruct.pack_into
+    def readWord(buffer):
+      return unpackFrom(buffer, firstBytePos)[0]
+    def writeWord(buffer, word):
+      packInto(buffer, firstBytePos, word)
+  else:
+    def readWord(buffer):
+      return int.from_bytes(buffer[firstBytePos:lastBytePos+1], "big")
+    def writeWord(buffer, word):
+      buffer[firstBytePos:lastBytePos+1] = array.array("B", word.to_bytes(wordSize, "big"))
+  # specialised getters (single byte fields are inlined)
+  if wordSize == 1 and not signed:
+    def getter(self):
+      if lastBytePos >= self.usedBufferSize:
+        raise IndexError("bitPos/bitLength out of buffer")
+      return (self.buffer[firstBytePos] >> shift) & valueMask
+  elif not signed:
+    def getter(self):
+      if lastBytePos >= self.usedBufferSize:
+        raise IndexError("bitPos/bitLength out of buffer")
+      return (readWord(self.buffer) >> shift) & valueMask
+  else:
+    def getter(self):
+      if lastBytePos >= self.usedBufferSize:
+        raise IndexError("bitPos/bitLength out of buffer")
+      value = (readWord(self.buffer) >> shift) & valueMask
+      if value > maxPosValue:
+        value -= signOffset
+      return value
+  # the setter handles values out of range in the generic method
+  def setter(self, value):
+    if type(value) != INT_TYPE:
+      try:
+        value = int(value)
+      except:
+        raise ValueError("value is not an integer")
+    if signed and value < 0:
+      value += signOffset
+    if value < 0 or value > valueMask:
+      getattr(self, genericName)(bitPos, bitLength, value)
+      return
+    if lastBytePos >= self.usedBufferSize:
+      raise IndexError("bitPos/bitLength out of buffer")
+    buffer = self.buffer
+    if wordSize == 1:
+      buffer[firstBytePos] = (buffer[firstBytePos] & clearMask) | (value << shift)
+    else:
+      writeWord(buffer, (readWord(buffer) & clearMask) | (value << shift))
+  return (getter, setter)
+# -----------------------------------------------------------------------------
+def compileIntegerAccessors(bytePos, byteLength, signed):
+  """returns compiled getter and setter functions for an UNSIGNED/SIGNED field"""
+  endPos = bytePos + byteLength
+  if signed:
+    minValue = -(1 << ((byteLength << 3) - 1))
+    maxValue = (1 << ((byteLength << 3) - 1)) - 1
+    formats = SIGNED_FORMATS
+    genericName = "setSigned"
+  else:
+    minValue = 0
+    maxValue = (1 << (byteLength << 3)) - 1
+    formats = UNSIGNED_FORMATS
+    genericName = "setUnsigned"
+  if byteLength == 1 and not signed:
+    def getter(self):
+      if endPos > self.usedBufferSize:
+        raise IndexError("bytePos/byteLength out of buffer")
+      return self.buffer[bytePos]
+  elif byteLength in formats:
+    valueStruct = struct.Struct(formats[byteLength])
+    unpackFrom = valueStruct.unpack_from
+    def getter(self):
+      if endPos > self.usedBufferSize:
+        raise IndexError("bytePos/byteLength out of buffer")
+      return unpackFrom(self.buffer, bytePos)[0]
+  else:
+    def getter(self):
+      if endPos > self.usedBufferSize:
+        raise IndexError("bytePos/byteLength out of buffer")
+      return int.from_bytes(self.buffer[bytePos:endPos], "big", signed=signed)
+  if byteLength in formats:
+    packInto = struct.Struct(formats[byteLength]).pack_into
+    def writeValue(buffer, value):
+      packInto(buffer, bytePos, value)
+  else:
+    def writeValue(buffer, value):
+      buffer[bytePos:endPos] = array.array("B", value.to_bytes(byteLength, "big", signed=signed))
+  # the setter handles values out of range in the generic method
+  def setter(self, value):
+    if type(value) != INT_TYPE:
+      try:
+        value = int(value)
+      except:
+        raise ValueError("value is not an integer")
+    if value < minValue or value > maxValue:
+      getattr(self, genericName)(bytePos, byteLength, value)
+      return
+    if endPos > self.usedBufferSize:
+      raise IndexError("bytePos/byteLength out of buffer")
+    writeValue(self.buffer, value)
+  return (getter, setter)
+# -----------------------------------------------------------------------------
+def compileFloatAccessors(bytePos, byteLength):
+  """returns compiled getter and setter functions for a FLOAT field"""
+  endPos = bytePos + byteLength
+  valueStruct = struct.Struct(FLOAT_FORMATS[byteLength])
+  unpackFrom = valueStruct.unpack_from
+  packInto = valueStruct.pack_into
+  def getter(self):
+    if endPos > self.usedBufferSize:
+      raise IndexError("bytePos/byteLength out of buffer")
+    return unpackFrom(self.buffer, bytePos)[0]
+  def setter(self, value):
+    try:
+      value = float(value)
+    except:
+      raise ValueError("value is not a float")
+    if endPos > self.usedBufferSize:
+      raise IndexError("bytePos/byteLength out of buffer")
+    packInto(self.buffer, bytePos, value)
+  return (getter, setter)
@@ -12,7 +12,8 @@
 #******************************************************************************
 # Utilities - System Module                                                   *
 #******************************************************************************
-import os
+import atexit, os, queue, sys, threading, time
+import UTIL.WRITER
 
 #############
 # constants #
@@ -23,6 +24,24 @@ INFO_STR = ESCAPE_STR + "[30;102m"
 WARNING_STR = ESCAPE_STR + "[30;103m"
 ERROR_STR = ESCAPE_STR + "[30;101m"
 RESET_STR = ESCAPE_STR + "[39;49m"
+# log levels, messages below the threshold of their subsystem are discarded
+LOG_LEVEL = 0
+INFO_LEVEL = 1
+WARNING_LEVEL = 2
+ERROR_LEVEL = 3
+OFF_LEVEL = 4
+LOG_LEVELS = {
+  "LOG": LOG_LEVEL,
+  "INFO": INFO_LEVEL,
+  "WARNING": WARNING_LEVEL,
+  "ERROR": ERROR_LEVEL,
+  "OFF": OFF_LEVEL}
+# asynchronous log writer: queue size (lines), flush period (seconds),
+# flush size (bytes) and lines that are written with one write call
+ASYNC_LOG_QUEUE_SIZE = 10000
+ASYNC_LOG_FLUSH_PERIOD = 1.0
+ASYNC_LOG_FLUSH_SIZE = 65536
+ASYNC_LOG_BATCH_SIZE = 1000
 
 ###########
 # classes #
@@ -65,6 +84,7 @@ class DefaultLogger(Logger):
     self.childDefaultLogger = None
     self.childLoggers = {}
     self.logFile = None
+    self.logWriter = None
     self.setColorLogging(False)
   # ---------------------------------------------------------------------------
   def setColorLogging(self, enable):
@@ -89,75 +109,44 @@ class DefaultLogger(Logger):
   # ---------------------------------------------------------------------------
   def _log(self, message, subsystem):
     """logs a message"""
-    if self.logFile != None:
-      if subsystem == None:
-        self.logFile.write(self.logStr + message + self.resetStr + "\n")
-      else:
-        self.logFile.write(self.logStr + "[" + subsystem + "] " + message + self.resetStr + "\n")
-      self.logFile.flush()
-    elif subsystem in self.childLoggers:
-      self.childLoggers[subsystem]._log(message, subsystem)
-    elif self.childDefaultLogger != None:
-      self.childDefaultLogger._log(message, subsystem)
-    else:
-      if subsystem == None:
-        print(self.logStr + message + self.resetStr)
-      else:
-        print(self.logStr + "[" + subsystem + "] " + message + self.resetStr)
+    self.logLine(self.logStr, message, subsystem, "_log", False)
   # ---------------------------------------------------------------------------
   def _logInfo(self, message, subsystem):
     """logs an info message"""
-    if self.logFile != None:
-      if subsystem == None:
-        self.logFile.write(self.infoStr + message + self.resetStr + "\n")
-      else:
-        self.logFile.write(self.infoStr + "[" + subsystem + "] " + message + self.resetStr + "\n")
-      self.logFile.flush()
-    elif subsystem in self.childLoggers:
-      self.childLoggers[subsystem]._logInfo(message, subsystem)
-    elif self.childDefaultLogger != None:
-      self.childDefaultLogger._logInfo(message, subsystem)
-    else:
-      if subsystem == None:
-        print(self.infoStr + message + self.resetStr)
-      else:
-        print(self.infoStr + "[" + subsystem + "] " + message + self.resetStr)
+    self.logLine(self.infoStr, message, subsystem, "_logInfo", False)
   # ---------------------------------------------------------------------------
   def _logWarning(self, message, subsystem):
     """logs a warning message"""
-    if self.logFile != None:
-      if subsystem == None:
-        self.logFile.write(self.warningStr + message + self.resetStr + "\n")
-      else:
-        self.logFile.write(self.warningStr + "[" + subsystem + "] " + message + self.resetStr + "\n")
-      self.logFile.flush()
-    elif subsystem in self.childLoggers:
-      self.childLoggers[subsystem]._logWarning(message, subsystem)
-    elif self.childDefaultLogger != None:
-      self.childDefaultLogger._logWarning(message, subsystem)
-    else:
-      if subsystem == None:
-        print(self.warningStr + message + self.resetStr)
-      else:
-        print(self.warningStr + "[" + subsystem + "] " + message + self.resetStr)
+    self.logLine(self.warningStr, message, subsystem, "_logWarning", False)
   # ---------------------------------------------------------------------------
   def _logError(self, message, subsystem):
-    """logs an error message"""
-    if self.logFile != None:
+    """logs an error message, it is flushed immediately"""
+    self.logLine(self.errorStr, message, subsystem, "_logError", True)
+  # ---------------------------------------------------------------------------
+  def logLine(self, levelStr, message, subsystem, childMethodName, urgent):
+    """
+    logs a message to the log file, a child logger or the console,
+    the asynchronous log writer replaces the log file or the console
+    """
+    logWriter = self.logWriter
+    if self.logFile != None or \
+       (logWriter != None and logWriter.fileName != None) or \
+       (not subsystem in self.childLoggers and self.childDefaultLogger == None):
       if subsystem == None:
-        self.logFile.write(self.errorStr + message + self.resetStr + "\n")
+        line = levelStr + message + self.resetStr
+      else:
+        line = levelStr + "[" + subsystem + "] " + message + self.resetStr
+      if self.logFile != None:
+        self.logFile.write(line + "\n")
+        self.logFile.flush()
+      elif logWriter != None:
+        logWriter.write(line + "\n", urgent)
       else:
-        self.logFile.write(self.errorStr + "[" + subsystem + "] " + message + self.resetStr + "\n")
-      self.logFile.flush()
+        print(line)
     elif subsystem in self.childLoggers:
-      self.childLoggers[subsystem]._logError(message, subsystem)
-    elif self.childDefaultLogger != None:
-      self.childDefaultLogger._logError(message, subsystem)
+      getattr(self.childLoggers[subsystem], childMethodName)(message, subsystem)
     else:
-      if subsystem == None:
-        print(self.errorStr + message + self.resetStr)
-      else:
-        print(self.errorStr + "[" + subsystem + "] " + message + self.resetStr)
+      getattr(self.childDefaultLogger, childMethodName)(message, subsystem)
   # ---------------------------------------------------------------------------
   def registerChildLogger(self, childLogger, subsystem=None):
     """
@@ -194,6 +183,144 @@ class DefaultLogger(Logger):
     if self.logFile != None:
       self.logFile.close()
       self.logFile = None
+  # ---------------------------------------------------------------------------
+  def enableAsyncLogging(self,
+                         fileName=None,
+                         maxBytes=0,
+                         backupCount=0,
+                         queueSize=ASYNC_LOG_QUEUE_SIZE,
+                         flushPeriod=ASYNC_LOG_FLUSH_PERIOD,
+                         flushSize=ASYNC_LOG_FLUSH_SIZE):
+    """
+    enables logging via a background writer thread, either to a file
+    (instead of enableFileLogging) or to the console (instead of print),
+    see AsyncLogWriter
+    """
+    self.disableAsyncLogging()
+    try:
+      self.logWriter = AsyncLogWriter(fileName,
+                                      maxBytes,
+                                      backupCount,
+                                      queueSize,
+                                      flushPeriod,
+                                      flushSize)
+    except:
+      self.logWriter = None
+      LOG_WARNING("Can not open log file " + str(fileName))
+  # ---------------------------------------------------------------------------
+  def disableAsyncLogging(self):
+    """disables the background writer thread, pending lines are written"""
+    if self.logWriter != None:
+      logWriter = self.logWriter
+      self.logWriter = None
+      logWriter.close()
+
+# =============================================================================
+class AsyncLogWriter(UTIL.WRITER.BackgroundWriter):
+  """
+  Writes log lines in a background thread: the lines are passed via a
+  bounded queue and written in batches, the output is flushed periodically,
+  when flushSize bytes are pending and for urgent (error) lines.
+  When the queue is full, lines are dropped and reported afterwards.
+  Log files that exceed maxBytes are rotated (fileName.1 ... backupCount).
+  """
+  # ---------------------------------------------------------------------------
+  def __init__(self,
+               fileName=None,
+               maxBytes=0,
+               backupCount=0,
+               queueSize=ASYNC_LOG_QUEUE_SIZE,
+               flushPeriod=ASYNC_LOG_FLUSH_PERIOD,
+               flushSize=ASYNC_LOG_FLUSH_SIZE):
+    """opens the log file (or uses the console) and starts the thread"""
+    self.fileName = fileName
+    self.maxBytes = maxBytes
+    self.backupCount = backupCount
+    self.flushSize = flushSize
+    self.droppedCount = 0
+    self.droppedLock = threading.Lock()
+    self.reportedDroppedCount = 0
+    if fileName == None:
+      self.stream = sys.stdout
+    else:
+      self.stream = open(fileName, "w")
+    self.fileSize = 0
+    self.pendingSize = 0
+    self.lines = []
+    UTIL.WRITER.BackgroundWriter.__init__(self,
+                                          queueSize,
+                                          flushPeriod,
+                                          ASYNC_LOG_BATCH_SIZE)
+  # ---------------------------------------------------------------------------
+  def write(self, line, urgent=False):
+    """passes a log line to the writer thread, never blocks"""
+    try:
+      self.queue.put_nowait((line, urgent))
+    except queue.Full:
+      self.droppedLock.acquire()
+      self.droppedCount += 1
+      self.droppedLock.release()
+  # ---------------------------------------------------------------------------
+  def writeItem(self, item):
+    """collects the lines of a batch, they are written in endBatch"""
+    line, urgent = item
+    self.lines.append(line)
+    return urgent
+  # ---------------------------------------------------------------------------
+  def endBatch(self):
+    """writes the lines of the batch with one write call"""
+    lines = self.lines
+    self.lines = []
+    droppedCount = self.droppedCount
+    if droppedCount != self.reportedDroppedCount:
+      lines.append("WARNING: " + str(droppedCount - self.reportedDroppedCount) +
+                   " log messages dropped (queue full)\n")
+      self.reportedDroppedCount = droppedCount
+    self.writeLines("".join(lines))
+  # ---------------------------------------------------------------------------
+  def isFlushNeeded(self):
+    """flushes when flushSize bytes are pending"""
+    return self.pendingSize >= self.flushSize
+  # ---------------------------------------------------------------------------
+  def closeOutput(self):
+    """closes the log file"""
+    if self.fileName != None:
+      self.stream.close()
+  # ---------------------------------------------------------------------------
+  def writeError(self, action, ex):
+    """the logging cannot report its own errors via the log"""
+    sys.stderr.write("log writer " + action + " error: " + str(ex) + "\n")
+  # ---------------------------------------------------------------------------
+  def writeLines(self, text):
+    """writes text to the stream, rotates the log file on demand"""
+    if text == "":
+      return
+    self.stream.write(text)
+    self.pendingSize += len(text)
+    self.fileSize += len(text)
+    if self.fileName != None and self.maxBytes > 0 and \
+       self.fileSize >= self.maxBytes:
+      self.rotate()
+  # ---------------------------------------------------------------------------
+  def flush(self):
+    """flushes the stream"""
+    if self.pendingSize > 0:
+      self.stream.flush()
+      self.pendingSize = 0
+  # ---------------------------------------------------------------------------
+  def rotate(self):
+    """renames the log file to fileName.1 and starts a new one"""
+    self.stream.close()
+    if self.backupCount > 0:
+      for i in range(self.backupCount - 1, 0, -1):
+        backupName = self.fileName + "." + str(i)
+        if os.path.exists(backupName):
+          os.replace(backupName, self.fileName + "." + str(i + 1))
+      os.replace(self.fileName, self.fileName + ".1")
+    self.stream = open(self.fileName, "w")
+    self.fileSize = 0
+    self.pendingSize = 0
+    self.lastFlushTime = time.time()
 
 # =============================================================================
 class Configuration(object):
@@ -219,6 +346,11 @@ class Configuration(object):
       # special handling of configuration variables inside the SYS module
       if configVar == "SYS_COLOR_LOG":
         s_logger.setColorLogging(configVal == "1")
+      elif configVar == "SYS_LOG_LEVEL":
+        try:
+          setLogThresholds(configVal)
+        except Error as ex:
+          LOG_WARNING(str(ex))
       self.configDictionary[configVar] = configVal
   # ---------------------------------------------------------------------------
   def __getattr__(self, name):
@@ -235,19 +367,105 @@ class Configuration(object):
 s_configuration = Configuration()
 # logger is a singleton
 s_logger = DefaultLogger()
+# log thresholds of specific subsystems and of all other subsystems
+s_logThresholds = {}
+s_defaultLogThreshold = LOG_LEVEL
+# pending lines of the asynchronous log writer are written on exit
+atexit.register(s_logger.disableAsyncLogging)
 
 #############
 # functions #
 #############
-def LOG(message, subsystem=None):
-  """convenience wrapper for logging"""
-  s_logger._log(message, subsystem)
-def LOG_INFO(message, subsystem=None):
-  """convenience wrapper for info logging"""
-  s_logger._logInfo(message, subsystem)
-def LOG_WARNING(message, subsystem=None):
-  """convenience wrapper for warning logging"""
-  s_logger._logWarning(message, subsystem)
-def LOG_ERROR(message, subsystem=None):
-  """convenience wrapper for error logging"""
-  s_logger._logError(message, subsystem)
+def LOG(message, subsystem=None, *args):
+  """convenience wrapper for logging, see formatMessage"""
+  if s_logThresholds.get(subsystem, s_defaultLogThreshold) <= LOG_LEVEL:
+    s_logger._log(formatMessage(message, args), subsystem)
+def LOG_INFO(message, subsystem=None, *args):
+  """convenience wrapper for info logging, see formatMessage"""
+  if s_logThresholds.get(subsystem, s_defaultLogThreshold) <= INFO_LEVEL:
+    s_logger._logInfo(formatMessage(message, args), subsystem)
+def LOG_WARNING(message, subsystem=None, *args):
+  """convenience wrapper for warning logging, see formatMessage"""
+  if s_logThresholds.get(subsystem, s_defaultLogThreshold) <= WARNING_LEVEL:
+    s_logger._logWarning(formatMessage(message, args), subsystem)
+def LOG_ERROR(message, subsystem=None, *args):
+  """convenience wrapper for error logging, see formatMessage"""
+  if s_logThresholds.get(subsystem, s_defaultLogThreshold) <= ERROR_LEVEL:
+    s_logger._logError(formatMessage(message, args), subsystem)
+# -----------------------------------------------------------------------------
+def formatMessage(message, args):
+  """
+  formats a log message, this is only done when the message is logged:
+  message can be a callable that returns the message string,
+  args are inserted into the message with the % operator
+  """
+  if callable(message):
+    message = message()
+  if len(args) > 0:
+    message = message % args
+  return message
+# -----------------------------------------------------------------------------
+def getLogLevel(level):
+  """returns the log level for a level or a level name"""
+  if level in LOG_LEVELS.values():
+    return level
+  levelName = str(level).upper()
+  if levelName in LOG_LEVELS:
+    return LOG_LEVELS[levelName]
+  raise Error("invalid log level " + str(level) + ", expected one of " + \
+              ", ".join(LOG_LEVELS.keys()))
+# -----------------------------------------------------------------------------
+def getLogLevelName(level):
+  """returns the name of a log level"""
+  for levelName, levelValue in LOG_LEVELS.items():
+    if levelValue == level:
+      return levelName
+  raise Error("invalid log level " + str(level))
+# -----------------------------------------------------------------------------
+def setLogThreshold(level, subsystem=None):
+  """
+  sets the minimum level of the messages that are logged for a subsystem,
+  subsystem None sets the threshold of all subsystems without own threshold
+  """
+  global s_defaultLogThreshold
+  level = getLogLevel(level)
+  if subsystem == None:
+    s_defaultLogThreshold = level
+  else:
+    s_logThresholds[subsystem] = level
+# -----------------------------------------------------------------------------
+def resetLogThresholds():
+  """logs again all messages of all subsystems"""
+  global s_defaultLogThreshold
+  s_logThresholds.clear()
+  s_defaultLogThreshold = LOG_LEVEL
+# -----------------------------------------------------------------------------
+def getLogThreshold(subsystem=None):
+  """returns the minimum level of the messages that are logged"""
+  return s_logThresholds.get(subsystem, s_defaultLogThreshold)
+# -----------------------------------------------------------------------------
+def isLogEnabled(level, subsystem=None):
+  """checks if messages of a level are logged for a subsystem"""
+  return s_logThresholds.get(subsystem, s_defaultLogThreshold) <= level
+# -----------------------------------------------------------------------------
+def setLogThresholds(configValue):
+  """
+  sets log thresholds from a comma separated list, e.g. "WARNING,TM=INFO":
+  entries without subsystem set the default threshold
+  """
+  for entry in configValue.split(","):
+    entry = entry.strip()
+    if entry == "":
+      continue
+    if "=" in entry:
+      subsystem, levelName = entry.split("=", 1)
+      setLogThreshold(levelName.strip(), subsystem.strip())
+    else:
+      setLogThreshold(entry)
+# -----------------------------------------------------------------------------
+def getLogThresholdsStr():
+  """returns the log thresholds in the format of setLogThresholds"""
+  entries = [getLogLevelName(s_defaultLogThreshold)]
+  for subsystem in sorted(s_logThresholds.keys()):
+    entries.append(subsystem + "=" + getLogLevelName(s_logThresholds[subsystem]))
+  return ",".join(entries)
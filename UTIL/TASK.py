@@ -33,7 +33,10 @@
 #              A Task can process the following sources:                      *
 #              - socket events (e.g. TCP/IP readers) that are installed via   *
 #                createFileHandler and deleteFileHandler                      *
+#              - socket write readiness (e.g. TCP/IP writers) that is         *
+#                installed via createWriteHandler and deleteWriteHandler      *
 #              - timer events that are installed via createTimeHandler        *
+#                (one-shot or periodic, cancellable via the returned handle)  *
 #              - Event objects that can be created in any parallel thread     *
 #                and be pushed to the task via pushEvent                      *
 #              - console events that are attached to the task via             *
@@ -53,7 +56,7 @@
 #              provide a transparent integration of a GUI library             *
 #              (e.g. tkinter). In this case the GUI occupies the ParentTask.  *
 #******************************************************************************
-import os, signal, select, socket, struct, sys, threading, time
+import heapq, os, selectors, signal, socket, struct, sys, threading, time
 if sys.platform == "win32":
   import msvcrt
   PLATFORM = "win32"
@@ -99,7 +102,17 @@ class Task(threading.Thread):
     self.eventBuffer = []
     self.views = {}
     self.readDictionary = {}
+    self.writeDictionary = {}
+    # persistent registration of the readers and writers
+    self.selector = selectors.DefaultSelector()
+    # files that the selector cannot poll (e.g. stdin redirected from a
+    # regular file or /dev/null with epoll): fileObject --> eventMask,
+    # they are treated as always ready like with select.select
+    self.unpolledFiles = {}
+    # heap of timer events: [timeoutSec, sequenceNumber, timerHandle]
     self.timerEvents = []
+    self.timerSequenceNumber = 0
+    self.cancelledTimerCount = 0
     self.consoleHandler = None
     self.consoleHandlerIsPolling = False
     if isProcessing:
@@ -137,59 +150,83 @@ class Task(threading.Thread):
     self.poll()
     # process the events: blocks the thread!
     while self.running:
-      # --- prepare readers ---
-      readers = self.readDictionary.keys()
       # --- prepare timers ---
-      # clone the timers because they might be modified by handlers
-      timers = list(self.timerEvents)
       # calculate the timeout for the earliest timer
-      if len(timers) == 0:
+      if len(self.timerEvents) == 0:
         # no timer registered
         timeout = POLL_CYCLE
       else:
         # timer registered ---> take the relative time of the 1st timer event
-        timeAbsoluteSec = time.time()
-        nextTimeoutAbsoluteSec = timers[0][0]
+        timeAbsoluteSec = time.monotonic()
+        nextTimeoutAbsoluteSec = self.timerEvents[0][0]
         nextTimeoutRelativeSec = nextTimeoutAbsoluteSec - timeAbsoluteSec
         # don't use negative timeouts and timeouts > POLL_CYCLE
         timeout = max(0.0, nextTimeoutRelativeSec)
         timeout = min(POLL_CYCLE, timeout)
       # --- wait for an event or timeout ---
-      # use sleep or select depending on the number of readers
-      if len(readers) == 0:
+      # use sleep or select depending on the number of readers and writers
+      if len(self.readDictionary) == 0 and len(self.writeDictionary) == 0:
         time.sleep(timeout)
-        status = [[], [], []]
+        events = []
       else:
+        if len(self.unpolledFiles) > 0:
+          # unpolled files are always ready
+          timeout = 0.0
         try:
-          status = select.select(readers, [], [], timeout)
+          events = self.selector.select(timeout)
         except Exception as ex:
           LOG_ERROR("Select terminated unexcepted: " + str(ex))
           sys.exit(-1)
-      # --- process readers ---
-      # contains only those readers which have data
-      readers = status[0]
-      # try to invoke for these readers the corresponding read method
-      for reader in readers:
-        if reader in self.readDictionary:
-          # reader found --> invoke method
-          readMethod = self.readDictionary[reader]
-          readMethod(reader, None)
-        else:
-          LOG_WARNING("Reader no more in the read dictionary")
+      # --- process readers and writers ---
+      for selectorKey, eventMask in events:
+        self.processFileEvent(selectorKey.fileobj, eventMask)
+      for fileObject, eventMask in list(self.unpolledFiles.items()):
+        self.processFileEvent(fileObject, eventMask)
       # --- process timers ---
-      timeAbsoluteSec = time.time()
-      i = 0
-      while i < len(timers):
-        nextTimeoutAbsoluteSec = timers[i][0]
+      self.processTimers()
+  # ---------------------------------------------------------------------------
+  def processFileEvent(self, fileObject, eventMask):
+    """invokes the read and/or write handler of a ready file"""
+    # the handlers might delete or replace handlers of other sockets,
+    # therefore the actual handler is looked up before each invocation
+    if eventMask & selectors.EVENT_READ:
+      readMethod = self.readDictionary.get(fileObject)
+      if readMethod != None:
+        readMethod(fileObject, None)
+    if eventMask & selectors.EVENT_WRITE:
+      writeMethod = self.writeDictionary.get(fileObject)
+      if writeMethod != None:
+        writeMethod(fileObject, None)
+  # ---------------------------------------------------------------------------
+  def processTimers(self):
+    """invokes the handlers of all expired timer events"""
+    # take the expired timer events out of the heap before the handlers are
+    # invoked, timers that are created by the handlers are processed later
+    timeAbsoluteSec = time.monotonic()
+    expiredTimerEvents = []
+    while len(self.timerEvents) > 0 and self.timerEvents[0][0] <= timeAbsoluteSec:
+      expiredTimerEvents.append(heapq.heappop(self.timerEvents))
+    for timeoutAbsoluteSec, sequenceNumber, timerHandle in expiredTimerEvents:
+      timerHandle.queued = False
+      if timerHandle.cancelled:
+        self.cancelledTimerCount -= 1
+        continue
+      if timerHandle.periodSec > 0.0:
+        # periodic timer: re-arm it relative to the expected timeout to
+        # avoid drift, skip missed periods if the task was too busy
+        nextTimeoutAbsoluteSec = timeoutAbsoluteSec + timerHandle.periodSec
         if nextTimeoutAbsoluteSec <= timeAbsoluteSec:
-          timerMethod = timers[i][1]
-          timerMethod()
-          i += 1
-        else:
-          # too early for the next timeout
-          break
-      # remove all processed timer events
-      self.timerEvents = self.timerEvents[i:]
+          nextTimeoutAbsoluteSec = timeAbsoluteSec + timerHandle.periodSec
+        self.pushTimerEvent(nextTimeoutAbsoluteSec, timerHandle)
+      timerHandle.handler()
+  # ---------------------------------------------------------------------------
+  def pushTimerEvent(self, timeoutAbsoluteSec, timerHandle):
+    """inserts a timer event into the timer heap"""
+    # the sequence number keeps timers with the same timeout in FIFO order
+    self.timerSequenceNumber += 1
+    timerEvent = [timeoutAbsoluteSec, self.timerSequenceNumber, timerHandle]
+    heapq.heappush(self.timerEvents, timerEvent)
+    timerHandle.queued = True
   # ---------------------------------------------------------------------------
   def stop(self):
     """shall be used (e.g. from outside) to terminate the task"""
@@ -240,6 +277,7 @@ class Task(threading.Thread):
       return
     # normal implementation
     self.readDictionary[socket] = handler
+    self.updateSelector(socket)
   # ---------------------------------------------------------------------------
   def deleteFileHandler(self, socket):
     """unregister a file descriptor handler"""
@@ -252,29 +290,110 @@ class Task(threading.Thread):
     # normal implementation
     if socket in self.readDictionary:
       del self.readDictionary[socket]
+      self.updateSelector(socket)
   # ---------------------------------------------------------------------------
-  def createTimeHandler(self, ms, handler):
-    """register a time handler"""
+  def createWriteHandler(self, socket, handler):
+    """
+    register a handler that is called when the socket is ready for writing,
+    the handler shall be deleted when there is nothing more to write
+    """
+    # special implementation for faked thread, delegate to parent task
+    global s_parentTask
+    if self.taskType == FAKETHREAD:
+      if s_parentTask:
+        s_parentTask.createWriteHandler(socket, handler)
+      else:
+        raise Error("missing parent task for write handler creation")
+      return
+    # normal implementation
+    self.writeDictionary[socket] = handler
+    self.updateSelector(socket)
+  # ---------------------------------------------------------------------------
+  def deleteWriteHandler(self, socket):
+    """unregister a write readiness handler"""
+    # special implementation for faked thread, delegate to parent task
+    global s_parentTask
+    if self.taskType == FAKETHREAD:
+      if s_parentTask:
+        s_parentTask.deleteWriteHandler(socket)
+      return
+    # normal implementation
+    if socket in self.writeDictionary:
+      del self.writeDictionary[socket]
+      self.updateSelector(socket)
+  # ---------------------------------------------------------------------------
+  def updateSelector(self, socket):
+    """adapts the selector registration to the read and write handlers"""
+    eventMask = 0
+    if socket in self.readDictionary:
+      eventMask |= selectors.EVENT_READ
+    if socket in self.writeDictionary:
+      eventMask |= selectors.EVENT_WRITE
+    try:
+      self.selector.get_key(socket)
+      registered = True
+    except KeyError:
+      registered = False
+    if eventMask == 0:
+      self.unpolledFiles.pop(socket, None)
+      if registered:
+        self.selector.unregister(socket)
+    elif socket in self.unpolledFiles:
+      self.unpolledFiles[socket] = eventMask
+    elif registered:
+      self.selector.modify(socket, eventMask)
+    else:
+      try:
+        self.selector.register(socket, eventMask)
+      except (PermissionError, ValueError):
+        # epoll refuses regular files and /dev/null
+        self.unpolledFiles[socket] = eventMask
+  # ---------------------------------------------------------------------------
+  def createTimeHandler(self, ms, handler, periodic=False):
+    """
+    register a time handler that is called once after ms milliseconds
+    or every ms milliseconds (periodic), returns a TimerHandle
+    """
     # special implementation for faked thread, delegate to parent task
     global s_parentTask
     if self.taskType == FAKETHREAD:
       if s_parentTask:
-        s_parentTask.createTimeHandler(ms, handler)
+        return s_parentTask.createTimeHandler(ms, handler, periodic)
       else:
         raise Error("missing parent task for time handler creation")
+    # normal implementation: insert a new timer event into the timer heap
+    if periodic:
+      if ms <= 0:
+        raise Error("invalid period for periodic time handler")
+      timerHandle = TimerHandle(handler, ms, self)
+    else:
+      timerHandle = TimerHandle(handler, task=self)
+    timeoutAbsoluteSec = time.monotonic() + (ms / 1000.0)
+    self.pushTimerEvent(timeoutAbsoluteSec, timerHandle)
+    return timerHandle
+  # ---------------------------------------------------------------------------
+  def cancelTimeHandler(self, timerHandle):
+    """unregister a time handler that is created via createTimeHandler"""
+    # special implementation for faked thread, delegate to parent task
+    global s_parentTask
+    if self.taskType == FAKETHREAD:
+      if s_parentTask:
+        s_parentTask.cancelTimeHandler(timerHandle)
       return
-    # normal implementation: create new timer event and order it into
-    # existing ordered timer events
-    timeAbsoluteSec = time.time()
-    timeoutAbsoluteSec = timeAbsoluteSec + (ms / 1000.0)
-    timerEvent = (timeoutAbsoluteSec, handler)
-    i = 0
-    while i < len(self.timerEvents):
-      nextTimeout = self.timerEvents[i][0]
-      if nextTimeout > timeoutAbsoluteSec:
-        break
-      i += 1
-    self.timerEvents.insert(i, timerEvent)
+    # normal implementation: cancelled timer events are removed lazily,
+    # the heap is rebuilt when it is dominated by cancelled timer events
+    if timerHandle.cancelled:
+      return
+    timerHandle.cancelled = True
+    if not timerHandle.queued:
+      # one-shot timer that has already expired
+      return
+    self.cancelledTimerCount += 1
+    if self.cancelledTimerCount > (len(self.timerEvents) >> 1):
+      self.timerEvents = [timerEvent for timerEvent in self.timerEvents
+                          if not timerEvent[2].cancelled]
+      heapq.heapify(self.timerEvents)
+      self.cancelledTimerCount = 0
   # ---------------------------------------------------------------------------
   def registerConsoleHandler(self, consoleHandler):
     """registers a handler that processes the console input"""
@@ -310,6 +429,28 @@ class Task(threading.Thread):
     """notifies with a command (string list) and extra data"""
     pass
 
+# =============================================================================
+class TimerHandle(object):
+  """handle of a time handler that is registered in a task"""
+  # ---------------------------------------------------------------------------
+  def __init__(self, handler, periodMs=0, task=None):
+    """
+    initialise the handler, the period (0 = one-shot) and the task
+    that owns the timer event (None = not managed in a timer heap)
+    """
+    self.handler = handler
+    self.periodSec = periodMs / 1000.0
+    self.task = task
+    self.cancelled = False
+    self.queued = False
+  # ---------------------------------------------------------------------------
+  def cancel(self):
+    """cancels the time handler, see Task.cancelTimeHandler"""
+    if self.task != None:
+      self.task.cancelTimeHandler(self)
+    else:
+      self.cancelled = True
+
 # =============================================================================
 class ProcessingTask(Task):
   """A task that performs the processing of the application."""
@@ -343,6 +484,8 @@ class ProcessingTask(Task):
         self.helpCmd(argv)
       elif cmd == "Q" or cmd == "QUIT":
         self.quitCmd(argv)
+      elif cmd == "LL" or cmd == "LOGLEVEL":
+        self.logLevelCmd(argv)
       else:
         LOG_WARNING("Invalid command " + argv[0])
         self.helpCmd([])
@@ -354,12 +497,34 @@ class ProcessingTask(Task):
     LOG("")
     LOG("h | help ........provides this information")
     LOG("q | quit ........terminates the application")
+    LOG("ll | logLevel [<level> [<subsystem>]] sets/shows the log thresholds")
     LOG("")
   # ---------------------------------------------------------------------------
   def quitCmd(self, argv):
     """Decoded quit command"""
     global s_parentTask
     s_parentTask.stop()
+  # ---------------------------------------------------------------------------
+  def logLevelCmd(self, argv):
+    """
+    Decoded logLevel command: without level the thresholds are shown,
+    without subsystem the threshold of all other subsystems is set
+    """
+    if len(argv) > 3:
+      LOG_WARNING("invalid parameters passed for logLevel")
+      return False
+    if len(argv) > 1:
+      if len(argv) == 3:
+        subsystem = argv[2]
+      else:
+        subsystem = None
+      try:
+        UTIL.SYS.setLogThreshold(argv[1], subsystem)
+      except UTIL.SYS.Error as ex:
+        LOG_WARNING(str(ex))
+        return False
+    LOG_INFO("log thresholds: " + UTIL.SYS.getLogThresholdsStr())
+    return True
 
 # =============================================================================
 class ConsoleHandler(object):
@@ -425,6 +590,7 @@ class RequestHandler(ConsoleHandler):
       i += 1
     # parse command line arguments
     logFileName = None
+    asyncLogging = False
     i = 0
     while i < argc:
       cmdSwitch = argv[i]
@@ -442,6 +608,9 @@ class RequestHandler(ConsoleHandler):
         else:
           LOG_ERROR("no logfile name specified for switch " + cmdSwitch)
           sys.exit(-1)
+      elif (cmdSwitch == "-al") or (cmdSwitch == "-asynclog"):
+        # log file or console output is written in a background thread
+        asyncLogging = True
       elif (cmdSwitch == "-p") or (cmdSwitch == "-port"):
         # port switch ---> next argument is the port number
         i += 1
@@ -466,7 +635,9 @@ class RequestHandler(ConsoleHandler):
         # this is the parent ---> terminate
         sys.exit(0);
     # enalble the log file only if the process is in foreground or the child
-    if logFileName != None:
+    if asyncLogging:
+      UTIL.SYS.s_logger.enableAsyncLogging(logFileName)
+    elif logFileName != None:
       UTIL.SYS.s_logger.enableFileLogging(logFileName)
   # ---------------------------------------------------------------------------
   def openConnectPort(self, hostName=None):
@@ -11,10 +11,39 @@
 # for more details.                                                           *
 #******************************************************************************
 # Utilities - TCP/IP Module                                                   *
+#                                                                             *
+# Data that cannot be sent immediately are queued per connection and sent     *
+# when the socket is ready for writing. When the queued data exceed the high  *
+# watermark the send policy decides if further data are dropped or if the     *
+# sender stalls until the queue has drained below the low watermark.          *
+#                                                                             *
+# Received data units with a size field in the header are decoded             *
+# incrementally by a DataUnitDecoder: a read might contain zero, one or many  *
+# data units and a data unit might be split over several reads.              *
 #******************************************************************************
-import socket, struct, sys
+import collections, itertools, socket, struct, sys, time
 from UTIL.SYS import Error, LOG, LOG_INFO, LOG_WARNING, LOG_ERROR
 
+#############
+# constants #
+#############
+# policies when the send queue exceeds the high watermark
+SEND_POLICY_STALL = 0
+SEND_POLICY_DROP = 1
+# default watermarks of the send queue (in bytes)
+SEND_QUEUE_HIGH_WATERMARK = 4194304
+SEND_QUEUE_LOW_WATERMARK = 1048576
+# maximum number of queued data units that are sent with one sendmsg call
+SEND_COALESCE_COUNT = 64
+# non-blocking send on a blocking socket (not supported on Windows)
+SEND_NON_BLOCKING_FLAGS = getattr(socket, "MSG_DONTWAIT", 0)
+# initial size of the receive buffer of a DataUnitDecoder (in bytes)
+RECEIVE_BUFFER_SIZE = 65536
+# minimum free space in the receive buffer for the next read (in bytes)
+RECEIVE_MIN_READ_SIZE = 16384
+# upper limit for the size field of received data units (in bytes)
+RECEIVE_MAX_DATA_UNIT_SIZE = 16777216
+
 ###########
 # classes #
 ###########
@@ -26,6 +55,18 @@ class DataSocketHandler(object):
     """Initialise attributes only"""
     self.task = task
     self.dataSocket = None
+    self.sendQueue = collections.deque()
+    self.sendQueueBytes = 0
+    self.sendQueueFull = False
+    self.sendQueueHighWatermark = SEND_QUEUE_HIGH_WATERMARK
+    self.sendQueueLowWatermark = SEND_QUEUE_LOW_WATERMARK
+    self.sendPolicy = SEND_POLICY_STALL
+    self.sendQueuePeakBytes = 0
+    self.sendStallTimeSec = 0.0
+    self.sendDroppedCount = 0
+    self.sendDroppedBytes = 0
+    # optional, shall be set by derived classes for recvDataUnits
+    self.dataUnitDecoder = None
   # ---------------------------------------------------------------------------
   def enableDataSocket(self, dataSocket):
     """Enables the data socket"""
@@ -33,6 +74,9 @@ class DataSocketHandler(object):
       LOG_ERROR("Data socket already open!")
       return
     self.dataSocket = dataSocket
+    # discard incomplete data units of a previous connection
+    if self.dataUnitDecoder != None:
+      self.dataUnitDecoder.reset()
     # register the data socket
     self.task.createFileHandler(self.dataSocket,
                                 self.receiveCallback)
@@ -54,21 +98,156 @@ class DataSocketHandler(object):
       return None
     return bytes
   # ---------------------------------------------------------------------------
+  def recvDataUnits(self):
+    """
+    Read the available bytes from the data socket into the dataUnitDecoder,
+    returns the list of complete data units or None if the read has failed
+    """
+    try:
+      nrBytes = self.dataUnitDecoder.recvFrom(self.dataSocket)
+    except BlockingIOError:
+      return []
+    except Exception as ex:
+      self.recvError(str(ex))
+      return None
+    if nrBytes == 0:
+      self.recvError("empty data read")
+      return None
+    try:
+      return self.dataUnitDecoder.decode()
+    except Exception as ex:
+      self.recvError(str(ex))
+      return None
+  # ---------------------------------------------------------------------------
+  def dispatchDataUnits(self, dataUnitCallback):
+    """
+    Read the available data units from the data socket and pass each to
+    dataUnitCallback, stops when a callback has closed the data socket
+    """
+    dataUnits = self.recvDataUnits()
+    if dataUnits == None:
+      # failure handling was done automatically by derived logic
+      return
+    for dataUnit in dataUnits:
+      if self.dataSocket == None:
+        break
+      dataUnitCallback(dataUnit)
+  # ---------------------------------------------------------------------------
   def recvError(self, errorMessage):
     """Read bytes from the data socket has failed"""
     LOG_ERROR("DataSocketHandler.recvError: " + errorMessage)
   # ---------------------------------------------------------------------------
-  def send(self, bytes):
-    """Send bytes to the data socket"""
-    try:
-      nrBytes = self.dataSocket.send(bytes)
-    except Exception as ex:
-      self.sendError(str(ex))
-      return 0
+  def send(self, data):
+    """
+    Send bytes to the data socket, bytes that cannot be sent immediately
+    are queued and sent when the data socket is ready for writing
+    """
+    nrBytes = len(data)
     if nrBytes == 0:
       self.sendError("empty data send")
+      return 0
+    if self.sendQueueFull and self.sendPolicy == SEND_POLICY_DROP:
+      self.sendDroppedCount += 1
+      self.sendDroppedBytes += nrBytes
+      return 0
+    if len(self.sendQueue) == 0:
+      # nothing queued: try to send directly without blocking the task
+      try:
+        sentBytes = self.dataSocket.send(data, SEND_NON_BLOCKING_FLAGS)
+      except BlockingIOError:
+        sentBytes = 0
+      except Exception as ex:
+        self.sendError(str(ex))
+        return 0
+      if sentBytes == nrBytes:
+        return nrBytes
+      data = memoryview(data)[sentBytes:]
+    # the caller might re-use its buffer, therefore a copy is queued
+    self.queueSendData(bytes(data))
     return nrBytes
   # ---------------------------------------------------------------------------
+  def queueSendData(self, data):
+    """appends data to the send queue and applies the send policy"""
+    if len(self.sendQueue) == 0:
+      self.task.createWriteHandler(self.dataSocket, self.sendCallback)
+    self.sendQueue.append(data)
+    self.sendQueueBytes += len(data)
+    self.sendQueuePeakBytes = max(self.sendQueuePeakBytes, self.sendQueueBytes)
+    if self.sendQueueBytes >= self.sendQueueHighWatermark:
+      self.sendQueueFull = True
+      if self.sendPolicy == SEND_POLICY_STALL:
+        # block the task until the queue has drained to the low watermark
+        stallStartTime = time.time()
+        self.flushSendQueue(blocking=True)
+        self.sendStallTimeSec += time.time() - stallStartTime
+  # ---------------------------------------------------------------------------
+  def sendCallback(self, socket, stateMask):
+    """Callback when the data socket is ready for writing"""
+    self.flushSendQueue(blocking=False)
+  # ---------------------------------------------------------------------------
+  def flushSendQueue(self, blocking):
+    """
+    Send queued data to the data socket, small data units are coalesced,
+    blocking: send until the queue has drained to the low watermark
+    """
+    if blocking:
+      flags = 0
+    else:
+      flags = SEND_NON_BLOCKING_FLAGS
+    while len(self.sendQueue) > 0:
+      if blocking and self.sendQueueBytes <= self.sendQueueLowWatermark:
+        break
+      try:
+        if len(self.sendQueue) > 1 and hasattr(self.dataSocket, "sendmsg"):
+          buffers = itertools.islice(self.sendQueue, SEND_COALESCE_COUNT)
+          sentBytes = self.dataSocket.sendmsg(buffers, [], flags)
+        else:
+          sentBytes = self.dataSocket.send(self.sendQueue[0], flags)
+      except BlockingIOError:
+        break
+      except Exception as ex:
+        # discard the queue, otherwise the failed socket stays writable
+        self.clearSendQueue()
+        self.sendError(str(ex))
+        return
+      # remove the sent data from the queue
+      self.sendQueueBytes -= sentBytes
+      while sentBytes > 0:
+        data = self.sendQueue[0]
+        if sentBytes < len(data):
+          self.sendQueue[0] = memoryview(data)[sentBytes:]
+          break
+        sentBytes -= len(data)
+        self.sendQueue.popleft()
+    if self.sendQueueBytes <= self.sendQueueLowWatermark:
+      self.sendQueueFull = False
+    if len(self.sendQueue) == 0:
+      self.task.deleteWriteHandler(self.dataSocket)
+  # ---------------------------------------------------------------------------
+  def clearSendQueue(self):
+    """discards the queued data"""
+    if len(self.sendQueue) > 0 and self.dataSocket != None:
+      self.task.deleteWriteHandler(self.dataSocket)
+    self.sendQueue.clear()
+    self.sendQueueBytes = 0
+    self.sendQueueFull = False
+  # ---------------------------------------------------------------------------
+  def setSendPolicy(self, sendPolicy, highWatermark, lowWatermark):
+    """defines the handling of the send queue when it is full"""
+    if lowWatermark > highWatermark:
+      raise Error("low watermark exceeds high watermark")
+    self.sendPolicy = sendPolicy
+    self.sendQueueHighWatermark = highWatermark
+    self.sendQueueLowWatermark = lowWatermark
+  # ---------------------------------------------------------------------------
+  def getSendMetrics(self):
+    """returns the metrics of the send queue"""
+    return {"queuedBytes": self.sendQueueBytes,
+            "peakQueuedBytes": self.sendQueuePeakBytes,
+            "stallTimeSec": self.sendStallTimeSec,
+            "droppedCount": self.sendDroppedCount,
+            "droppedBytes": self.sendDroppedBytes}
+  # ---------------------------------------------------------------------------
   def sendError(self, errorMessage):
     """Send bytes from the data socket has failed"""
     LOG_ERROR("DatotaSocketHandler.sendError: " + errorMessage)
@@ -79,7 +258,8 @@ class DataSocketHandler(object):
     if self.dataSocket == None:
       LOG_ERROR("Data socket not open!")
       return
-    # unregister the receive socket
+    # unregister the receive socket and discard unsent data
+    self.clearSendQueue()
     self.task.deleteFileHandler(self.dataSocket)
     # close the data socket
     try:
@@ -88,6 +268,102 @@ class DataSocketHandler(object):
       LOG_ERROR("Close of data socket failed: " + str(ex))
     self.dataSocket = None
 
+# =============================================================================
+class DataUnitDecoder(object):
+  """
+  Incremental decoder for a byte stream of data units, the size of a data
+  unit is: value of the size field in the header + sizeFieldDelta
+  """
+  # ---------------------------------------------------------------------------
+  def __init__(self,
+               headerByteSize,
+               sizeFieldAttribute,
+               sizeFieldDelta=0,
+               minDataUnitSize=None):
+    """
+    Initialise the header layout and the receive buffer,
+    sizeFieldAttribute is an UNSIGNED entry of the header attribute map
+    """
+    self.headerByteSize = headerByteSize
+    self.sizeFieldOffset, self.sizeFieldLength, fieldType = sizeFieldAttribute
+    self.sizeFieldDelta = sizeFieldDelta
+    if minDataUnitSize == None:
+      minDataUnitSize = headerByteSize
+    self.minDataUnitSize = minDataUnitSize
+    self.buffer = bytearray(RECEIVE_BUFFER_SIZE)
+    self.reset()
+  # ---------------------------------------------------------------------------
+  def reset(self):
+    """discards all received bytes"""
+    self.startPos = 0
+    self.endPos = 0
+    self.dataUnitSize = None
+  # ---------------------------------------------------------------------------
+  def reserve(self, byteSize):
+    """ensures free space for byteSize bytes at the end of the buffer"""
+    if len(self.buffer) - self.endPos >= byteSize:
+      return
+    # move the pending bytes to the begin of the buffer
+    pendingByteSize = self.endPos - self.startPos
+    if self.startPos > 0:
+      self.buffer[0:pendingByteSize] = self.buffer[self.startPos:self.endPos]
+      self.startPos = 0
+      self.endPos = pendingByteSize
+    # enlarge the buffer for big data units
+    missingByteSize = byteSize - (len(self.buffer) - self.endPos)
+    if missingByteSize > 0:
+      self.buffer.extend(bytes(missingByteSize))
+  # ---------------------------------------------------------------------------
+  def getMissingByteSize(self):
+    """returns the number of bytes that complete the next header/data unit"""
+    pendingByteSize = self.endPos - self.startPos
+    if self.dataUnitSize == None:
+      return self.headerByteSize - pendingByteSize
+    return self.dataUnitSize - pendingByteSize
+  # ---------------------------------------------------------------------------
+  def recvFrom(self, dataSocket):
+    """reads the available bytes from dataSocket, returns the nr of bytes"""
+    self.reserve(max(self.getMissingByteSize(), RECEIVE_MIN_READ_SIZE))
+    with memoryview(self.buffer) as bufferView:
+      nrBytes = dataSocket.recv_into(bufferView[self.endPos:])
+    self.endPos += nrBytes
+    return nrBytes
+  # ---------------------------------------------------------------------------
+  def feed(self, data):
+    """adds received bytes, alternative to recvFrom"""
+    nrBytes = len(data)
+    self.reserve(nrBytes)
+    self.buffer[self.endPos:self.endPos + nrBytes] = data
+    self.endPos += nrBytes
+  # ---------------------------------------------------------------------------
+  def decode(self):
+    """returns the list of complete data units, raises Error on a bad size"""
+    dataUnits = []
+    buffer = self.buffer
+    with memoryview(buffer) as bufferView:
+      while True:
+        pendingByteSize = self.endPos - self.startPos
+        if self.dataUnitSize == None:
+          if pendingByteSize < self.headerByteSize:
+            break
+          sizeFieldPos = self.startPos + self.sizeFieldOffset
+          sizeField = bufferView[sizeFieldPos:sizeFieldPos + self.sizeFieldLength]
+          dataUnitSize = int.from_bytes(sizeField, "big") + self.sizeFieldDelta
+          if dataUnitSize < self.minDataUnitSize or \
+             dataUnitSize > RECEIVE_MAX_DATA_UNIT_SIZE:
+            raise Error("invalid data unit size: " + str(dataUnitSize))
+          self.dataUnitSize = dataUnitSize
+        if pendingByteSize < self.dataUnitSize:
+          break
+        dataUnitEndPos = self.startPos + self.dataUnitSize
+        dataUnits.append(bytes(bufferView[self.startPos:dataUnitEndPos]))
+        self.startPos = dataUnitEndPos
+        self.dataUnitSize = None
+    if self.startPos == self.endPos:
+      self.startPos = 0
+      self.endPos = 0
+    return dataUnits
+
 # =============================================================================
 class Client(DataSocketHandler):
   """TCP/IP client"""
@@ -0,0 +1,153 @@
+#******************************************************************************
+# (C) 2020, Stefan Korner, Austria                                            *
+#                                                                             *
+# The Space Python Library is free software; you can redistribute it and/or   *
+# modify it under under the terms of the MIT License as published by the      *
+# Massachusetts Institute of Technology.                                      *
+#                                                                             *
+# The Space Python Library is distributed in the hope that it will be useful, *
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              *
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the MIT License    *
+# for more details.                                                           *
+#******************************************************************************
+# Utilities - Background Writer                                               *
+#                                                                             *
+# Base class for writers that get their items via a bounded queue and write   *
+# them in batches in a background thread (e.g. log files, TM archives, frame  *
+# recordings). This module is used by UTIL.SYS and must not import it.        *
+#******************************************************************************
+import queue, sys, threading, time
+
+#############
+# constants #
+#############
+WRITE_QUEUE_SIZE = 10000
+WRITE_BATCH_SIZE = 1000
+WRITE_FLUSH_PERIOD = 1.0
+# queue items that control the writer thread
+SYNC_ITEM = ("SYNC",)
+CLOSE_ITEM = ("CLOSE",)
+
+###########
+# classes #
+###########
+# =============================================================================
+class BackgroundWriter(object):
+  """
+  Writes queued items in a background thread: the items that are already
+  queued are processed in batches of up to batchSize, the output is
+  flushed every flushPeriod seconds, on sync/close and when isFlushNeeded
+  returns True. A failing item is reported via writeError, it does not
+  affect the other items or the thread.
+  Derived classes implement writeItem, flush and closeOutput and call
+  BackgroundWriter.__init__ at the end of their initialisation, because
+  it starts the thread.
+  """
+  # ---------------------------------------------------------------------------
+  def __init__(self,
+               queueSize=WRITE_QUEUE_SIZE,
+               flushPeriod=WRITE_FLUSH_PERIOD,
+               batchSize=WRITE_BATCH_SIZE):
+    """creates the queue and starts the writer thread"""
+    self.queue = queue.Queue(queueSize)
+    self.flushPeriod = flushPeriod
+    self.batchSize = batchSize
+    self.lastFlushTime = time.time()
+    self.thread = threading.Thread(target=self.run, daemon=True)
+    self.thread.start()
+  # ---------------------------------------------------------------------------
+  def putItem(self, item):
+    """passes an item to the writer thread, blocks when the queue is full"""
+    self.queue.put(item)
+  # ---------------------------------------------------------------------------
+  def sync(self):
+    """waits until all passed items are written and flushed"""
+    self.queue.put(SYNC_ITEM)
+    self.queue.join()
+  # ---------------------------------------------------------------------------
+  def close(self):
+    """writes the pending items and terminates the writer thread"""
+    if self.thread.is_alive():
+      self.queue.put(CLOSE_ITEM)
+      self.thread.join()
+  # ---------------------------------------------------------------------------
+  def run(self):
+    """writer thread: writes the queued items in batches"""
+    running = True
+    while running:
+      try:
+        item = self.queue.get(timeout=self.flushPeriod)
+      except queue.Empty:
+        self.callSafe(self.flushOutput, "flush")
+        continue
+      # collect the items that are already queued
+      items = [item]
+      while len(items) < self.batchSize:
+        try:
+          items.append(self.queue.get_nowait())
+        except queue.Empty:
+          break
+      try:
+        urgent = False
+        for item in items:
+          if item is CLOSE_ITEM:
+            running = False
+            urgent = True
+          elif item is SYNC_ITEM:
+            urgent = True
+          else:
+            try:
+              if self.writeItem(item):
+                urgent = True
+            except Exception as ex:
+              self.writeError("write", ex)
+        self.callSafe(self.endBatch, "write")
+        if urgent or \
+           self.isFlushNeeded() or \
+           (time.time() - self.lastFlushTime) >= self.flushPeriod:
+          self.callSafe(self.flushOutput, "flush")
+      finally:
+        # sync and close return only when all items are processed
+        for item in items:
+          self.queue.task_done()
+    self.callSafe(self.closeOutput, "close")
+  # ---------------------------------------------------------------------------
+  def callSafe(self, method, action):
+    """calls method, errors are reported via writeError"""
+    try:
+      method()
+    except Exception as ex:
+      self.writeError(action, ex)
+  # ---------------------------------------------------------------------------
+  def flushOutput(self):
+    """flushes the output and restarts the flush period"""
+    self.flush()
+    self.lastFlushTime = time.time()
+  # ---------------------------------------------------------------------------
+  def writeItem(self, item):
+    """
+    writes one item, returns True if the output shall be flushed,
+    shall be implemented in derived classes
+    """
+    pass
+  # ---------------------------------------------------------------------------
+  def endBatch(self):
+    """hook that is called after the items of a batch are written"""
+    pass
+  # ---------------------------------------------------------------------------
+  def isFlushNeeded(self):
+    """hook for additional flush conditions (e.g. buffered size)"""
+    return False
+  # ---------------------------------------------------------------------------
+  def flush(self):
+    """flushes the output"""
+    pass
+  # ---------------------------------------------------------------------------
+  def closeOutput(self):
+    """called by the writer thread when it terminates"""
+    pass
+  # ---------------------------------------------------------------------------
+  def writeError(self, action, ex):
+    """reports an error, action is write, flush or close"""
+    sys.stderr.write("background writer " + action + " error: " +
+                     str(ex) + "\n")
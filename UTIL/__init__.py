@@ -12,4 +12,4 @@
 #******************************************************************************
 # Utilities                                                                   *
 #******************************************************************************
-__all__ = ["BCH", "CRC", "DU", "SYS", "TASK", "TCO", "TCP", "TIME"]
+__all__ = ["BCH", "CRC", "DU", "SYS", "TASK", "TCO", "TCP", "TIME", "WRITER"]
@@ -13,7 +13,7 @@
 #******************************************************************************
 # Unit Tests                                                                  *
 #******************************************************************************
-import unittest
+import random, unittest
 import UTIL.BCH, testData
 
 #############
@@ -42,6 +42,25 @@ class TestCRC(unittest.TestCase):
     sreg = UTIL.BCH.encodeStep(sreg, testData.BCH_BLOCK_02[6])
     code = UTIL.BCH.encodeStop(sreg)
     self.assertEqual(code, testData.BCH_BLOCK_02[7])
+  def test_tables(self):
+    """test the constant tables against the generated galois field"""
+    transitions = UTIL.BCH.generateShiftRegisterValues()
+    for sreg in range(128):
+      for value in range(256):
+        self.assertEqual(UTIL.BCH.encodeStep(sreg, value), transitions[sreg][value])
+  def test_encodeBlocks(self):
+    """test the BCH encoding of complete code blocks"""
+    data = bytes(testData.BCH_BLOCK_01[:7] + testData.BCH_BLOCK_02[:7])
+    codes = UTIL.BCH.encodeBlocks(data)
+    self.assertEqual(codes, bytes([testData.BCH_BLOCK_01[7], testData.BCH_BLOCK_02[7]]))
+    random.seed(4711)
+    data = bytes([random.randrange(256) for i in range(7 * 100)])
+    codes = UTIL.BCH.encodeBlocks(data)
+    for i in range(100):
+      sreg = UTIL.BCH.encodeStart()
+      for value in data[i * 7:(i + 1) * 7]:
+        sreg = UTIL.BCH.encodeStep(sreg, value)
+      self.assertEqual(codes[i], UTIL.BCH.encodeStop(sreg))
 
 ########
 # main #
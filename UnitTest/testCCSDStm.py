@@ -15,7 +15,7 @@
 #******************************************************************************
 import unittest
 import testData
-import CCSDS.ASSEMBLER, CCSDS.FRAME, CCSDS.PACKET, CCSDS.PACKETIZER
+import CCSDS.ASSEMBLER, CCSDS.FRAME, CCSDS.MULTIPLEXER, CCSDS.PACKET, CCSDS.PACKETIZER
 import UTIL.SYS
 
 ####################
@@ -42,10 +42,74 @@ class Assembler(CCSDS.ASSEMBLER.Assembler):
     """notifies when the next TM frame is assembled"""
     # overloaded from CCSDS.ASSEMBLER.Assembler
     global s_packetizer, s_tmBinFrames
+    # the frame CRC is calculated while the frame is assembled
+    if not tmFrameDu.checkChecksum():
+      raise AssertionError("invalid TM frame CRC")
     binFrame = tmFrameDu.getBuffer()
     s_tmBinFrames.append(binFrame)
     s_packetizer.pushTMframe(binFrame)
 
+# =============================================================================
+class RecordingAssembler(CCSDS.ASSEMBLER.Assembler):
+  """Assembler that records the frames"""
+  def __init__(self, useFrameTemplate):
+    """Initialise attributes only"""
+    CCSDS.ASSEMBLER.Assembler.__init__(self, useFrameTemplate=useFrameTemplate)
+    self.binFrames = []
+  # ---------------------------------------------------------------------------
+  def notifyTMframeCallback(self, tmFrameDu):
+    """notifies when the next TM frame is assembled"""
+    # overloaded from CCSDS.ASSEMBLER.Assembler
+    if not tmFrameDu.checkChecksum():
+      raise AssertionError("invalid TM frame CRC")
+    self.binFrames.append(tmFrameDu.getBuffer())
+
+# =============================================================================
+class RecordingMultiplexer(CCSDS.MULTIPLEXER.Multiplexer):
+  """Multiplexer that records the frames"""
+  def __init__(self, scheduling):
+    """Initialise attributes only"""
+    CCSDS.MULTIPLEXER.Multiplexer.__init__(self, scheduling)
+    self.tmFrames = []
+  # ---------------------------------------------------------------------------
+  def notifyTMframeCallback(self, tmFrameDu):
+    """notifies when the next TM frame is emitted"""
+    # overloaded from CCSDS.MULTIPLEXER.Multiplexer
+    if not tmFrameDu.checkChecksum():
+      raise AssertionError("invalid TM frame CRC")
+    self.tmFrames.append(CCSDS.FRAME.TMframe(tmFrameDu.getBuffer()))
+  # ---------------------------------------------------------------------------
+  def getVirtualChannelIds(self):
+    """returns the VCIDs of the recorded frames"""
+    return [tmFrame.virtualChannelId for tmFrame in self.tmFrames]
+
+# =============================================================================
+class RecordingPacketizer(CCSDS.PACKETIZER.Packetizer):
+  """Packetizer that records the packets"""
+  def __init__(self, frameVCID):
+    """Initialise attributes only"""
+    CCSDS.PACKETIZER.Packetizer.__init__(self, frameVCID)
+    self.binPackets = []
+  # ---------------------------------------------------------------------------
+  def notifyTMpacketCallback(self, binPacket):
+    """notifies when the next TM packet is assembled"""
+    # overloaded from CSDS.PACKETIZER.Packetizer
+    self.binPackets.append(binPacket)
+
+# =============================================================================
+class RecordingDemultiplexer(CCSDS.PACKETIZER.Demultiplexer):
+  """Demultiplexer that records the packets per virtual channel"""
+  def __init__(self, virtualChannelIds=None, zeroCopy=False):
+    """Initialise attributes only"""
+    CCSDS.PACKETIZER.Demultiplexer.__init__(self, virtualChannelIds, zeroCopy)
+    self.binPackets = {}
+  # ---------------------------------------------------------------------------
+  def notifyTMpacketCallback(self, binPacket):
+    """notifies when the next TM packet is assembled"""
+    # overloaded from CSDS.PACKETIZER.Demultiplexer
+    if CCSDS.PACKET.getApplicationProcessId(binPacket) != CCSDS.PACKET.IDLE_PKT_APID:
+      self.binPackets.setdefault(self.virtualChannelId, []).append(bytes(binPacket))
+
 # =============================================================================
 class Packetizer(CCSDS.PACKETIZER.Packetizer):
   """Subclass of CCSDS.PACKETIZER.Packetizer"""
@@ -60,9 +124,35 @@ class Packetizer(CCSDS.PACKETIZER.Packetizer):
     global s_tmBinPackets
     s_tmBinPackets.append(binPacket)
 
+# =============================================================================
+class ZeroCopyPacketizer(CCSDS.PACKETIZER.Packetizer):
+  """Packetizer that passes packets as memoryviews"""
+  def __init__(self):
+    """Initialise attributes only"""
+    frameVCID = int(UTIL.SYS.s_configuration.TM_TRANSFER_FRAME_VCID)
+    CCSDS.PACKETIZER.Packetizer.__init__(self, frameVCID, zeroCopy=True)
+    self.binPackets = []
+  # ---------------------------------------------------------------------------
+  def notifyTMpacketCallback(self, binPacket):
+    """notifies when the next TM packet is assembled"""
+    # overloaded from CSDS.PACKETIZER.Packetizer
+    if type(binPacket) != memoryview:
+      raise AssertionError("binPacket is not a memoryview")
+    # the view is only valid during the callback
+    self.binPackets.append(binPacket.tobytes())
+
 #############
 # functions #
 #############
+def createTMpacket(apid, packetSize):
+  """creates a TM packet with a counter in the data field"""
+  tmPacket = CCSDS.PACKET.TMpacket([i % 256 for i in range(packetSize)])
+  tmPacket.versionNumber = 0
+  tmPacket.packetType = CCSDS.PACKET.TM_PACKET_TYPE
+  tmPacket.applicationProcessId = apid
+  tmPacket.setPacketLength()
+  return tmPacket.getBuffer()
+# -----------------------------------------------------------------------------
 def initConfiguration():
   """initialise the system configuration"""
   UTIL.SYS.s_configuration.setDefaults([
@@ -281,6 +371,222 @@ class TestCCSDStm(unittest.TestCase):
     self.assertEqual(receivedTmPacket, tm2Packet)
     receivedTmPacket = CCSDS.PACKET.TMpacket(s_tmBinPackets[2])
     self.assertEqual(receivedTmPacket.applicationProcessId, CCSDS.PACKET.IDLE_PKT_APID)
+  # ---------------------------------------------------------------------------
+  def test_zeroCopy(self):
+    """pass spillover packets through a zero copy Packetizer"""
+    global s_assembler, s_packetizer, s_tmBinFrames, s_tmBinPackets
+    s_assembler.multiPacketMode = True
+    s_assembler.reset()
+    s_packetizer.reset()
+    s_tmBinFrames = []
+    s_tmBinPackets = []
+    for tmPacketData in [testData.TM_PACKET_02, testData.TM_PACKET_04,
+                         testData.TM_PACKET_01, testData.TM_PACKET_04,
+                         testData.TM_PACKET_03, testData.TM_PACKET_02]:
+      tmPacket = CCSDS.PACKET.TMpacket(tmPacketData)
+      s_assembler.pushTMpacket(tmPacket.getBuffer())
+    s_assembler.flushTMframe()
+    # the same frames must result in the same packets
+    zeroCopyPacketizer = ZeroCopyPacketizer()
+    for binFrame in s_tmBinFrames:
+      zeroCopyPacketizer.pushTMframe(binFrame)
+    self.assertEqual(len(zeroCopyPacketizer.binPackets), len(s_tmBinPackets))
+    for i in range(len(s_tmBinPackets)):
+      self.assertEqual(zeroCopyPacketizer.binPackets[i], s_tmBinPackets[i].tobytes())
+    self.assertFalse(zeroCopyPacketizer.isPacketPending())
+  # ---------------------------------------------------------------------------
+  def test_frameTemplate(self):
+    """frames from the frame template are identical to created frames"""
+    tmPackets = []
+    for tmPacketData in [testData.TM_PACKET_01, testData.TM_PACKET_02,
+                         testData.TM_PACKET_03, testData.TM_PACKET_04]:
+      tmPackets.append(CCSDS.PACKET.TMpacket(tmPacketData).getBuffer())
+    # packets that leave 1...6 bytes free space cause an idle packet spillover
+    for packetSize in [100, 1000, 1098, 1102, 1103, 1105, 2200, 4000]:
+      tmPackets.append(CCSDS.PACKET.createIdlePacket(packetSize).getBuffer())
+    for multiPacketMode in [False, True]:
+      for secondaryHeaderFlag in [0, 1]:
+        assemblers = [RecordingAssembler(useFrameTemplate=False),
+                      RecordingAssembler(useFrameTemplate=True)]
+        for assembler in assemblers:
+          assembler.multiPacketMode = multiPacketMode
+          if secondaryHeaderFlag == 1:
+            assembler.frameDefaults.secondaryHeaderFlag = 1
+            assembler.frameDefaults.secondaryHeaderSize = \
+              CCSDS.ASSEMBLER.TRANSFER_FRAME_SECONDARY_HEADER_SIZE - 1
+            if assembler.frameTemplate != None:
+              assembler.initFrameTemplate()
+          assembler.flushTMframeOrIdleFrame()
+          for i in range(300):
+            tmPacket = tmPackets[i % len(tmPackets)]
+            if multiPacketMode or len(tmPacket) <= assembler.emptyFrameFreeSpace():
+              assembler.pushTMpacket(tmPacket)
+            if i % 7 == 0:
+              assembler.flushTMframeOrIdleFrame()
+          assembler.flushTMframeOrIdleFrame()
+        self.assertGreater(len(assemblers[0].binFrames), 150)
+        self.assertEqual(assemblers[0].binFrames, assemblers[1].binFrames)
+  # ---------------------------------------------------------------------------
+  def test_multiplexer(self):
+    """route packets to virtual channels and extract them per channel"""
+    multiplexer = RecordingMultiplexer(CCSDS.MULTIPLEXER.ROUND_ROBIN_SCHEDULING)
+    multiplexer.addVirtualChannel(0)
+    multiplexer.addVirtualChannel(1, [1500], weight=2)
+    multiplexer.addVirtualChannel(2, [1600, 1601])
+    self.assertRaises(CCSDS.MULTIPLEXER.Error, multiplexer.addVirtualChannel, 1)
+    self.assertRaises(CCSDS.MULTIPLEXER.Error, multiplexer.addVirtualChannel,
+                      CCSDS.MULTIPLEXER.IDLE_VIRTUAL_CHANNEL_ID)
+    self.assertRaises(CCSDS.MULTIPLEXER.Error, multiplexer.addVirtualChannel, 8)
+    for virtualChannel in multiplexer.virtualChannels:
+      virtualChannel.multiPacketMode = True
+    binPackets = {}
+    for i in range(200):
+      apid = [1000, 1500, 1600, 1601, 1500][i % 5]
+      binPacket = createTMpacket(apid, 50 + (i * 37) % 700)
+      binPackets.setdefault(apid, []).append(binPacket)
+      multiplexer.pushTMpacket(binPacket)
+      multiplexer.emitReadyTMframes()
+    # flush the pending frames, followed by an idle frame
+    for i in range(4):
+      multiplexer.flushTMframeOrIdleFrame()
+    self.assertEqual(multiplexer.tmFrames[-1].virtualChannelId,
+                     CCSDS.MULTIPLEXER.IDLE_VIRTUAL_CHANNEL_ID)
+    self.assertEqual(multiplexer.tmFrames[-1].firstHeaderPointer,
+                     CCSDS.FRAME.IDLE_FRAME_PATTERN)
+    # the frame counters are consecutive on the master and virtual channels
+    virtualChannelFrameCounts = {}
+    for i, tmFrame in enumerate(multiplexer.tmFrames):
+      self.assertEqual(tmFrame.masterChannelFrameCount, i % 256)
+      virtualChannelId = tmFrame.virtualChannelId
+      frameCount = virtualChannelFrameCounts.get(virtualChannelId, 0)
+      self.assertEqual(tmFrame.virtualChannelFCountLow, frameCount % 256)
+      virtualChannelFrameCounts[virtualChannelId] = frameCount + 1
+    # each virtual channel contains only the packets of its APIDs
+    for virtualChannelId, apids in [(0, [1000]), (1, [1500]), (2, [1600, 1601])]:
+      packetizer = RecordingPacketizer(virtualChannelId)
+      for tmFrame in multiplexer.tmFrames:
+        if tmFrame.virtualChannelId == virtualChannelId:
+          packetizer.pushTMframe(tmFrame.getBuffer())
+      binPacketsOfApids = [binPacket for binPacket in packetizer.binPackets
+                           if CCSDS.PACKET.getApplicationProcessId(binPacket) != CCSDS.PACKET.IDLE_PKT_APID]
+      expectedBinPackets = []
+      for apid in apids:
+        expectedBinPackets += binPackets[apid]
+      self.assertEqual(sorted(map(bytes, binPacketsOfApids)),
+                       sorted(map(bytes, expectedBinPackets)))
+  # ---------------------------------------------------------------------------
+  def test_multiplexerScheduling(self):
+    """check the order of the frames for the different schedulers"""
+    # each packet fills a complete frame
+    fullFramePacketSize = 1115 - 6 - 4 - 2
+    def queueFrames(multiplexer, frameCounts):
+      for virtualChannelId, frameCount in frameCounts:
+        for i in range(frameCount):
+          multiplexer.pushTMpacket(createTMpacket(1000 + virtualChannelId, fullFramePacketSize))
+    # weighted round robin: interleaved with the weights
+    multiplexer = RecordingMultiplexer(CCSDS.MULTIPLEXER.ROUND_ROBIN_SCHEDULING)
+    multiplexer.addVirtualChannel(0, [1000], weight=1)
+    multiplexer.addVirtualChannel(1, [1001], weight=2)
+    multiplexer.addVirtualChannel(2, [1002], weight=1)
+    queueFrames(multiplexer, [(0, 4), (1, 4), (2, 4)])
+    multiplexer.emitReadyTMframes()
+    self.assertEqual(multiplexer.getVirtualChannelIds(),
+                     [1, 0, 2, 1, 1, 0, 2, 1, 0, 2, 0, 2])
+    # priority: the highest priority first, a new packet overtakes
+    multiplexer = RecordingMultiplexer(CCSDS.MULTIPLEXER.PRIORITY_SCHEDULING)
+    multiplexer.addVirtualChannel(0, [1000], priority=1)
+    multiplexer.addVirtualChannel(1, [1001], priority=5)
+    queueFrames(multiplexer, [(0, 3), (1, 2)])
+    multiplexer.emitTMframe()
+    multiplexer.emitTMframe()
+    multiplexer.emitTMframe()
+    queueFrames(multiplexer, [(1, 1)])
+    multiplexer.emitReadyTMframes()
+    self.assertEqual(multiplexer.getVirtualChannelIds(), [1, 1, 0, 1, 0, 0])
+    # bitrate: VC 1 has 3/4 of the bitrate, VC 0 gets no credit while empty
+    multiplexer = RecordingMultiplexer(CCSDS.MULTIPLEXER.BITRATE_SCHEDULING)
+    multiplexer.addVirtualChannel(0, [1000], weight=1000)
+    multiplexer.addVirtualChannel(1, [1001], weight=3000)
+    queueFrames(multiplexer, [(1, 4)])
+    multiplexer.emitReadyTMframes()
+    queueFrames(multiplexer, [(0, 4), (1, 8)])
+    multiplexer.emitReadyTMframes()
+    virtualChannelIds = multiplexer.getVirtualChannelIds()
+    self.assertEqual(virtualChannelIds,
+                     [1, 1, 1, 1, 0, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 0])
+    # fill policy: pending frames are filled or wait for further packets
+    multiplexer = RecordingMultiplexer(CCSDS.MULTIPLEXER.ROUND_ROBIN_SCHEDULING)
+    multiplexer.addVirtualChannel(0, [1000])
+    multiplexer.addVirtualChannel(1, [1001], fillPolicy=CCSDS.MULTIPLEXER.FILL_NEVER)
+    for virtualChannel in multiplexer.virtualChannels:
+      virtualChannel.multiPacketMode = True
+    multiplexer.pushTMpacket(createTMpacket(1000, 100))
+    multiplexer.pushTMpacket(createTMpacket(1001, 100))
+    multiplexer.emitTMframe()
+    multiplexer.emitTMframe()
+    self.assertEqual(multiplexer.getVirtualChannelIds(),
+                     [0, CCSDS.MULTIPLEXER.IDLE_VIRTUAL_CHANNEL_ID])
+    self.assertTrue(multiplexer.getVirtualChannel(1).isFramePending())
+  # ---------------------------------------------------------------------------
+  def test_demultiplexer(self):
+    """extract the packets of all virtual channels in one pass"""
+    multiplexer = RecordingMultiplexer(CCSDS.MULTIPLEXER.ROUND_ROBIN_SCHEDULING)
+    multiplexer.addVirtualChannel(0)
+    multiplexer.addVirtualChannel(1, [1500])
+    multiplexer.addVirtualChannel(2, [1600])
+    for virtualChannel in multiplexer.virtualChannels:
+      virtualChannel.multiPacketMode = True
+    binPackets = {0: [], 1: [], 2: []}
+    for i in range(150):
+      virtualChannelId = i % 3
+      apid = [1000, 1500, 1600][virtualChannelId]
+      binPacket = createTMpacket(apid, 50 + (i * 37) % 1500)
+      binPackets[virtualChannelId].append(bytes(binPacket))
+      multiplexer.pushTMpacket(binPacket)
+      multiplexer.emitReadyTMframes()
+    for i in range(4):
+      multiplexer.flushTMframeOrIdleFrame()
+    binFrames = [tmFrame.getBuffer() for tmFrame in multiplexer.tmFrames]
+    # single pass, with and without zero copy
+    for zeroCopy in [False, True]:
+      demultiplexer = RecordingDemultiplexer(zeroCopy=zeroCopy)
+      for binFrame in binFrames:
+        demultiplexer.pushTMframe(binFrame)
+      self.assertEqual(demultiplexer.binPackets, binPackets)
+      self.assertFalse(demultiplexer.isPacketPending())
+      self.assertEqual(demultiplexer.getFrameCountGaps(), 0)
+    # filtered virtual channels
+    demultiplexer = RecordingDemultiplexer(
+      CCSDS.PACKETIZER.parseVirtualChannelIds("0,2"))
+    demultiplexer.pushTMframes(binFrames)
+    self.assertEqual(demultiplexer.binPackets, {0: binPackets[0], 2: binPackets[2]})
+    self.assertEqual(CCSDS.PACKETIZER.parseVirtualChannelIds("all"), None)
+    self.assertRaises(CCSDS.PACKETIZER.Error,
+                      CCSDS.PACKETIZER.parseVirtualChannelIds, "1;2")
+    # a lost frame of VC 1 with a spillover packet only affects VC 1
+    lostFrameIndex = None
+    for i, tmFrame in enumerate(multiplexer.tmFrames):
+      if tmFrame.virtualChannelId == 1 and i > 10 and \
+         tmFrame.firstHeaderPointer != 0:
+        lostFrameIndex = i
+        break
+    demultiplexer = RecordingDemultiplexer()
+    for i, binFrame in enumerate(binFrames):
+      if i != lostFrameIndex:
+        demultiplexer.pushTMframe(binFrame)
+    self.assertEqual(demultiplexer.getFrameCountGaps(), 1)
+    self.assertEqual(demultiplexer.binPackets[0], binPackets[0])
+    self.assertEqual(demultiplexer.binPackets[2], binPackets[2])
+    receivedBinPackets = demultiplexer.binPackets[1]
+    self.assertLess(len(receivedBinPackets), len(binPackets[1]))
+    for binPacket in receivedBinPackets:
+      self.assertIn(binPacket, binPackets[1])
+    # worker processes, the state is continued over several calls
+    demultiplexer = RecordingDemultiplexer(zeroCopy=True)
+    demultiplexer.pushTMframes(binFrames[:40], parallel=True)
+    demultiplexer.pushTMframes(binFrames[40:], parallel=True)
+    self.assertEqual(demultiplexer.binPackets, binPackets)
+    self.assertEqual(demultiplexer.getFrameCountGaps(), 0)
 
 ########
 # main #
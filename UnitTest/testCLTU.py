@@ -13,8 +13,8 @@
 #******************************************************************************
 # CCSDS Stack - Unit Tests                                                    *
 #******************************************************************************
-import array, unittest
-import CCSDS.CLTU, testData
+import array, random, unittest
+import CCSDS.CLTU, UTIL.BCH, testData
 
 #############
 # test case #
@@ -40,6 +40,54 @@ class TestCLTU(unittest.TestCase):
     self.assertIsNotNone(frame2b)
     # ignore the fill bytes
     self.assertEqual(frame2a, frame2b[:len(frame2a)])
+  def test_reference(self):
+    """test the block wise CLTU encoding against the byte wise encoding"""
+    random.seed(4711)
+    for frameSize in range(1, 30):
+      frame = array.array("B", [random.randrange(256) for i in range(frameSize)])
+      # byte wise reference encoding
+      netto = list(frame)
+      while len(netto) % CCSDS.CLTU.BCH_NETTO_SIZE != 0:
+        netto.append(CCSDS.CLTU.CLTU_FILL_BYTE)
+      cltuBody = []
+      for i in range(0, len(netto), CCSDS.CLTU.BCH_NETTO_SIZE):
+        sreg = UTIL.BCH.encodeStart()
+        for value in netto[i:i + CCSDS.CLTU.BCH_NETTO_SIZE]:
+          sreg = UTIL.BCH.encodeStep(sreg, value)
+          cltuBody.append(value)
+        cltuBody.append(UTIL.BCH.encodeStop(sreg))
+      referenceCltu = array.array("B", CCSDS.CLTU.CLTU_START_SEQUENCE +
+                                       cltuBody +
+                                       CCSDS.CLTU.CLTU_TRAILER_SEQUENCE)
+      cltu = CCSDS.CLTU.encodeCltu(frame)
+      self.assertEqual(cltu, referenceCltu)
+      self.assertEqual(CCSDS.CLTU.decodeCltu(cltu), array.array("B", netto))
+  def test_decodeCltus(self):
+    """test the batch decoding of CLTUs"""
+    frame1 = array.array("B", testData.TC_FRAME_01)
+    frame2 = array.array("B", testData.TC_FRAME_02)
+    cltu1 = CCSDS.CLTU.encodeCltu(frame1)
+    cltu2 = CCSDS.CLTU.encodeCltu(frame2)
+    # corrupted netto byte in the 2nd code block
+    cltu3 = array.array("B", cltu1)
+    cltu3[CCSDS.CLTU.CLTU_START_SEQUENCE_SIZE + 9] ^= 0x01
+    okState, msg = CCSDS.CLTU.checkCltu(cltu3)
+    self.assertFalse(okState)
+    self.assertEqual(msg, "wrong BCH check byte")
+    # wrong start sequence
+    cltu4 = array.array("B", cltu2)
+    cltu4[0] = 0
+    okState, msg = CCSDS.CLTU.checkCltu(cltu4)
+    self.assertFalse(okState)
+    self.assertEqual(msg, "wrong cltu start sequence")
+    frames = CCSDS.CLTU.decodeCltus([cltu1, cltu3, bytes(cltu2), cltu4, cltu1])
+    self.assertEqual(len(frames), 5)
+    self.assertEqual(frames[0][:len(frame1)], frame1)
+    self.assertIsNone(frames[1])
+    self.assertEqual(frames[2][:len(frame2)], frame2)
+    self.assertIsNone(frames[3])
+    self.assertEqual(frames[4], frames[0])
+    self.assertEqual(CCSDS.CLTU.decodeCltus([]), [])
 
 ########
 # main #
@@ -13,7 +13,7 @@
 #******************************************************************************
 # Unit Tests                                                                  *
 #******************************************************************************
-import unittest
+import array, random, unittest
 import UTIL.CRC, testData
 
 #############
@@ -43,6 +43,38 @@ class TestCRC(unittest.TestCase):
     crc = UTIL.CRC.calculate(testData.TC_FRAME_02[:-2])
     expectedCrc = (0x0100 * testData.TC_FRAME_02[-2]) + testData.TC_FRAME_02[-1]
     self.assertEqual(crc, expectedCrc)
+  # ---------------------------------------------------------------------------
+  def test_implementations(self):
+    """test the different CRC implementations against each other"""
+    random.seed(4711)
+    for byteSize in [0, 1, 7, 8, 9, 100, 1113]:
+      byteArray = array.array("B", [random.randrange(256) for i in range(byteSize)])
+      crc = UTIL.CRC.calculateBitwise(byteArray)
+      self.assertEqual(UTIL.CRC.calculate(byteArray), crc)
+      self.assertEqual(UTIL.CRC.calculate(list(byteArray)), crc)
+      self.assertEqual(UTIL.CRC.calculate(byteArray.tobytes()), crc)
+      self.assertEqual(UTIL.CRC.updateTable(UTIL.CRC.INITIAL_VALUE, byteArray), crc)
+      # incremental calculation in several parts
+      splitPos = byteSize // 3
+      partCrc = UTIL.CRC.update(UTIL.CRC.INITIAL_VALUE, byteArray[:splitPos])
+      partCrc = UTIL.CRC.update(partCrc, byteArray[splitPos:])
+      self.assertEqual(partCrc, crc)
+      partCrc = UTIL.CRC.updateTable(UTIL.CRC.INITIAL_VALUE, byteArray[:splitPos])
+      partCrc = UTIL.CRC.updateTable(partCrc, byteArray[splitPos:])
+      self.assertEqual(partCrc, crc)
+  # ---------------------------------------------------------------------------
+  def test_checkFrames(self):
+    """test the CRC check of several frames in one buffer"""
+    frame = testData.TM_FRAME_01
+    frameSize = len(frame)
+    corruptFrame = list(frame)
+    corruptFrame[10] ^= 0x01
+    frames = array.array("B", frame + corruptFrame + frame)
+    self.assertEqual(UTIL.CRC.checkFrames(frames, frameSize), [True, False, True])
+    self.assertEqual(UTIL.CRC.checkFrames(frames, frameSize, frameSize, 2), [False, True])
+    self.assertEqual(UTIL.CRC.checkFrames(frame, frameSize), [True])
+    with self.assertRaises(IndexError):
+      UTIL.CRC.checkFrames(frames, frameSize, 1, 3)
 
 ########
 # main #
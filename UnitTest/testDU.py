@@ -13,11 +13,42 @@
 #******************************************************************************
 # Unit Tests                                                                  *
 #******************************************************************************
-import array, unittest
+import array, random, unittest
 import CCSDS.DU, CCSDS.TIME
 import UTIL.DU, UTIL.TCO, UTIL.TIME
 import testData
 
+####################
+# global variables #
+####################
+# attribute maps with all field types and alignments
+TEST_DU_BYTE_SIZE1 = 24
+TEST_DU_ATTRIBUTES1 = {
+  "bits1":     ( 0,  1, UTIL.DU.BITS),
+  "bits3":     ( 1,  3, UTIL.DU.BITS),
+  "bits11":    ( 5, 11, UTIL.DU.BITS),
+  "bits13":    (19, 13, UTIL.DU.BITS),
+  "bits20":    (36, 20, UTIL.DU.BITS),
+  "bits33":    (57, 33, UTIL.DU.BITS),
+  "sbits2":    (90,  2, UTIL.DU.SBITS),
+  "sbits14":   (92, 14, UTIL.DU.SBITS),
+  "unsigned1": (14,  1, UTIL.DU.UNSIGNED),
+  "unsigned2": (14,  2, UTIL.DU.UNSIGNED),
+  "unsigned3": (15,  3, UTIL.DU.UNSIGNED),
+  "unsigned4": (18,  4, UTIL.DU.UNSIGNED),
+  "signed1":   (22,  1, UTIL.DU.SIGNED),
+  "signed2":   (22,  2, UTIL.DU.SIGNED),
+  "signed3":   (19,  3, UTIL.DU.SIGNED),
+  "bytes":     (16,  4, UTIL.DU.BYTES),
+  "string":    (20,  4, UTIL.DU.STRING)}
+TEST_DU_BYTE_SIZE2 = 16
+TEST_DU_ATTRIBUTES2 = {
+  "bits5":     ( 3,  5, UTIL.DU.BITS),
+  "signed8":   ( 0,  8, UTIL.DU.SIGNED),
+  "float4":    ( 8,  4, UTIL.DU.FLOAT),
+  "float8":    ( 8,  8, UTIL.DU.FLOAT),
+  "bits1":     (64,  1, UTIL.DU.BITS)}
+
 #############
 # test case #
 #############
@@ -236,6 +267,75 @@ class TestDU(unittest.TestCase):
     self.assertEqual(str(h), "\n"
 "0000 00 01 FF FE 64 12                               ....d.")
   # ---------------------------------------------------------------------------
+  def test_DUcompiledAccessors(self):
+    """test the compiled field accessors against the generic ones"""
+    random.seed(4711)
+    byteSize = TEST_DU_BYTE_SIZE1 + TEST_DU_BYTE_SIZE2
+    for i in range(100):
+      binaryString = array.array("B", [random.randrange(256) for j in range(byteSize)])
+      # the string field must contain ASCII characters
+      binaryString[20:24] = array.array("B", [random.randrange(32, 127) for j in range(4)])
+      b = UTIL.DU.BinaryUnit(binaryString,
+                             TEST_DU_BYTE_SIZE1, TEST_DU_ATTRIBUTES1,
+                             TEST_DU_BYTE_SIZE2, TEST_DU_ATTRIBUTES2)
+      self.assertTrue(isinstance(b, UTIL.DU.BinaryUnit))
+      self.assertNotEqual(type(b), UTIL.DU.BinaryUnit)
+      self.assertEqual(type(b).compiledBaseClass, UTIL.DU.BinaryUnit)
+      for name in list(TEST_DU_ATTRIBUTES2.keys()) + list(TEST_DU_ATTRIBUTES1.keys()):
+        value = getattr(b, name)
+        self.assertEqual(repr(value), repr(UTIL.DU.BinaryUnit.__getattr__(b, name)))
+        # write the value into a cleared data unit via both paths
+        b1 = UTIL.DU.BinaryUnit(array.array("B", [0] * byteSize),
+                                TEST_DU_BYTE_SIZE1, TEST_DU_ATTRIBUTES1,
+                                TEST_DU_BYTE_SIZE2, TEST_DU_ATTRIBUTES2)
+        b2 = UTIL.DU.BinaryUnit(array.array("B", [0xFF] * byteSize),
+                                TEST_DU_BYTE_SIZE1, TEST_DU_ATTRIBUTES1,
+                                TEST_DU_BYTE_SIZE2, TEST_DU_ATTRIBUTES2)
+        g1 = UTIL.DU.BinaryUnit(array.array("B", [0] * byteSize),
+                                TEST_DU_BYTE_SIZE1, TEST_DU_ATTRIBUTES1,
+                                TEST_DU_BYTE_SIZE2, TEST_DU_ATTRIBUTES2)
+        g2 = UTIL.DU.BinaryUnit(array.array("B", [0xFF] * byteSize),
+                                TEST_DU_BYTE_SIZE1, TEST_DU_ATTRIBUTES1,
+                                TEST_DU_BYTE_SIZE2, TEST_DU_ATTRIBUTES2)
+        setattr(b1, name, value)
+        setattr(b2, name, value)
+        UTIL.DU.BinaryUnit.__setattr__(g1, name, value)
+        UTIL.DU.BinaryUnit.__setattr__(g2, name, value)
+        self.assertEqual(b1.buffer, g1.buffer)
+        self.assertEqual(b2.buffer, g2.buffer)
+    # error handling is the same as for the generic accessors
+    b = UTIL.DU.BinaryUnit(array.array("B", [0] * byteSize),
+                           TEST_DU_BYTE_SIZE1, TEST_DU_ATTRIBUTES1,
+                           TEST_DU_BYTE_SIZE2, TEST_DU_ATTRIBUTES2)
+    with self.assertRaises(ValueError):
+      b.bits3 = 8
+    with self.assertRaises(ValueError):
+      b.unsigned2 = 0x10000
+    with self.assertRaises(ValueError):
+      b.bits11 = "abc"
+    with self.assertRaises(ValueError):
+      b.float4 = "abc"
+    with self.assertRaises(AttributeError):
+      b.unknown = 1
+    with self.assertRaises(AttributeError):
+      b.unknown
+    b.sbits14 = -2
+    self.assertEqual(b.sbits14, -2)
+    b.signed3 = -70000
+    self.assertEqual(b.signed3, -70000)
+    b.bits33 = "12345"
+    self.assertEqual(b.bits33, 12345)
+    b.setLen(TEST_DU_BYTE_SIZE1)
+    with self.assertRaises(IndexError):
+      b.float8
+    with self.assertRaises(IndexError):
+      b.bits5 = 1
+    # changing the secondary attribute map rebinds the compiled accessors
+    b.setAttributeMap2(None)
+    with self.assertRaises(AttributeError):
+      b.bits5
+    self.assertEqual(b.bits33, 12345)
+  # ---------------------------------------------------------------------------
   def test_DUcompare(self):
     """test the data unit compare operations"""
     b1 = UTIL.DU.BinaryUnit("1")
@@ -64,6 +64,14 @@ class TestFRAME(unittest.TestCase):
     self.assertEqual(len(packets), testData.TM_FRAME_01_nrPackets)
     self.assertEqual(trailingFragment,
                      testData.TM_FRAME_01_trailingFragment)
+    # extract packets as views into the frame buffer
+    leadingView, packetViews, trailingView = tmFrame1.getPacketViews()
+    self.assertEqual(leadingView, leadingFragment)
+    self.assertEqual(len(packetViews), len(packets))
+    for i in range(len(packets)):
+      self.assertEqual(type(packetViews[i]), memoryview)
+      self.assertEqual(packetViews[i].tobytes(), packets[i].tobytes())
+    self.assertEqual(trailingView, trailingFragment)
     tcFrame1 = CCSDS.FRAME.TCframe(testData.TC_FRAME_01)
     self.assertEqual(tcFrame1.versionNumber,
                      testData.TC_FRAME_01_versionNumber)
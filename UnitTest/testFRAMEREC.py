@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+#******************************************************************************
+# (C) 2020, Stefan Korner, Austria                                            *
+#                                                                             *
+# The Space Python Library is free software; you can redistribute it and/or   *
+# modify it under under the terms of the MIT License as published by the      *
+# Massachusetts Institute of Technology.                                      *
+#                                                                             *
+# The Space Python Library is distributed in the hope that it will be useful, *
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              *
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the MIT License    *
+# for more details.                                                           *
+#******************************************************************************
+# TM Frame Recorder - Unit Tests                                              *
+#******************************************************************************
+import os, shutil, tempfile, unittest
+import testData
+import GRND.CRYOSATDU, GRND.FRAMEREC, GRND.NCTRS
+import UTIL.DU, UTIL.SYS, UTIL.TCO
+
+####################
+# global variables #
+####################
+UTIL.SYS.s_configuration.setDefaults([
+  ["NCTRS_TM_DU_VERSION", "V1_CDS3"]])
+
+#############
+# constants #
+#############
+START_TIME = 1600000000.25
+
+#############
+# test case #
+#############
+class TestFRAMEREC(unittest.TestCase):
+  # ---------------------------------------------------------------------------
+  def setUp(self):
+    """creates a temporary directory for the recording files"""
+    self.recordDir = tempfile.mkdtemp()
+  # ---------------------------------------------------------------------------
+  def tearDown(self):
+    """deletes the recording files"""
+    shutil.rmtree(self.recordDir)
+  # ---------------------------------------------------------------------------
+  def test_nctrsRecording(self):
+    """NCTRS frames are recorded in rotated files with an index"""
+    frame = testData.TM_FRAME_01
+    nctrsTMfields = GRND.NCTRS.NCTRStmFields()
+    nctrsTMfields.spacecraftId = 758
+    recordFileName = os.path.join(self.recordDir, "frames.nctrs")
+    duByteSize = GRND.NCTRS.getTMdataUnitHeaderByteSize() + len(frame)
+    frameRecorder = GRND.FRAMEREC.FrameRecorder(recordFileName,
+                                                "NCTRS",
+                                                nctrsTMfields,
+                                                maxBytes=duByteSize * 4)
+    for i in range(10):
+      frameRecorder.pushFrame(frame, START_TIME + i)
+    frameRecorder.close()
+    self.assertEqual(frameRecorder.recordedFiles,
+                     [recordFileName,
+                      recordFileName + ".1",
+                      recordFileName + ".2"])
+    # the recording files can be read with the NCTRS frame reader
+    frameNr = 0
+    for fileName in frameRecorder.recordedFiles:
+      indexEntries = GRND.FRAMEREC.readIndex(fileName)
+      recordFile = open(fileName, "rb")
+      for ertUTC, offset in indexEntries:
+        self.assertEqual(recordFile.tell(), offset)
+        self.assertEqual(ertUTC, START_TIME + frameNr)
+        tmDu = GRND.NCTRS.readNCTRSframe(recordFile)
+        self.assertEqual(list(tmDu.getFrame()), frame)
+        self.assertEqual(tmDu.spacecraftId, 758)
+        self.assertAlmostEqual(tmDu.earthReceptionTime,
+          UTIL.TCO.correlateToERTmissionEpoch(START_TIME + frameNr), 5)
+        frameNr += 1
+      recordFile.close()
+    self.assertEqual(frameNr, 10)
+    # seek by ERT
+    indexEntries = GRND.FRAMEREC.readIndex(recordFileName + ".1")
+    self.assertEqual(GRND.FRAMEREC.findFrameIndex(indexEntries, START_TIME + 5.5), 2)
+    self.assertEqual(indexEntries[2][1], duByteSize * 2)
+  # ---------------------------------------------------------------------------
+  def test_asciiRendering(self):
+    """ASCII formats are rendered from the binary recording"""
+    frame = testData.TM_FRAME_01
+    recordFileName = os.path.join(self.recordDir, "frames.txt")
+    frameRecorder = GRND.FRAMEREC.FrameRecorder(recordFileName,
+                                                "CRYOSAT_ASCII",
+                                                filePeriod=60)
+    frameRecorder.pushFrame(frame, START_TIME)
+    frameRecorder.pushFrame(frame, START_TIME + 30)
+    frameRecorder.pushFrame(frame, START_TIME + 60)
+    frameRecorder.close()
+    self.assertEqual(frameRecorder.recordedFiles,
+                     [recordFileName + ".bin", recordFileName + ".1.bin"])
+    expected = ""
+    for ertUTC in [START_TIME, START_TIME + 30]:
+      tmDu = GRND.CRYOSATDU.TMframeDataUnit()
+      tmDu.setFrame(frame)
+      ertTime = UTIL.TCO.correlateToERTmissionEpoch(ertUTC)
+      tmDu.downlinkTimeSec = int(ertTime)
+      tmDu.downlinkTimeMicro = int((ertTime - int(ertTime)) * 1000000)
+      expected += "\nCRYOSAT_ASCII Frame Header:"
+      expected += UTIL.DU.array2str(tmDu.getBufferHeader())
+      expected += "\nCRYOSAT_ASCII Frame Body:"
+      expected += UTIL.DU.array2str(tmDu.getBufferBody())
+      expected += "\n"
+    asciiFile = open(recordFileName)
+    self.assertEqual(asciiFile.read(), expected)
+    asciiFile.close()
+    # details
+    detailsFileName = os.path.join(self.recordDir, "details.txt")
+    GRND.FRAMEREC.renderFrameFile(recordFileName + ".1.bin",
+                                  detailsFileName,
+                                  "CRYOSAT_ASCII_DETAILS")
+    asciiFile = open(detailsFileName)
+    lines = asciiFile.read().split("\n")
+    asciiFile.close()
+    self.assertEqual(lines[1], "CRYOSAT_ASCII_DETAILS Frame Header:")
+    self.assertEqual(lines[5], "tmDu.rsErorFlag = 0")
+    self.assertIn("tmFrameDu.firstHeaderPointer = " +
+                  str(testData.TM_FRAME_01_firstHeaderPointer), lines)
+
+########
+# main #
+########
+if __name__ == "__main__":
+  unittest.main()
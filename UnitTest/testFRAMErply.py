@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+#******************************************************************************
+# (C) 2020, Stefan Korner, Austria                                            *
+#                                                                             *
+# The Space Python Library is free software; you can redistribute it and/or   *
+# modify it under under the terms of the MIT License as published by the      *
+# Massachusetts Institute of Technology.                                      *
+#                                                                             *
+# The Space Python Library is distributed in the hope that it will be useful, *
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              *
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the MIT License    *
+# for more details.                                                           *
+#******************************************************************************
+# NCTRS Frame Replayer - Unit Tests                                           *
+#******************************************************************************
+import os, shutil, tempfile, unittest
+import testData
+import CS.FRAMEmodel, CS.FRAMErply
+import GRND.FRAMEREC, GRND.NCTRS
+import UTIL.SYS, UTIL.TASK
+
+####################
+# global variables #
+####################
+UTIL.SYS.s_configuration.setDefaults([
+  ["NCTRS_TM_DU_VERSION", "V1_CDS3"]])
+
+#############
+# constants #
+#############
+START_TIME = 1600000000.25
+FRAMES_NR = 20
+
+###########
+# classes #
+###########
+# =============================================================================
+class ProcessingTask(object):
+  """processing task that triggers the time handlers on demand"""
+  # ---------------------------------------------------------------------------
+  def __init__(self):
+    self.timeHandlers = []
+  # ---------------------------------------------------------------------------
+  def notifyGUItask(self, status):
+    pass
+  # ---------------------------------------------------------------------------
+  def createTimeHandler(self, ms, handler):
+    timeHandler = (ms, handler)
+    self.timeHandlers.append(timeHandler)
+    return timeHandler
+  # ---------------------------------------------------------------------------
+  def cancelTimeHandler(self, timeHandler):
+    self.timeHandlers.remove(timeHandler)
+  # ---------------------------------------------------------------------------
+  def triggerTimeHandler(self):
+    """returns the delay of the triggered time handler"""
+    ms, handler = self.timeHandlers.pop(0)
+    handler()
+    return ms
+
+# =============================================================================
+class FrameModel(object):
+  """collects the replayed frames"""
+  # ---------------------------------------------------------------------------
+  def __init__(self):
+    self.frames = []
+  # ---------------------------------------------------------------------------
+  def receiveTMframe(self, frame):
+    self.frames.append(bytes(frame))
+
+#############
+# test case #
+#############
+class TestFRAMErply(unittest.TestCase):
+  # ---------------------------------------------------------------------------
+  def setUp(self):
+    """records a NCTRS frame file with 1 frame per second"""
+    self.recordDir = tempfile.mkdtemp()
+    self.replayFileName = os.path.join(self.recordDir, "frames.nctrs")
+    frameRecorder = GRND.FRAMEREC.FrameRecorder(self.replayFileName,
+                                                "NCTRS",
+                                                GRND.NCTRS.NCTRStmFields())
+    for i in range(FRAMES_NR):
+      frameRecorder.pushFrame(testData.TM_FRAME_01, START_TIME + i)
+    frameRecorder.close()
+    self.savedTask = UTIL.TASK.s_processingTask
+    self.savedFrameModel = CS.FRAMEmodel.s_frameModel
+    UTIL.TASK.s_processingTask = ProcessingTask()
+    CS.FRAMEmodel.s_frameModel = FrameModel()
+    self.savedBatchSize = CS.FRAMErply.REPLAY_BATCH_SIZE
+    CS.FRAMErply.s_frameIndexes.clear()
+  # ---------------------------------------------------------------------------
+  def tearDown(self):
+    """deletes the recording files"""
+    UTIL.TASK.s_processingTask = self.savedTask
+    CS.FRAMEmodel.s_frameModel = self.savedFrameModel
+    CS.FRAMErply.REPLAY_BATCH_SIZE = self.savedBatchSize
+    shutil.rmtree(self.recordDir)
+  # ---------------------------------------------------------------------------
+  def test_frameIndex(self):
+    """the index is scanned without an index file and cached per file"""
+    os.remove(self.replayFileName + GRND.FRAMEREC.INDEX_FILE_EXTENSION)
+    frameIndex, replayMap = CS.FRAMErply.getFrameIndex(self.replayFileName)
+    duByteSize = GRND.NCTRS.getTMdataUnitHeaderByteSize() + \
+                 len(testData.TM_FRAME_01)
+    self.assertEqual(len(frameIndex), FRAMES_NR)
+    self.assertEqual(list(frameIndex.offsets),
+                     [i * duByteSize for i in range(FRAMES_NR + 1)])
+    for i in range(FRAMES_NR):
+      self.assertAlmostEqual(frameIndex.erts[i], START_TIME + i, 5)
+    self.assertEqual(frameIndex.findFrame(START_TIME + 4.5), 5)
+    replayMap.close()
+    cachedIndex, replayMap = CS.FRAMErply.getFrameIndex(self.replayFileName)
+    self.assertIs(cachedIndex, frameIndex)
+    replayMap.close()
+  # ---------------------------------------------------------------------------
+  def test_partialIndexFile(self):
+    """frames that are recorded after the last index entry are scanned"""
+    indexFile = open(self.replayFileName + GRND.FRAMEREC.INDEX_FILE_EXTENSION, "r+b")
+    indexFile.truncate(GRND.FRAMEREC.INDEX_ENTRY_BYTE_SIZE * 5 + 3)
+    indexFile.close()
+    frameIndex, replayMap = CS.FRAMErply.getFrameIndex(self.replayFileName)
+    duByteSize = GRND.NCTRS.getTMdataUnitHeaderByteSize() + \
+                 len(testData.TM_FRAME_01)
+    self.assertEqual(len(frameIndex), FRAMES_NR)
+    self.assertEqual(list(frameIndex.offsets),
+                     [i * duByteSize for i in range(FRAMES_NR + 1)])
+    for i in range(FRAMES_NR):
+      self.assertAlmostEqual(frameIndex.erts[i], START_TIME + i, 5)
+    replayMap.close()
+  # ---------------------------------------------------------------------------
+  def test_replayModes(self):
+    """frame rate, as fast as possible and ERT following replay"""
+    processingTask = UTIL.TASK.s_processingTask
+    frameModel = CS.FRAMEmodel.s_frameModel
+    frame = bytes(testData.TM_FRAME_01)
+    frameReplayer = CS.FRAMErply.FrameReplayer()
+    # one frame per tick
+    frameReplayer.startReplay(self.replayFileName, 100.0)
+    self.assertEqual(len(frameModel.frames), 1)
+    self.assertEqual(processingTask.triggerTimeHandler(), 100.0)
+    self.assertEqual(frameModel.frames, [frame, frame])
+    frameReplayer.stopReplay()
+    self.assertEqual(processingTask.timeHandlers, [])
+    # batches, starting at an ERT
+    CS.FRAMErply.REPLAY_BATCH_SIZE = 8
+    frameModel.frames = []
+    frameReplayer.startReplay(self.replayFileName, 100.0,
+                              CS.FRAMErply.REPLAY_AS_FAST_AS_POSSIBLE,
+                              START_TIME + 3.5)
+    self.assertEqual(len(frameModel.frames), 8)
+    self.assertEqual(processingTask.triggerTimeHandler(), 0)
+    self.assertEqual(frameReplayer.frameNr, 16)
+    self.assertFalse(frameReplayer.running)
+    self.assertEqual(len(frameModel.frames), FRAMES_NR - 4)
+    self.assertEqual(processingTask.timeHandlers, [])
+    # 10x the recorded ERTs, frames are 1 second apart
+    frameModel.frames = []
+    frameReplayer.startReplay(self.replayFileName, 100.0, 10)
+    self.assertEqual(len(frameModel.frames), 1)
+    self.assertAlmostEqual(processingTask.timeHandlers[0][0], 100.0, -1)
+    # seek backwards re-anchors the replay time
+    frameReplayer.seek(START_TIME + 10)
+    processingTask.triggerTimeHandler()
+    self.assertEqual(frameReplayer.nextFrame, 11)
+    frameReplayer.stopReplay()
+    self.assertEqual(processingTask.timeHandlers, [])
+
+########
+# main #
+########
+if __name__ == "__main__":
+  unittest.main()
@@ -35,6 +35,32 @@ class TestMIB(unittest.TestCase):
     self.assertNotEqual(len(ccfMap), 0)
     self.assertNotEqual(len(cpcMap), 0)
     self.assertNotEqual(len(cdfMap), 0)
+  # ---------------------------------------------------------------------------
+  def test_parallel(self):
+    """load MIB tables in worker processes"""
+    tableMaps = SCOS.MIB.readTables(SCOS.MIB.TABLE_NAMES)
+    parallelTableMaps = SCOS.MIB.readTables(SCOS.MIB.TABLE_NAMES, parallel=True)
+    self.assertEqual(sorted(parallelTableMaps.keys()), sorted(SCOS.MIB.TABLE_NAMES))
+    for tableName in SCOS.MIB.TABLE_NAMES:
+      tableMap = tableMaps[tableName]
+      parallelTableMap = parallelTableMaps[tableName]
+      self.assertEqual(sorted(parallelTableMap.keys()), sorted(tableMap.keys()))
+      for key, recordEntry in tableMap.items():
+        if tableName in SCOS.MIB.MULTIPLE_KEYS_TABLE_NAMES:
+          records = recordEntry
+          parallelRecords = parallelTableMap[key]
+        else:
+          records = [recordEntry]
+          parallelRecords = [parallelTableMap[key]]
+        for record, parallelRecord in zip(records, parallelRecords):
+          self.assertIsInstance(parallelRecord, SCOS.MIB.RECORD_CLASSES[tableName])
+          self.assertEqual(parallelRecord.getValues(), record.getValues())
+        self.assertEqual(len(parallelRecords), len(records))
+    # the records only store the used fields
+    pidRecord = tableMaps["pid.dat"][10001]
+    self.assertFalse(hasattr(pidRecord, "__dict__"))
+    self.assertEqual(pidRecord.pidSPID, 10001)
+    self.assertEqual(pidRecord.pidTPSD, -1)
 
 ########
 # main #
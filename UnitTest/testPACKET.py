@@ -16,7 +16,7 @@
 import unittest
 import testData
 import CCSDS.PACKET
-import PUS.PACKET
+import PUS.PACKET, PUS.PKTID
 
 #############
 # test case #
@@ -163,6 +163,56 @@ class TestPACKET(unittest.TestCase):
                      testData.TC_PACKET_01_serviceSubType)
     self.assertTrue(tcPusPacket.checkPacketLength())
     self.assertTrue(tcPusPacket.checkChecksum())
+  def test_packetIdentificator(self):
+    """test the packet identification on data units and raw bytes"""
+    identificator = PUS.PKTID.PacketIdentificator(cacheSize=2)
+    # PI1 is the first byte of the application data (bit 128)
+    identificator.addKeyFieldRecord(1234, 3, 25, 128, 8, None, None)
+    identificator.addKeyFieldRecord(None, 5, 1, None, None, None, None)
+    identificator.addKeyFieldRecord(100, None, None, 48, 12, None, None)
+    identificator.addPacketIDrecord(1234, 3, 25, 7, None, "HK7")
+    identificator.addPacketIDrecord(1234, 3, 25, 8, None, "HK8")
+    identificator.addPacketIDrecord(1234, 5, 1, None, None, "EV1")
+    identificator.addPacketIDrecord(100, None, None, 0xABC, None, "CCSDS")
+    hk7Packet = PUS.PACKET.TMpacket()
+    hk7Packet.setLen(20)
+    hk7Packet.applicationProcessId = 1234
+    hk7Packet.serviceType = 3
+    hk7Packet.serviceSubType = 25
+    hk7Packet.setUnsigned(16, 1, 7)
+    hk8Packet = PUS.PACKET.TMpacket(hk7Packet.getBuffer())
+    hk8Packet.setUnsigned(16, 1, 8)
+    evPacket = PUS.PACKET.TMpacket(hk7Packet.getBuffer())
+    evPacket.serviceType = 5
+    evPacket.serviceSubType = 1
+    ccsdsPacket = CCSDS.PACKET.TMpacket()
+    ccsdsPacket.setLen(10)
+    ccsdsPacket.applicationProcessId = 100
+    ccsdsPacket.setUnsigned(6, 2, 0xABCD)
+    self.assertEqual(identificator.getPacketKey(hk7Packet), "HK7")
+    self.assertEqual(identificator.getPacketKey(hk8Packet), "HK8")
+    self.assertEqual(identificator.getPacketKey(evPacket), "EV1")
+    self.assertEqual(identificator.getPacketKey(ccsdsPacket), "CCSDS")
+    self.assertEqual(len(identificator.packetKeyCache), 2)
+    buffers = [hk7Packet.getBuffer(),
+               bytes(hk8Packet.getBuffer()),
+               bytearray(evPacket.getBuffer()),
+               memoryview(ccsdsPacket.getBuffer().tobytes())]
+    self.assertEqual(identificator.identify(buffers),
+                     ["HK7", "HK8", "EV1", "CCSDS"])
+    # unknown packets are identified as None
+    hk7Packet.setUnsigned(16, 1, 9)
+    self.assertEqual(identificator.identifyBuffer(hk7Packet.getBuffer()), None)
+    hk7Packet.serviceSubType = 26
+    self.assertEqual(identificator.identifyBuffer(hk7Packet.getBuffer()), None)
+    # new records invalidate the caches
+    identificator.addPacketIDrecord(1234, 3, 25, 9, None, "HK9")
+    self.assertEqual(len(identificator.packetKeyCache), 0)
+    hk7Packet.serviceSubType = 25
+    self.assertEqual(identificator.identifyBuffer(hk7Packet.getBuffer()), "HK9")
+    # PI outside of the packet
+    with self.assertRaises(IndexError):
+      identificator.identifyBuffer(hk7Packet.getBuffer()[:16])
 
 ########
 # main #
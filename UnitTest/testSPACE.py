@@ -13,11 +13,12 @@
 #******************************************************************************
 # Space Segment - Unit Tests                                                  *
 #******************************************************************************
-import unittest
+import array, os, pickle, random, unittest
 import testData
-import CCSDS.PACKET
+import CCSDS.DU, CCSDS.PACKET
 import SPACE.IF, SPACE.TMGEN
-import SUPP.DEF, SUPP.IF
+import SCOS.ENV
+import SUPP.DEF, SUPP.DEFFILE, SUPP.IF
 import UTIL.SYS
 
 #############
@@ -64,6 +65,28 @@ def initConfiguration():
   ["SYS_APP_NAME", "Simulator"],
   ["SYS_APP_VERSION", "1.0"]])
 
+# -----------------------------------------------------------------------------
+def extractParam(dataUnit, paramExtraction):
+  """reference extraction of a parameter with the generic accessors"""
+  bitPos = paramExtraction.bitPos
+  bitWidth = paramExtraction.bitWidth
+  valueType = paramExtraction.valueType
+  bytePos = bitPos // 8
+  byteLength = bitWidth // 8
+  if valueType == UTIL.DU.BITS:
+    return dataUnit.getBits(bitPos, bitWidth)
+  if valueType == UTIL.DU.SBITS:
+    return dataUnit.getSBits(bitPos, bitWidth)
+  if valueType == UTIL.DU.UNSIGNED:
+    return dataUnit.getUnsigned(bytePos, byteLength)
+  if valueType == UTIL.DU.SIGNED:
+    return dataUnit.getSigned(bytePos, byteLength)
+  if valueType == UTIL.DU.FLOAT:
+    return dataUnit.getFloat(bytePos, byteLength)
+  if valueType == UTIL.DU.STRING:
+    return dataUnit.getString(bytePos, byteLength)
+  return bytes(dataUnit.getBytes(bytePos, byteLength))
+
 #############
 # test case #
 #############
@@ -111,6 +134,72 @@ class TestSPACE(unittest.TestCase):
     self.assertEqual(tmParamDefs[15].paramName, "TC_ID")
     self.assertEqual(tmParamDefs[16].paramName, "TC_SSC")
   # ---------------------------------------------------------------------------
+  def touchTable(self, tableFileName, tableStat):
+    """modifies the mtime of a MIB table"""
+    os.utime(tableFileName, ns=(tableStat.st_atime_ns, tableStat.st_mtime_ns + 1000000000))
+  # ---------------------------------------------------------------------------
+  def test_DEFfile(self):
+    """function to test the on demand loading of the definition file"""
+    createdDefinitions = SUPP.IF.s_definitions
+    definitions = SUPP.DEF.DefinitionsImpl()
+    definitions.initDefinitions()
+    definitionData = definitions.definitionData
+    self.assertIsInstance(definitionData.tmPktDefs, SUPP.DEFFILE.DefinitionList)
+    self.assertEqual(definitionData.creationTime,
+                     createdDefinitions.definitionData.creationTime)
+    # nothing is unpickled before it is accessed
+    self.assertEqual(definitionData.tmPktDefs.definitions.count(None),
+                     len(definitionData.tmPktDefs))
+    tmPktDef = definitions.getTMpktDefBySPID(12345)
+    self.assertEqual(tmPktDef.pktSPID, 12345)
+    self.assertIs(definitions.getTMpktDefByIndex(9), tmPktDef)
+    self.assertEqual(definitionData.tmPktDefs.definitions.count(None),
+                     len(definitionData.tmPktDefs) - 1)
+    self.assertEqual(definitions.getSPIDbyPktName(tmPktDef.pktName), 12345)
+    self.assertEqual(definitions.getTMpktDefBySPID(4711), None)
+    self.assertEqual([tmPktDef.pktSPID for tmPktDef in definitions.getTMpktDefs()],
+                     [tmPktDef.pktSPID for tmPktDef in createdDefinitions.getTMpktDefs()])
+    self.assertEqual([tmParamDef.paramName for tmParamDef in definitions.getTMparamDefs()],
+                     [tmParamDef.paramName for tmParamDef in createdDefinitions.getTMparamDefs()])
+    for tcPktDef in createdDefinitions.getTCpktDefs():
+      self.assertEqual(definitions.getTCpktDefByName(tcPktDef.pktName).pktAPID,
+                       tcPktDef.pktAPID)
+    # a changed MIB table recreates only the dependent definitions
+    tmPktDefs = definitions.definitionData.tmPktDefs
+    tcPktDefs = definitions.definitionData.tcPktDefs
+    mibDir = SCOS.ENV.s_environment.mibDir()
+    tableStats = {}
+    for tableName in ["cdf.dat", "vpd.dat", "pid.dat"]:
+      tableStats[tableName] = os.stat(mibDir + "/" + tableName)
+    try:
+      self.touchTable(mibDir + "/cdf.dat", tableStats["cdf.dat"])
+      self.assertEqual(definitions.reloadDefinitions(), [SUPP.DEF.TC_PACKETS])
+      self.assertIs(definitions.definitionData.tmPktDefs, tmPktDefs)
+      self.assertIsInstance(definitions.definitionData.tcPktDefs, list)
+      self.assertEqual(definitions.reloadDefinitions(), [])
+      self.touchTable(mibDir + "/vpd.dat", tableStats["vpd.dat"])
+      self.assertEqual(definitions.reloadDefinitions(), [SUPP.DEF.TM_STRUCTURES])
+      self.assertIsInstance(definitions.definitionData.tmPktDefs, SUPP.DEFFILE.DefinitionList)
+      # only the packet with a variable structure is recreated
+      self.assertIs(definitions.getTMpktDefBySPID(12345), tmPktDef)
+      self.assertIsNot(definitions.getTMpktDefBySPID(12343), tmPktDefs[8])
+      self.assertEqual(definitions.getTMpktDefBySPID(12343).tmStructDef.structName, "12343")
+      self.assertEqual([tmPktDef.pktSPID for tmPktDef in definitions.getTMpktDefs()],
+                       [tmPktDef.pktSPID for tmPktDef in createdDefinitions.getTMpktDefs()])
+      # the stored definitions are taken over by a new process
+      definitions = SUPP.DEF.DefinitionsImpl()
+      definitions.initDefinitions()
+      self.assertEqual(definitions.reloadDefinitions(), [])
+      self.touchTable(mibDir + "/pid.dat", tableStats["pid.dat"])
+      definitions = SUPP.DEF.DefinitionsImpl()
+      definitions.initDefinitions()
+      self.assertIsInstance(definitions.definitionData.tmPktDefs, list)
+      self.assertIsInstance(definitions.definitionData.tcPktDefs, SUPP.DEFFILE.DefinitionList)
+    finally:
+      for tableName, tableStat in tableStats.items():
+        os.utime(mibDir + "/" + tableName, ns=(tableStat.st_atime_ns, tableStat.st_mtime_ns))
+      createdDefinitions.createDefinitions()
+  # ---------------------------------------------------------------------------
   def test_TMGENoperations(self):
     """function to test the TMGEN telemetry generator"""
     # create TM packet without TM parameters
@@ -169,6 +258,118 @@ class TestSPACE(unittest.TestCase):
       "0000 0C D2 C0 01 00 26 10 03 19 00 00 00 00 00 00 00 .....&..........\n" + \
       "0010 00 00 AA 12 34 56 78 00 00 00 00 00 00 00 00 41 ....4Vx........A\n" + \
       "0020 20 00 00 40 24 00 00 00 00 00 00 BC 77           ..@$.......w")
+  # ---------------------------------------------------------------------------
+  def test_populatePlan(self):
+    """function to test the cached population of TM packets"""
+    tmPacketGenerator = SPACE.IF.s_tmPacketGenerator
+    parameterValuesList = [["PAR1", 1], ["PAR9", 0x12345678], ["PAR11", 10.0],
+                           ["UNKNOWN", 5], ["PAR12", "-2.5"]]
+    tmPacket = tmPacketGenerator.getTMpacket(
+      spid=testData.TM_PACKET_03_SPID,
+      parameterValues=parameterValuesList,
+      tmStruct=None,
+      obtUTC=0.0,
+      reuse=False)
+    tmPktDef = SUPP.IF.s_definitions.getTMpktDefBySPID(testData.TM_PACKET_03_SPID)
+    paramNames = ("PAR1", "PAR9", "PAR11", "UNKNOWN", "PAR12")
+    populatePlan = tmPacketGenerator.getPopulatePlan(tmPktDef, paramNames)
+    self.assertIsNone(populatePlan.setters[3])
+    # the plan is compiled once
+    tmPacketGenerator.getTMpacket(
+      spid=testData.TM_PACKET_03_SPID,
+      parameterValues=parameterValuesList,
+      tmStruct=None,
+      obtUTC=0.0)
+    self.assertIs(tmPacketGenerator.getPopulatePlan(tmPktDef, paramNames), populatePlan)
+    # the values are read back by the extraction plan
+    paramValues = {}
+    for paramExtraction, paramValue in zip(tmPktDef.getParamExtractions(),
+                                           tmPktDef.extractAll(tmPacket.getBuffer())):
+      paramValues[paramExtraction.name] = paramValue
+    self.assertEqual(paramValues["PAR1"], 1)
+    self.assertEqual(paramValues["PAR9"], 0x12345678)
+    self.assertEqual(paramValues["PAR11"], 10.0)
+    self.assertEqual(paramValues["PAR12"], -2.5)
+    self.assertTrue(tmPacket.checkChecksum())
+  # ---------------------------------------------------------------------------
+  def test_populatePlanCache(self):
+    """function to test the bounded cache of populate plans"""
+    tmPacketGenerator = SPACE.TMGEN.TMpacketGeneratorImpl(populatePlanCacheSize=2)
+    tmPktDef = SUPP.IF.s_definitions.getTMpktDefBySPID(testData.TM_PACKET_03_SPID)
+    plan1 = tmPacketGenerator.getPopulatePlan(tmPktDef, ("PAR1",))
+    plan2 = tmPacketGenerator.getPopulatePlan(tmPktDef, ("PAR2",))
+    # the access makes PAR1 the most recently used plan
+    self.assertIs(tmPacketGenerator.getPopulatePlan(tmPktDef, ("PAR1",)), plan1)
+    tmPacketGenerator.getPopulatePlan(tmPktDef, ("PAR3",))
+    self.assertEqual(len(tmPacketGenerator.populatePlans), 2)
+    self.assertIs(tmPacketGenerator.getPopulatePlan(tmPktDef, ("PAR1",)), plan1)
+    self.assertIsNot(tmPacketGenerator.getPopulatePlan(tmPktDef, ("PAR2",)), plan2)
+  # ---------------------------------------------------------------------------
+  def test_createTMpacket(self):
+    """function to test the side effect free creation of default packets"""
+    tmPacketGenerator = SPACE.IF.s_tmPacketGenerator
+    tmPktDef = SUPP.IF.s_definitions.getTMpktDefBySPID(testData.TM_PACKET_03_SPID)
+    sequenceCounters = dict(tmPacketGenerator.sequenceCounters)
+    packetCache = dict(tmPacketGenerator.packetCache)
+    tmPacket = tmPacketGenerator.createTMpacket(tmPktDef)
+    self.assertEqual(tmPacket.applicationProcessId, tmPktDef.pktAPID)
+    self.assertEqual(tmPacket.serviceType, tmPktDef.pktType)
+    self.assertEqual(tmPacket.serviceSubType, tmPktDef.pktSType)
+    self.assertEqual(len(tmPacket), tmPktDef.pktSPsize)
+    self.assertEqual(tmPacketGenerator.sequenceCounters, sequenceCounters)
+    self.assertEqual(tmPacketGenerator.packetCache, packetCache)
+  # ---------------------------------------------------------------------------
+  def test_extractionPlan(self):
+    """function to test the extraction of all parameters of a packet"""
+    random.seed(4711)
+    # synthetic parameter layout with all value types
+    paramExtractions = [
+      SUPP.IF.TMparamExtraction(48, 3, "B1", "", UTIL.DU.BITS),
+      SUPP.IF.TMparamExtraction(51, 5, "B2", "", UTIL.DU.SBITS),
+      SUPP.IF.TMparamExtraction(56, 16, "U2", "", UTIL.DU.UNSIGNED),
+      SUPP.IF.TMparamExtraction(72, 32, "S4", "", UTIL.DU.SIGNED),
+      SUPP.IF.TMparamExtraction(104, 32, "F4", "", UTIL.DU.FLOAT),
+      SUPP.IF.TMparamExtraction(136, 24, "U3", "", UTIL.DU.UNSIGNED),
+      SUPP.IF.TMparamExtraction(160, 24, "S3", "", UTIL.DU.SIGNED),
+      SUPP.IF.TMparamExtraction(186, 20, "B20", "", UTIL.DU.BITS),
+      SUPP.IF.TMparamExtraction(208, 64, "F8", "", UTIL.DU.FLOAT),
+      SUPP.IF.TMparamExtraction(272, 40, "BY", "", UTIL.DU.BYTES),
+      SUPP.IF.TMparamExtraction(312, 32, "ST", "", UTIL.DU.STRING),
+      SUPP.IF.TMparamExtraction(345, 14, "SB", "", UTIL.DU.SBITS),
+      SUPP.IF.TMparamExtraction(360, 8, "U1", "", UTIL.DU.UNSIGNED)]
+    plan = SUPP.IF.TMextractionPlan(paramExtractions)
+    # B1, B2, U2, S4 and F4 are read with one struct
+    self.assertEqual(plan.runs[0][0], 6)
+    self.assertEqual(plan.runs[0][1].format, ">BHif")
+    for i in range(20):
+      # printable characters, no NaN floats
+      dataUnit = CCSDS.DU.DataUnit(array.array("B",
+        [random.randrange(0x20, 0x7F) for j in range(plan.byteSize)]))
+      self.assertEqual(plan.extractAll(dataUnit.getBuffer()),
+                       [extractParam(dataUnit, paramExtraction)
+                        for paramExtraction in paramExtractions])
+    self.assertRaises(IndexError, plan.extractAll, bytes(plan.byteSize - 1))
+    # plans of the MIB packets
+    for tmPktDef in SUPP.IF.s_definitions.getTMpktDefs():
+      paramExtractions = tmPktDef.getParamExtractions()
+      plan = tmPktDef.getExtractionPlan()
+      self.assertIs(tmPktDef.getExtractionPlan(), plan)
+      dataUnit = CCSDS.DU.DataUnit(array.array("B",
+        [random.randrange(0x20, 0x7F) for j in range(max(plan.byteSize, 1))]))
+      self.assertEqual(tmPktDef.extractAll(dataUnit.getBuffer()),
+                       [extractParam(dataUnit, paramExtraction)
+                        for paramExtraction in paramExtractions])
+    # the caches are not pickled
+    tmPktDef = SUPP.IF.s_definitions.getTMpktDefBySPID(testData.TM_PACKET_03_SPID)
+    paramName = list(tmPktDef.paramLinks)[0]
+    paramExtraction = tmPktDef.getParamExtraction(paramName)
+    self.assertIs(tmPktDef.getParamExtraction(paramName), paramExtraction)
+    self.assertIsNone(tmPktDef.getParamExtraction("UNKNOWN"))
+    copiedPktDef = pickle.loads(pickle.dumps(tmPktDef))
+    self.assertIsNone(copiedPktDef.extractionPlan)
+    self.assertIsNone(copiedPktDef.paramExtractionCache)
+    self.assertEqual(copiedPktDef.getParamExtraction(paramName).bitPos,
+                     paramExtraction.bitPos)
 
 ########
 # main #
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+#******************************************************************************
+# (C) 2018, Stefan Korner, Austria                                            *
+#                                                                             *
+# The Space Python Library is free software; you can redistribute it and/or   *
+# modify it under under the terms of the MIT License as published by the      *
+# Massachusetts Institute of Technology.                                      *
+#                                                                             *
+# The Space Python Library is distributed in the hope that it will be useful, *
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              *
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the MIT License    *
+# for more details.                                                           *
+#******************************************************************************
+# Utilities - System Module - Unit Tests                                      *
+#******************************************************************************
+import os, shutil, tempfile, threading, unittest
+import UTIL.SYS
+from UTIL.SYS import LOG, LOG_INFO, LOG_WARNING, LOG_ERROR
+
+###########
+# classes #
+###########
+# =============================================================================
+class RecordingLogger(UTIL.SYS.Logger):
+  """records the logged messages"""
+  def __init__(self):
+    self.messages = []
+  def _log(self, message, subsystem):
+    self.messages.append(("LOG", message, subsystem))
+  def _logInfo(self, message, subsystem):
+    self.messages.append(("INFO", message, subsystem))
+  def _logWarning(self, message, subsystem):
+    self.messages.append(("WARNING", message, subsystem))
+  def _logError(self, message, subsystem):
+    self.messages.append(("ERROR", message, subsystem))
+
+# =============================================================================
+class BlockingLogWriter(UTIL.SYS.AsyncLogWriter):
+  """writer thread that waits before the first lines are written"""
+  def __init__(self, fileName, queueSize):
+    self.writeEnabled = threading.Event()
+    UTIL.SYS.AsyncLogWriter.__init__(self, fileName, queueSize=queueSize)
+  def writeLines(self, text):
+    self.writeEnabled.wait()
+    UTIL.SYS.AsyncLogWriter.writeLines(self, text)
+
+#############
+# test case #
+#############
+class TestSYS(unittest.TestCase):
+  def setUp(self):
+    self.logger = RecordingLogger()
+    UTIL.SYS.s_logger.registerChildLogger(self.logger)
+  def tearDown(self):
+    UTIL.SYS.s_logger.unregisterChildLogger()
+    UTIL.SYS.resetLogThresholds()
+  def test_logThresholds(self):
+    """messages below the threshold of their subsystem are discarded"""
+    LOG("a", "TM")
+    LOG_INFO("b")
+    self.assertEqual(self.logger.messages,
+                     [("LOG", "a", "TM"), ("INFO", "b", None)])
+    UTIL.SYS.setLogThresholds("WARNING, TM=info")
+    self.assertEqual(UTIL.SYS.getLogThresholdsStr(), "WARNING,TM=INFO")
+    self.assertTrue(UTIL.SYS.isLogEnabled(UTIL.SYS.INFO_LEVEL, "TM"))
+    self.assertFalse(UTIL.SYS.isLogEnabled(UTIL.SYS.INFO_LEVEL, "SPACE"))
+    self.logger.messages = []
+    LOG("c", "TM")
+    LOG_INFO("d", "TM")
+    LOG_INFO("e", "SPACE")
+    LOG_WARNING("f", "SPACE")
+    LOG_ERROR("g")
+    self.assertEqual(self.logger.messages,
+                     [("INFO", "d", "TM"),
+                      ("WARNING", "f", "SPACE"),
+                      ("ERROR", "g", None)])
+    UTIL.SYS.setLogThreshold(UTIL.SYS.OFF_LEVEL)
+    self.logger.messages = []
+    LOG_ERROR("h", "SPACE")
+    self.assertEqual(self.logger.messages, [])
+    with self.assertRaises(UTIL.SYS.Error):
+      UTIL.SYS.setLogThreshold("VERBOSE", "TM")
+  def test_deferredFormatting(self):
+    """messages are only formatted when they are logged"""
+    calls = []
+    def createMessage():
+      calls.append(True)
+      return "created"
+    UTIL.SYS.setLogThreshold("INFO", "TM")
+    LOG(createMessage, "TM")
+    LOG("%d%%", "TM", 100)
+    self.assertEqual(calls, [])
+    self.assertEqual(self.logger.messages, [])
+    LOG_INFO(createMessage, "TM")
+    LOG_INFO("%d%%", "TM", 100)
+    LOG_INFO("no args: 100%")
+    self.assertEqual(calls, [True])
+    self.assertEqual(self.logger.messages,
+                     [("INFO", "created", "TM"),
+                      ("INFO", "100%", "TM"),
+                      ("INFO", "no args: 100%", None)])
+  def test_asyncLogWriter(self):
+    """log lines are written by a background thread"""
+    UTIL.SYS.s_logger.unregisterChildLogger()
+    logDir = tempfile.mkdtemp()
+    try:
+      fileName = os.path.join(logDir, "test.log")
+      UTIL.SYS.s_logger.enableAsyncLogging(fileName, flushPeriod=60.0)
+      logWriter = UTIL.SYS.s_logger.logWriter
+      LOG("line 1", "TM")
+      LOG_ERROR("line 2")
+      logWriter.sync()
+      logFile = open(fileName)
+      self.assertEqual(logFile.read(), "[TM] line 1\nERROR: line 2\n")
+      logFile.close()
+      UTIL.SYS.s_logger.disableAsyncLogging()
+      self.assertFalse(logWriter.thread.is_alive())
+      # rotation
+      logWriter = UTIL.SYS.AsyncLogWriter(fileName, maxBytes=20, backupCount=2)
+      for i in range(5):
+        logWriter.write("0123456789 line " + str(i) + "\n")
+        logWriter.sync()
+      logWriter.close()
+      self.assertEqual(sorted(os.listdir(logDir)),
+                       ["test.log", "test.log.1", "test.log.2"])
+      logFile = open(fileName + ".2")
+      self.assertEqual(logFile.read(),
+                       "0123456789 line 0\n0123456789 line 1\n")
+      logFile.close()
+      # dropped lines are reported
+      logWriter = BlockingLogWriter(fileName, queueSize=2)
+      for i in range(10):
+        logWriter.write("line " + str(i) + "\n")
+      logWriter.writeEnabled.set()
+      logWriter.close()
+      logFile = open(fileName)
+      lines = logFile.readlines()
+      logFile.close()
+      self.assertEqual(lines[-1],
+                       "WARNING: " + str(logWriter.droppedCount) +
+                       " log messages dropped (queue full)\n")
+      self.assertEqual(len(lines) - 1 + logWriter.droppedCount, 10)
+    finally:
+      UTIL.SYS.s_logger.disableAsyncLogging()
+      shutil.rmtree(logDir)
+
+########
+# main #
+########
+if __name__ == "__main__":
+  unittest.main()
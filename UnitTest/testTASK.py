@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+#******************************************************************************
+# (C) 2018, Stefan Korner, Austria                                            *
+#                                                                             *
+# The Space Python Library is free software; you can redistribute it and/or   *
+# modify it under under the terms of the MIT License as published by the      *
+# Massachusetts Institute of Technology.                                      *
+#                                                                             *
+# The Space Python Library is distributed in the hope that it will be useful, *
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              *
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the MIT License    *
+# for more details.                                                           *
+#******************************************************************************
+# Unit Tests                                                                  *
+#******************************************************************************
+import os, socket, sys, tempfile, unittest
+import UTIL.TASK
+
+###########
+# classes #
+###########
+# =============================================================================
+class TimerTask(UTIL.TASK.Task):
+  """records the invocation of time handlers"""
+  # ---------------------------------------------------------------------------
+  def __init__(self):
+    """initialise as parent task, which is processed in the calling thread"""
+    UTIL.TASK.Task.__init__(self, isParent=True, isProcessing=False)
+    self.calls = []
+  # ---------------------------------------------------------------------------
+  def record(self, name):
+    """returns a time handler that records its name"""
+    return lambda: self.calls.append(name)
+
+# =============================================================================
+class LineConsoleHandler(UTIL.TASK.ConsoleHandler):
+  """records the console input lines, the first line stops the task"""
+  # ---------------------------------------------------------------------------
+  def __init__(self, task):
+    UTIL.TASK.ConsoleHandler.__init__(self)
+    self.task = task
+    self.lines = []
+  # ---------------------------------------------------------------------------
+  def processBuffer(self, buffer):
+    self.lines.append(buffer)
+    self.task.stop()
+
+#############
+# test case #
+#############
+class TestTASK(unittest.TestCase):
+  def test_timers(self):
+    """test one-shot, periodic and cancelled time handlers"""
+    # the timers are processed with a simulated clock in 5 ms steps
+    clock = [1000.0]
+    savedMonotonic = UTIL.TASK.time.monotonic
+    UTIL.TASK.time.monotonic = lambda: clock[0]
+    try:
+      task = TimerTask()
+      task.createTimeHandler(30, task.record("B"))
+      oneShot = task.createTimeHandler(10, task.record("A"))
+      task.createTimeHandler(30, task.record("C"))
+      cancelled = task.createTimeHandler(20, task.record("X"))
+      periodic = task.createTimeHandler(25, task.record("P"), periodic=True)
+      task.cancelTimeHandler(cancelled)
+      self.assertEqual(task.cancelledTimerCount, 1)
+      task.createTimeHandler(140, periodic.cancel)
+      for ms in range(5, 205, 5):
+        clock[0] = 1000.0 + ms / 1000.0
+        task.processTimers()
+      self.assertEqual(task.calls, ["A", "P", "B", "C", "P", "P", "P", "P"])
+      self.assertEqual(task.timerEvents, [])
+      self.assertEqual(task.cancelledTimerCount, 0)
+      # an expired one-shot timer is not counted as cancelled
+      task.cancelTimeHandler(oneShot)
+      self.assertEqual(task.cancelledTimerCount, 0)
+      # TimerHandle.cancel is routed through the task
+      direct = task.createTimeHandler(10, task.record("D"))
+      task.createTimeHandler(10, task.record("E"))
+      direct.cancel()
+      self.assertEqual(task.cancelledTimerCount, 1)
+      clock[0] += 0.01
+      task.processTimers()
+      self.assertEqual(task.calls[-1], "E")
+      self.assertEqual(task.calls.count("D"), 0)
+      self.assertEqual(task.cancelledTimerCount, 0)
+    finally:
+      UTIL.TASK.time.monotonic = savedMonotonic
+    self.assertRaises(UTIL.TASK.Error,
+                      task.createTimeHandler, 0, task.stop, True)
+
+  def test_fileHandlers(self):
+    """test read and write handlers, also deletion during dispatching"""
+    task = TimerTask()
+    socketA, socketB = socket.socketpair()
+    socketC, socketD = socket.socketpair()
+    def writeHandler(writeSocket, stateMask):
+      task.calls.append("write")
+      writeSocket.send(b"ping")
+      task.deleteWriteHandler(writeSocket)
+    def readHandlerA(readSocket, stateMask):
+      task.calls.append(readSocket.recv(16))
+      task.deleteFileHandler(readSocket)
+      task.deleteFileHandler(socketC)
+      socketB.send(b"x")
+    def readHandlerC(readSocket, stateMask):
+      task.calls.append("C")
+      task.deleteFileHandler(readSocket)
+      task.deleteFileHandler(socketA)
+    task.createFileHandler(socketA, readHandlerA)
+    task.createWriteHandler(socketB, writeHandler)
+    task.createTimeHandler(200, task.stop)
+    task.start()
+    self.assertEqual(task.calls, ["write", b"ping"])
+    self.assertEqual(len(task.readDictionary), 0)
+    self.assertEqual(len(task.writeDictionary), 0)
+    self.assertEqual(len(task.selector.get_map()), 0)
+    # both sockets become readable together, only one handler is called
+    socketB.send(b"y")
+    socketD.send(b"z")
+    task.calls = []
+    task.createFileHandler(socketA, readHandlerA)
+    task.createFileHandler(socketC, readHandlerC)
+    task.createTimeHandler(100, task.stop)
+    task.start()
+    self.assertEqual(len(task.calls), 1)
+    self.assertEqual(len(task.selector.get_map()), 0)
+    for dataSocket in [socketA, socketB, socketC, socketD]:
+      dataSocket.close()
+
+  def test_consoleFile(self):
+    """console input from a regular file, which epoll cannot poll"""
+    task = TimerTask()
+    fileHandle, fileName = tempfile.mkstemp()
+    os.write(fileHandle, b"help\n")
+    os.close(fileHandle)
+    savedStdin = sys.stdin
+    sys.stdin = open(fileName)
+    try:
+      consoleHandler = LineConsoleHandler(task)
+      task.registerConsoleHandler(consoleHandler)
+      task.createTimeHandler(5000, task.stop)
+      task.start()
+      self.assertEqual(consoleHandler.lines, ["help"])
+      task.deleteFileHandler(sys.stdin)
+      self.assertEqual(len(task.unpolledFiles), 0)
+    finally:
+      sys.stdin.close()
+      sys.stdin = savedStdin
+      os.remove(fileName)
+
+########
+# main #
+########
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+#******************************************************************************
+# (C) 2018, Stefan Korner, Austria                                            *
+#                                                                             *
+# The Space Python Library is free software; you can redistribute it and/or   *
+# modify it under under the terms of the MIT License as published by the      *
+# Massachusetts Institute of Technology.                                      *
+#                                                                             *
+# The Space Python Library is distributed in the hope that it will be useful, *
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              *
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the MIT License    *
+# for more details.                                                           *
+#******************************************************************************
+# Unit Tests                                                                  *
+#******************************************************************************
+import random, socket, unittest
+from UTIL.DU import UNSIGNED
+import UTIL.SYS, UTIL.TASK, UTIL.TCP
+
+#############
+# constants #
+#############
+PDU_SIZE = 1000
+PDU_COUNT = 2000
+
+#############
+# test case #
+#############
+class TestTCP(unittest.TestCase):
+  def test_sendQueue(self):
+    """test queueing, dropping and draining of sent data"""
+    task = UTIL.TASK.Task(isParent=True, isProcessing=False)
+    senderSocket, receiverSocket = socket.socketpair()
+    sender = UTIL.TCP.DataSocketHandler(task)
+    sender.enableDataSocket(senderSocket)
+    sender.setSendPolicy(UTIL.TCP.SEND_POLICY_DROP, 65536, 16384)
+    # the receiver does not read: the send queue must fill up
+    expectedData = bytearray()
+    for i in range(PDU_COUNT):
+      pdu = bytearray([i % 256]) * PDU_SIZE
+      if sender.send(pdu) == PDU_SIZE:
+        expectedData += pdu
+      # modification of the buffer after send must not corrupt queued data
+      pdu[0] = 0xFF
+    metrics = sender.getSendMetrics()
+    self.assertTrue(metrics["queuedBytes"] >= 65536)
+    self.assertTrue(metrics["droppedCount"] > 0)
+    self.assertEqual(metrics["droppedBytes"], metrics["droppedCount"] * PDU_SIZE)
+    self.assertEqual(len(expectedData) + metrics["droppedBytes"],
+                     PDU_COUNT * PDU_SIZE)
+    # the task sends the queued data when the receiver reads
+    receivedData = bytearray()
+    def receiveCallback(readSocket, stateMask):
+      receivedData.extend(readSocket.recv(65536))
+      if len(receivedData) == len(expectedData):
+        task.stop()
+    task.createFileHandler(receiverSocket, receiveCallback)
+    task.createTimeHandler(5000, task.stop)
+    task.start()
+    self.assertEqual(receivedData, expectedData)
+    self.assertEqual(sender.getSendMetrics()["queuedBytes"], 0)
+    self.assertFalse(senderSocket in task.writeDictionary)
+    # accepted again after draining
+    self.assertEqual(sender.send(b"ping"), 4)
+    self.assertEqual(receiverSocket.recv(16), b"ping")
+    task.deleteFileHandler(receiverSocket)
+    sender.disableDataSocket()
+    receiverSocket.close()
+
+  def test_sendError(self):
+    """a failed send discards the queued data and the write handler"""
+    task = UTIL.TASK.Task(isParent=True, isProcessing=False)
+    senderSocket, receiverSocket = socket.socketpair()
+    sender = UTIL.TCP.DataSocketHandler(task)
+    sender.enableDataSocket(senderSocket)
+    while sender.getSendMetrics()["queuedBytes"] == 0:
+      sender.send(bytes(PDU_SIZE))
+    self.assertTrue(senderSocket in task.writeDictionary)
+    receiverSocket.close()
+    sender.sendCallback(senderSocket, None)
+    self.assertEqual(sender.getSendMetrics()["queuedBytes"], 0)
+    self.assertFalse(senderSocket in task.writeDictionary)
+    sender.disableDataSocket()
+
+  def test_dataUnitDecoder(self):
+    """test decoding of fragmented and coalesced data unit streams"""
+    random.seed(4711)
+    # EDEN like header: 6 bytes, data field length in bytes 2..5
+    dataUnits = []
+    stream = bytearray()
+    for i in range(200):
+      dataField = bytes([i % 256]) * random.randrange(0, 300)
+      dataUnit = b"HD" + len(dataField).to_bytes(4, "big") + dataField
+      dataUnits.append(dataUnit)
+      stream += dataUnit
+    for chunkSize in [1, 5, 6, 7, 100, 1000, len(stream)]:
+      decoder = UTIL.TCP.DataUnitDecoder(6, (2, 4, UNSIGNED), sizeFieldDelta=6)
+      decodedDataUnits = []
+      for pos in range(0, len(stream), chunkSize):
+        decoder.feed(stream[pos:pos + chunkSize])
+        decodedDataUnits.extend(decoder.decode())
+      self.assertEqual(decodedDataUnits, dataUnits)
+      self.assertEqual(decoder.getMissingByteSize(), 6)
+    # data units that are bigger than the receive buffer
+    decoder = UTIL.TCP.DataUnitDecoder(6, (2, 4, UNSIGNED), sizeFieldDelta=6)
+    bigDataUnit = b"HD" + (200000).to_bytes(4, "big") + bytes(200000)
+    decoder.feed(bigDataUnit[:100])
+    self.assertEqual(decoder.decode(), [])
+    self.assertEqual(decoder.getMissingByteSize(), len(bigDataUnit) - 100)
+    decoder.feed(bigDataUnit[100:] + dataUnits[0])
+    self.assertEqual(decoder.decode(), [bigDataUnit, dataUnits[0]])
+    # invalid size field
+    decoder = UTIL.TCP.DataUnitDecoder(6, (2, 4, UNSIGNED), minDataUnitSize=7)
+    decoder.feed(b"HD" + (6).to_bytes(4, "big"))
+    self.assertRaises(UTIL.SYS.Error, decoder.decode)
+    # decoding from a socket
+    senderSocket, receiverSocket = socket.socketpair()
+    senderSocket.sendall(stream)
+    decoder = UTIL.TCP.DataUnitDecoder(6, (2, 4, UNSIGNED), sizeFieldDelta=6)
+    decodedDataUnits = []
+    while len(decodedDataUnits) < len(dataUnits):
+      self.assertTrue(decoder.recvFrom(receiverSocket) > 0)
+      decodedDataUnits.extend(decoder.decode())
+    self.assertEqual(decodedDataUnits, dataUnits)
+    senderSocket.close()
+    receiverSocket.close()
+
+########
+# main #
+########
+if __name__ == "__main__":
+  unittest.main()
@@ -13,8 +13,8 @@
 #******************************************************************************
 # Unit Tests                                                                  *
 #******************************************************************************
-import unittest
-import CCSDS.TIME
+import array, unittest
+import CCSDS.DU, CCSDS.TIME
 import UTIL.TCO, UTIL.TIME
 import testData
 
@@ -213,6 +213,58 @@ class TestTIME(unittest.TestCase):
       self.assertEqual(pics1CDStimeDU.pics, 1)
     except:
       self.assertEqual(pics1CDStimeDU.pics, 0)
+  def test_timeCodec(self):
+    """tests the direct buffer encoding and decoding of the time formats"""
+    pyTimes = [0.0, 0.5, 86399.9999, 86400.0, 1234567.890123, 987654321.000001]
+    cucScales = {CCSDS.TIME.TIME_FORMAT_CUC1: 0x100,
+                 CCSDS.TIME.TIME_FORMAT_CUC2: 0x10000,
+                 CCSDS.TIME.TIME_FORMAT_CUC3: 0x1000000,
+                 CCSDS.TIME.TIME_FORMAT_CUC4: 0x100000000}
+    for timeFormat in sorted(CCSDS.TIME.TIME_CODECS):
+      byteSize = CCSDS.TIME.byteArraySize(timeFormat)
+      timeColumn = bytearray()
+      for pyTime in pyTimes:
+        # encoded at an offset, the surrounding bytes are not touched
+        buffer = bytearray(b"\xAA" * (byteSize + 4))
+        CCSDS.TIME.encodeTime(buffer, 2, timeFormat, pyTime)
+        self.assertEqual(buffer[:2], b"\xAA\xAA")
+        self.assertEqual(buffer[-2:], b"\xAA\xAA")
+        timeField = buffer[2:-2]
+        timeColumn += timeField
+        # check the fields via the attribute maps
+        timeDU = CCSDS.TIME.createCCSDS(timeField, timeFormat)
+        if CCSDS.TIME.isCDStimeFormat(timeFormat):
+          self.assertEqual(timeDU.days, int(pyTime) // 86400)
+        else:
+          self.assertEqual(timeDU.coarse, int(pyTime))
+          if timeFormat in cucScales:
+            fine = int((pyTime - int(pyTime)) * cucScales[timeFormat])
+            self.assertEqual(timeDU.fine, fine)
+        self.assertEqual(bytes(timeDU.getBuffer()),
+                         bytes(CCSDS.TIME.convertToCCSDS(pyTime, timeFormat).getBuffer()))
+        # decoding
+        decodedTime = CCSDS.TIME.decodeTime(buffer, 2, timeFormat)
+        if timeFormat == CCSDS.TIME.TIME_FORMAT_CUC0:
+          self.assertEqual(decodedTime, int(pyTime))
+        else:
+          self.assertEqual(decodedTime, CCSDS.TIME.convertFromCCSDS(timeDU, timeFormat))
+          self.assertAlmostEqual(decodedTime, pyTime, places=2)
+      # batch decoding
+      decodedTimes = CCSDS.TIME.decodeTimeColumn(timeColumn, timeFormat)
+      self.assertEqual(len(decodedTimes), len(pyTimes))
+      for i, decodedTime in enumerate(decodedTimes):
+        self.assertEqual(decodedTime,
+                         CCSDS.TIME.decodeTime(timeColumn, i * byteSize, timeFormat))
+      self.assertRaises(CCSDS.TIME.Error,
+                        CCSDS.TIME.decodeTimeColumn, timeColumn[:-1], timeFormat)
+    self.assertRaises(CCSDS.TIME.Error,
+                      CCSDS.TIME.encodeTime, bytearray(10), 0, 99, 0.0)
+    # time fields of CCSDS data units
+    dataUnit = CCSDS.DU.DataUnit(array.array("B", [0] * 12))
+    dataUnit.setTime(2, CCSDS.TIME.TIME_FORMAT_CDS3, 1234567.5)
+    self.assertEqual(dataUnit.getTime(2, CCSDS.TIME.TIME_FORMAT_CDS3), 1234567.5)
+    self.assertRaises(IndexError, dataUnit.setTime, 4, CCSDS.TIME.TIME_FORMAT_CDS3, 0.0)
+    self.assertRaises(IndexError, dataUnit.getTime, -1, CCSDS.TIME.TIME_FORMAT_CDS1)
 
 ########
 # main #
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+#******************************************************************************
+# (C) 2020, Stefan Korner, Austria                                            *
+#                                                                             *
+# The Space Python Library is free software; you can redistribute it and/or   *
+# modify it under under the terms of the MIT License as published by the      *
+# Massachusetts Institute of Technology.                                      *
+#                                                                             *
+# The Space Python Library is distributed in the hope that it will be useful, *
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              *
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the MIT License    *
+# for more details.                                                           *
+#******************************************************************************
+# TM Packet Archive - Unit Tests                                              *
+#******************************************************************************
+import os, shutil, tempfile, unittest
+import CCSDS.PACKET
+import SUPP.TMARCHIVE
+import UTIL.TCO, UTIL.TIME
+
+#############
+# constants #
+#############
+SEGMENT_PERIOD = 60
+# aligned to the segment period
+START_TIME = 1599999960.0
+
+#############
+# functions #
+#############
+def createPacket(apid, ssc, packetSize):
+  """creates a raw TM packet"""
+  tmPacket = CCSDS.PACKET.createIdlePacket(packetSize)
+  tmPacket.applicationProcessId = apid
+  tmPacket.sequenceControlCount = ssc
+  return tmPacket.getBuffer()
+
+#############
+# test case #
+#############
+class TestTMARCHIVE(unittest.TestCase):
+  # ---------------------------------------------------------------------------
+  def setUp(self):
+    """creates a temporary archive directory"""
+    self.archiveDir = tempfile.mkdtemp()
+  # ---------------------------------------------------------------------------
+  def tearDown(self):
+    """deletes the archive"""
+    shutil.rmtree(self.archiveDir)
+  # ---------------------------------------------------------------------------
+  def test_writeRead(self):
+    """packets are written in segments and selected via the index"""
+    archiveWriter = SUPP.TMARCHIVE.ArchiveWriter(self.archiveDir, SEGMENT_PERIOD)
+    binPackets = []
+    for i in range(12):
+      binPacket = createPacket(100 + i % 3, i, 10 + i)
+      binPackets.append(binPacket)
+      archiveWriter.pushPacket(binPacket, START_TIME + i * 10, 1000 + i)
+    archiveWriter.sync()
+    archiveReader = SUPP.TMARCHIVE.ArchiveReader(self.archiveDir)
+    self.assertEqual(archiveReader.getSegments(),
+                     [(1599999960, "20200913_122600"),
+                      (1600000020, "20200913_122700")])
+    records = list(archiveReader.readPackets())
+    self.assertEqual(len(records), 12)
+    for i, (ert, apid, spid, ssc, binPacket) in enumerate(records):
+      self.assertEqual(ert, START_TIME + i * 10)
+      self.assertEqual(apid, 100 + i % 3)
+      self.assertEqual(spid, 1000 + i)
+      self.assertEqual(ssc, i)
+      self.assertEqual(binPacket, binPackets[i])
+    # time range only in the 2nd segment, APID and SPID filters
+    records = archiveReader.readPackets(startTime=START_TIME + 65,
+                                        stopTime=START_TIME + 100)
+    self.assertEqual([record[3] for record in records], [7, 8, 9])
+    records = archiveReader.readPackets(apids=[101])
+    self.assertEqual([record[3] for record in records], [1, 4, 7, 10])
+    records = archiveReader.readPackets(startTime=START_TIME + 30,
+                                        spids=[1002, 1011])
+    self.assertEqual([record[3] for record in records], [11])
+    # append to an existing segment, also out of time order
+    archiveWriter.pushPacket(createPacket(100, 12, 10), START_TIME + 5)
+    archiveWriter.close()
+    records = list(SUPP.TMARCHIVE.ArchiveReader(self.archiveDir).readPackets(
+      stopTime=START_TIME + 60))
+    self.assertEqual([record[3] for record in records], [0, 1, 2, 3, 4, 5, 12])
+    self.assertEqual(records[-1][2], SUPP.TMARCHIVE.NO_SPID)
+    archiveReader.close()
+  # ---------------------------------------------------------------------------
+  def test_writeErrors(self):
+    """invalid packets are skipped, the other packets of the batch are written"""
+    archiveWriter = SUPP.TMARCHIVE.ArchiveWriter(self.archiveDir, SEGMENT_PERIOD)
+    archiveWriter.pushPacket(b"\0\0", START_TIME)
+    archiveWriter.pushPacket(createPacket(100, 1, 20), START_TIME + 1, 0x80000001)
+    archiveWriter.close()
+    self.assertFalse(archiveWriter.thread.is_alive())
+    archiveReader = SUPP.TMARCHIVE.ArchiveReader(self.archiveDir)
+    records = list(archiveReader.readPackets())
+    self.assertEqual([(record[2], record[3]) for record in records],
+                     [(0x80000001, 1)])
+    archiveReader.close()
+  # ---------------------------------------------------------------------------
+  def test_recovery(self):
+    """records without index entries are recovered"""
+    archiveWriter = SUPP.TMARCHIVE.ArchiveWriter(self.archiveDir, SEGMENT_PERIOD)
+    for i in range(5):
+      archiveWriter.pushPacket(createPacket(100, i, 20), START_TIME + i)
+    archiveWriter.close()
+    segmentPath = os.path.join(self.archiveDir, "20200913_122600")
+    # index with a partial last entry, incomplete last record
+    indexFile = open(segmentPath + SUPP.TMARCHIVE.INDEX_FILE_EXTENSION, "r+b")
+    indexFile.truncate(SUPP.TMARCHIVE.INDEX_ENTRY_BYTE_SIZE * 2 + 3)
+    indexFile.close()
+    segmentFile = open(segmentPath + SUPP.TMARCHIVE.SEGMENT_FILE_EXTENSION, "ab")
+    segmentFile.write(b"\0\0\0\x20\0\0")
+    segmentFile.close()
+    archiveReader = SUPP.TMARCHIVE.ArchiveReader(self.archiveDir)
+    records = list(archiveReader.readPackets())
+    self.assertEqual([record[3] for record in records], [0, 1, 2, 3, 4])
+    self.assertEqual([record[0] for record in records],
+                     [START_TIME + i for i in range(5)])
+    archiveReader.close()
+  # ---------------------------------------------------------------------------
+  def test_appendAfterCrash(self):
+    """a segment that was not indexed completely is recovered before appending"""
+    archiveWriter = SUPP.TMARCHIVE.ArchiveWriter(self.archiveDir, SEGMENT_PERIOD)
+    for i in range(5):
+      archiveWriter.pushPacket(createPacket(100, i, 20), START_TIME + i)
+    archiveWriter.close()
+    # crash: the last 2 records are not indexed, the next one is incomplete
+    segmentPath = os.path.join(self.archiveDir, "20200913_122600")
+    indexFile = open(segmentPath + SUPP.TMARCHIVE.INDEX_FILE_EXTENSION, "r+b")
+    indexFile.truncate(SUPP.TMARCHIVE.INDEX_ENTRY_BYTE_SIZE * 3)
+    indexFile.close()
+    segmentFile = open(segmentPath + SUPP.TMARCHIVE.SEGMENT_FILE_EXTENSION, "ab")
+    segmentFile.write(b"\0\0\0\x20\0\0")
+    segmentFile.close()
+    # restart and append to the same segment
+    archiveWriter = SUPP.TMARCHIVE.ArchiveWriter(self.archiveDir, SEGMENT_PERIOD)
+    for i in range(5, 7):
+      archiveWriter.pushPacket(createPacket(100, i, 20), START_TIME + i)
+    archiveWriter.close()
+    indexSize = os.path.getsize(segmentPath + SUPP.TMARCHIVE.INDEX_FILE_EXTENSION)
+    self.assertEqual(indexSize, SUPP.TMARCHIVE.INDEX_ENTRY_BYTE_SIZE * 7)
+    archiveReader = SUPP.TMARCHIVE.ArchiveReader(self.archiveDir)
+    records = list(archiveReader.readPackets())
+    self.assertEqual([record[3] for record in records], list(range(7)))
+    self.assertEqual(records[6][4], createPacket(100, 6, 20))
+    archiveReader.close()
+  # ---------------------------------------------------------------------------
+  def test_convertReplayFile(self):
+    """hex replay files are converted into an archive"""
+    ertStr = "2020.257.12.26.10.000"
+    replayFileName = os.path.join(self.archiveDir, "replay.hex")
+    replayFile = open(replayFileName, "w")
+    replayFile.write("# TM packet replay file with hex raw packets\n")
+    replayFile.write(bytes(createPacket(100, 1, 10)).hex().upper() + "\n")
+    replayFile.write("# packet 2\n")
+    replayFile.write(ertStr + "\n")
+    replayFile.write(bytes(createPacket(101, 2, 12)).hex().upper() + "\n")
+    replayFile.write("sleep(1000)\n")
+    replayFile.write(bytes(createPacket(102, 3, 14)).hex().upper() + "\n")
+    replayFile.close()
+    archiveDir = os.path.join(self.archiveDir, "archive")
+    packetsNr = SUPP.TMARCHIVE.convertReplayFile(replayFileName, archiveDir)
+    self.assertEqual(packetsNr, 3)
+    archiveReader = SUPP.TMARCHIVE.ArchiveReader(archiveDir)
+    records = list(archiveReader.readPackets())
+    ert = UTIL.TCO.correlateFromERTmissionEpoch(
+      UTIL.TIME.getTimeFromASDstr(ertStr))
+    self.assertEqual([record[0] for record in records], [0.0, ert, ert])
+    self.assertEqual([record[1] for record in records], [100, 101, 102])
+    self.assertEqual(records[2][4], createPacket(102, 3, 14))
+    archiveReader.close()
+
+########
+# main #
+########
+if __name__ == "__main__":
+  unittest.main()
@@ -68,7 +68,7 @@
 #  +-- s_8: Par8 = 182736489393276                                        936 *
 #  +-- s_9: Par9 = "This is the last variable string in the struct"      1320 *
 #******************************************************************************
-import sys, unittest
+import gc, sys, unittest
 import PUS.VP
 import UTIL.DU
 
@@ -277,6 +277,46 @@ def encodeDecode(struct, structDef):
   dStruct.decode(du, 0)
   return dStruct
 
+# -----------------------------------------------------------------------------
+def createNestedDefinition():
+  """struct with bit fields, numbers and a list of lists"""
+  def slotDef(slotName, paramType, bitWidth, defaultValue):
+    return PUS.VP.SlotDef(slotName,
+      PUS.VP.SimpleParamDef(slotName, paramType, bitWidth, defaultValue, False))
+  innerDef = PUS.VP.StructDef("", [
+    slotDef("i_1", UTIL.DU.BITS, 3, 5),
+    slotDef("i_2", UTIL.DU.SBITS, 5, -7),
+    slotDef("i_3", UTIL.DU.SIGNED, 16, -1234),
+    slotDef("i_4", UTIL.DU.FLOAT, 64, 1.5)])
+  innerLenDef = PUS.VP.SimpleParamDef("n_2", UTIL.DU.UNSIGNED, 8, 2, False)
+  outerDef = PUS.VP.StructDef("", [
+    slotDef("o_1", UTIL.DU.UNSIGNED, 24, 70000),
+    PUS.VP.SlotDef("o_2",
+      PUS.VP.VariableParamDef("o_2", UTIL.DU.STRING, 1, "var", False)),
+    PUS.VP.SlotDef("o_3", PUS.VP.ListDef(innerLenDef, innerDef)),
+    slotDef("o_4", UTIL.DU.BITS, 16, 4711)])
+  outerLenDef = PUS.VP.SimpleParamDef("n_1", UTIL.DU.UNSIGNED, 16, 3, False)
+  return PUS.VP.StructDef("NESTED", [
+    slotDef("s_1", UTIL.DU.UNSIGNED, 8, 200),
+    slotDef("s_2", UTIL.DU.BITS, 4, 9),
+    slotDef("s_3", UTIL.DU.BITS, 12, 4000),
+    PUS.VP.SlotDef("s_4", PUS.VP.ListDef(outerLenDef, outerDef)),
+    slotDef("s_5", UTIL.DU.STRING, 32, "last")])
+# -----------------------------------------------------------------------------
+def encodeDecodeMode(struct, structDef, compiledCodecs):
+  """encodes/decodes with the compiled or the interpretive processing"""
+  oldCompiledCodecs = PUS.VP.COMPILED_CODECS
+  PUS.VP.COMPILED_CODECS = compiledCodecs
+  try:
+    du = UTIL.DU.BinaryUnit()
+    du.setLen(struct.getBitWidth() >> 3)
+    nextBitPos = struct.encode(du, 0)
+    dStruct = PUS.VP.Struct(structDef)
+    dNextBitPos = dStruct.decode(du, 0)
+  finally:
+    PUS.VP.COMPILED_CODECS = oldCompiledCodecs
+  return (du.getBuffer(), nextBitPos, dStruct, dNextBitPos)
+
 #############
 # test case #
 #############
@@ -354,6 +394,95 @@ class TestVP(unittest.TestCase):
       "Struct.s_8 = 182736489393276\n" + \
       "Struct.s_9 = This is the last variable string in the struct")
     self.assertTrue(testStruct2(dStruct))
+  def test_compiledCodec(self):
+    """compiled codec produces the same results as the interpretive one"""
+    structDef = createNestedDefinition()
+    self.assertIs(PUS.VP.getStructCodec(structDef),
+                  PUS.VP.getStructCodec(structDef))
+    struct = PUS.VP.Struct(structDef)
+    struct.s_4[1].o_2.value = "longer value"
+    struct.s_4[1].o_3.setLen(4)
+    struct.s_4[1].o_3[3].i_3.value = 32767
+    struct.s_4[2].o_3.setLen(0)
+    compiledResult = encodeDecodeMode(struct, structDef, True)
+    interpretiveResult = encodeDecodeMode(struct, structDef, False)
+    buffer, nextBitPos, dStruct, dNextBitPos = compiledResult
+    self.assertEqual(buffer, interpretiveResult[0])
+    self.assertEqual(nextBitPos, struct.getBitWidth())
+    self.assertEqual(nextBitPos, interpretiveResult[1])
+    self.assertEqual(dNextBitPos, nextBitPos)
+    self.assertEqual(str(dStruct), str(struct))
+    self.assertEqual(str(dStruct), str(interpretiveResult[2]))
+    self.assertEqual(dStruct.s_4[0].o_3[1].i_2.value, -7)
+    self.assertEqual(dStruct.s_4[1].o_3[3].i_3.value, 32767)
+    # values that are converted or out of range
+    struct.s_1.value = "17"
+    buffer = encodeDecodeMode(struct, structDef, True)[0]
+    self.assertEqual(buffer[0], 17)
+    struct.s_1.value = 256
+    with self.assertRaises(ValueError):
+      encodeDecodeMode(struct, structDef, True)
+    struct.s_1.value = 17
+    # a struct that does not start byte aligned
+    du = UTIL.DU.BinaryUnit()
+    du.setLen((struct.getBitWidth() >> 3) + 1)
+    with self.assertRaises(PUS.VP.Error):
+      struct.encode(du, 4)
+    # buffer too short
+    du = UTIL.DU.BinaryUnit()
+    du.setLen(2)
+    with self.assertRaises(IndexError):
+      PUS.VP.Struct(structDef).decode(du, 0)
+  def test_codecRelease(self):
+    """codecs are released with their definitions (e.g. after a reload)"""
+    codecCount = len(PUS.VP.s_structCodecs)
+    structDef = createNestedDefinition()
+    encodeDecodeMode(PUS.VP.Struct(structDef), structDef, True)
+    self.assertTrue(len(PUS.VP.s_structCodecs) > codecCount)
+    del structDef
+    gc.collect()
+    self.assertEqual(len(PUS.VP.s_structCodecs), codecCount)
+  def test_lazyDecode(self):
+    """list entries are located only and decoded on access"""
+    structDef = createNestedDefinition()
+    struct = PUS.VP.Struct(structDef)
+    struct.s_4.setLen(50)
+    struct.s_4[7].o_3.setLen(3)
+    struct.s_4[7].o_3[2].i_4.value = -2.75
+    du = UTIL.DU.BinaryUnit()
+    du.setLen(struct.getBitWidth() >> 3)
+    nextBitPos = struct.encode(du, 0)
+    lStruct = PUS.VP.Struct(structDef)
+    self.assertEqual(lStruct.decode(du, 0, lazy=True), nextBitPos)
+    self.assertTrue(lStruct.s_4.isLazy())
+    self.assertEqual(len(lStruct.s_4), 50)
+    # variable entry size: the positions are scanned
+    entries = lStruct.s_4.entries
+    self.assertFalse(entries.isDecoded(7))
+    outerEntry = lStruct.s_4[7]
+    self.assertTrue(entries.isDecoded(7))
+    self.assertIs(lStruct.s_4[7], outerEntry)
+    self.assertEqual(len(entries.decodedEntries), 1)
+    # fixed entry size: the positions are calculated
+    innerEntries = outerEntry.o_3.entries
+    self.assertEqual(type(innerEntries.entryBitPositions), range)
+    self.assertEqual(outerEntry.o_3[-1].i_4.value, -2.75)
+    self.assertEqual(outerEntry.o_4.value, 4711)
+    self.assertEqual(lStruct.s_5.value, "last")
+    # iteration and str() decode all entries
+    self.assertEqual(str(lStruct), str(struct))
+    # changing the length or a normal decode replaces the lazy entries
+    lStruct.s_4.setLen(2)
+    self.assertFalse(lStruct.s_4.isLazy())
+    self.assertEqual(len(lStruct.s_4), 2)
+    lStruct.decode(du, 0, lazy=True)
+    lStruct.decode(du, 0)
+    self.assertFalse(lStruct.s_4.isLazy())
+    self.assertEqual(str(lStruct), str(struct))
+    # a list that exceeds the data unit
+    du.setLen(40)
+    with self.assertRaises(IndexError):
+      PUS.VP.Struct(structDef).decode(du, 0, lazy=True)
 
 ########
 # main #
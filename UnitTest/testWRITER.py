@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+#******************************************************************************
+# (C) 2020, Stefan Korner, Austria                                            *
+#                                                                             *
+# The Space Python Library is free software; you can redistribute it and/or   *
+# modify it under under the terms of the MIT License as published by the      *
+# Massachusetts Institute of Technology.                                      *
+#                                                                             *
+# The Space Python Library is distributed in the hope that it will be useful, *
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              *
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the MIT License    *
+# for more details.                                                           *
+#******************************************************************************
+# Background Writer - Unit Tests                                              *
+#******************************************************************************
+import threading, unittest
+import UTIL.WRITER
+
+###########
+# classes #
+###########
+# =============================================================================
+class ListWriter(UTIL.WRITER.BackgroundWriter):
+  """
+  writes the items into a list, negative items fail,
+  item 0 blocks the thread until the next batch is queued
+  """
+  # ---------------------------------------------------------------------------
+  def __init__(self):
+    self.pending = []
+    self.written = []
+    self.errors = []
+    self.closed = False
+    self.gateReached = threading.Event()
+    self.gateOpen = threading.Event()
+    UTIL.WRITER.BackgroundWriter.__init__(self, flushPeriod=10.0)
+  # ---------------------------------------------------------------------------
+  def writeItem(self, item):
+    if item == 0:
+      self.gateReached.set()
+      self.gateOpen.wait()
+      return False
+    if item < 0:
+      raise ValueError("invalid item " + str(item))
+    self.pending.append(item)
+    return False
+  # ---------------------------------------------------------------------------
+  def flush(self):
+    self.written += self.pending
+    self.pending = []
+  # ---------------------------------------------------------------------------
+  def closeOutput(self):
+    self.closed = True
+  # ---------------------------------------------------------------------------
+  def writeError(self, action, ex):
+    self.errors.append((action, str(ex)))
+
+#############
+# test case #
+#############
+class TestWRITER(unittest.TestCase):
+  def test_backgroundWriter(self):
+    """failing items do not affect the batch, sync and close"""
+    writer = ListWriter()
+    writer.putItem(1)
+    writer.sync()
+    self.assertEqual(writer.written, [1])
+    # the next batch is queued while the thread is blocked:
+    # failing item, valid item and close item are processed together
+    writer.putItem(0)
+    writer.gateReached.wait()
+    writer.putItem(-2)
+    writer.putItem(3)
+    writer.putItem(UTIL.WRITER.CLOSE_ITEM)
+    writer.gateOpen.set()
+    writer.thread.join()
+    self.assertFalse(writer.thread.is_alive())
+    self.assertTrue(writer.closed)
+    self.assertEqual(writer.written, [1, 3])
+    self.assertEqual(writer.errors, [("write", "invalid item -2")])
+    # close of a terminated writer
+    writer.close()
+
+########
+# main #
+########
+if __name__ == "__main__":
+  unittest.main()